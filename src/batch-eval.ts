@@ -0,0 +1,222 @@
+/**
+ * Batch hand evaluation for simulations, bots and analytics
+ *
+ * Hands are rows of a count matrix: HAND_MATRIX_WIDTH bytes per hand, one per
+ * match class (flowers folded, as in hand-matcher.ts) and a last column of
+ * jokers. All tiles are taken as concealed. evaluateHands writes, per row, the
+ * best pattern completed and its points, plus a byte per card pattern telling
+ * whether the hand completes it. Nothing is allocated per hand or per pattern:
+ * rows go through the card's win table when one ships for it (win-table.ts),
+ * otherwise through the feature index and the compiled matcher.
+ *
+ * evaluateHandsOnPool splits the rows into chunks across a WorkerPool; the
+ * matrix and results are backed by SharedArrayBuffers so workers read and
+ * write them in place. Workers evaluate against the shared 2024 card.
+ */
+
+import { RuleCard, Tile } from './types';
+import { HandCounts } from './hand-counts';
+import { getShared2024RuleCard } from './rulecard';
+import {
+  HandVector,
+  HAND_SIZE,
+  MATCH_CLASS_COUNT,
+  getCompiledRuleCard,
+  matchClass,
+  matchCompiledPattern
+} from './hand-matcher';
+import { getWinTable } from './win-table';
+import { JOKER_ID, INVALID_TILE_ID, encodeTile } from './tile-codec';
+import { WorkerPool } from './worker-pool';
+
+/** Bytes per hand: one count per match class, then jokers */
+export const HAND_MATRIX_WIDTH = MATCH_CLASS_COUNT + 1;
+
+/** Best pattern of a row that completes none */
+export const NO_PATTERN = -1;
+
+export interface HandMatrix {
+  count: number;
+  counts: Uint8Array; // count * HAND_MATRIX_WIDTH tile counts, one row per hand
+}
+
+export interface HandEvaluationBatch {
+  count: number;
+  patternCount: number;
+  best: Int16Array;     // Index into the card's patterns of the best match, or NO_PATTERN
+  points: Uint16Array;  // Points of the best match (0 when none)
+  feasible: Uint8Array; // count * patternCount: 1 when the hand completes the pattern
+}
+
+export interface BatchEvalOptions {
+  chunkSize?: number; // Hands per worker task (default: spread evenly, at most 4096)
+}
+
+function allocate(bytes: number, shared: boolean): ArrayBuffer | SharedArrayBuffer {
+  return shared ? new SharedArrayBuffer(bytes) : new ArrayBuffer(bytes);
+}
+
+/**
+ * Allocates an empty matrix. Pass shared = true to back it with a
+ * SharedArrayBuffer so worker threads can read it in place.
+ */
+export function createHandMatrix(count: number, shared: boolean = false): HandMatrix {
+  return { count, counts: new Uint8Array(allocate(count * HAND_MATRIX_WIDTH, shared)) };
+}
+
+/**
+ * Writes one hand into a matrix row, replacing what was there
+ */
+export function setMatrixHand(matrix: HandMatrix, row: number, hand: readonly Tile[] | HandCounts): void {
+  if (row < 0 || row >= matrix.count) {
+    throw new Error(`Row ${row} is outside a matrix of ${matrix.count}`);
+  }
+  const base = row * HAND_MATRIX_WIDTH;
+  matrix.counts.fill(0, base, base + HAND_MATRIX_WIDTH);
+
+  if (hand instanceof HandCounts) {
+    for (let id = 0; id < JOKER_ID; id++) {
+      matrix.counts[base + matchClass(id)] += hand.countId(id);
+    }
+    matrix.counts[base + MATCH_CLASS_COUNT] = hand.jokerCount;
+    return;
+  }
+  for (const tile of hand) {
+    const id = encodeTile(tile);
+    if (id === INVALID_TILE_ID) throw new Error(`Unknown tile: ${tile}`);
+    matrix.counts[base + (id === JOKER_ID ? MATCH_CLASS_COUNT : matchClass(id))]++;
+  }
+}
+
+/**
+ * Builds a matrix with one row per hand
+ */
+export function toHandMatrix(hands: ReadonlyArray<readonly Tile[] | HandCounts>, shared: boolean = false): HandMatrix {
+  const matrix = createHandMatrix(hands.length, shared);
+  hands.forEach((hand, row) => setMatrixHand(matrix, row, hand));
+  return matrix;
+}
+
+/**
+ * Allocates results for a matrix of count hands
+ */
+export function createHandEvaluationBatch(
+  count: number,
+  patternCount: number,
+  shared: boolean = false
+): HandEvaluationBatch {
+  return {
+    count,
+    patternCount,
+    best: new Int16Array(allocate(count * 2, shared)),
+    points: new Uint16Array(allocate(count * 2, shared)),
+    feasible: new Uint8Array(allocate(count * patternCount, shared))
+  };
+}
+
+/**
+ * Evaluates rows [from, to) of a matrix into the results. Only one scratch
+ * vector is allocated for the whole range.
+ */
+export function fillHandEvaluation(
+  matrix: HandMatrix,
+  results: HandEvaluationBatch,
+  card: RuleCard,
+  from: number = 0,
+  to: number = matrix.count
+): void {
+  const compiled = getCompiledRuleCard(card);
+  if (results.patternCount !== compiled.patterns.length) {
+    throw new Error(`Results hold ${results.patternCount} patterns, the card has ${compiled.patterns.length}`);
+  }
+  if (from < 0 || to > matrix.count || to > results.count) {
+    throw new Error(`Hands ${from}..${to} do not fit a batch of ${Math.min(matrix.count, results.count)}`);
+  }
+
+  const table = getWinTable(card);
+  const patternCount = results.patternCount;
+  const vector: HandVector = {
+    counts: new Uint8Array(MATCH_CLASS_COUNT),
+    jokers: 0,
+    melds: [],
+    exposed: new Uint8Array(MATCH_CLASS_COUNT),
+    meldJokers: 0,
+    size: 0
+  };
+
+  for (let row = from; row < to; row++) {
+    const base = row * HAND_MATRIX_WIDTH;
+    let size = 0;
+    for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+      vector.counts[cls] = matrix.counts[base + cls];
+      size += vector.counts[cls];
+    }
+    vector.jokers = matrix.counts[base + MATCH_CLASS_COUNT];
+    vector.size = size + vector.jokers;
+
+    const feasible = row * patternCount;
+    results.feasible.fill(0, feasible, feasible + patternCount);
+    let best = NO_PATTERN;
+    let points = 0;
+
+    if (vector.size === HAND_SIZE) {
+      if (table) {
+        // Listed highest points first
+        const found = table.lookup(vector.counts, vector.jokers);
+        for (let i = 0; i < found.length; i++) results.feasible[feasible + found[i]] = 1;
+        if (found.length > 0) best = found[0];
+      } else {
+        for (const pattern of compiled.index.candidates(vector)) {
+          if (!matchCompiledPattern(pattern, vector)) continue;
+          const p = compiled.patterns.indexOf(pattern);
+          results.feasible[feasible + p] = 1;
+          if (best === NO_PATTERN || pattern.pattern.points > card.patterns[best].points) best = p;
+        }
+      }
+      if (best !== NO_PATTERN) points = card.patterns[best].points;
+    }
+    results.best[row] = best;
+    results.points[row] = points;
+  }
+}
+
+/**
+ * Evaluates every hand of a matrix on the calling thread
+ */
+export function evaluateHands(matrix: HandMatrix, card: RuleCard = getShared2024RuleCard()): HandEvaluationBatch {
+  const results = createHandEvaluationBatch(matrix.count, card.patterns.length);
+  fillHandEvaluation(matrix, results, card);
+  return results;
+}
+
+/**
+ * Evaluates every hand of a matrix against the shared 2024 card, fanning
+ * chunks out across a worker pool. Produces exactly the same results as
+ * evaluateHands. A matrix not backed by a SharedArrayBuffer is copied into one.
+ */
+export async function evaluateHandsOnPool(
+  matrix: HandMatrix,
+  pool: WorkerPool,
+  options: BatchEvalOptions = {}
+): Promise<HandEvaluationBatch> {
+  let shared = matrix;
+  if (!(matrix.counts.buffer instanceof SharedArrayBuffer)) {
+    shared = createHandMatrix(matrix.count, true);
+    shared.counts.set(matrix.counts);
+  }
+  const results = createHandEvaluationBatch(matrix.count, getShared2024RuleCard().patterns.length, true);
+  const workers = Math.max(1, pool.getMetrics().workers);
+  const chunkSize = Math.max(1, options.chunkSize ?? Math.min(4096, Math.ceil(matrix.count / workers)));
+
+  const tasks: Promise<number>[] = [];
+  for (let from = 0; from < matrix.count; from += chunkSize) {
+    tasks.push(pool.run('evaluateHands', {
+      matrix: shared,
+      results,
+      from,
+      to: Math.min(matrix.count, from + chunkSize)
+    }));
+  }
+  await Promise.all(tasks);
+  return results;
+}
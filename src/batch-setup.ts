@@ -0,0 +1,166 @@
+/**
+ * Batch game setup for simulations and fairness audits
+ *
+ * setupGames deals many games into one preallocated arena instead of building
+ * a GameState per deal. Each deal occupies one 152-byte row of tile IDs in
+ * draw order (the 53 dealt tiles, then the live wall, then the dead wall) plus
+ * one byte of dice. Rows are decoded on demand with dealHands/dealWall/getDeal.
+ *
+ * setupGamesOnPool splits the seeds into chunks across a WorkerPool; the arena
+ * is backed by a SharedArrayBuffer so workers write their rows in place.
+ */
+
+import { PlayerId, Tile } from './types';
+import { DeterministicRNG, RngVersion, LATEST_RNG_VERSION } from './rng';
+import { TILE_SET_TEMPLATE, decodeTile } from './tile-codec';
+import { shuffleTileIdsInto, rollDice, GameDeal } from './wall';
+import { TileWall, DEALT_TILE_COUNT, DEAL_SEAT_OFFSETS, writeDrawOrder } from './tile-wall';
+import { WorkerPool } from './worker-pool';
+
+export const DEAL_ROW_SIZE = TILE_SET_TEMPLATE.length;
+
+export interface SeedPair {
+  clientSeed: string;
+  serverSecret: string;
+}
+
+export interface DealBatch {
+  count: number;
+  dealer: PlayerId;
+  rngVersion: RngVersion;
+  tiles: Uint8Array;  // count * DEAL_ROW_SIZE tile IDs, one row per deal in draw order
+  dice: Uint8Array;   // Dice total per deal
+}
+
+export interface BatchSetupOptions {
+  rngVersion?: RngVersion;
+  chunkSize?: number; // Deals per worker task (default: spread evenly, at most 4096)
+}
+
+/**
+ * Allocates an empty batch. Pass shared = true to back it with a
+ * SharedArrayBuffer so worker threads can fill it in place.
+ */
+export function createDealBatch(
+  count: number,
+  dealer: PlayerId,
+  rngVersion: RngVersion = LATEST_RNG_VERSION,
+  shared: boolean = false
+): DealBatch {
+  const tileBytes = count * DEAL_ROW_SIZE;
+  return {
+    count,
+    dealer,
+    rngVersion,
+    tiles: new Uint8Array(shared ? new SharedArrayBuffer(tileBytes) : new ArrayBuffer(tileBytes)),
+    dice: new Uint8Array(shared ? new SharedArrayBuffer(count) : new ArrayBuffer(count))
+  };
+}
+
+/**
+ * Deals rows [from, from + seeds.length) of a batch. Only a single 152-slot
+ * scratch buffer is allocated for the whole range.
+ */
+export function fillDealBatch(batch: DealBatch, seeds: readonly SeedPair[], from: number = 0): void {
+  if (from < 0 || from + seeds.length > batch.count) {
+    throw new Error(`Deals ${from}..${from + seeds.length} do not fit a batch of ${batch.count}`);
+  }
+
+  const scratch = new Uint8Array(DEAL_ROW_SIZE);
+  for (let i = 0; i < seeds.length; i++) {
+    const row = from + i;
+    const rng = new DeterministicRNG(seeds[i].clientSeed, seeds[i].serverSecret, batch.rngVersion);
+    // Same RNG call order as setupGame: shuffle, then dice
+    shuffleTileIdsInto(rng, scratch);
+    const dice = rollDice(rng);
+    writeDrawOrder(scratch, batch.dealer, dice, batch.tiles.subarray(row * DEAL_ROW_SIZE, (row + 1) * DEAL_ROW_SIZE));
+    batch.dice[row] = dice;
+  }
+}
+
+/**
+ * Deals one game per seed pair on the calling thread
+ */
+export function setupGames(
+  seeds: readonly SeedPair[],
+  dealer: PlayerId,
+  rngVersion: RngVersion = LATEST_RNG_VERSION
+): DealBatch {
+  const batch = createDealBatch(seeds.length, dealer, rngVersion);
+  fillDealBatch(batch, seeds);
+  return batch;
+}
+
+/**
+ * Deals one game per seed pair, fanning chunks out across a worker pool.
+ * Produces exactly the same batch as setupGames.
+ */
+export async function setupGamesOnPool(
+  seeds: readonly SeedPair[],
+  dealer: PlayerId,
+  pool: WorkerPool,
+  options: BatchSetupOptions = {}
+): Promise<DealBatch> {
+  const rngVersion = options.rngVersion ?? LATEST_RNG_VERSION;
+  const batch = createDealBatch(seeds.length, dealer, rngVersion, true);
+  const workers = Math.max(1, pool.getMetrics().workers);
+  const chunkSize = Math.max(1, options.chunkSize ?? Math.min(4096, Math.ceil(seeds.length / workers)));
+
+  const tasks: Promise<number>[] = [];
+  for (let from = 0; from < seeds.length; from += chunkSize) {
+    tasks.push(pool.run('setupBatch', {
+      batch,
+      seeds: seeds.slice(from, from + chunkSize),
+      from
+    }));
+  }
+  await Promise.all(tasks);
+  return batch;
+}
+
+/**
+ * Tile IDs of one player's opening hand, in the order they were dealt
+ */
+export function dealHandIds(batch: DealBatch, index: number, player: PlayerId): Uint8Array {
+  const offset = (player - batch.dealer + 4) % 4;
+  const hand = new Uint8Array(offset === 0 ? 14 : 13);
+  const row = index * DEAL_ROW_SIZE;
+  let n = 0;
+  for (let k = 0; k < DEALT_TILE_COUNT; k++) {
+    if (DEAL_SEAT_OFFSETS[k] === offset) hand[n++] = batch.tiles[row + k];
+  }
+  return hand;
+}
+
+/**
+ * Opening hands of one deal, indexed by player
+ */
+export function dealHands(batch: DealBatch, index: number): Tile[][] {
+  const hands: Tile[][] = [[], [], [], []];
+  const row = index * DEAL_ROW_SIZE;
+  for (let k = 0; k < DEALT_TILE_COUNT; k++) {
+    hands[(batch.dealer + DEAL_SEAT_OFFSETS[k]) % 4].push(decodeTile(batch.tiles[row + k]));
+  }
+  return hands;
+}
+
+/**
+ * Wall of one deal, positioned just after the deal
+ */
+export function dealWall(batch: DealBatch, index: number): TileWall {
+  const row = batch.tiles.subarray(index * DEAL_ROW_SIZE, (index + 1) * DEAL_ROW_SIZE);
+  return TileWall.fromDrawOrder(row, batch.dice[index] * 2, DEALT_TILE_COUNT);
+}
+
+/**
+ * Expands one deal of a batch into the shape produced by dealFromSeeds
+ */
+export function getDeal(batch: DealBatch, index: number): GameDeal {
+  const wall = dealWall(batch, index);
+  return {
+    hands: dealHands(batch, index),
+    wall,
+    reservedTiles: wall.deadTiles().reverse(),
+    dice: batch.dice[index]
+  };
+}
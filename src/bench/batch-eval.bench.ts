@@ -0,0 +1,66 @@
+/**
+ * Batch hand evaluation: scoreHand per hand vs evaluateHands over a count
+ * matrix (win table and matcher paths), inline and across a worker pool
+ */
+
+import * as os from 'os';
+import { bench, benchAsync, report } from './harness';
+import { DeterministicRNG } from '../rng';
+import { createAmericanMahjongTileSet } from '../tiles';
+import { getShared2024RuleCard } from '../rulecard';
+import { scoreHand } from '../scoring';
+import { startNewGame } from '../engine';
+import { evaluateHands, evaluateHandsOnPool, toHandMatrix } from '../batch-eval';
+import { WorkerPool } from '../worker-pool';
+import { RuleCard, Tile } from '../types';
+
+export async function run(): Promise<void> {
+  const batchSize = 2000;
+  const card = getShared2024RuleCard();
+  const rng = new DeterministicRNG('bench-client', 'bench-secret', 2);
+  const tiles = createAmericanMahjongTileSet();
+  const hands: Tile[][] = [];
+  for (let i = 0; i < batchSize; i++) {
+    const pool = tiles.slice();
+    const hand: Tile[] = [];
+    for (let n = 0; n < 14; n++) hand.push(pool.splice(rng.nextUint32() % pool.length, 1)[0]);
+    hands.push(hand);
+  }
+  const matrix = toHandMatrix(hands);
+  // Same patterns in a new card object, which has no shipped win table
+  const untabled: RuleCard = { ...card, patterns: card.patterns.slice() };
+
+  const state = startNewGame('bench-seed', 'bench-secret', 0);
+  const results = [
+    bench(`scoreHand x${batchSize}`, () => {
+      let valid = 0;
+      for (const hand of hands) {
+        state.players[0].hand = hand;
+        if (scoreHand(state, 0, card).valid) valid++;
+      }
+      return valid;
+    }, { iterations: 10, warmup: 2 }),
+    bench(`evaluateHands x${batchSize} (win table)`, () => evaluateHands(matrix, card), { iterations: 50, warmup: 5 }),
+    bench(`evaluateHands x${batchSize} (matcher)`, () => evaluateHands(matrix, untabled), { iterations: 50, warmup: 5 })
+  ];
+
+  const pool = new WorkerPool({ size: Math.max(1, os.cpus().length - 1) });
+  try {
+    results.push(await benchAsync(
+      `evaluateHandsOnPool x${batchSize} (${pool.getMetrics().workers} workers)`,
+      () => evaluateHandsOnPool(matrix, pool),
+      { iterations: 20, warmup: 2 }
+    ));
+  } finally {
+    await pool.close();
+  }
+
+  report('Batch hand evaluation', results);
+}
+
+if (require.main === module) {
+  run().catch(err => {
+    console.error(err);
+    process.exit(1);
+  });
+}
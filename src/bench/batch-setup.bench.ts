@@ -0,0 +1,50 @@
+/**
+ * Batch deal throughput: one setupGame per seed vs the setupGames arena,
+ * inline and across a worker pool
+ */
+
+import * as os from 'os';
+import { bench, benchAsync, report } from './harness';
+import { DeterministicRNG } from '../rng';
+import { setupGame } from '../wall';
+import { SeedPair, setupGames, setupGamesOnPool } from '../batch-setup';
+import { WorkerPool } from '../worker-pool';
+
+export async function run(): Promise<void> {
+  const batchSize = 1000;
+  const seeds: SeedPair[] = [];
+  for (let i = 0; i < batchSize; i++) {
+    seeds.push({ clientSeed: `client-${i}`, serverSecret: 'server-secret' });
+  }
+
+  const results = [
+    bench(`setupGame x${batchSize}`, () => {
+      const deals = [];
+      for (const seed of seeds) {
+        deals.push(setupGame(new DeterministicRNG(seed.clientSeed, seed.serverSecret), 0));
+      }
+      return deals;
+    }, { iterations: 10, warmup: 2 }),
+    bench(`setupGames x${batchSize}`, () => setupGames(seeds, 0), { iterations: 10, warmup: 2 })
+  ];
+
+  const pool = new WorkerPool({ size: Math.max(1, os.cpus().length - 1) });
+  try {
+    results.push(await benchAsync(
+      `setupGamesOnPool x${batchSize} (${pool.getMetrics().workers} workers)`,
+      () => setupGamesOnPool(seeds, 0, pool),
+      { iterations: 10, warmup: 2 }
+    ));
+  } finally {
+    await pool.close();
+  }
+
+  report('Batch deals', results);
+}
+
+if (require.main === module) {
+  run().catch(err => {
+    console.error(err);
+    process.exit(1);
+  });
+}
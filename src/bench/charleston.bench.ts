@@ -0,0 +1,84 @@
+/**
+ * A full Charleston: six passes (blind on the third and sixth), the vote for
+ * the second Charleston and the courtesy pass, per table
+ */
+
+import { bench, consume, measureHeap, report, reportHeap } from './harness';
+import { GameState, PlayerId } from '../types';
+import { startNewGame } from '../engine';
+import {
+  initializeCharleston,
+  executeCharlestonPass,
+  processVoteResults,
+  executeCourtesyPass,
+  createCharlestonRng
+} from '../charleston-manager';
+import { DeterministicRNG } from '../rng';
+
+// Passes in a full Charleston, counting the courtesy pass
+const PASSES = 7;
+
+function selectPass(state: GameState): void {
+  const phase = state.charleston!.phase;
+  const canBlind = phase === 'pass-left' || phase === 'pass-right-2';
+  for (let pid = 0; pid < 4; pid++) {
+    const playerId = pid as PlayerId;
+    // Seats 1 and 3 pass one tile on blind where the rules allow it
+    const blind = canBlind && pid % 2 === 1 ? 1 : 0;
+    state.charleston!.playerStates[playerId] = {
+      selectedTiles: state.players[playerId].hand.filter(t => t !== 'J').slice(0, 3 - blind),
+      ready: true,
+      blindPass: blind ? { enabled: true, count: 1 } : undefined
+    };
+  }
+}
+
+function fullCharleston(start: GameState, rng: DeterministicRNG): GameState {
+  let state = start;
+  for (let pass = 0; pass < 3; pass++) {
+    selectPass(state);
+    state = executeCharlestonPass(state, rng);
+  }
+  // Three of four vote for the second Charleston
+  for (let pid = 0; pid < 4; pid++) {
+    state.charleston!.playerStates[pid as PlayerId] = {
+      selectedTiles: [],
+      ready: true,
+      vote: pid === 0 ? 'no' : 'yes',
+      voteSubmitted: true
+    };
+  }
+  state = processVoteResults(state);
+  for (let pass = 0; pass < 3; pass++) {
+    selectPass(state);
+    state = executeCharlestonPass(state, rng);
+  }
+  // Seats 0 and 2 trade two tiles
+  for (const [from, to] of [[0, 2], [2, 0]] as [PlayerId, PlayerId][]) {
+    state.charleston!.playerStates[from].courtesyOffer = {
+      tiles: state.players[from].hand.filter(t => t !== 'J').slice(0, 2),
+      targetPlayer: to
+    };
+  }
+  return executeCourtesyPass(state);
+}
+
+export function run(): void {
+  const start = initializeCharleston(startNewGame('bench-client', 'bench-secret', 0));
+  const rng = createCharlestonRng('bench-client', 'bench-secret');
+  consume(fullCharleston(start, rng));
+
+  const result = bench('full Charleston (6 passes + courtesy)', () => fullCharleston(start, rng), {
+    iterations: 5000
+  });
+  report('Charleston', [result]);
+  console.log(`  ${'passes/s'.padEnd(44)} ${Math.round(result.opsPerSec * PASSES).toLocaleString().padStart(25)}`);
+
+  reportHeap('Charleston heap', [
+    measureHeap('full Charleston (6 passes + courtesy)', () => fullCharleston(start, rng))
+  ]);
+}
+
+if (require.main === module) {
+  run();
+}
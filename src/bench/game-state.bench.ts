@@ -0,0 +1,53 @@
+/**
+ * Time and heap per Charleston pass and per audit snapshot: structurally
+ * shared transitions vs the JSON deep clone they replaced
+ */
+
+import { bench, consume, measureHeap, report, reportHeap } from './harness';
+import { GameState, PlayerId } from '../types';
+import { startNewGame } from '../engine';
+import { initializeCharleston, executeCharlestonPass } from '../charleston-manager';
+import { snapshotGameState } from '../game-state';
+
+function jsonClone(state: GameState): GameState {
+  return { ...JSON.parse(JSON.stringify(state)), wall: state.wall.clone() };
+}
+
+function readyToPass(): GameState {
+  const state = initializeCharleston(startNewGame('bench-client', 'bench-secret', 0));
+  for (let pid = 0; pid < 4; pid++) {
+    const playerId = pid as PlayerId;
+    state.charleston!.playerStates[playerId] = {
+      selectedTiles: state.players[playerId].hand.filter(t => t !== 'J').slice(0, 3),
+      ready: true
+    };
+  }
+  return state;
+}
+
+export function run(): void {
+  const state = readyToPass();
+  consume(executeCharlestonPass(state));
+
+  report('Charleston pass', [
+    bench('JSON clone (previous pass setup)', () => jsonClone(state), { iterations: 5000 }),
+    bench('executeCharlestonPass (shared)', () => executeCharlestonPass(state), { iterations: 5000 })
+  ]);
+  reportHeap('Charleston pass heap', [
+    measureHeap('JSON clone (previous pass setup)', () => jsonClone(state)),
+    measureHeap('executeCharlestonPass (shared)', () => executeCharlestonPass(state))
+  ]);
+
+  report('Game state snapshot', [
+    bench('JSON deep copy', () => jsonClone(state), { iterations: 5000 }),
+    bench('snapshotGameState', () => snapshotGameState(state), { iterations: 5000 })
+  ]);
+  reportHeap('Game state snapshot heap', [
+    measureHeap('JSON deep copy', () => jsonClone(state)),
+    measureHeap('snapshotGameState', () => snapshotGameState(state))
+  ]);
+}
+
+if (require.main === module) {
+  run();
+}
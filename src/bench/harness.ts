@@ -0,0 +1,138 @@
+/**
+ * Minimal micro-benchmark harness used by the scripts in src/bench.
+ * Run with `npm run bench` (all benchmarks) or `npm run bench -- <name>`.
+ */
+
+import { performance } from 'perf_hooks';
+
+export interface BenchResult {
+  name: string;
+  iterations: number;
+  totalMs: number;
+  nsPerOp: number;
+  opsPerSec: number;
+}
+
+export interface HeapResult {
+  name: string;
+  iterations: number;
+  bytesPerOp: number;
+  exact: boolean; // False when run without --expose-gc (garbage may be included)
+}
+
+export interface BenchOptions {
+  iterations?: number; // Timed iterations (default 100000)
+  warmup?: number;     // Untimed warmup iterations (default iterations / 10)
+}
+
+// Prevents the JIT from discarding benchmarked work
+let sink: unknown;
+
+export function consume(value: unknown): void {
+  sink = value;
+}
+
+/**
+ * Times fn over a fixed number of iterations
+ */
+export function bench(name: string, fn: () => unknown, options: BenchOptions = {}): BenchResult {
+  const iterations = options.iterations ?? 100000;
+  const warmup = options.warmup ?? Math.ceil(iterations / 10);
+
+  for (let i = 0; i < warmup; i++) {
+    sink = fn();
+  }
+
+  const start = performance.now();
+  for (let i = 0; i < iterations; i++) {
+    sink = fn();
+  }
+  const totalMs = performance.now() - start;
+
+  return {
+    name,
+    iterations,
+    totalMs,
+    nsPerOp: (totalMs * 1e6) / iterations,
+    opsPerSec: iterations / (totalMs / 1000)
+  };
+}
+
+/**
+ * Times an async fn, awaiting each call before starting the next
+ */
+export async function benchAsync(
+  name: string,
+  fn: () => Promise<unknown>,
+  options: BenchOptions = {}
+): Promise<BenchResult> {
+  const iterations = options.iterations ?? 100;
+  const warmup = options.warmup ?? Math.ceil(iterations / 10);
+
+  for (let i = 0; i < warmup; i++) {
+    sink = await fn();
+  }
+
+  const start = performance.now();
+  for (let i = 0; i < iterations; i++) {
+    sink = await fn();
+  }
+  const totalMs = performance.now() - start;
+
+  return {
+    name,
+    iterations,
+    totalMs,
+    nsPerOp: (totalMs * 1e6) / iterations,
+    opsPerSec: iterations / (totalMs / 1000)
+  };
+}
+
+/**
+ * Heap retained per call, keeping every result alive so nothing a call
+ * produced can be collected. Accurate when node runs with --expose-gc.
+ */
+export function measureHeap(name: string, fn: () => unknown, iterations: number = 1000): HeapResult {
+  const gc = (global as { gc?: () => void }).gc;
+  const kept: unknown[] = new Array(iterations);
+  fn();
+  gc?.();
+  const before = process.memoryUsage().heapUsed;
+  for (let i = 0; i < iterations; i++) {
+    kept[i] = fn();
+  }
+  gc?.();
+  const after = process.memoryUsage().heapUsed;
+  sink = kept;
+  return { name, iterations, bytesPerOp: Math.max(0, after - before) / iterations, exact: gc !== undefined };
+}
+
+/**
+ * Prints heap-per-call results, with ratios relative to the first result
+ */
+export function reportHeap(title: string, results: HeapResult[]): void {
+  console.log(`\n${title}${results.some(r => !r.exact) ? ' (approximate: run node with --expose-gc)' : ''}`);
+  const baseline = results[0];
+  for (const r of results) {
+    const ratio = baseline && r.bytesPerOp > 0 ? baseline.bytesPerOp / r.bytesPerOp : 1;
+    console.log(
+      `  ${r.name.padEnd(44)} ${Math.round(r.bytesPerOp).toLocaleString().padStart(12)} B/op  x${ratio.toFixed(2)}`
+    );
+  }
+}
+
+/**
+ * Prints a results table, with speedups relative to the first result
+ */
+export function report(title: string, results: BenchResult[]): void {
+  console.log(`\n${title}`);
+  const baseline = results[0];
+  for (const r of results) {
+    const speedup = baseline ? baseline.nsPerOp / r.nsPerOp : 1;
+    console.log(
+      `  ${r.name.padEnd(44)} ${r.nsPerOp.toFixed(1).padStart(10)} ns/op ` +
+      `${Math.round(r.opsPerSec).toLocaleString().padStart(14)} ops/s  x${speedup.toFixed(2)}`
+    );
+  }
+  void sink;
+}
@@ -0,0 +1,38 @@
+/**
+ * Runs every benchmark, or only those whose name contains the first CLI argument
+ */
+
+import * as tileCodec from './tile-codec.bench';
+import * as rng from './rng.bench';
+import * as batchSetup from './batch-setup.bench';
+import * as gameState from './game-state.bench';
+import * as stateHash from './state-hash.bench';
+import * as patternIndex from './pattern-index.bench';
+import * as batchEval from './batch-eval.bench';
+import * as winProbability from './win-probability.bench';
+import * as charleston from './charleston.bench';
+
+const benchmarks: Record<string, { run: () => void | Promise<void> }> = {
+  'tile-codec': tileCodec,
+  'rng': rng,
+  'batch-setup': batchSetup,
+  'game-state': gameState,
+  'state-hash': stateHash,
+  'pattern-index': patternIndex,
+  'batch-eval': batchEval,
+  'win-probability': winProbability,
+  'charleston': charleston
+};
+
+async function main(): Promise<void> {
+  const filter = process.argv[2];
+  for (const [name, benchmark] of Object.entries(benchmarks)) {
+    if (filter && !name.includes(filter)) continue;
+    await benchmark.run();
+  }
+}
+
+main().catch(err => {
+  console.error(err);
+  process.exit(1);
+});
@@ -0,0 +1,99 @@
+/**
+ * Rule-card matching with and without the feature-signature index, on random
+ * deals and on realistic hands (card lines with a few tiles swapped out)
+ */
+
+import { bench, report, consume } from './harness';
+import { Tile } from '../types';
+import { getShared2024RuleCard } from '../rulecard';
+import { getCompiledRuleCard, toHandVector, matchCompiledPattern, HandTemplate, HandVector } from '../hand-matcher';
+import { createAmericanMahjongTileSet } from '../tiles';
+import { decodeTile, FIRST_FLOWER_ID } from '../tile-codec';
+import { DeterministicRNG } from '../rng';
+
+const HAND_COUNT = 1000;
+
+function randomHand(rng: DeterministicRNG, tiles: readonly Tile[]): Tile[] {
+  const pool = tiles.slice();
+  const hand: Tile[] = [];
+  for (let n = 0; n < 14; n++) {
+    hand.push(pool.splice(rng.nextUint32() % pool.length, 1)[0]);
+  }
+  return hand;
+}
+
+// The template's tiles, with up to two group tiles as jokers and `swaps` tiles
+// replaced by random ones
+function realisticHand(rng: DeterministicRNG, template: HandTemplate, tiles: readonly Tile[], swaps: number): Tile[] {
+  const hand: Tile[] = [];
+  let jokers = 2;
+  let flower = 0;
+  for (let cls = 0; cls < template.natural.length; cls++) {
+    for (let n = 0; n < template.natural[cls] + template.grouped[cls]; n++) {
+      if (n >= template.natural[cls] && jokers > 0) {
+        hand.push('J');
+        jokers--;
+      } else {
+        hand.push(cls === FIRST_FLOWER_ID ? decodeTile(FIRST_FLOWER_ID + (flower++ % 8)) : decodeTile(cls));
+      }
+    }
+  }
+  for (let s = 0; s < swaps; s++) {
+    hand[rng.nextUint32() % hand.length] = tiles[rng.nextUint32() % tiles.length];
+  }
+  return hand;
+}
+
+export function run(): void {
+  const compiled = getCompiledRuleCard(getShared2024RuleCard());
+  const rng = new DeterministicRNG('bench-client', 'bench-secret', 2);
+  const tiles = createAmericanMahjongTileSet();
+  const templates = compiled.patterns.flatMap(p => p.templates);
+
+  const sets: Record<string, HandVector[]> = {
+    random: [],
+    realistic: []
+  };
+  for (let i = 0; i < HAND_COUNT; i++) {
+    sets.random.push(toHandVector(randomHand(rng, tiles), [])!);
+    const template = templates[rng.nextUint32() % templates.length];
+    sets.realistic.push(toHandVector(realisticHand(rng, template, tiles, i % 3), [])!);
+  }
+
+  for (const [name, vectors] of Object.entries(sets)) {
+    let candidates = 0;
+    let matches = 0;
+    for (const vector of vectors) {
+      const found = compiled.index.candidates(vector);
+      candidates += found.length;
+      matches += found.filter(p => matchCompiledPattern(p, vector)).length;
+    }
+    console.log(
+      `\n${name} hands: ${(candidates / vectors.length).toFixed(2)} candidates/hand ` +
+      `of ${compiled.patterns.length} patterns, ${(matches / vectors.length).toFixed(2)} matches/hand`
+    );
+
+    let i = 0;
+    const next = () => vectors[i++ % vectors.length];
+    report(`Card evaluation, ${name} hands`, [
+      bench('all patterns', () => {
+        const vector = next();
+        let found = 0;
+        for (const p of compiled.patterns) if (matchCompiledPattern(p, vector)) found++;
+        return found;
+      }, { iterations: 20000 }),
+      bench('index candidates only', () => {
+        const vector = next();
+        let found = 0;
+        for (const p of compiled.index.candidates(vector)) if (matchCompiledPattern(p, vector)) found++;
+        return found;
+      }, { iterations: 200000 }),
+      bench('index lookup', () => compiled.index.candidates(next()).length, { iterations: 200000 })
+    ]);
+  }
+  consume(sets);
+}
+
+if (require.main === module) {
+  run();
+}
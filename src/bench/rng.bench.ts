@@ -0,0 +1,32 @@
+/**
+ * Deal throughput for each RNG stream version
+ */
+
+import { bench, report } from './harness';
+import { DeterministicRNG, RngVersion } from '../rng';
+import { setupGame } from '../wall';
+
+export function run(): void {
+  const iterations = 2000;
+  let seed = 0;
+
+  const results = ([1, 2] as RngVersion[]).map(version =>
+    bench(`setupGame (rng v${version})`, () => {
+      const rng = new DeterministicRNG(`client-${seed++}`, 'server-secret', version);
+      return setupGame(rng, 0);
+    }, { iterations })
+  );
+
+  const rawResults = ([1, 2] as RngVersion[]).map(version => {
+    const rng = new DeterministicRNG('client', 'server-secret', version);
+    const out = new Uint32Array(1024);
+    return bench(`fillUint32 x1024 (rng v${version})`, () => rng.fillUint32(out), { iterations: 200 });
+  });
+
+  report('Deals/sec by RNG version', results);
+  report('Raw keystream', rawResults);
+}
+
+if (require.main === module) {
+  run();
+}
@@ -0,0 +1,37 @@
+/**
+ * Per-action audit hashing: full sorted SHA-256 digest vs the incremental
+ * Zobrist position hash
+ */
+
+import { bench, report } from './harness';
+import { GameState } from '../types';
+import { startNewGame, processMove } from '../engine';
+import { hashGameState, hashPosition } from '../fairness';
+
+function midGame(): GameState {
+  let state = processMove(startNewGame('bench-client', 'bench-secret', 0), { type: 'stopCharleston', player: 0 });
+  for (let i = 0; i < 40; i++) {
+    const player = state.currentPlayer;
+    if (state.derived!.tileCount(player) === 13) {
+      state = processMove(state, { type: 'draw', player });
+    }
+    state = processMove(state, { type: 'discard', player, tile: state.players[player].hand[0] });
+  }
+  return state;
+}
+
+export function run(): void {
+  const state = midGame();
+  const player = state.currentPlayer;
+  const draw = { type: 'draw' as const, player };
+
+  report('State hash per action', [
+    bench('hashGameState', () => hashGameState(state), { iterations: 5000 }),
+    bench('hashPosition', () => hashPosition(state), { iterations: 100000 }),
+    bench('processMove(draw) + hashPosition', () => hashPosition(processMove(state, draw)), { iterations: 20000 })
+  ]);
+}
+
+if (require.main === module) {
+  run();
+}
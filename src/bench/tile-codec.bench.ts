@@ -0,0 +1,84 @@
+/**
+ * Per-tile classification cost: legacy string parsing vs the integer codec
+ */
+
+import { Tile } from '../types';
+import { bench, report, consume } from './harness';
+import { createAmericanMahjongTileSet } from '../tiles';
+import {
+  TILE_SUIT,
+  TILE_RANK,
+  TILE_FLAGS,
+  TILE_EFFECTIVE_SUIT,
+  FLAG_SUITED,
+  encodeTiles
+} from '../tile-codec';
+
+// Legacy implementations (as they were before the codec) for comparison
+function legacyGetTileSuit(tile: Tile): string | null {
+  if (tile === 'J') return 'jokers';
+  if (tile.startsWith('F')) return 'flowers';
+  if (['N', 'E', 'S', 'W'].includes(tile)) return 'winds';
+  if (['RD', 'GD', 'WD'].includes(tile)) return 'dragons';
+  if (tile.endsWith('C')) return 'craks';
+  if (tile.endsWith('B')) return 'bams';
+  if (tile.endsWith('D')) return 'dots';
+  return null;
+}
+
+function legacyGetTileValue(tile: Tile): number | null {
+  const match = tile.match(/^(\d+)[CBD]$/);
+  return match ? parseInt(match[1]) : null;
+}
+
+function legacyTileHasSuit(tile: Tile): boolean {
+  const suit = legacyGetTileSuit(tile);
+  return suit !== null && !['flowers', 'winds', 'jokers'].includes(suit);
+}
+
+export function run(): void {
+  const tiles = createAmericanMahjongTileSet();
+  const ids = encodeTiles(tiles);
+  const iterations = 20000;
+
+  const results = [
+    bench('legacy string suit+rank+hasSuit (152 tiles)', () => {
+      let acc = 0;
+      for (let i = 0; i < tiles.length; i++) {
+        const t = tiles[i];
+        if (legacyGetTileSuit(t) !== null) acc++;
+        acc += legacyGetTileValue(t) ?? 0;
+        if (legacyTileHasSuit(t)) acc++;
+      }
+      return acc;
+    }, { iterations }),
+    bench('codec encode + table lookups (152 tiles)', () => {
+      const encoded = encodeTiles(tiles);
+      let acc = 0;
+      for (let i = 0; i < encoded.length; i++) {
+        const id = encoded[i];
+        if (TILE_SUIT[id] >= 0) acc++;
+        acc += TILE_RANK[id];
+        if (TILE_FLAGS[id] & FLAG_SUITED) acc++;
+      }
+      return acc;
+    }, { iterations }),
+    bench('codec table lookups on IDs (152 tiles)', () => {
+      let acc = 0;
+      for (let i = 0; i < ids.length; i++) {
+        const id = ids[i];
+        if (TILE_SUIT[id] >= 0) acc++;
+        acc += TILE_RANK[id] + TILE_EFFECTIVE_SUIT[id];
+        if (TILE_FLAGS[id] & FLAG_SUITED) acc++;
+      }
+      return acc;
+    }, { iterations })
+  ];
+
+  consume(ids);
+  report('Tile classification', results);
+}
+
+if (require.main === module) {
+  run();
+}
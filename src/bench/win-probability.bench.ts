@@ -0,0 +1,44 @@
+/**
+ * Win probabilities on every turn of a game: the first turn from cold caches,
+ * then each turn of a game in play order
+ */
+
+import { bench, report } from './harness';
+import { startNewGame, processMove } from '../engine';
+import { winProbabilities } from '../win-probability';
+import { GameState } from '../types';
+
+function playTurns(seed: string, moves: number): GameState[] {
+  let state = processMove(startNewGame(seed, 'bench-secret', 0), { type: 'stopCharleston', player: 0 });
+  const states = [state];
+  for (let i = 0; i < moves; i++) {
+    const player = state.currentPlayer;
+    state = state.players[player].hand.length === 14
+      ? processMove(state, { type: 'discard', player, tile: state.players[player].hand[(i * 7) % 14] })
+      : processMove(state, { type: 'draw', player });
+    states.push(state);
+  }
+  return states;
+}
+
+export function run(): void {
+  const first = playTurns('bench-first', 0)[0];
+  const cold = bench('winProbabilities, first turn (cold)', () => winProbabilities(first, 0).length, {
+    iterations: 1,
+    warmup: 0
+  });
+
+  // Turns of fresh games, one per iteration, so earlier results do not repeat
+  const turns = Array.from({ length: 12 }, (_, i) => playTurns(`bench-game-${i}`, 80).slice(1)).flat();
+  let turn = 0;
+  const perTurn = bench('winProbabilities, per turn of a new game', () => {
+    const state = turns[turn++];
+    return winProbabilities(state, state.currentPlayer).length;
+  }, { iterations: 800, warmup: 160 });
+
+  report('Win probability', [cold, perTurn]);
+}
+
+if (require.main === module) {
+  run();
+}
@@ -0,0 +1,470 @@
+/**
+ * Bot seats
+ *
+ * A bot plays one seat from a BotView: the seat's own tiles, the phase and
+ * the last discard, nothing another player could not see. Each decision is
+ * the next thing the seat does:
+ *
+ *   - Charleston passes are the advisor's best pass (see
+ *     charleston-advisor.ts), searched within the move budget
+ *   - the vote is "yes" while the hand is still far from every line
+ *   - the courtesy pass offers the player across up to three tiles the hand
+ *     can spare without moving away from its closest line
+ *   - a discard that completes the hand is called for mahjong; one that
+ *     fills an exposure is claimed when it brings the hand close to a line
+ *   - on its turn the seat draws, declares a winning hand, or throws the
+ *     tile whose loss costs the card's nearest lines the least
+ *
+ * Play moves are plain Moves for applyMove; Charleston decisions go through
+ * the charleston-manager handlers, as a player's messages would.
+ *
+ * BotDriver makes the decisions on a worker pool under a per-move budget,
+ * falling back to the greedy choice on the calling thread when a worker's
+ * answer would be late.
+ */
+
+import { performance } from 'perf_hooks';
+import { GameState, Meld, Move, PlayerId, RuleCard, Tile } from './types';
+import { CharlestonPhase } from './charleston-types';
+import { getShared2024RuleCard } from './rulecard';
+import { getCompiledRuleCard, MATCH_CLASS_COUNT, matchClass } from './hand-matcher';
+import {
+  HandDistance,
+  getDistanceTable,
+  UNREACHABLE,
+  LINE_SLACK,
+  MAX_LINES,
+  WARM_UP_HAND
+} from './hand-distance';
+import { JOKER_ID, encodeTile } from './tile-codec';
+import { isWinningHand } from './win-check';
+import { adviseCharlestonPass, LINE_WEIGHTS } from './charleston-advisor';
+import {
+  getPassTarget,
+  handleCharlestonSelection,
+  handleCharlestonReady,
+  handleCharlestonVote,
+  handleCharlestonVoteSubmit,
+  handleCourtesyProposal
+} from './charleston-manager';
+import { DeterministicRNG } from './rng';
+import { BudgetedPool, WorkerPoolMetrics } from './worker-pool';
+import { LatencyStats } from './metrics';
+
+// A hand at least this far from every line votes for a second Charleston
+const VOTE_DISTANCE = 8;
+// Exposures are only called once they leave the hand this close to a line
+const EXPOSE_DISTANCE = 4;
+// Natural tiles, the claimed one included, each exposure needs (as
+// validateExposure requires)
+const MIN_NATURALS: Record<number, number> = { 3: 2, 4: 3, 5: 1 };
+const MELD_TYPES: Record<number, Meld['type']> = { 3: 'pong', 4: 'kong', 5: 'quint' };
+
+export interface BotView {
+  seat: PlayerId;
+  phase: GameState['phase'];
+  charlestonPhase?: CharlestonPhase;  // While the Charleston runs
+  hand: Tile[];
+  melds: Meld[];
+  currentPlayer: PlayerId;
+  discard?: { player: PlayerId; tile: Tile };  // A discard no one has acted on yet
+  wallCount: number;
+}
+
+export type BotAction =
+  | { type: 'move'; move: Move }
+  | { type: 'charlestonPass'; tiles: Tile[] }
+  | { type: 'charlestonVote'; vote: 'yes' | 'no' }
+  | { type: 'courtesyOffer'; tiles: Tile[]; targetPlayer: PlayerId }
+  | { type: 'wait' };
+
+export interface BotDecisionOptions {
+  budgetMs?: number;        // Search time limit (default: none)
+  distance?: HandDistance;  // The seat's distances, in step with its tiles
+                            // (built from the view when absent)
+  rng?: DeterministicRNG;   // For policies that choose at random
+}
+
+/**
+ * A way of playing a seat. Policies are looked up by name so that worker
+ * threads can run them; a module registering its own is loaded by the
+ * workers before they play (see self-play.ts).
+ */
+export interface BotPolicy {
+  name: string;
+  decide(card: RuleCard, view: BotView, options: BotDecisionOptions): BotAction;
+}
+
+/**
+ * What the seat can see of the table
+ */
+export function getBotView(state: GameState, seat: PlayerId): BotView {
+  const player = state.players[seat];
+  const top = state.discardPile[state.discardPile.length - 1];
+  const charleston = state.charleston;
+  return {
+    seat,
+    phase: state.phase,
+    charlestonPhase: charleston && !charleston.completed ? charleston.phase : undefined,
+    hand: player.hand,
+    melds: player.melds,
+    currentPlayer: state.currentPlayer,
+    discard: state.lastAction?.type === 'discard' && top ? top : undefined,
+    wallCount: state.wall.length
+  };
+}
+
+/**
+ * The seat's next action
+ */
+export function decideBotAction(card: RuleCard, view: BotView, options: BotDecisionOptions = {}): BotAction {
+  if (view.phase === 'charleston') {
+    return decideCharleston(card, view, options);
+  }
+  if (view.phase !== 'play') {
+    return { type: 'wait' };
+  }
+  const { seat, hand, melds } = view;
+  const tiles = hand.length + melds.reduce((sum, meld) => sum + meld.tiles.length, 0);
+
+  if (tiles === 13 && view.discard && view.discard.player !== seat) {
+    const claim = decideClaim(card, view, view.discard.tile, options.distance);
+    if (claim) return { type: 'move', move: claim };
+  }
+  if (view.currentPlayer !== seat) {
+    return { type: 'wait' };
+  }
+  if (tiles === 13) {
+    return view.wallCount > 0 ? { type: 'move', move: { type: 'draw', player: seat } } : { type: 'wait' };
+  }
+  if (isWinningHand(hand, melds, card)) {
+    return { type: 'move', move: { type: 'declareMahjong', player: seat } };
+  }
+  return { type: 'move', move: { type: 'discard', player: seat, tile: chooseDiscard(card, hand, melds, options.distance) } };
+}
+
+function decideCharleston(card: RuleCard, view: BotView, options: BotDecisionOptions): BotAction {
+  const phase = view.charlestonPhase;
+  if (!phase) return { type: 'wait' };
+
+  if (phase === 'vote') {
+    const distance = (options.distance ?? new HandDistance(card, view.hand)).minDistance();
+    return { type: 'charlestonVote', vote: distance >= VOTE_DISTANCE ? 'yes' : 'no' };
+  }
+  if (phase === 'courtesy') {
+    const targetPlayer = getPassTarget(view.seat, 'pass-across');
+    const distance = (options.distance ?? new HandDistance(card, view.hand)).minDistance();
+    const naturals = view.hand.filter(tile => tile !== 'J').length;
+    const startedAt = performance.now();
+    // The most tiles that leave the closest line where it is
+    for (let count = Math.min(3, naturals); count > 0; count--) {
+      const budgetMs = options.budgetMs === undefined
+        ? undefined
+        : Math.max(0, options.budgetMs - (performance.now() - startedAt));
+      const advice = adviseCharlestonPass(card, view.hand, { count, top: 1, budgetMs });
+      if (advice.candidates[0].distance <= distance) {
+        return { type: 'courtesyOffer', tiles: advice.tiles, targetPlayer };
+      }
+    }
+    return { type: 'courtesyOffer', tiles: [], targetPlayer };
+  }
+  if (phase === 'complete') return { type: 'wait' };
+  return { type: 'charlestonPass', tiles: adviseCharlestonPass(card, view.hand, { top: 1, budgetMs: options.budgetMs }).tiles };
+}
+
+/**
+ * Mahjong on the discard, or an exposure worth calling, or null to let it go
+ */
+function decideClaim(card: RuleCard, view: BotView, tile: Tile, tracker?: HandDistance): Move | null {
+  const id = encodeTile(tile);
+  if (id === JOKER_ID) return null;
+  const { seat, hand, melds } = view;
+  if (isWinningHand([...hand, tile], melds, card)) {
+    return { type: 'declareMahjong', player: seat };
+  }
+
+  let distance: HandDistance;
+  try {
+    distance = tracker ?? new HandDistance(card, hand, melds);
+  } catch {
+    return null;
+  }
+  // One more tile brings a line at most one tile closer
+  const before = distance.minDistance();
+  if (before - 1 > EXPOSE_DISTANCE) return null;
+  const winning = new Uint8Array(MATCH_CLASS_COUNT);
+  const exposable = new Uint8Array(MATCH_CLASS_COUNT);
+  distance.fillClaimSets(winning, exposable);
+  const groups = exposable[matchClass(id)];
+  if (groups === 0) return null;
+
+  // Larger exposures first: they place more of the hand
+  for (const size of [5, 4, 3]) {
+    if ((groups & (1 << size)) === 0) continue;
+    const meld = buildMeld(hand, tile, size);
+    if (!meld) continue;
+    const rest = [...hand];
+    for (const used of meld.tiles.slice(1)) rest.splice(rest.indexOf(used), 1);
+    try {
+      const after = new HandDistance(card, rest, [...melds, meld]).minDistance();
+      if (after < before && after <= EXPOSE_DISTANCE) {
+        return { type: 'claim', player: seat, meld };
+      }
+    } catch {
+      // The meld fits no line once placed
+    }
+  }
+  return null;
+}
+
+/**
+ * The discard plus size - 1 tiles from the hand, matching naturals before
+ * jokers, or null if the hand cannot make a valid exposure
+ */
+function buildMeld(hand: readonly Tile[], tile: Tile, size: number): Meld | null {
+  const tiles = [tile];
+  for (const held of hand) {
+    if (tiles.length < size && held === tile) tiles.push(held);
+  }
+  if (tiles.length < MIN_NATURALS[size]) return null;
+  for (const held of hand) {
+    if (tiles.length < size && held === 'J') tiles.push(held);
+  }
+  if (tiles.length < size) return null;
+  return {
+    tiles,
+    type: MELD_TYPES[size],
+    from: 'wall',  // Set to the discarder when the claim is applied
+    exposed: true,
+    canExchangeJokers: tiles.includes('J')
+  };
+}
+
+/**
+ * Templates within LINE_SLACK of the closest, nearest first (in card order
+ * at each distance), at most MAX_LINES of them
+ */
+function nearestLines(distance: HandDistance, templates: number): number[] {
+  let nearest = UNREACHABLE;
+  for (let t = 0; t < templates; t++) {
+    const d = distance.templateDistance(t);
+    if (d < nearest) nearest = d;
+  }
+  const lines: number[] = [];
+  for (let d = nearest; d <= nearest + LINE_SLACK && d < UNREACHABLE && lines.length < MAX_LINES; d++) {
+    for (let t = 0; t < templates && lines.length < MAX_LINES; t++) {
+      if (distance.templateDistance(t) === d) lines.push(t);
+    }
+  }
+  return lines;
+}
+
+/**
+ * The tile whose loss keeps the most of the hand's nearest lines: a line
+ * scores 2^-distance, so one that loses a tile halves its share. A given
+ * tracker is left as it was found.
+ */
+export function chooseDiscard(
+  card: RuleCard,
+  hand: readonly Tile[],
+  melds: readonly Meld[] = [],
+  tracker?: HandDistance
+): Tile {
+  const distance = tracker ?? new HandDistance(card, hand, melds);
+  const lines = nearestLines(distance, getDistanceTable(getCompiledRuleCard(card)).templates.length);
+
+  let best: Tile | undefined;
+  let bestScore = -1;
+  const tried = new Uint8Array(MATCH_CLASS_COUNT);
+  for (const tile of hand) {
+    const id = encodeTile(tile);
+    // Copies of a class (flowers included) cost the same
+    if (id === JOKER_ID || tried[matchClass(id)]) continue;
+    tried[matchClass(id)] = 1;
+    distance.changeId(id, -1);
+    let score = 0;
+    for (const t of lines) score += LINE_WEIGHTS[distance.templateDistance(t)];
+    distance.changeId(id, 1);
+    if (score > bestScore) {
+      bestScore = score;
+      best = tile;
+    }
+  }
+  // Only jokers left to throw
+  return best ?? hand[0];
+}
+
+/**
+ * Tiles a random policy may let go of: anything but jokers, unless that is
+ * all there is
+ */
+function randomTile(hand: readonly Tile[], rng: DeterministicRNG): Tile {
+  const naturals = hand.filter(tile => tile !== 'J');
+  const from = naturals.length > 0 ? naturals : hand;
+  return from[rng.nextInt(from.length)];
+}
+
+/**
+ * Plays at random: passes and discards any tiles but jokers, votes either
+ * way, never exposes, and only calls mahjong when it has it. A baseline for
+ * the other policies.
+ */
+function decideRandomAction(card: RuleCard, view: BotView, options: BotDecisionOptions): BotAction {
+  const rng = options.rng;
+  if (!rng) throw new Error('The random policy needs an RNG');
+  const { seat, hand, melds } = view;
+
+  if (view.phase === 'charleston') {
+    const pick = (count: number) => {
+      const rest = hand.filter(tile => tile !== 'J');
+      const tiles: Tile[] = [];
+      for (let i = 0; i < count && rest.length > 0; i++) tiles.push(rest.splice(rng.nextInt(rest.length), 1)[0]);
+      return tiles;
+    };
+    switch (view.charlestonPhase) {
+      case undefined:
+      case 'complete':
+        return { type: 'wait' };
+      case 'vote':
+        return { type: 'charlestonVote', vote: rng.nextInt(2) === 0 ? 'yes' : 'no' };
+      case 'courtesy':
+        return { type: 'courtesyOffer', tiles: pick(rng.nextInt(4)), targetPlayer: getPassTarget(seat, 'pass-across') };
+      default:
+        return { type: 'charlestonPass', tiles: pick(3) };
+    }
+  }
+  if (view.phase !== 'play') return { type: 'wait' };
+
+  const tiles = hand.length + melds.reduce((sum, meld) => sum + meld.tiles.length, 0);
+  if (tiles === 13 && view.discard && view.discard.player !== seat && view.discard.tile !== 'J'
+      && isWinningHand([...hand, view.discard.tile], melds, card)) {
+    return { type: 'move', move: { type: 'declareMahjong', player: seat } };
+  }
+  if (view.currentPlayer !== seat) return { type: 'wait' };
+  if (tiles === 13) {
+    return view.wallCount > 0 ? { type: 'move', move: { type: 'draw', player: seat } } : { type: 'wait' };
+  }
+  if (isWinningHand(hand, melds, card)) {
+    return { type: 'move', move: { type: 'declareMahjong', player: seat } };
+  }
+  return { type: 'move', move: { type: 'discard', player: seat, tile: randomTile(hand, rng) } };
+}
+
+const botPolicies = new Map<string, BotPolicy>();
+
+/**
+ * Makes a policy available by name (replacing any of the same name)
+ */
+export function registerBotPolicy(policy: BotPolicy): void {
+  botPolicies.set(policy.name, policy);
+}
+
+export function getBotPolicy(name: string): BotPolicy {
+  const policy = botPolicies.get(name);
+  if (!policy) throw new Error(`Unknown bot policy: ${name}`);
+  return policy;
+}
+
+registerBotPolicy({ name: 'greedy', decide: decideBotAction });
+registerBotPolicy({ name: 'random', decide: decideRandomAction });
+
+/**
+ * Records a Charleston decision for the seat through the same handlers a
+ * player's messages use. Returns false if the Charleston rejected it.
+ */
+export function submitCharlestonAction(state: GameState, seat: PlayerId, action: BotAction): boolean {
+  switch (action.type) {
+    case 'charlestonPass':
+      if (!handleCharlestonSelection(state, seat, action.tiles).success) return false;
+      return handleCharlestonReady(state, seat).success;
+    case 'charlestonVote':
+      if (!handleCharlestonVote(state, seat, action.vote).success) return false;
+      return handleCharlestonVoteSubmit(state, seat).success;
+    case 'courtesyOffer':
+      if (action.tiles.length > 0 && !handleCourtesyProposal(state, seat, action.tiles, action.targetPlayer).success) {
+        return false;
+      }
+      return handleCharlestonReady(state, seat).success;
+    default:
+      return false;
+  }
+}
+
+export interface BotConfig {
+  workers: number;              // Worker threads (0 decides inline)
+  moveBudgetMs: number;         // Time allowed per decision, queueing included
+  moveDelayMs: number;          // Pause before a bot moves at a table with people at it
+  replaceDisconnected: boolean; // Bots play for disconnected seats instead of pausing the table
+}
+
+export interface BotMetrics {
+  decisions: number;
+  late: number;              // Decisions made by the greedy fallback
+  latency: LatencyStats;     // Request-to-decision time
+  pool: WorkerPoolMetrics;
+}
+
+/**
+ * Reads the bot configuration from the environment:
+ *   BOT_WORKERS                - worker threads (default 1; 0 decides inline)
+ *   BOT_MOVE_BUDGET_MS         - time allowed per decision (default 100)
+ *   BOT_MOVE_DELAY_MS          - pause before a bot moves when people are
+ *                                seated, so they can follow and claim (default 800)
+ *   BOT_REPLACE_DISCONNECTED   - 'false' pauses the table on a disconnect
+ *                                instead of playing the seat (default true)
+ */
+export function loadBotConfig(env: NodeJS.ProcessEnv = process.env): BotConfig {
+  const workers = parseInt(env.BOT_WORKERS || '1', 10);
+  const moveBudgetMs = parseInt(env.BOT_MOVE_BUDGET_MS || '100', 10);
+  const moveDelayMs = parseInt(env.BOT_MOVE_DELAY_MS || '800', 10);
+  return {
+    workers: Number.isFinite(workers) && workers >= 0 ? workers : 1,
+    moveBudgetMs: Number.isFinite(moveBudgetMs) && moveBudgetMs > 0 ? moveBudgetMs : 100,
+    moveDelayMs: Number.isFinite(moveDelayMs) && moveDelayMs >= 0 ? moveDelayMs : 800,
+    replaceDisconnected: env.BOT_REPLACE_DISCONNECTED !== 'false'
+  };
+}
+
+/**
+ * Bot decisions for the shared 2024 card, made on worker threads
+ */
+export class BotDriver {
+  private pool: BudgetedPool;
+
+  constructor(config: Pick<BotConfig, 'workers' | 'moveBudgetMs'>) {
+    this.pool = new BudgetedPool(config.workers, config.moveBudgetMs);
+    // Compile the card and warm each worker up before the first real decision
+    const view: BotView = {
+      seat: 0,
+      phase: 'charleston',
+      charlestonPhase: 'pass-right',
+      hand: [...WARM_UP_HAND],
+      melds: [],
+      currentPlayer: 0,
+      wallCount: 0
+    };
+    this.pool.warmUp('botAction', decideUntil => ({ view, decideUntil }));
+  }
+
+  /**
+   * The seat's next action, decided within the budget: if the worker has not
+   * replied in time the greedy choice is made here instead
+   */
+  decide(state: GameState, seat: PlayerId): Promise<BotAction> {
+    const view = getBotView(state, seat);
+    return this.pool.run(
+      'botAction',
+      decideUntil => ({ view, decideUntil }),
+      () => decideBotAction(getShared2024RuleCard(), view, { budgetMs: 0 })
+    );
+  }
+
+  getMetrics(): BotMetrics {
+    const { requests, ...metrics } = this.pool.getMetrics();
+    return { decisions: requests, ...metrics };
+  }
+
+  async close(): Promise<void> {
+    await this.pool.close();
+  }
+}
@@ -0,0 +1,26 @@
+/**
+ * Writes the compiled rule-card artifact loaded by rulecard-registry.ts.
+ *
+ * Runs as part of `npm run build`, or directly with an output path:
+ * `node dist/build-rule-cards.js <file>`. The default writes into src/data,
+ * from where the artifact ships with the rest of the card data.
+ */
+
+import * as fs from 'fs';
+import * as path from 'path';
+import { RULE_CARD_ARTIFACT, buildRuleCardArtifact } from './rulecard-registry';
+
+function main(): void {
+  const output = process.argv[2] ?? path.join(__dirname, '..', 'src', 'data', RULE_CARD_ARTIFACT);
+  const artifact = buildRuleCardArtifact();
+  const json = JSON.stringify(artifact);
+  fs.writeFileSync(output, json);
+
+  console.log(`Wrote ${output} (${(json.length / 1024).toFixed(1)} KiB)`);
+  for (const entry of artifact.cards) {
+    const templates = entry.templates.reduce((sum, list) => sum + list.length, 0);
+    console.log(`  ${entry.year} ${entry.source} ${entry.hash}: ${entry.card.patterns.length} patterns, ${templates} templates`);
+  }
+}
+
+main();
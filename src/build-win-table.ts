@@ -0,0 +1,81 @@
+/**
+ * Generates the winning-hand table for the 2024 card (see win-table.ts) and
+ * reports its size and lookup throughput against the compiled matcher.
+ *
+ * Run with `npm run build:win-table`, or pass an output path:
+ * `node dist/build-win-table.js <file>`. The default writes into src/data so
+ * the table ships with the rule card data.
+ */
+
+import * as fs from 'fs';
+import * as path from 'path';
+import { performance } from 'perf_hooks';
+import { bench, report } from './bench/harness';
+import { load2024RuleCard } from './rulecard-parser';
+import { getCompiledRuleCard, toHandVector, matchCompiledPattern, HandVector } from './hand-matcher';
+import { WinTable, WIN_TABLE_FILE, buildWinTable } from './win-table';
+import { createAmericanMahjongTileSet } from './tiles';
+import { decodeTile, FIRST_FLOWER_ID } from './tile-codec';
+import { DeterministicRNG } from './rng';
+import { Tile } from './types';
+
+const SAMPLE_HANDS = 1000;
+
+function main(): void {
+  const output = process.argv[2] ?? path.join(__dirname, '..', 'src', 'data', WIN_TABLE_FILE);
+  const card = load2024RuleCard();
+
+  const start = performance.now();
+  const bytes = buildWinTable(card);
+  const buildMs = performance.now() - start;
+  fs.writeFileSync(output, bytes);
+
+  const table = WinTable.fromBytes(bytes);
+  console.log(`Wrote ${output}`);
+  console.log(
+    `${table.keyCount} winning multisets over ${card.patterns.length} patterns, ` +
+    `${(table.byteLength / 1024).toFixed(1)} KiB, built in ${buildMs.toFixed(0)} ms`
+  );
+
+  // Half winning hands (a template filled, some group tiles as jokers), half random
+  const compiled = getCompiledRuleCard(card);
+  const templates = compiled.patterns.flatMap(p => p.templates.map(t => ({ t, maxJokers: p.maxJokers })));
+  const rng = new DeterministicRNG('win-table-client', 'win-table-secret', 2);
+  const tiles = createAmericanMahjongTileSet();
+  const vectors: HandVector[] = [];
+  for (let i = 0; i < SAMPLE_HANDS; i++) {
+    const hand: Tile[] = [];
+    if (i % 2 === 0) {
+      const { t, maxJokers } = templates[rng.nextUint32() % templates.length];
+      let jokers = Math.min(maxJokers, i % 4);
+      let flower = 0;
+      for (let cls = 0; cls < t.natural.length; cls++) {
+        for (let n = 0; n < t.natural[cls] + t.grouped[cls]; n++) {
+          if (n >= t.natural[cls] && jokers-- > 0) hand.push('J');
+          else hand.push(cls === FIRST_FLOWER_ID ? decodeTile(FIRST_FLOWER_ID + (flower++ % 8)) : decodeTile(cls));
+        }
+      }
+    } else {
+      const pool = tiles.slice();
+      for (let n = 0; n < 14; n++) hand.push(pool.splice(rng.nextUint32() % pool.length, 1)[0]);
+    }
+    vectors.push(toHandVector(hand, [])!);
+  }
+
+  let i = 0;
+  const next = () => vectors[i++ % vectors.length];
+  report('Win lookup, half winning hands', [
+    bench('compiled matcher (indexed)', () => {
+      const vector = next();
+      let found = 0;
+      for (const p of compiled.index.candidates(vector)) if (matchCompiledPattern(p, vector)) found++;
+      return found;
+    }, { iterations: 200000 }),
+    bench('win table probe', () => {
+      const vector = next();
+      return table.lookup(vector.counts, vector.jokers).length;
+    }, { iterations: 1000000 })
+  ]);
+}
+
+main();
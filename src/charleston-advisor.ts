@@ -0,0 +1,301 @@
+/**
+ * Charleston pass advice
+ *
+ * Ranks the passes a hand can make (C(14,3) = 364 for a dealer's hand, 286
+ * for 13 tiles) by how well the tiles kept hold on to the card's best lines.
+ * The lines are the templates (see hand-distance.ts) within LINE_SLACK tiles
+ * of the closest one, and a hand scores 2^-distance summed over them, so a
+ * pass that costs a line one tile halves its share, and tiles no line uses
+ * are free to pass.
+ *
+ * The search picks tiles by class (copies of a tile are interchangeable) in
+ * order of least harm, depth first. Passing a tile can only move a line
+ * further away, so a partial pass scoring no better than the worst of the
+ * best passes found so far is cut off with everything below it. The first
+ * pass reached is the greedy one, so even a search stopped by its time budget
+ * has an answer.
+ *
+ * CharlestonAdvisor runs searches on a worker pool under a strict per-request
+ * budget, falling back to the greedy pass on the calling thread when a
+ * worker's answer would be late.
+ */
+
+import { performance } from 'perf_hooks';
+import { RuleCard, Tile } from './types';
+import { getShared2024RuleCard } from './rulecard';
+import { getCompiledRuleCard, MATCH_CLASS_COUNT, matchClass } from './hand-matcher';
+import { getDistanceTable, UNREACHABLE, LINE_SLACK, MAX_LINES, WARM_UP_HAND } from './hand-distance';
+import { JOKER_ID, INVALID_TILE_ID, encodeTile } from './tile-codec';
+import { BudgetedPool, BudgetedPoolMetrics } from './worker-pool';
+
+// Search nodes between deadline checks
+const CLOCK_INTERVAL = 32;
+// 2^-distance for every distance a line can be at
+export const LINE_WEIGHTS = Float64Array.from({ length: UNREACHABLE + 1 }, (_, d) => Math.pow(2, -d));
+
+export interface PassAdviceOptions {
+  count?: number;     // Tiles to pass (default 3; fewer when passing blind)
+  top?: number;       // Passes to return, best first (default 5)
+  budgetMs?: number;  // Search time limit (default: none)
+}
+
+export interface PassCandidate {
+  tiles: Tile[];
+  score: number;      // Sum of 2^-distance over the lines, after the pass
+  distance: number;   // Closest line after the pass
+  pattern: string;    // Name of the pattern of that line
+}
+
+export interface CharlestonAdvice {
+  tiles: Tile[];                // The best pass found
+  candidates: PassCandidate[];  // Best first
+  passes: number;               // Passes the hand allows, C(non-jokers, count)
+  evaluated: number;            // Complete passes scored
+  pruned: number;               // Partial passes cut off by the bound
+  complete: boolean;            // False when the budget ran out first
+  elapsedMs: number;
+}
+
+function choose(n: number, k: number): number {
+  let result = 1;
+  for (let i = 0; i < k; i++) result = result * (n - i) / (i + 1);
+  return Math.round(result);
+}
+
+/**
+ * Ranks the passes of `count` tiles from a concealed Charleston hand
+ */
+export function adviseCharlestonPass(
+  card: RuleCard,
+  hand: readonly Tile[],
+  options: PassAdviceOptions = {}
+): CharlestonAdvice {
+  const start = performance.now();
+  const count = options.count ?? 3;
+  const top = Math.max(1, options.top ?? 5);
+  const deadline = options.budgetMs === undefined ? Infinity : start + options.budgetMs;
+
+  // Hand by class, with the tiles of each class (flowers differ by name only)
+  const counts = new Uint8Array(MATCH_CLASS_COUNT);
+  const tilesOf: Tile[][] = [];
+  let jokers = 0;
+  for (const tile of hand) {
+    const id = encodeTile(tile);
+    if (id === INVALID_TILE_ID) throw new Error(`Unknown tile: ${tile}`);
+    if (id === JOKER_ID) {
+      jokers++;
+      continue;
+    }
+    const cls = matchClass(id);
+    counts[cls]++;
+    (tilesOf[cls] ??= []).push(tile);
+  }
+  const naturals = hand.length - jokers;
+  if (count < 1 || count > naturals) {
+    throw new Error(`Cannot pass ${count} of ${naturals} tiles (jokers cannot be passed)`);
+  }
+
+  // The lines: the templates near the closest one
+  const compiled = getCompiledRuleCard(card);
+  const table = getDistanceTable(compiled);
+  const distances: number[] = [];
+  for (let t = 0; t < table.templates.length; t++) {
+    const template = table.templates[t];
+    let naturalGap = 0;
+    let groupGap = 0;
+    for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+      const natural = template.natural[cls];
+      const grouped = template.grouped[cls];
+      if (natural + grouped === 0) continue;
+      const have = counts[cls];
+      if (natural > have) naturalGap += natural - have;
+      const spare = have > natural ? have - natural : 0;
+      if (grouped > spare) groupGap += grouped - spare;
+    }
+    const cover = Math.min(jokers, table.maxJokers[t]);
+    distances.push(naturalGap + (groupGap > cover ? groupGap - cover : 0));
+  }
+  const order = distances.map((_, t) => t).sort((a, b) => distances[a] - distances[b]);
+  const nearest = distances[order[0]];
+  const lines = order.filter(t => distances[t] <= nearest + LINE_SLACK).slice(0, MAX_LINES);
+
+  // Per line: its gaps, kept up to date as tiles leave the hand
+  const lineCount = lines.length;
+  const naturalGap = new Uint8Array(lineCount);
+  const groupGap = new Uint8Array(lineCount);
+  const cover = new Uint8Array(lineCount);
+  const linesOf: number[][] = Array.from({ length: MATCH_CLASS_COUNT }, () => []);
+  for (let l = 0; l < lineCount; l++) {
+    const template = table.templates[lines[l]];
+    cover[l] = Math.min(jokers, table.maxJokers[lines[l]]);
+    for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+      const natural = template.natural[cls];
+      const grouped = template.grouped[cls];
+      if (natural + grouped === 0) continue;
+      linesOf[cls].push(l);
+      const have = counts[cls];
+      if (natural > have) naturalGap[l] += natural - have;
+      const spare = have > natural ? have - natural : 0;
+      if (grouped > spare) groupGap[l] += grouped - spare;
+    }
+  }
+
+  const lineDistance = (l: number) => naturalGap[l] + (groupGap[l] > cover[l] ? groupGap[l] - cover[l] : 0);
+  const weight = (l: number) => LINE_WEIGHTS[lineDistance(l)];
+  let score = 0;
+  for (let l = 0; l < lineCount; l++) score += weight(l);
+
+  // Moves one tile of a class out of (delta -1) or back into (+1) the hand,
+  // keeping the score in step
+  const move = (cls: number, delta: number) => {
+    const before = counts[cls];
+    const after = before + delta;
+    counts[cls] = after;
+    const template = table.templates;
+    for (const l of linesOf[cls]) {
+      score -= weight(l);
+      const natural = template[lines[l]].natural[cls];
+      const grouped = template[lines[l]].grouped[cls];
+      naturalGap[l] += Math.max(0, natural - after) - Math.max(0, natural - before);
+      groupGap[l] += Math.max(0, grouped - Math.max(0, after - natural)) - Math.max(0, grouped - Math.max(0, before - natural));
+      score += weight(l);
+    }
+  };
+
+  // Classes to pass from, least harmful first
+  const classes: number[] = [];
+  const harm = new Float64Array(MATCH_CLASS_COUNT);
+  for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+    if (counts[cls] === 0) continue;
+    const full = score;
+    move(cls, -1);
+    harm[cls] = full - score;
+    move(cls, 1);
+    score = full;
+    classes.push(cls);
+  }
+  classes.sort((a, b) => harm[a] - harm[b] || a - b);
+
+  const best: PassCandidate[] = [];
+  const picked: number[] = [];
+  let evaluated = 0;
+  let pruned = 0;
+  let nodes = 0;
+  let stopped = false;
+
+  const record = () => {
+    evaluated++;
+    if (best.length === top && score <= best[top - 1].score) return;
+    let closest = UNREACHABLE;
+    let line = 0;
+    for (let l = 0; l < lineCount; l++) {
+      const distance = lineDistance(l);
+      if (distance < closest) {
+        closest = distance;
+        line = l;
+      }
+    }
+    const used = new Uint8Array(MATCH_CLASS_COUNT);
+    const candidate: PassCandidate = {
+      tiles: picked.map(cls => tilesOf[cls][used[cls]++]),
+      score,
+      distance: closest,
+      pattern: compiled.patterns[table.patternOf[lines[line]]].pattern.name
+    };
+    let at = best.length;
+    while (at > 0 && best[at - 1].score < score) at--;
+    best.splice(at, 0, candidate);
+    if (best.length > top) best.pop();
+  };
+
+  // Picks tiles from classes[from..] (a class may be picked again while
+  // copies remain), keeping the classes picked in order
+  const search = (from: number) => {
+    if (picked.length === count) {
+      record();
+      return;
+    }
+    for (let i = from; i < classes.length && !stopped; i++) {
+      const cls = classes[i];
+      if (counts[cls] === 0) continue;
+      move(cls, -1);
+      picked.push(cls);
+      if (best.length === top && score <= best[top - 1].score) {
+        pruned++;
+      } else {
+        search(i);
+      }
+      picked.pop();
+      move(cls, 1);
+      // Stop once there is an answer and the time is up
+      if (++nodes % CLOCK_INTERVAL === 0 && best.length > 0 && performance.now() > deadline) {
+        stopped = true;
+      }
+    }
+  };
+  search(0);
+
+  return {
+    tiles: best[0].tiles,
+    candidates: best,
+    passes: choose(naturals, count),
+    evaluated,
+    pruned,
+    complete: !stopped,
+    elapsedMs: performance.now() - start
+  };
+}
+
+export interface CharlestonAdvisorConfig {
+  workers: number;   // Worker threads (0 runs searches inline)
+  budgetMs: number;  // Time allowed per request, queueing included
+}
+
+export type CharlestonAdvisorMetrics = BudgetedPoolMetrics;
+
+/**
+ * Reads the advisor configuration from the environment:
+ *   CHARLESTON_ADVISOR_WORKERS    - worker threads (default 1; 0 runs inline)
+ *   CHARLESTON_ADVISOR_BUDGET_MS  - time allowed per request (default 50)
+ */
+export function loadCharlestonAdvisorConfig(env: NodeJS.ProcessEnv = process.env): CharlestonAdvisorConfig {
+  const workers = parseInt(env.CHARLESTON_ADVISOR_WORKERS || '1', 10);
+  const budgetMs = parseInt(env.CHARLESTON_ADVISOR_BUDGET_MS || '50', 10);
+  return {
+    workers: Number.isFinite(workers) && workers >= 0 ? workers : 1,
+    budgetMs: Number.isFinite(budgetMs) && budgetMs > 0 ? budgetMs : 50
+  };
+}
+
+/**
+ * Pass advice for the shared 2024 card, searched on worker threads
+ */
+export class CharlestonAdvisor {
+  private pool: BudgetedPool;
+
+  constructor(config: CharlestonAdvisorConfig) {
+    this.pool = new BudgetedPool(config.workers, config.budgetMs);
+    // Compile the card and warm each worker up before the first real request
+    this.pool.warmUp('charlestonAdvice', searchUntil => ({ hand: [...WARM_UP_HAND], options: {}, searchUntil }));
+  }
+
+  /**
+   * Ranked passes for a hand, answered within the budget: if the worker has
+   * not replied in time the greedy pass is computed here instead
+   */
+  advise(hand: readonly Tile[], options: Omit<PassAdviceOptions, 'budgetMs'> = {}): Promise<CharlestonAdvice> {
+    return this.pool.run(
+      'charlestonAdvice',
+      searchUntil => ({ hand: [...hand], options, searchUntil }),
+      () => adviseCharlestonPass(getShared2024RuleCard(), hand, { ...options, budgetMs: 0 })
+    );
+  }
+
+  getMetrics(): CharlestonAdvisorMetrics {
+    return this.pool.getMetrics();
+  }
+
+  async close(): Promise<void> {
+    await this.pool.close();
+  }
+}
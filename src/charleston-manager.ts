@@ -3,6 +3,10 @@
 
 import { GameState, PlayerId, Tile } from './types';
 import { CharlestonState, CharlestonPlayerState, CharlestonPhase } from './charleston';
+import { validateTileOwnership } from './validation';
+import { StateDraft } from './game-state';
+import { DeterministicRNG, RngVersion, LATEST_RNG_VERSION } from './rng';
+import { TILE_KIND_COUNT, TILE_NAMES, JOKER_ID, INVALID_TILE_ID, encodeTile } from './tile-codec';
 
 /**
  * Initialize Charleston at the start of the game
@@ -113,12 +117,10 @@ export function handleCharlestonSelection(
     }
   }
   
-  // Validate tile ownership
-  const playerHand = state.players[playerId].hand;
-  for (const tile of tiles) {
-    if (!playerHand.includes(tile)) {
-      return { success: false, error: `Tile ${tile} not in hand` };
-    }
+  // Validate tile ownership (duplicates must each be held)
+  const ownership = validateTileOwnership(state.players[playerId].hand, tiles);
+  if (!ownership.valid) {
+    return { success: false, error: ownership.error!.message };
   }
   
   // Update player state
@@ -164,107 +166,163 @@ export function allPlayersReady(charleston: CharlestonState): boolean {
   return Object.values(charleston.playerStates).every(ps => ps.ready);
 }
 
+// Scratch for executeCharlestonPass (passes are synchronous). Each seat sends
+// three slots: its own tiles first, then any it passes on blind.
+const PASS_SIZE = 3;
+const ownCount = new Uint8Array(4);
+const slotTile = new Int16Array(4 * PASS_SIZE);   // Own tile ID in the slot
+const slotFrom = new Int8Array(4 * PASS_SIZE);    // Incoming slot passed on blind, or -1
+const forwarded = new Uint8Array(4 * PASS_SIZE);  // Incoming slot passed on (not kept)
+const leaving = new Uint8Array(TILE_KIND_COUNT);
+const blindOrder = new Uint8Array(PASS_SIZE);
+
+/**
+ * Tile sent in a seat's outgoing slot, following blind passes back to the
+ * seat whose own tile it is. A chain can run through every seat's slots, so
+ * it is bounded by the slot count rather than the seat count.
+ */
+function resolveSlot(seat: number, slot: number, offset: number): number {
+  for (let step = 0; step < 4 * PASS_SIZE; step++) {
+    const from = slotFrom[seat * PASS_SIZE + slot];
+    if (from < 0) return slotTile[seat * PASS_SIZE + slot];
+    // Incoming slot i of a seat is outgoing slot i of the seat passing to it
+    seat = (seat + offset) % 4;
+    slot = from;
+  }
+  throw new Error('Blind passes form a cycle with no tile to send');
+}
+
+/**
+ * Seeds the RNG stream used for a table's blind passes. It is keyed by the
+ * same committed seeds as the deal, under its own label, so blind-pass
+ * choices can be replayed and audited alongside the deal.
+ */
+export function createCharlestonRng(
+  clientSeed: string,
+  serverSecret: string,
+  rngVersion: RngVersion = LATEST_RNG_VERSION
+): DeterministicRNG {
+  return new DeterministicRNG(`${clientSeed}:charleston`, serverSecret, rngVersion);
+}
+
 /**
- * Execute the current pass
+ * Execute the current pass for all four seats at once
+ *
+ * Works on the tile counts: each seat's outgoing tiles are checked against its
+ * counts, then every tile is routed to the seat that keeps it. A seat blind
+ * passing n tiles passes on n of the tiles coming to it, chosen from rng,
+ * without them touching its hand, and keeps the rest. Only the four hands and
+ * the Charleston state are copied; the rest of the state is shared.
  */
-export function executeCharlestonPass(state: GameState): GameState {
+export function executeCharlestonPass(state: GameState, rng?: DeterministicRNG): GameState {
   if (!state.charleston || state.charleston.completed) {
     return state;
   }
   
-  const charleston = state.charleston;
-  const phase = charleston.phase;
+  const phase = state.charleston.phase;
   
   if (phase === 'vote' || phase === 'courtesy' || phase === 'complete') {
     return state;
   }
   
-  const newState = JSON.parse(JSON.stringify(state)) as GameState;
-  const newCharleston = newState.charleston!;
-  
-  // First, collect what each player is sending
-  const outgoing: Record<PlayerId, Tile[]> = {
-    0: [], 1: [], 2: [], 3: []
-  };
+  const draft = new StateDraft(state);
+  const charleston = draft.charleston();
+  const derived = draft.derived();
+  const offset = getPassSource(0, phase);
   
+  // Lay out each seat's outgoing slots and take its own tiles out of its counts
+  // (the scratch is cleared here as a pass that threw may have left it dirty)
+  forwarded.fill(0);
+  leaving.fill(0);
   for (let pid = 0; pid < 4; pid++) {
     const playerId = pid as PlayerId;
-    const playerState = newCharleston.playerStates[playerId];
-    outgoing[playerId] = [...playerState.selectedTiles];
+    const playerState = charleston.playerStates[playerId];
+    const blind = playerState.blindPass?.enabled ? playerState.blindPass.count : 0;
+    const own = PASS_SIZE - blind;
+    if (playerState.selectedTiles.length !== own) {
+      throw new Error(`Player ${playerId} must pass ${own} tiles of their own`);
+    }
+    
+    for (let slot = 0; slot < own; slot++) {
+      const id = encodeTile(playerState.selectedTiles[slot]);
+      if (id === INVALID_TILE_ID || id === JOKER_ID || !derived.takeIdFromHand(playerId, id)) {
+        throw new Error(`Player ${playerId} cannot pass ${playerState.selectedTiles[slot]}`);
+      }
+      slotTile[pid * PASS_SIZE + slot] = id;
+      slotFrom[pid * PASS_SIZE + slot] = -1;
+    }
+    
+    if (blind > 0) {
+      if (!rng) {
+        throw new Error('Blind passes need the table RNG');
+      }
+      // The first `blind` of a shuffled slot order are passed on
+      blindOrder[0] = 0; blindOrder[1] = 1; blindOrder[2] = 2;
+      for (let i = 0; i < blind; i++) {
+        const j = i + rng.nextInt(PASS_SIZE - i);
+        const chosen = blindOrder[j];
+        blindOrder[j] = blindOrder[i];
+        blindOrder[i] = chosen;
+        slotFrom[pid * PASS_SIZE + own + i] = chosen;
+        forwarded[pid * PASS_SIZE + chosen] = 1;
+      }
+    }
+    ownCount[pid] = own;
   }
   
-  // Handle blind passes - collect incoming tiles first
-  const incoming: Record<PlayerId, Tile[]> = {
-    0: [], 1: [], 2: [], 3: []
-  };
-  
+  // Each seat keeps the incoming slots it does not pass on
+  const incoming = {} as Record<PlayerId, Tile[]>;
   for (let pid = 0; pid < 4; pid++) {
     const playerId = pid as PlayerId;
-    const sourcePlayer = getPassSource(playerId, phase);
-    incoming[playerId] = [...outgoing[sourcePlayer]];
+    const source = (pid + offset) % 4;
+    const kept: Tile[] = [];
+    for (let slot = 0; slot < PASS_SIZE; slot++) {
+      if (forwarded[pid * PASS_SIZE + slot]) continue;
+      const id = resolveSlot(source, slot, offset);
+      derived.addIdToHand(playerId, id);
+      kept.push(TILE_NAMES[id]);
+    }
+    incoming[playerId] = kept;
   }
   
-  // Now process each player's pass
+  // Rewrite the hands in one pass each, keeping their order
   for (let pid = 0; pid < 4; pid++) {
     const playerId = pid as PlayerId;
-    const playerState = newCharleston.playerStates[playerId];
-    const targetPlayer = getPassTarget(playerId, phase);
-    
-    // Remove selected tiles from hand
-    const hand = newState.players[playerId].hand;
-    for (const tile of playerState.selectedTiles) {
-      const idx = hand.indexOf(tile);
-      if (idx >= 0) {
-        hand.splice(idx, 1);
-      }
+    for (let slot = 0; slot < ownCount[pid]; slot++) {
+      leaving[slotTile[pid * PASS_SIZE + slot]]++;
     }
-    
-    // Handle blind pass
-    if (playerState.blindPass?.enabled && playerState.blindPass.count) {
-      const blindCount = playerState.blindPass.count;
-      const incomingTiles = incoming[playerId];
-      
-      // Randomly select tiles from incoming to keep
-      const tilesToKeep: Tile[] = [];
-      const availableIncoming = [...incomingTiles];
-      
-      for (let i = 0; i < blindCount; i++) {
-        if (availableIncoming.length > 0) {
-          const randomIdx = Math.floor(Math.random() * availableIncoming.length);
-          tilesToKeep.push(availableIncoming[randomIdx]);
-          availableIncoming.splice(randomIdx, 1);
-        }
+    const hand = draft.player(playerId).hand;
+    let write = 0;
+    for (let read = 0; read < hand.length; read++) {
+      const tile = hand[read];
+      const id = encodeTile(tile);
+      if (leaving[id] > 0) {
+        leaving[id]--;
+      } else {
+        hand[write++] = tile;
       }
-      
-      // Add kept tiles to hand
-      newState.players[playerId].hand.push(...tilesToKeep);
-      
-      // Pass remaining incoming tiles + selected tiles to target
-      const tilesToPass = [...availableIncoming, ...playerState.selectedTiles];
-      newState.players[targetPlayer].hand.push(...tilesToPass);
-    } else {
-      // Normal pass - just add outgoing tiles to target
-      newState.players[targetPlayer].hand.push(...playerState.selectedTiles);
     }
+    hand.length = write;
+    for (const tile of incoming[playerId]) hand.push(tile);
   }
   
   // Store incoming tiles for reference
-  newCharleston.incomingTiles = incoming;
+  charleston.incomingTiles = incoming;
   
   // Reset player states for next pass
   for (let pid = 0; pid < 4; pid++) {
     const playerId = pid as PlayerId;
-    newCharleston.playerStates[playerId] = {
+    charleston.playerStates[playerId] = {
       selectedTiles: [],
       ready: false
     };
   }
   
   // Move to next phase
-  newCharleston.passNumber++;
-  newCharleston.phase = getNextPhase(phase);
+  charleston.passNumber++;
+  charleston.phase = getNextPhase(phase);
   
-  return newState;
+  return draft.state;
 }
 
 /**
@@ -405,12 +463,10 @@ export function handleCourtesyProposal(
     return { success: false, error: 'Jokers cannot be passed' };
   }
   
-  // Validate tile ownership
-  const playerHand = state.players[playerId].hand;
-  for (const tile of tiles) {
-    if (!playerHand.includes(tile)) {
-      return { success: false, error: `Tile ${tile} not in hand` };
-    }
+  // Validate tile ownership (duplicates must each be held)
+  const ownership = validateTileOwnership(state.players[playerId].hand, tiles);
+  if (!ownership.valid) {
+    return { success: false, error: ownership.error!.message };
   }
   
   // Update player state
@@ -431,8 +487,9 @@ export function executeCourtesyPass(state: GameState): GameState {
     return state;
   }
   
-  const newState = JSON.parse(JSON.stringify(state)) as GameState;
-  const charleston = newState.charleston!;
+  const draft = new StateDraft(state);
+  const newState = draft.state;
+  const charleston = draft.charleston();
   
   // Find mutual trade agreements
   const trades: Array<{ player1: PlayerId; player2: PlayerId }> = [];
@@ -469,19 +526,12 @@ export function executeCourtesyPass(state: GameState): GameState {
     const tiles2 = charleston.playerStates[p2].courtesyOffer!.tiles;
     
     // Remove tiles from hands
-    for (const tile of tiles1) {
-      const idx = newState.players[p1].hand.indexOf(tile);
-      if (idx >= 0) newState.players[p1].hand.splice(idx, 1);
-    }
-    
-    for (const tile of tiles2) {
-      const idx = newState.players[p2].hand.indexOf(tile);
-      if (idx >= 0) newState.players[p2].hand.splice(idx, 1);
-    }
+    draft.takeFromHand(p1, tiles1);
+    draft.takeFromHand(p2, tiles2);
     
     // Add tiles to hands
-    newState.players[p1].hand.push(...tiles2);
-    newState.players[p2].hand.push(...tiles1);
+    draft.addToHand(p1, tiles2);
+    draft.addToHand(p2, tiles1);
   }
   
   // Mark Charleston as complete
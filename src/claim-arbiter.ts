@@ -0,0 +1,441 @@
+/**
+ * Claim windows
+ *
+ * After a discard, the other seats get a short window to call the tile.
+ * ClaimArbiter runs one table's windows:
+ *
+ *   - a window opens on a discard for the other seats whose claim sets (see
+ *     DistanceCache) hold the tile, and only those seats may answer it; when
+ *     no seat could use the tile (a discarded joker never can) none opens
+ *   - each seat answers once: a claim for an exposure, declareMahjong on the
+ *     discard, or a pass; calls are checked against the state the window
+ *     opened on as they arrive (without playing them, as a transition would
+ *     supersede that state)
+ *   - the window closes once every seat has answered, once no seat still to
+ *     answer could outrank the best call with the calls open to it, or at
+ *     its deadline
+ *   - the call that takes the tile is mahjong before any exposure, then the
+ *     seat nearest the discarder in turn order
+ *
+ * The arbiter does not apply the call: onResolve gets it and the caller
+ * plays it as an ordinary move. Deadlines for every table run on one
+ * ClaimScheduler (a heap of deadlines behind a single timer) rather than a
+ * timer per discard.
+ */
+
+import { performance } from 'perf_hooks';
+import { GameState, Move, PlayerId, Tile } from './types';
+import { validateMove, validateTileOwnership } from './validation';
+import { DistanceCache } from './hand-distance';
+import { LatencyRecorder, LatencyStats } from './metrics';
+
+export interface ClaimWindowConfig {
+  windowMs: number;   // Time the other seats get to call a discard
+}
+
+/**
+ * Reads the claim window configuration from the environment:
+ *   CLAIM_WINDOW_MS  - how long a discard stays open to calls (default 3000)
+ */
+export function loadClaimWindowConfig(env: NodeJS.ProcessEnv = process.env): ClaimWindowConfig {
+  const windowMs = parseInt(env.CLAIM_WINDOW_MS || '3000', 10);
+  return {
+    windowMs: Number.isFinite(windowMs) && windowMs >= 0 ? windowMs : 3000
+  };
+}
+
+export interface ScheduledTask {
+  at: number;
+  run: (() => void) | null;  // Null once run or cancelled
+}
+
+export interface ClaimSchedulerOptions {
+  now?: () => number;  // Clock deadlines are given in (default performance.now)
+  manual?: boolean;    // Never arm a timer; the owner calls runDue
+}
+
+/**
+ * Deadlines for any number of windows behind one timer, armed for the
+ * earliest of them
+ */
+export class ClaimScheduler {
+  readonly now: () => number;
+  private readonly manual: boolean;
+  private heap: ScheduledTask[] = [];
+  private timer: NodeJS.Timeout | null = null;
+  private armedAt = Infinity;
+
+  constructor(options: ClaimSchedulerOptions = {}) {
+    this.now = options.now ?? (() => performance.now());
+    this.manual = options.manual ?? false;
+  }
+
+  schedule(at: number, run: () => void): ScheduledTask {
+    const task: ScheduledTask = { at, run };
+    this.heap.push(task);
+    this.siftUp(this.heap.length - 1);
+    this.arm();
+    return task;
+  }
+
+  /**
+   * Drops a task; it leaves the heap when it reaches the top
+   */
+  cancel(task: ScheduledTask): void {
+    task.run = null;
+  }
+
+  /** Tasks not yet run or cancelled */
+  get pending(): number {
+    return this.heap.filter(task => task.run).length;
+  }
+
+  /**
+   * Runs every task due by now, earliest first. Returns how many ran.
+   */
+  runDue(now: number = this.now()): number {
+    let ran = 0;
+    while (this.heap.length > 0 && this.heap[0].at <= now) {
+      const task = this.pop();
+      const run = task.run;
+      if (!run) continue;
+      task.run = null;
+      ran++;
+      try {
+        run();
+      } catch (error) {
+        console.error('[Claims] Scheduled task failed:', error);
+      }
+    }
+    this.arm();
+    return ran;
+  }
+
+  close(): void {
+    for (const task of this.heap) task.run = null;
+    this.heap = [];
+    this.arm();
+  }
+
+  private arm(): void {
+    while (this.heap.length > 0 && !this.heap[0].run) this.pop();
+    const at = this.heap.length > 0 ? this.heap[0].at : Infinity;
+    if (this.manual || at === this.armedAt) return;
+    if (this.timer) clearTimeout(this.timer);
+    this.timer = null;
+    this.armedAt = at;
+    if (at === Infinity) return;
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.armedAt = Infinity;
+      this.runDue();
+    }, Math.max(0, at - this.now()));
+    this.timer.unref();
+  }
+
+  private pop(): ScheduledTask {
+    const top = this.heap[0];
+    const last = this.heap.pop()!;
+    if (this.heap.length > 0) {
+      this.heap[0] = last;
+      this.siftDown(0);
+    }
+    return top;
+  }
+
+  private siftUp(i: number): void {
+    const heap = this.heap;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (heap[parent].at <= heap[i].at) break;
+      [heap[parent], heap[i]] = [heap[i], heap[parent]];
+      i = parent;
+    }
+  }
+
+  private siftDown(i: number): void {
+    const heap = this.heap;
+    for (;;) {
+      const left = 2 * i + 1;
+      const right = left + 1;
+      let least = i;
+      if (left < heap.length && heap[left].at < heap[least].at) least = left;
+      if (right < heap.length && heap[right].at < heap[least].at) least = right;
+      if (least === i) return;
+      [heap[least], heap[i]] = [heap[i], heap[least]];
+      i = least;
+    }
+  }
+}
+
+export interface ClaimWindow {
+  id: number;
+  state: GameState;                      // State the window opened on
+  discard: { player: PlayerId; tile: Tile };
+  eligible: PlayerId[];                  // Seats that may answer, in turn order from the discarder
+  winners: PlayerId[];                   // Eligible seats the tile would give mahjong
+  responses: Map<PlayerId, Move>;        // Calls and passes so far
+  openedAt: number;
+  closesAt: number;
+}
+
+export interface ClaimResolution {
+  window: ClaimWindow;
+  move?: Move;   // The call that takes the tile; none if every seat let it go
+  // Why it closed: every seat answered, no seat left could outrank the best
+  // call, or time ran out
+  reason: 'answered' | 'decided' | 'timeout';
+  latencyMs: number;  // From opening to closing
+}
+
+export type ClaimSubmitResult =
+  | { ok: true }
+  | { ok: false; error: { code: string; message: string } };
+
+export interface ClaimWindowMetrics {
+  windows: number;   // Windows closed
+  claimed: number;   // ... with a call taking the tile
+  early: number;     // ... before the deadline
+  timedOut: number;  // ... at the deadline, with seats yet to answer
+  latency: LatencyStats;
+}
+
+/**
+ * Window counts and latency, shared by any number of arbiters
+ */
+export class ClaimWindowRecorder {
+  private windows = 0;
+  private claimed = 0;
+  private early = 0;
+  private timedOut = 0;
+  private latency = new LatencyRecorder();
+
+  record(resolution: ClaimResolution): void {
+    this.windows++;
+    if (resolution.move) this.claimed++;
+    if (resolution.reason === 'timeout') this.timedOut++;
+    else this.early++;
+    this.latency.record(resolution.latencyMs);
+  }
+
+  stats(): ClaimWindowMetrics {
+    return {
+      windows: this.windows,
+      claimed: this.claimed,
+      early: this.early,
+      timedOut: this.timedOut,
+      latency: this.latency.stats()
+    };
+  }
+}
+
+/**
+ * Order of a call: mahjong before exposures, then turn order from the
+ * discarder. Lower goes first.
+ */
+export function claimPriority(move: Move, discarder: PlayerId): number {
+  return (move.type === 'declareMahjong' ? 0 : 4) + ((move.player - discarder + 4) % 4);
+}
+
+/**
+ * Whether a move calls the last discard rather than playing a turn: a claim,
+ * or mahjong declared on a fresh discard
+ */
+export function isClaimMove(state: GameState, move: Move): boolean {
+  return move.type === 'claim' || (move.type === 'declareMahjong' && state.lastAction?.type === 'discard');
+}
+
+// Exposure sizes a discard can be called for (pong, kong, quint)
+const EXPOSURE_SIZES = [3, 4, 5];
+
+export interface ClaimArbiterOptions {
+  windowMs: number;
+  scheduler: ClaimScheduler;
+  recorder?: ClaimWindowRecorder;  // Default: the arbiter's own
+}
+
+/**
+ * One table's claim windows, one at a time
+ */
+export class ClaimArbiter {
+  private readonly windowMs: number;
+  private readonly scheduler: ClaimScheduler;
+  private readonly recorder: ClaimWindowRecorder;
+  private readonly onResolve: (resolution: ClaimResolution) => void;
+  private current: ClaimWindow | null = null;
+  private deadline: ScheduledTask | null = null;
+  // Claim sets of the table's seats, synced as each window opens
+  private cache: DistanceCache | null = null;
+  private nextId = 1;
+
+  constructor(options: ClaimArbiterOptions, onResolve: (resolution: ClaimResolution) => void) {
+    this.windowMs = options.windowMs;
+    this.scheduler = options.scheduler;
+    this.recorder = options.recorder ?? new ClaimWindowRecorder();
+    this.onResolve = onResolve;
+  }
+
+  /** The open window, if any */
+  get window(): ClaimWindow | null {
+    return this.current;
+  }
+
+  /**
+   * Opens a window on the state's last discard for the seats that could call
+   * it (a dead hand never can). Returns null, with nothing scheduled, when there is no fresh discard
+   * or no seat can use it.
+   */
+  open(state: GameState): ClaimWindow | null {
+    this.cancel();
+    const discard = state.discardPile[state.discardPile.length - 1];
+    if (state.phase !== 'play' || state.lastAction?.type !== 'discard' || !discard || discard.tile === 'J') {
+      return null;
+    }
+    if (this.cache) this.cache.sync(state);
+    else this.cache = new DistanceCache(state);
+    const cache = this.cache;
+
+    const eligible: PlayerId[] = [];
+    const winners: PlayerId[] = [];
+    for (let step = 1; step < 4; step++) {
+      const seat = ((discard.player + step) % 4) as PlayerId;
+      if (state.players[seat].isDead) continue;
+      const wins = cache.canWinOn(seat, discard.tile);
+      if (wins) winners.push(seat);
+      if (wins || EXPOSURE_SIZES.some(size => cache.canExposeWith(seat, discard.tile, size))) eligible.push(seat);
+    }
+    if (eligible.length === 0) return null;
+
+    const openedAt = this.scheduler.now();
+    const window: ClaimWindow = {
+      id: this.nextId++,
+      state,
+      discard: { player: discard.player, tile: discard.tile },
+      eligible,
+      winners,
+      responses: new Map(),
+      openedAt,
+      closesAt: openedAt + this.windowMs
+    };
+    this.current = window;
+    this.deadline = this.scheduler.schedule(window.closesAt, () => {
+      if (this.current === window) this.close('timeout');
+    });
+    return window;
+  }
+
+  /**
+   * Takes a seat's answer to the open window: claim, declareMahjong or pass
+   */
+  submit(move: Move): ClaimSubmitResult {
+    const window = this.current;
+    if (!window) {
+      return rejected('no_claim_window', 'No discard is open to calls');
+    }
+    if (!window.eligible.includes(move.player)) {
+      return rejected('not_eligible', 'You may not call this discard');
+    }
+    if (window.responses.has(move.player)) {
+      return rejected('already_answered', 'You have already answered this discard');
+    }
+    if (move.type !== 'pass' && move.type !== 'claim' && move.type !== 'declareMahjong') {
+      return rejected('invalid_claim', 'Answer a discard with a claim, mahjong or a pass');
+    }
+    if (move.type !== 'pass') {
+      const check = checkCall(window, this.cache!, move);
+      if (!check.ok) return check;
+    }
+
+    window.responses.set(move.player, move);
+    if (window.responses.size === window.eligible.length) {
+      this.close('answered');
+    } else if (this.decided(window)) {
+      this.close('decided');
+    }
+    return { ok: true };
+  }
+
+  /**
+   * Drops the open window without resolving it (the game moved on another
+   * way, or the table closed)
+   */
+  cancel(): void {
+    if (this.deadline) this.scheduler.cancel(this.deadline);
+    this.deadline = null;
+    this.current = null;
+  }
+
+  getMetrics(): ClaimWindowMetrics {
+    return this.recorder.stats();
+  }
+
+  // The best call so far, if any
+  private best(window: ClaimWindow): Move | undefined {
+    let best: Move | undefined;
+    for (const move of window.responses.values()) {
+      if (move.type === 'pass') continue;
+      if (!best || claimPriority(move, window.discard.player) < claimPriority(best, window.discard.player)) {
+        best = move;
+      }
+    }
+    return best;
+  }
+
+  // Whether no seat still to answer could go before the best call with the
+  // best call open to it
+  private decided(window: ClaimWindow): boolean {
+    const best = this.best(window);
+    if (!best) return false;
+    const rank = claimPriority(best, window.discard.player);
+    return window.eligible.every(seat => {
+      if (window.responses.has(seat)) return true;
+      const call: Move = window.winners.includes(seat)
+        ? { type: 'declareMahjong', player: seat }
+        : { type: 'claimRequest', player: seat, claimType: 'pong' };
+      return claimPriority(call, window.discard.player) > rank;
+    });
+  }
+
+  private close(reason: ClaimResolution['reason']): void {
+    const window = this.current!;
+    this.cancel();
+    const resolution: ClaimResolution = {
+      window,
+      move: this.best(window),
+      reason,
+      latencyMs: this.scheduler.now() - window.openedAt
+    };
+    this.recorder.record(resolution);
+    this.onResolve(resolution);
+  }
+}
+
+/**
+ * Whether the seat can make the call: an exposure of a size its claim sets
+ * allow, with the other tiles in its hand, or mahjong on a tile that
+ * completes its hand
+ */
+function checkCall(window: ClaimWindow, cache: DistanceCache, move: Move): ClaimSubmitResult {
+  const { state, discard } = window;
+  const valid = validateMove(state, move);
+  if (!valid.valid) {
+    return rejected(valid.error?.code ?? 'invalid_claim', valid.error?.message ?? 'Invalid claim');
+  }
+  if (move.type === 'claim') {
+    const hand = state.derived ? state.derived.hands[move.player] : state.players[move.player].hand;
+    const owned = validateTileOwnership(hand, move.meld.tiles.slice(1));
+    if (!owned.valid) {
+      return rejected(owned.error?.code ?? 'invalid_claim', owned.error?.message ?? 'Tiles not in hand');
+    }
+    if (!cache.canExposeWith(move.player, discard.tile, move.meld.tiles.length)) {
+      return rejected('invalid_claim', `No open line takes an exposure of ${move.meld.tiles.length} ${discard.tile}`);
+    }
+  } else if (!window.winners.includes(move.player)) {
+    return rejected('invalid_claim', 'Hand does not match any pattern on the card');
+  }
+  return { ok: true };
+}
+
+function rejected(code: string, message: string): ClaimSubmitResult {
+  return { ok: false, error: { code, message } };
+}
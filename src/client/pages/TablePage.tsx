@@ -150,6 +150,19 @@ export default function TablePage({ messages, onLeaveTable, onJoinTable, onSendM
     return null;
   }, [messages, inviteCode]);
 
+  // Latest pass suggestion, until the pass it was for has run
+  const charlestonHint = useMemo(() => {
+    for (let i = messages.length - 1; i >= 0; i--) {
+      const msg = messages[i] as any;
+      if (msg.type === 'charleston_pass_executed' || msg.type === 'charleston_complete') return null;
+      if (msg.type === 'charleston_hint_result') {
+        const [best] = msg.candidates;
+        return best ? { tiles: msg.tiles, pattern: best.pattern, distance: best.distance } : null;
+      }
+    }
+    return null;
+  }, [messages]);
+
   // Get storage key for tile order
   const getTileOrderStorageKey = React.useCallback(() => {
     const joinMsg = messages.find((m: any) => 
@@ -383,6 +396,45 @@ export default function TablePage({ messages, onLeaveTable, onJoinTable, onSendM
     });
   };
 
+  // Only the table's creator may fill the empty seats with bots
+  const isCreator = useMemo(
+    () => messages.some((m: any) => m.type === 'table_created' && m.inviteCode === inviteCode),
+    [messages, inviteCode]
+  );
+
+  const handleFillWithBots = () => {
+    const joinMsg = messages.find((m: any) => 
+      (m.type === 'table_created' || m.type === 'table_joined') && 
+      m.inviteCode === inviteCode
+    ) as any;
+    
+    if (!joinMsg?.tableId) return;
+    
+    onSendMessage({
+      type: 'fill_with_bots',
+      tableId: joinMsg.tableId,
+      traceId: crypto.randomUUID(),
+      ts: new Date().toISOString()
+    });
+  };
+
+  const handleCharlestonHint = (count: number) => {
+    const joinMsg = messages.find((m: any) => 
+      (m.type === 'table_created' || m.type === 'table_joined') && 
+      m.inviteCode === inviteCode
+    ) as any;
+    
+    if (!joinMsg?.tableId) return;
+    
+    onSendMessage({
+      type: 'charleston_hint',
+      tableId: joinMsg.tableId,
+      count,
+      traceId: crypto.randomUUID(),
+      ts: new Date().toISOString()
+    });
+  };
+
   const handleCharlestonReady = () => {
     const joinMsg = messages.find((m: any) => 
       (m.type === 'table_created' || m.type === 'table_joined') && 
@@ -492,7 +544,9 @@ export default function TablePage({ messages, onLeaveTable, onJoinTable, onSendM
                   <div key={seat} className={`p-6 rounded-lg border-2 ${player ? 'bg-green-50 border-green-500' : 'bg-gray-50 border-gray-300 border-dashed'}`}>
                     <div className="text-sm text-gray-600 mb-2">Seat {seat + 1}</div>
                     {player ? (
-                      <div className="font-bold text-lg text-gray-900">{player.username}</div>
+                      <div className="font-bold text-lg text-gray-900">
+                        {player.username}{player.isBot && <span className="ml-2 text-sm font-normal text-gray-500">(bot)</span>}
+                      </div>
                     ) : (
                       <div className="text-gray-400 italic">Waiting...</div>
                     )}
@@ -512,6 +566,15 @@ export default function TablePage({ messages, onLeaveTable, onJoinTable, onSendM
                 <p className="text-sm mt-1">Share the invite code with your friends!</p>
               )}
             </div>
+            
+            {isCreator && !playerCountInfo.ready && (
+              <button
+                onClick={handleFillWithBots}
+                className="mt-4 w-full px-4 py-2 bg-green-600 hover:bg-green-700 text-white font-medium rounded-lg transition-colors"
+              >
+                Fill Empty Seats with Bots
+              </button>
+            )}
           </div>
         </div>
       </div>
@@ -636,6 +699,8 @@ export default function TablePage({ messages, onLeaveTable, onJoinTable, onSendM
             yourHand={currentHand.length > 0 ? currentHand : gameStartInfo.yourHand}
             hideBottomHand={!!charlestonInfo}
             onReorderHand={handleReorderHand}
+            onRequestHint={handleCharlestonHint}
+            hint={charlestonHint}
           />
         </div>
       )}
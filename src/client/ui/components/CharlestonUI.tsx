@@ -15,6 +15,8 @@ interface CharlestonUIProps {
   onVote: (vote: 'yes' | 'no') => void;
   onCourtesyOffer: (tiles: string[], targetPlayer: number) => void;
   onReorderHand?: (newOrder: string[]) => void; // Callback when tiles are reordered
+  onRequestHint?: (count: number) => void; // Asks the server to suggest a pass
+  hint?: { tiles: string[]; pattern: string; distance: number } | null; // Latest suggestion
 }
 
 export default function CharlestonUI({
@@ -30,7 +32,9 @@ export default function CharlestonUI({
   onReady,
   onVote,
   onCourtesyOffer,
-  onReorderHand
+  onReorderHand,
+  onRequestHint,
+  hint
 }: CharlestonUIProps) {
   const [selectedTiles, setSelectedTiles] = useState<string[]>([]);
   const [blindPassEnabled, setBlindPassEnabled] = useState(false);
@@ -107,6 +111,20 @@ export default function CharlestonUI({
     }
   }, [selectedTiles, courtesyTarget, isCourtesyPhase]);
 
+  // Select a suggested pass when it arrives
+  useEffect(() => {
+    if (!hint || !isPassPhase || yourState.ready) return;
+    const used = new Set<number>();
+    const picked: string[] = [];
+    for (const tile of hint.tiles) {
+      const index = yourHand.findIndex((t, i) => t === tile && !used.has(i));
+      if (index === -1) return; // The hand has changed since
+      used.add(index);
+      picked.push(`${tile}_${index}`);
+    }
+    setSelectedTiles(picked.slice(0, maxSelectableTiles));
+  }, [hint]);
+
   const handleReady = () => {
     if (!yourState.ready) {
       onReady();
@@ -382,6 +400,16 @@ export default function CharlestonUI({
         >
           {yourState.ready ? '✓ Ready' : isVotePhase ? 'Submit Vote' : 'Ready'}
         </button>
+        {isPassPhase && onRequestHint && !yourState.ready && (
+          <button className="hint-button" onClick={() => onRequestHint(maxSelectableTiles)}>
+            Suggest a pass
+          </button>
+        )}
+        {isPassPhase && hint && !yourState.ready && (
+          <p className="hint-text">
+            Suggested: {hint.tiles.join(' ')} (keeps {hint.pattern}, {hint.distance} away)
+          </p>
+        )}
         {!canReady && !yourState.ready && (
           <p className="ready-hint">
             {isVotePhase && 'Select your vote'}
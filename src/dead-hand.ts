@@ -0,0 +1,323 @@
+/**
+ * Dead-hand detection: which patterns each player can still complete
+ *
+ * A template stays a candidate while the tiles not yet visible can still fill
+ * it. Visible tiles are the discard pile and every exposure; a class whose
+ * copies are all visible is gone for good. For a template, each class must
+ * still have enough unseen copies for its singles and pairs (jokers cannot
+ * stand in for them), and the group tiles short of unseen copies must fit in
+ * the jokers the pattern allows and that are not yet discarded. Exposed
+ * jokers are not counted as gone, since a joker exchange can bring them back.
+ * A player's exposures must also fit the template (one group per meld, as in
+ * hand-distance.ts), and concealed patterns are out once they have exposed.
+ *
+ * Tiles only become visible, so candidates only ever drop out. DeadHandTracker
+ * keeps each player's candidate templates with the joker-filled tiles each
+ * still needs. A discard updates just the candidates using its class, and a
+ * claim places the new meld in the claimant's candidates, so each event costs
+ * a pass over a few candidates rather than a scan of the card. A player with
+ * no candidate pattern left is dead. The rare moves that take tiles back out
+ * of view (a joker exchange returns an exposed joker to a hand) recheck from
+ * scratch.
+ */
+
+import { GameState, HandPattern, Meld, PlayerId } from './types';
+import { CompiledRuleCard, MATCH_CLASS_COUNT, getCompiledRuleCard, matchClass, toHandVector } from './hand-matcher';
+import { DistanceTable, UNREACHABLE, getDistanceTable, placeMelds } from './hand-distance';
+import { JOKER_ID, TILE_COPIES } from './tile-codec';
+import { getDerivedState } from './derived-state';
+
+/** Copies of each match class in the set (flowers folded) */
+const CLASS_COPIES: Uint8Array = (() => {
+  const copies = new Uint8Array(MATCH_CLASS_COUNT);
+  for (let id = 0; id < JOKER_ID; id++) copies[matchClass(id)] += TILE_COPIES[id];
+  return copies;
+})();
+
+const JOKER_COPIES = TILE_COPIES[JOKER_ID];
+
+/**
+ * Group tiles a class of a template still needs beyond its unseen copies
+ * (these must come from jokers), or -1 when its singles and pairs cannot be
+ * filled
+ */
+function classShortfall(natural: number, grouped: number, unseen: number): number {
+  if (natural > unseen) return -1;
+  return natural + grouped > unseen ? natural + grouped - unseen : 0;
+}
+
+/**
+ * One player's exposures and surviving templates
+ */
+interface PlayerCandidates {
+  melds: readonly Meld[];
+  /** Signatures of the exposed melds, as in HandVector.melds */
+  signatures: number[];
+  /** Group needs per template once exposed melds are placed (null: no melds) */
+  grouped: Uint8Array | null;
+  /** Jokers each template may still take, after those in exposed melds */
+  jokerRoom: Uint8Array;
+  /** Joker-filled tiles each template needs given the unseen tiles */
+  short: Uint8Array;
+  /** 1 for each template still reachable */
+  live: Uint8Array;
+  /** Reachable templates of each pattern */
+  liveTemplates: Uint16Array;
+  /** Patterns with a reachable template */
+  patterns: number;
+}
+
+export class DeadHandTracker {
+  private readonly compiled: CompiledRuleCard;
+  private readonly table: DistanceTable;
+  /** Visible tiles per class, and discarded jokers */
+  private readonly gone = new Uint8Array(MATCH_CLASS_COUNT);
+  private goneJokers = 0;
+  private readonly players: PlayerCandidates[] = [];
+
+  constructor(state: GameState) {
+    this.compiled = getCompiledRuleCard(state.options.ruleCard);
+    this.table = getDistanceTable(this.compiled);
+    this.readVisible(state, this.gone);
+    this.goneJokers = this.discardedJokers(state);
+
+    const count = this.table.templates.length;
+    for (let pid = 0; pid < 4; pid++) {
+      const player: PlayerCandidates = {
+        melds: [],
+        signatures: [],
+        grouped: null,
+        jokerRoom: new Uint8Array(count),
+        short: new Uint8Array(count),
+        live: new Uint8Array(count),
+        liveTemplates: new Uint16Array(this.compiled.patterns.length),
+        patterns: 0
+      };
+      this.players.push(player);
+      this.rebuild(player, state.players[pid as PlayerId]?.melds ?? []);
+    }
+  }
+
+  /**
+   * Brings every player's candidates up to date with the state. Newly visible
+   * tiles recheck only the candidates using their class, and a new exposure
+   * only the claimant's candidates; anything else that changed a player's
+   * exposures rechecks that player in full.
+   */
+  sync(state: GameState): void {
+    const gone = new Uint8Array(MATCH_CLASS_COUNT);
+    this.readVisible(state, gone);
+    const goneJokers = this.discardedJokers(state);
+
+    let returned = goneJokers < this.goneJokers;
+    const grown: number[] = [];
+    for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+      if (gone[cls] > this.gone[cls]) grown.push(cls);
+      else if (gone[cls] < this.gone[cls]) returned = true;
+    }
+
+    const melds = ([0, 1, 2, 3] as PlayerId[]).map(pid => state.players[pid]?.melds ?? []);
+    const rebuild = this.players.map((player, pid) => returned || !extendsMelds(player.melds, melds[pid]));
+    for (const cls of grown) {
+      const before = CLASS_COPIES[cls] - this.gone[cls];
+      const after = CLASS_COPIES[cls] - gone[cls];
+      this.players.forEach((player, pid) => {
+        if (!rebuild[pid]) this.updateClass(player, cls, before, after);
+      });
+    }
+    const jokersGone = goneJokers > this.goneJokers;
+    this.gone.set(gone);
+    this.goneJokers = goneJokers;
+
+    this.players.forEach((player, pid) => {
+      if (rebuild[pid]) {
+        this.rebuild(player, melds[pid]);
+        return;
+      }
+      if (melds[pid].length > player.melds.length) this.expose(player, melds[pid]);
+      if (jokersGone) {
+        // Any candidate may have been counting on the discarded joker
+        const limit = JOKER_COPIES - this.goneJokers;
+        for (let t = 0; t < player.live.length; t++) {
+          if (player.live[t] && player.short[t] > limit) this.drop(player, t);
+        }
+      }
+    });
+  }
+
+  /**
+   * Whether the player can no longer complete any pattern on the card
+   */
+  isDead(player: PlayerId): boolean {
+    return this.players[player].patterns === 0;
+  }
+
+  /**
+   * Players with no pattern left, in seat order
+   */
+  deadPlayers(): PlayerId[] {
+    return ([0, 1, 2, 3] as PlayerId[]).filter(pid => this.isDead(pid));
+  }
+
+  /**
+   * Number of patterns the player can still complete
+   */
+  candidateCount(player: PlayerId): number {
+    return this.players[player].patterns;
+  }
+
+  /**
+   * The patterns the player can still complete, in card order
+   */
+  candidates(player: PlayerId): HandPattern[] {
+    const { liveTemplates } = this.players[player];
+    return this.compiled.patterns.filter((_, p) => liveTemplates[p] > 0).map(p => p.pattern);
+  }
+
+  /**
+   * Visible tiles (discards and exposures) per match class
+   */
+  private readVisible(state: GameState, gone: Uint8Array): void {
+    const visible = getDerivedState(state).visible;
+    for (let id = 0; id < JOKER_ID; id++) {
+      gone[matchClass(id)] += visible.countId(id);
+    }
+  }
+
+  private discardedJokers(state: GameState): number {
+    const derived = getDerivedState(state);
+    let exposed = 0;
+    for (const counts of derived.exposed) exposed += counts.jokerCount;
+    return derived.visible.jokerCount - exposed;
+  }
+
+  private groupedNeed(player: PlayerCandidates, t: number, cls: number): number {
+    return player.grouped ? player.grouped[t * MATCH_CLASS_COUNT + cls] : this.table.templates[t].grouped[cls];
+  }
+
+  /**
+   * Places a player's exposures again and rechecks every template
+   */
+  private rebuild(player: PlayerCandidates, melds: readonly Meld[]): void {
+    const vector = toHandVector([], melds);
+    if (!vector) {
+      throw new Error('Exposures contain unknown tiles or mixed melds');
+    }
+    const { templates, maxJokers, isOpen } = this.table;
+    player.melds = melds;
+    player.signatures = vector.melds.slice();
+    player.grouped = vector.melds.length > 0 ? new Uint8Array(templates.length * MATCH_CLASS_COUNT) : null;
+    player.live.fill(0);
+    player.liveTemplates.fill(0);
+    player.patterns = 0;
+
+    const jokers = JOKER_COPIES - this.goneJokers;
+    for (let t = 0; t < templates.length; t++) {
+      const template = templates[t];
+      if (player.grouped) {
+        if (!isOpen[t] || vector.meldJokers > maxJokers[t]) continue;
+        const grouped = player.grouped.subarray(t * MATCH_CLASS_COUNT, (t + 1) * MATCH_CLASS_COUNT);
+        grouped.set(template.grouped);
+        if (!placeMelds(template, vector.melds, grouped)) continue;
+      }
+      player.jokerRoom[t] = maxJokers[t] - vector.meldJokers;
+
+      let short = 0;
+      for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+        const natural = template.natural[cls];
+        const grouped = this.groupedNeed(player, t, cls);
+        if (natural + grouped === 0) continue;
+        const need = classShortfall(natural, grouped, CLASS_COPIES[cls] - this.gone[cls]);
+        if (need < 0) {
+          short = UNREACHABLE;
+          break;
+        }
+        short += need;
+      }
+      if (short > Math.min(player.jokerRoom[t], jokers)) continue;
+      player.short[t] = short;
+      player.live[t] = 1;
+      if (player.liveTemplates[this.table.patternOf[t]]++ === 0) player.patterns++;
+    }
+  }
+
+  /**
+   * Applies a drop in the unseen copies of one class to the templates using it
+   */
+  private updateClass(player: PlayerCandidates, cls: number, before: number, after: number): void {
+    const { templates } = this.table;
+    const jokers = JOKER_COPIES - this.goneJokers;
+    for (const t of this.table.postings[cls]) {
+      if (!player.live[t]) continue;
+      const natural = templates[t].natural[cls];
+      const grouped = this.groupedNeed(player, t, cls);
+      const need = classShortfall(natural, grouped, after);
+      const short = need < 0 ? UNREACHABLE : player.short[t] + need - classShortfall(natural, grouped, before);
+      if (short > Math.min(player.jokerRoom[t], jokers)) this.drop(player, t);
+      else player.short[t] = short;
+    }
+  }
+
+  /**
+   * Places the melds a player has added since the last sync in every
+   * candidate template. Groups of the same tile and size are interchangeable,
+   * so a meld fits if the template has more such groups than the player has
+   * such melds.
+   */
+  private expose(player: PlayerCandidates, melds: readonly Meld[]): void {
+    const added = toHandVector([], melds.slice(player.melds.length));
+    if (!added) {
+      throw new Error('Exposures contain unknown tiles or mixed melds');
+    }
+    const { templates, isOpen } = this.table;
+    if (!player.grouped) {
+      player.grouped = new Uint8Array(templates.length * MATCH_CLASS_COUNT);
+      for (let t = 0; t < templates.length; t++) player.grouped.set(templates[t].grouped, t * MATCH_CLASS_COUNT);
+    }
+    const grouped = player.grouped;
+    player.melds = melds;
+
+    const jokers = JOKER_COPIES - this.goneJokers;
+    for (const meld of added.melds) {
+      player.signatures.push(meld);
+      const held = player.signatures.filter(m => m === meld).length;
+      const cls = meld >> 3;
+      const unseen = CLASS_COPIES[cls] - this.gone[cls];
+      for (let t = 0; t < templates.length; t++) {
+        if (!player.live[t]) continue;
+        const template = templates[t];
+        if (!isOpen[t] || template.groups.filter(g => g === meld).length < held) {
+          this.drop(player, t);
+          continue;
+        }
+        const at = t * MATCH_CLASS_COUNT + cls;
+        const natural = template.natural[cls];
+        const before = classShortfall(natural, grouped[at], unseen);
+        grouped[at] -= meld & 7;
+        player.short[t] += classShortfall(natural, grouped[at], unseen) - before;
+      }
+    }
+    for (let t = 0; t < templates.length; t++) {
+      if (!player.live[t]) continue;
+      if (added.meldJokers > player.jokerRoom[t]) {
+        this.drop(player, t);
+        continue;
+      }
+      player.jokerRoom[t] -= added.meldJokers;
+      if (player.short[t] > Math.min(player.jokerRoom[t], jokers)) this.drop(player, t);
+    }
+  }
+
+  private drop(player: PlayerCandidates, t: number): void {
+    player.live[t] = 0;
+    if (--player.liveTemplates[this.table.patternOf[t]] === 0) player.patterns--;
+  }
+}
+
+/**
+ * Whether b is a followed by zero or more new melds (moves share untouched
+ * melds and replace changed ones)
+ */
+function extendsMelds(a: readonly Meld[], b: readonly Meld[]): boolean {
+  return a.length <= b.length && a.every((meld, i) => meld === b[i]);
+}
@@ -0,0 +1,177 @@
+/**
+ * Tile counts derived from a GameState, maintained incrementally by the move
+ * reducer so lookups never rescan hands, melds or the discard pile
+ *
+ * Tiles only change location through the methods below, which keep the
+ * counts and the Zobrist position hash in step with each other.
+ */
+
+import { GameState, PlayerId, Tile } from './types';
+import { HandCounts } from './hand-counts';
+import { TileId, encodeTile, INVALID_TILE_ID } from './tile-codec';
+import {
+  ZobristHash,
+  handLocation,
+  exposedLocation,
+  LOCATION_DISCARDS,
+  LOCATION_LIVE_WALL,
+  LOCATION_DEAD_WALL
+} from './zobrist';
+
+function tileId(tile: Tile): TileId {
+  const id = encodeTile(tile);
+  if (id === INVALID_TILE_ID) {
+    throw new Error(`Unknown tile: ${tile}`);
+  }
+  return id;
+}
+
+export class DerivedState {
+  /** Tiles face up to everyone: discards plus every exposed meld */
+  readonly visible: HandCounts;
+  /** Concealed tiles held by each player */
+  readonly hands: HandCounts[];
+  /** Exposed meld tiles of each player */
+  readonly exposed: HandCounts[];
+  /** Position hash over where every tile is (see zobrist.ts) */
+  readonly zobrist: ZobristHash;
+
+  private constructor(visible: HandCounts, hands: HandCounts[], exposed: HandCounts[], zobrist: ZobristHash) {
+    this.visible = visible;
+    this.hands = hands;
+    this.exposed = exposed;
+    this.zobrist = zobrist;
+  }
+
+  /**
+   * Computes every count from scratch
+   */
+  static fromState(state: GameState): DerivedState {
+    const derived = new DerivedState(new HandCounts(), [], [], new ZobristHash());
+
+    for (let pid = 0; pid < 4; pid++) {
+      const playerId = pid as PlayerId;
+      const player = state.players[playerId];
+      derived.hands.push(new HandCounts());
+      derived.exposed.push(new HandCounts());
+      derived.addToHand(playerId, player?.hand ?? []);
+      for (const meld of player?.melds ?? []) {
+        derived.addExposed(playerId, meld.tiles);
+      }
+    }
+    for (const discard of state.discardPile) {
+      derived.addDiscard(discard.tile);
+    }
+    for (const id of state.wall.liveIds()) {
+      derived.zobrist.add(LOCATION_LIVE_WALL, id);
+    }
+    for (const id of state.wall.deadIds()) {
+      derived.zobrist.add(LOCATION_DEAD_WALL, id);
+    }
+
+    return derived;
+  }
+
+  /**
+   * Tiles a player holds in total, concealed and exposed
+   */
+  tileCount(player: PlayerId): number {
+    return this.hands[player].size + this.exposed[player].size;
+  }
+
+  addToHand(player: PlayerId, tiles: readonly Tile[]): void {
+    for (const tile of tiles) {
+      this.addIdToHand(player, tileId(tile));
+    }
+  }
+
+  addIdToHand(player: PlayerId, id: TileId): void {
+    this.hands[player].addId(id);
+    this.zobrist.add(handLocation(player), id);
+  }
+
+  /**
+   * Takes one tile out of a concealed hand. Returns false (and changes
+   * nothing) if it is not held.
+   */
+  takeIdFromHand(player: PlayerId, id: TileId): boolean {
+    if (!this.hands[player].removeId(id)) return false;
+    this.zobrist.remove(handLocation(player), id);
+    return true;
+  }
+
+  /**
+   * Takes tiles out of a concealed hand. Returns false (and changes nothing)
+   * unless every tile is held.
+   */
+  takeFromHand(player: PlayerId, tiles: readonly Tile[]): boolean {
+    if (!this.hands[player].removeAll(tiles)) return false;
+    for (const tile of tiles) {
+      this.zobrist.remove(handLocation(player), tileId(tile));
+    }
+    return true;
+  }
+
+  addExposed(player: PlayerId, tiles: readonly Tile[]): void {
+    for (const tile of tiles) {
+      const id = tileId(tile);
+      this.exposed[player].addId(id);
+      this.visible.addId(id);
+      this.zobrist.add(exposedLocation(player), id);
+    }
+  }
+
+  removeExposed(player: PlayerId, tile: Tile): void {
+    const id = tileId(tile);
+    this.exposed[player].removeId(id);
+    this.visible.removeId(id);
+    this.zobrist.remove(exposedLocation(player), id);
+  }
+
+  addDiscard(tile: Tile): void {
+    const id = tileId(tile);
+    this.visible.addId(id);
+    this.zobrist.add(LOCATION_DISCARDS, id);
+  }
+
+  removeDiscard(tile: Tile): void {
+    const id = tileId(tile);
+    this.visible.removeId(id);
+    this.zobrist.remove(LOCATION_DISCARDS, id);
+  }
+
+  /**
+   * Records a tile leaving the wall (the caller adds it to a hand)
+   */
+  takeFromWall(tile: Tile, dead: boolean = false): void {
+    this.zobrist.remove(dead ? LOCATION_DEAD_WALL : LOCATION_LIVE_WALL, tileId(tile));
+  }
+
+  clone(): DerivedState {
+    return new DerivedState(
+      this.visible.clone(),
+      this.hands.map(h => h.clone()),
+      this.exposed.map(e => e.clone()),
+      this.zobrist.clone()
+    );
+  }
+
+  /**
+   * Derived counts are rebuilt from the state itself, so they are left out of
+   * serialized states
+   */
+  toJSON(): undefined {
+    return undefined;
+  }
+}
+
+/**
+ * The state's derived counts, computing and attaching them if missing (e.g.
+ * for a state restored from JSON)
+ */
+export function getDerivedState(state: GameState): DerivedState {
+  if (!state.derived) {
+    state.derived = DerivedState.fromState(state);
+  }
+  return state.derived;
+}
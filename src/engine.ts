@@ -1,6 +1,6 @@
 // Create a new game (alias for startNewGame)
 export function createGame(clientSeed: string, serverSecret: string, dealer: PlayerId = 0, options?: Partial<GameState>): GameState {
-  const state = startNewGame(clientSeed, serverSecret, dealer);
+  const state = startNewGame(clientSeed, serverSecret, dealer, options?.rngVersion);
   if (options) {
     Object.assign(state, options);
   }
@@ -26,16 +26,31 @@ export function getGameState(state: GameState): GameState {
  * Main American Mahjong game engine
  */
 import { GameState, PlayerId, Tile, Move } from './types';
-import { DeterministicRNG } from './rng';
-import { setupGame } from './wall';
-import { create2024AmericanRuleCard } from './rulecard';
+import { RngVersion, LATEST_RNG_VERSION } from './rng';
+import { dealFromSeeds, GameDeal } from './wall';
+import { getShared2024RuleCard } from './rulecard';
+import { DerivedState } from './derived-state';
+import { reduceMove } from './move-reducer';
+import { checkWin } from './win-check';
 // Charleston logic is now in charleston-manager.ts
 import { validateMove, validateDeadHand } from './validation';
 
-export function startNewGame(clientSeed: string, serverSecret: string, dealer: PlayerId = 0): GameState {
-  const rng = new DeterministicRNG(clientSeed, serverSecret);
-  const ruleCard = create2024AmericanRuleCard();
-  const { hands, gameWalls, dice } = setupGame(rng, dealer);
+export function startNewGame(
+  clientSeed: string,
+  serverSecret: string,
+  dealer: PlayerId = 0,
+  rngVersion: RngVersion = LATEST_RNG_VERSION
+): GameState {
+  const deal = dealFromSeeds(clientSeed, serverSecret, dealer, rngVersion);
+  return createGameFromDeal(deal, dealer, rngVersion);
+}
+
+/**
+ * Builds the initial game state from a completed deal
+ */
+export function createGameFromDeal(deal: GameDeal, dealer: PlayerId, rngVersion: RngVersion): GameState {
+  const ruleCard = getShared2024RuleCard();
+  const { hands, dice } = deal;
 
   // Initialize player states
   const players: Record<PlayerId, any> = {
@@ -45,23 +60,25 @@ export function startNewGame(clientSeed: string, serverSecret: string, dealer: P
     3: { hand: hands[3], melds: [], isReady: false, isDead: false, score: 0 }
   };
 
-  return {
+  const state: GameState = {
     id: Math.random().toString(36).slice(2),
     phase: 'charleston',
     players,
     dealer,
     currentPlayer: dealer,
-    wall: gameWalls.walls.flatMap(w => w.tiles),
-    deadWall: [],
-    reservedTiles: gameWalls.walls[dealer].reserved,
+    wall: deal.wall,
+    reservedTiles: deal.reservedTiles,
     discardPile: [],
     charleston: undefined,
     options: {
       ruleCard
     },
     logs: [],
-    dice
+    dice,
+    rngVersion
   };
+  state.derived = DerivedState.fromState(state);
+  return state;
 }
 
 export function processMove(state: GameState, move: Move): GameState {
@@ -71,20 +88,8 @@ export function processMove(state: GameState, move: Move): GameState {
     throw new Error(result.error?.message || 'Invalid move');
   }
 
-  // Apply move (simplified)
-  // ...actual move application logic would go here...
-
-  // Log move
-  state.logs.push(move);
-  return state;
+  // Apply it; the move is appended to the logs by the reducer
+  return reduceMove(state, move);
 }
 
-export function checkWin(state: GameState, player: PlayerId): boolean {
-  // Validate hand against rulecard patterns
-  const playerState = state.players[player];
-  if (!playerState) return false;
-  const ruleCard = state.options?.ruleCard;
-  if (!ruleCard) return false;
-  // ...implement hand pattern matching logic...
-  return false;
-}
+export { checkWin };
@@ -0,0 +1,244 @@
+/**
+ * LRU cache of complete-hand evaluations
+ *
+ * Hint requests, claim checks and scoring keep asking which patterns the same
+ * hand completes. The cache answers repeats from a Map kept in recency order
+ * (a hit moves its entry to the back, eviction takes from the front), bounded
+ * by an estimate of its memory use.
+ *
+ * Keys are canonical over the card's suit symmetries: a hand and its
+ * suit-permuted twin share an entry. A card's symmetries are the suit
+ * permutations (moving each suit's dragon with it) that map every pattern's
+ * templates onto themselves. Not all six qualify: on the 2024 card the year
+ * hands fix white dragons as zeros, which ties dots to its place, leaving only
+ * the craks/bams swap.
+ */
+
+import { HandTemplate, CompiledPattern, CompiledRuleCard, HandVector, MATCH_CLASS_COUNT, matchCompiledPattern } from './hand-matcher';
+import { TILE_FLAGS, TILE_SUIT, TILE_RANK, FLAG_NUMBER, numberTileId, dragonIdForSuit } from './tile-codec';
+
+export interface EvalCacheOptions {
+  maxBytes?: number; // Memory cap for keys and results (default 4 MiB)
+}
+
+export interface EvalCacheMetrics {
+  hits: number;
+  misses: number;
+  hitRate: number;   // hits / lookups, 0 before any lookup
+  entries: number;
+  bytes: number;     // Estimated memory held
+  maxBytes: number;
+  evictions: number;
+}
+
+const DEFAULT_MAX_BYTES = 4 * 1024 * 1024;
+// Rough per-entry cost beyond the key characters and result slots: the Map
+// entry, the entry object and the result array header
+const ENTRY_OVERHEAD = 96;
+
+const SUIT_PERMUTATIONS = [[0, 1, 2], [0, 2, 1], [1, 0, 2], [1, 2, 0], [2, 0, 1], [2, 1, 0]];
+
+/**
+ * Class each class moves to under a permutation of the three suits
+ */
+function permutationMap(suits: number[]): Uint8Array {
+  const map = new Uint8Array(MATCH_CLASS_COUNT);
+  for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+    map[cls] = cls;
+    if (TILE_FLAGS[cls] & FLAG_NUMBER) {
+      map[cls] = numberTileId(suits[TILE_SUIT[cls]], TILE_RANK[cls]);
+    }
+  }
+  for (let suit = 0; suit < 3; suit++) {
+    map[dragonIdForSuit(suit)] = dragonIdForSuit(suits[suit]);
+  }
+  return map;
+}
+
+function templateKey(template: HandTemplate, map: Uint8Array): string {
+  const natural = new Uint8Array(MATCH_CLASS_COUNT);
+  const grouped = new Uint8Array(MATCH_CLASS_COUNT);
+  for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+    natural[map[cls]] += template.natural[cls];
+    grouped[map[cls]] += template.grouped[cls];
+  }
+  return `${natural.join(',')}|${grouped.join(',')}`;
+}
+
+function preservesCard(compiled: CompiledRuleCard, map: Uint8Array): boolean {
+  const identity = permutationMap([0, 1, 2]);
+  return compiled.patterns.every(pattern => {
+    const own = new Set(pattern.templates.map(t => templateKey(t, identity)));
+    return pattern.templates.every(t => own.has(templateKey(t, map)));
+  });
+}
+
+const symmetryCache = new WeakMap<CompiledRuleCard, Uint8Array[]>();
+
+/**
+ * Suit permutations (as class maps, identity first) that leave the card's
+ * answers unchanged
+ */
+export function cardSymmetries(compiled: CompiledRuleCard): Uint8Array[] {
+  let symmetries = symmetryCache.get(compiled);
+  if (!symmetries) {
+    symmetries = SUIT_PERMUTATIONS.map(permutationMap).filter(map => preservesCard(compiled, map));
+    symmetryCache.set(compiled, symmetries);
+  }
+  return symmetries;
+}
+
+// Scratch for building keys (lookups are synchronous)
+const baseCodes: number[] = [];
+const mappedCodes: number[] = [];
+const byNumber = (a: number, b: number) => a - b;
+
+/**
+ * Codes for a hand's key: one per non-empty class, (class << 4) | count,
+ * concealed then exposed (offset by MATCH_CLASS_COUNT), then the melds as
+ * 0x8000 | signature. Classes are in order; melds are not.
+ */
+function collectCodes(vector: HandVector, codes: number[]): void {
+  codes.length = 0;
+  for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+    if (vector.counts[cls] > 0) codes.push((cls << 4) | vector.counts[cls]);
+  }
+  for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+    if (vector.exposed[cls] > 0) codes.push(((MATCH_CLASS_COUNT + cls) << 4) | vector.exposed[cls]);
+  }
+  for (const meld of vector.melds) codes.push(0x8000 | meld);
+}
+
+/**
+ * Codes with their classes moved by a symmetry, back in order
+ */
+function mapCodes(codes: readonly number[], map: Uint8Array, out: number[]): void {
+  out.length = 0;
+  for (const code of codes) {
+    if (code & 0x8000) {
+      out.push(0x8000 | (map[(code & 0x7fff) >> 3] << 3) | (code & 7));
+    } else {
+      const cls = code >> 4;
+      const to = cls < MATCH_CLASS_COUNT ? map[cls] : MATCH_CLASS_COUNT + map[cls - MATCH_CLASS_COUNT];
+      out.push((to << 4) | (code & 15));
+    }
+  }
+  out.sort(byNumber);
+}
+
+/**
+ * Canonical key of a hand: the smallest of its keys under the card's
+ * symmetries, plus its joker counts
+ */
+export function canonicalHandKey(compiled: CompiledRuleCard, vector: HandVector): string {
+  const symmetries = cardSymmetries(compiled);
+  collectCodes(vector, baseCodes);
+  if (vector.melds.length > 1) baseCodes.sort(byNumber);
+  let best = String.fromCharCode.apply(null, baseCodes);
+  for (let i = 1; i < symmetries.length; i++) {
+    mapCodes(baseCodes, symmetries[i], mappedCodes);
+    const key = String.fromCharCode.apply(null, mappedCodes);
+    if (key < best) best = key;
+  }
+  return best + String.fromCharCode(0xffff, vector.jokers, vector.meldJokers);
+}
+
+type CacheEntry = {
+  patterns: readonly CompiledPattern[];
+  bytes: number;
+};
+
+export class EvalCache {
+  private readonly maxBytes: number;
+  private readonly entries = new Map<string, CacheEntry>();
+  // Cards get small ids so keys need not hold the card
+  private readonly cardIds = new WeakMap<CompiledRuleCard, number>();
+  private nextCardId = 0;
+  private bytes = 0;
+  private hits = 0;
+  private misses = 0;
+  private evictions = 0;
+
+  constructor(options: EvalCacheOptions = {}) {
+    this.maxBytes = options.maxBytes ?? DEFAULT_MAX_BYTES;
+    if (this.maxBytes <= 0) throw new Error('maxBytes must be positive');
+  }
+
+  /**
+   * Patterns of the card the hand completes, in card order
+   */
+  matchPatterns(compiled: CompiledRuleCard, vector: HandVector): readonly CompiledPattern[] {
+    let cardId = this.cardIds.get(compiled);
+    if (cardId === undefined) {
+      cardId = this.nextCardId++;
+      this.cardIds.set(compiled, cardId);
+    }
+    const key = `${cardId}:${canonicalHandKey(compiled, vector)}`;
+
+    const cached = this.entries.get(key);
+    if (cached) {
+      this.hits++;
+      this.entries.delete(key);
+      this.entries.set(key, cached);
+      return cached.patterns;
+    }
+
+    this.misses++;
+    const patterns = Object.freeze(
+      compiled.index.candidates(vector).filter(pattern => matchCompiledPattern(pattern, vector) !== null)
+    );
+    const entry = { patterns, bytes: ENTRY_OVERHEAD + key.length * 2 + patterns.length * 8 };
+    this.entries.set(key, entry);
+    this.bytes += entry.bytes;
+    this.evict();
+    return patterns;
+  }
+
+  metrics(): EvalCacheMetrics {
+    const lookups = this.hits + this.misses;
+    return {
+      hits: this.hits,
+      misses: this.misses,
+      hitRate: lookups === 0 ? 0 : this.hits / lookups,
+      entries: this.entries.size,
+      bytes: this.bytes,
+      maxBytes: this.maxBytes,
+      evictions: this.evictions
+    };
+  }
+
+  clear(): void {
+    this.entries.clear();
+    this.bytes = 0;
+    this.hits = 0;
+    this.misses = 0;
+    this.evictions = 0;
+  }
+
+  private evict(): void {
+    for (const [key, entry] of this.entries) {
+      if (this.bytes <= this.maxBytes) return;
+      this.entries.delete(key);
+      this.bytes -= entry.bytes;
+      this.evictions++;
+    }
+  }
+}
+
+let sharedCache: EvalCache | undefined;
+
+/**
+ * The process-wide cache used by scoring and win checks
+ */
+export function getEvalCache(): EvalCache {
+  if (!sharedCache) sharedCache = new EvalCache();
+  return sharedCache;
+}
+
+/**
+ * Replaces the process-wide cache, e.g. to change its memory cap
+ */
+export function configureEvalCache(options: EvalCacheOptions): EvalCache {
+  sharedCache = new EvalCache(options);
+  return sharedCache;
+}
@@ -0,0 +1,339 @@
+/**
+ * Event-sourced game log
+ *
+ * Moves are stored compactly (a few bytes each, tiles as IDs) in one growing
+ * byte buffer, and a snapshot of the state is kept every snapshotInterval
+ * moves. The state at any move index is materialized from the nearest
+ * snapshot at or before it plus at most snapshotInterval - 1 replayed moves,
+ * so resuming or auditing never replays the game from the start.
+ *
+ * State changes that are not Moves (the Charleston passes run by
+ * charleston-manager) are recorded with checkpoint(), which adds a snapshot
+ * at the current index after the ones already there, so the deal and every
+ * Charleston pass stay in the log.
+ */
+
+import { GameState, Move, Meld, PlayerId, Tile } from './types';
+import { encodeTile, decodeTile, INVALID_TILE_ID } from './tile-codec';
+import { snapshotGameState, redactGameState, redactMove } from './game-state';
+import { reduceMove } from './move-reducer';
+
+export const DEFAULT_SNAPSHOT_INTERVAL = 32;
+
+const MOVE_TYPES: Move['type'][] = [
+  'draw', 'discard', 'charlestonPass', 'pass', 'claim',
+  'claimRequest', 'declareMahjong', 'stopCharleston', 'replaceJoker', 'kong'
+];
+const MELD_TYPES: Meld['type'][] = ['pong', 'kong', 'chow', 'pair', 'quint', 'exposed-kong'];
+const CLAIM_TYPES = ['pong', 'chow', 'kong'] as const;
+const WALL = 4;     // Meld source byte for 'wall'
+const NO_OWNER = 255;
+
+function tileByte(tile: Tile): number {
+  const id = encodeTile(tile);
+  if (id === INVALID_TILE_ID) {
+    throw new Error(`Unknown tile: ${tile}`);
+  }
+  return id;
+}
+
+function pushTiles(out: number[], tiles: readonly Tile[]): void {
+  out.push(tiles.length);
+  for (const tile of tiles) out.push(tileByte(tile));
+}
+
+/**
+ * Appends the compact encoding of a move: a type byte, the player, then the
+ * move's fields with tiles as IDs and lists prefixed by their length
+ */
+export function encodeMove(move: Move, out: number[] = []): number[] {
+  out.push(MOVE_TYPES.indexOf(move.type), move.player);
+  switch (move.type) {
+    case 'discard':
+      out.push(tileByte(move.tile));
+      break;
+    case 'charlestonPass':
+      out.push(move.to);
+      pushTiles(out, move.tiles);
+      break;
+    case 'claim':
+      out.push(
+        MELD_TYPES.indexOf(move.meld.type),
+        move.meld.from === 'wall' ? WALL : move.meld.from,
+        (move.meld.exposed ? 1 : 0) | (move.meld.canExchangeJokers ? 2 : 0)
+      );
+      pushTiles(out, move.meld.tiles);
+      break;
+    case 'claimRequest':
+      out.push(CLAIM_TYPES.indexOf(move.claimType));
+      break;
+    case 'replaceJoker':
+      out.push(move.meldIndex, tileByte(move.tile), move.owner ?? NO_OWNER);
+      break;
+    case 'kong':
+      pushTiles(out, move.tiles);
+      break;
+  }
+  return out;
+}
+
+/**
+ * Decodes one move. Returns the move and the offset just past it.
+ */
+export function decodeMove(bytes: Uint8Array, offset: number): { move: Move; next: number } {
+  let at = offset;
+  const type = MOVE_TYPES[bytes[at++]];
+  const player = bytes[at++] as PlayerId;
+  const readTiles = (): Tile[] => {
+    const tiles: Tile[] = [];
+    for (let n = bytes[at++]; n > 0; n--) tiles.push(decodeTile(bytes[at++]));
+    return tiles;
+  };
+
+  let move: Move;
+  switch (type) {
+    case 'discard':
+      move = { type, player, tile: decodeTile(bytes[at++]) };
+      break;
+    case 'charlestonPass': {
+      const to = bytes[at++] as PlayerId;
+      move = { type, player, to, tiles: readTiles() };
+      break;
+    }
+    case 'claim': {
+      const meldType = MELD_TYPES[bytes[at++]];
+      const from = bytes[at++];
+      const flags = bytes[at++];
+      move = {
+        type,
+        player,
+        meld: {
+          type: meldType,
+          from: from === WALL ? 'wall' : from as PlayerId,
+          exposed: (flags & 1) !== 0,
+          canExchangeJokers: (flags & 2) !== 0,
+          tiles: readTiles()
+        }
+      };
+      break;
+    }
+    case 'claimRequest':
+      move = { type, player, claimType: CLAIM_TYPES[bytes[at++]] };
+      break;
+    case 'replaceJoker': {
+      const meldIndex = bytes[at++];
+      const tile = decodeTile(bytes[at++]);
+      const owner = bytes[at++];
+      move = owner === NO_OWNER
+        ? { type, player, meldIndex, tile }
+        : { type, player, meldIndex, tile, owner: owner as PlayerId };
+      break;
+    }
+    case 'kong':
+      move = { type, player, tiles: readTiles() };
+      break;
+    case 'draw':
+    case 'pass':
+    case 'declareMahjong':
+    case 'stopCharleston':
+      move = { type, player };
+      break;
+    default:
+      throw new Error(`Unknown move type byte ${bytes[offset]}`);
+  }
+  return { move, next: at };
+}
+
+interface StateSnapshot {
+  index: number;      // Moves applied before this state
+  state: GameState;
+  checkpoint: boolean; // Recorded by checkpoint() rather than reached by moves
+}
+
+export interface ReplaySlice {
+  state: GameState;   // State after `from` moves, before any checkpoint there
+  checkpoints: { index: number; state: GameState }[]; // Applied before the move at their index
+  logs: Move[];
+}
+
+export interface EventStoreOptions {
+  snapshotInterval?: number; // Moves between snapshots (default 32)
+}
+
+export class GameEventStore {
+  private bytes = new Uint8Array(256);
+  private byteLength = 0;
+  private offsets = new Uint32Array(64);
+  private count = 0;
+  private readonly snapshots: StateSnapshot[] = [];
+  private readonly snapshotInterval: number;
+  private lastPhase: GameState['phase'];
+
+  constructor(initial: GameState, options: EventStoreOptions = {}) {
+    this.snapshotInterval = Math.max(1, options.snapshotInterval ?? DEFAULT_SNAPSHOT_INTERVAL);
+    this.snapshots.push({ index: 0, state: snapshotGameState(initial), checkpoint: false });
+    this.lastPhase = initial.phase;
+  }
+
+  /** Number of moves recorded */
+  get length(): number {
+    return this.count;
+  }
+
+  /** Bytes used by the encoded moves */
+  get encodedSize(): number {
+    return this.byteLength;
+  }
+
+  get snapshotCount(): number {
+    return this.snapshots.length;
+  }
+
+  /** Phase of the last recorded state */
+  get phase(): GameState['phase'] {
+    return this.lastPhase;
+  }
+
+  /**
+   * Records a move and the state it produced
+   */
+  append(move: Move, stateAfter: GameState): void {
+    const encoded = encodeMove(move);
+    this.reserve(encoded.length);
+    if (this.count === this.offsets.length) {
+      const grown = new Uint32Array(this.offsets.length * 2);
+      grown.set(this.offsets);
+      this.offsets = grown;
+    }
+    this.offsets[this.count++] = this.byteLength;
+    this.bytes.set(encoded, this.byteLength);
+    this.byteLength += encoded.length;
+    this.lastPhase = stateAfter.phase;
+
+    if (this.count % this.snapshotInterval === 0) {
+      this.snapshots.push({ index: this.count, state: snapshotGameState(stateAfter), checkpoint: false });
+    }
+  }
+
+  /**
+   * Snapshots a state reached without a Move at the current index. Later
+   * materializations at this index start from it; the states recorded at
+   * this index before it are kept (see materialize and checkpoints).
+   */
+  checkpoint(state: GameState): void {
+    this.snapshots.push({ index: this.count, state: snapshotGameState(state), checkpoint: true });
+    this.lastPhase = state.phase;
+  }
+
+  moveAt(index: number): Move {
+    if (index < 0 || index >= this.count) {
+      throw new RangeError(`Move ${index} out of range (0..${this.count - 1})`);
+    }
+    return decodeMove(this.bytes, this.offsets[index]).move;
+  }
+
+  /**
+   * Moves in [from, to)
+   */
+  moves(from: number = 0, to: number = this.count): Move[] {
+    const start = Math.max(0, from);
+    const end = Math.min(to, this.count);
+    const result: Move[] = [];
+    let offset = this.offsets[start];
+    for (let i = start; i < end; i++) {
+      const decoded = decodeMove(this.bytes, offset);
+      result.push(decoded.move);
+      offset = decoded.next;
+    }
+    return result;
+  }
+
+  /**
+   * The state after `index` moves, built from the nearest earlier snapshot.
+   * It includes the checkpoints at `index` unless beforeCheckpoints is set,
+   * which gives the state the moves alone reached (at 0, the deal). The
+   * result is a fresh copy the caller may keep or advance.
+   */
+  materialize(index: number = this.count, beforeCheckpoints: boolean = false): GameState {
+    if (index < 0 || index > this.count) {
+      throw new RangeError(`Index ${index} out of range (0..${this.count})`);
+    }
+    const snapshot = this.nearestSnapshot(index, beforeCheckpoints);
+    let state = snapshotGameState(snapshot.state);
+    for (const move of this.moves(snapshot.index, index)) {
+      state = reduceMove(state, move);
+    }
+    return state;
+  }
+
+  /**
+   * States recorded by checkpoint() at indexes from..to, in the order they
+   * were recorded. Each is a fresh copy.
+   */
+  checkpoints(from: number = 0, to: number = this.count): { index: number; state: GameState }[] {
+    const result: { index: number; state: GameState }[] = [];
+    for (const snapshot of this.snapshots) {
+      if (snapshot.index > to) break;
+      if (snapshot.checkpoint && snapshot.index >= from) {
+        result.push({ index: snapshot.index, state: snapshotGameState(snapshot.state) });
+      }
+    }
+    return result;
+  }
+
+  /**
+   * What a replay of the moves in [from, to) may show `seat`: everything
+   * once the game is complete, otherwise only what that seat saw at the
+   * table (see redactGameState; without a seat no concealed tile is shown)
+   */
+  replay(from: number, to: number, seat?: PlayerId): ReplaySlice {
+    const slice: ReplaySlice = {
+      state: this.materialize(from, true),
+      checkpoints: this.checkpoints(from, to),
+      logs: this.moves(from, to)
+    };
+    if (this.lastPhase === 'complete') return slice;
+    return {
+      state: redactGameState(slice.state, seat),
+      checkpoints: slice.checkpoints.map(c => ({ index: c.index, state: redactGameState(c.state, seat) })),
+      logs: slice.logs.map(move => redactMove(move, seat))
+    };
+  }
+
+  private nearestSnapshot(index: number, beforeCheckpoints: boolean): StateSnapshot {
+    // Snapshots are in index order; binary search for the last at or before index
+    let lo = 0;
+    let hi = this.snapshots.length - 1;
+    while (lo < hi) {
+      const mid = (lo + hi + 1) >> 1;
+      if (this.snapshots[mid].index <= index) lo = mid;
+      else hi = mid - 1;
+    }
+    // The first snapshot is never a checkpoint, so this stops by then
+    while (beforeCheckpoints && this.snapshots[lo].checkpoint && this.snapshots[lo].index === index) lo--;
+    return this.snapshots[lo];
+  }
+
+  private reserve(extra: number): void {
+    if (this.byteLength + extra <= this.bytes.length) return;
+    const grown = new Uint8Array(Math.max(this.bytes.length * 2, this.byteLength + extra));
+    grown.set(this.bytes.subarray(0, this.byteLength));
+    this.bytes = grown;
+  }
+}
+
+// Stores of the games running in this process, keyed by table ID, so the
+// WebSocket and REST servers serve replays from the same log
+const eventStores = new Map<string, GameEventStore>();
+
+export function registerEventStore(gameId: string, store: GameEventStore): void {
+  eventStores.set(gameId, store);
+}
+
+export function getEventStore(gameId: string): GameEventStore | undefined {
+  return eventStores.get(gameId);
+}
+
+export function removeEventStore(gameId: string): void {
+  eventStores.delete(gameId);
+}
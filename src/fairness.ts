@@ -13,6 +13,9 @@
 
 import * as crypto from 'crypto';
 import { GameState, Tile, Meld, PlayerId, PlayerState } from './types';
+import { snapshotGameState } from './game-state';
+import { getDerivedState } from './derived-state';
+import { ZOBRIST_KEYS, TURN_KEY_OFFSET, PHASE_KEY_OFFSET, formatHash } from './zobrist';
 
 // ============================================================================
 // CRYPTOGRAPHIC FAIRNESS SYSTEM
@@ -66,8 +69,8 @@ export interface AuditLogEntry {
   playerId?: string;             // Player who performed action (if applicable)
   action: string;                // Action type (e.g., 'tile_drawn', 'meld_claimed')
   data: any;                     // Action-specific data
-  stateHashBefore: string;       // Game state hash before action
-  stateHashAfter: string;        // Game state hash after action
+  stateHashBefore: string;       // Position hash (hashPosition) before action
+  stateHashAfter: string;        // Position hash (hashPosition) after action
   signature: string;             // Cryptographic signature of this entry
   previousEntryHash?: string;    // Hash of previous entry (for chain integrity)
 }
@@ -256,8 +259,8 @@ export function hashGameState(state: GameState): string {
     phase: state.phase,
     dealer: state.dealer,
     currentPlayer: state.currentPlayer,
-    wall: state.wall.slice().sort(), // Tiles are already strings
-    deadWall: state.deadWall.slice().sort(),
+    wall: state.wall.liveTiles().sort(), // Tiles are already strings
+    deadWall: state.wall.deadTiles().sort(),
     players: Object.entries(state.players).map(([playerId, player]) => ({
       id: playerId,
       hand: player.hand.slice().sort(), // Tiles are already strings
@@ -281,6 +284,24 @@ export function hashGameState(state: GameState): string {
     .digest('hex');
 }
 
+const HASHED_PHASES: GameState['phase'][] = ['init', 'charleston', 'play', 'complete'];
+
+/**
+ * Incremental position hash: the Zobrist hash of every tile's location (kept
+ * up to date by the move reducer) combined with the player to move and the
+ * phase. Constant time once the state has derived counts; checkpoints pair it
+ * with the full hashGameState digest.
+ */
+export function hashPosition(state: GameState): string {
+  const zobrist = getDerivedState(state).zobrist;
+  const turnKey = (TURN_KEY_OFFSET + state.currentPlayer) * 2;
+  const phaseKey = (PHASE_KEY_OFFSET + HASHED_PHASES.indexOf(state.phase)) * 2;
+  return formatHash(
+    zobrist.high ^ ZOBRIST_KEYS[turnKey] ^ ZOBRIST_KEYS[phaseKey],
+    zobrist.low ^ ZOBRIST_KEYS[turnKey + 1] ^ ZOBRIST_KEYS[phaseKey + 1]
+  );
+}
+
 /**
  * Create a snapshot of the current game state with integrity hash
  */
@@ -300,7 +321,7 @@ export function createGameStateSnapshot(
     gameId,
     turn,
     timestamp,
-    state: JSON.parse(JSON.stringify(state)), // Deep copy
+    state: snapshotGameState(state), // Independent copy; the rule card is shared
     hash: stateHash,
     auditLogHash
   };
@@ -371,13 +392,22 @@ export function verifyTileShuffle(
 // FAIRNESS VERIFICATION MANAGER
 // ============================================================================
 
+export const DEFAULT_CHECKPOINT_INTERVAL = 32;
+
+export interface FairnessOptions {
+  checkpointInterval?: number; // Game actions between full state digests (default 32)
+}
+
 export class FairnessManager {
   private fairnessData: GameFairnessData;
   private auditLogger: AuditLogger;
   private stateSnapshots: GameStateSnapshot[] = [];
+  private readonly checkpointInterval: number;
+  private actionCount = 0;
   
-  constructor(gameId: string, clientSeeds?: Record<string, string>) {
+  constructor(gameId: string, clientSeeds?: Record<string, string>, options: FairnessOptions = {}) {
     this.auditLogger = new AuditLogger(gameId);
+    this.checkpointInterval = Math.max(1, options.checkpointInterval ?? DEFAULT_CHECKPOINT_INTERVAL);
     
     this.fairnessData = {
       gameId,
@@ -434,7 +464,9 @@ export class FairnessManager {
   }
   
   /**
-   * Log a game action with audit trail
+   * Log a game action with audit trail. Entries carry the O(1) position hash;
+   * every checkpointInterval actions a 'state_checkpoint' entry also records
+   * the full cryptographic digest of the resulting state.
    */
   logGameAction(
     action: string,
@@ -443,10 +475,19 @@ export class FairnessManager {
     stateBefore?: GameState,
     stateAfter?: GameState
   ): void {
-    const stateHashBefore = stateBefore ? hashGameState(stateBefore) : '';
-    const stateHashAfter = stateAfter ? hashGameState(stateAfter) : '';
+    const stateHashBefore = stateBefore ? hashPosition(stateBefore) : '';
+    const stateHashAfter = stateAfter ? hashPosition(stateAfter) : '';
     
     this.auditLogger.logAction(action, data, playerId, stateHashBefore, stateHashAfter);
+
+    this.actionCount++;
+    if (stateAfter && this.actionCount % this.checkpointInterval === 0) {
+      this.auditLogger.logAction('state_checkpoint', {
+        actionCount: this.actionCount,
+        positionHash: stateHashAfter,
+        stateHash: hashGameState(stateAfter)
+      });
+    }
   }
   
   /**
@@ -0,0 +1,137 @@
+/**
+ * Pre-dealt game setup pool
+ *
+ * Keeps a reserve of per-table server secrets with their commitments ready
+ * before tables are created, and runs the shuffle/wall/deal for a filled table
+ * on worker threads so the event loop is not blocked while other tables wait.
+ */
+
+import { performance } from 'perf_hooks';
+import { GameState, PlayerId } from './types';
+import { RngVersion, LATEST_RNG_VERSION } from './rng';
+import { generateServerSeed, commitServerSeed } from './fairness';
+import { createGameFromDeal } from './engine';
+import { deserializeDeal } from './wall';
+import { WorkerPool, WorkerPoolMetrics } from './worker-pool';
+import { LatencyRecorder, LatencyStats } from './metrics';
+
+export interface SetupPoolConfig {
+  enabled: boolean;
+  workers: number;      // Worker threads used for dealing
+  seedReserve: number;  // Server secrets + commitments kept ready
+}
+
+export interface TableSeeds {
+  serverSecret: string;
+  clientSeed: string;
+  serverCommit: string;
+}
+
+export interface SetupPoolMetrics {
+  queueDepth: number;       // Setups waiting for a worker
+  inFlight: number;         // Setups submitted but not yet returned
+  seedsReady: number;       // Pre-generated secrets available
+  setupLatency: LatencyStats;
+  pool: WorkerPoolMetrics;
+}
+
+/**
+ * Reads the pool configuration from the environment:
+ *   SETUP_POOL_WORKERS  - worker threads (0 or unset disables the pool)
+ *   SETUP_POOL_SEEDS    - number of pre-generated server secrets (default 32)
+ */
+export function loadSetupPoolConfig(env: NodeJS.ProcessEnv = process.env): SetupPoolConfig {
+  const workers = parseInt(env.SETUP_POOL_WORKERS || '0', 10);
+  const seedReserve = parseInt(env.SETUP_POOL_SEEDS || '32', 10);
+  return {
+    enabled: workers > 0,
+    workers: Number.isFinite(workers) && workers > 0 ? workers : 0,
+    seedReserve: Number.isFinite(seedReserve) && seedReserve >= 0 ? seedReserve : 32
+  };
+}
+
+/**
+ * Generates a fresh server secret and its public commitment
+ */
+export function generateCommittedSeed(): { serverSecret: string; serverCommit: string } {
+  const serverSecret = generateServerSeed();
+  return { serverSecret, serverCommit: commitServerSeed(serverSecret) };
+}
+
+export class GameSetupPool {
+  private pool: WorkerPool;
+  private seeds: Array<{ serverSecret: string; serverCommit: string }> = [];
+  private refillScheduled = false;
+  private inFlight = 0;
+  private latency = new LatencyRecorder();
+  private readonly seedReserve: number;
+
+  constructor(config: Pick<SetupPoolConfig, 'workers' | 'seedReserve'>) {
+    this.seedReserve = config.seedReserve;
+    this.pool = new WorkerPool({ size: config.workers });
+    this.scheduleRefill();
+  }
+
+  /**
+   * Takes pre-generated seeds for a new table. The secret is generated on the
+   * spot if the reserve has run dry.
+   */
+  takeSeeds(clientSeed: string): TableSeeds {
+    const seed = this.seeds.shift() || generateCommittedSeed();
+    this.scheduleRefill();
+    return { ...seed, clientSeed };
+  }
+
+  /**
+   * Deals a game for the table's committed seeds on a worker thread and
+   * returns the ready state
+   */
+  async createGame(
+    seeds: TableSeeds,
+    dealer: PlayerId,
+    rngVersion: RngVersion = LATEST_RNG_VERSION
+  ): Promise<GameState> {
+    const start = performance.now();
+    this.inFlight++;
+    try {
+      const deal = await this.pool.run('deal', {
+        clientSeed: seeds.clientSeed,
+        serverSecret: seeds.serverSecret,
+        dealer,
+        rngVersion
+      });
+      return createGameFromDeal(deserializeDeal(deal), dealer, rngVersion);
+    } finally {
+      this.inFlight--;
+      this.latency.record(performance.now() - start);
+    }
+  }
+
+  getMetrics(): SetupPoolMetrics {
+    const pool = this.pool.getMetrics();
+    return {
+      queueDepth: pool.queueDepth,
+      inFlight: this.inFlight,
+      seedsReady: this.seeds.length,
+      setupLatency: this.latency.stats(),
+      pool
+    };
+  }
+
+  async close(): Promise<void> {
+    await this.pool.close();
+  }
+
+  private scheduleRefill(): void {
+    if (this.refillScheduled || this.seeds.length >= this.seedReserve) return;
+    this.refillScheduled = true;
+    // Top up off the request path, a few secrets per tick
+    setImmediate(() => {
+      this.refillScheduled = false;
+      for (let i = 0; i < 8 && this.seeds.length < this.seedReserve; i++) {
+        this.seeds.push(generateCommittedSeed());
+      }
+      this.scheduleRefill();
+    }).unref();
+  }
+}
@@ -0,0 +1,203 @@
+/**
+ * Structurally shared GameState transitions
+ *
+ * A transition starts from a StateDraft, which shallow-copies the state and
+ * then copies individual sub-objects (a player, the Charleston state, the
+ * wall cursors) only the first time they are written. Everything the
+ * transition does not touch - other players, the discard pile, logs and the
+ * rule card - is shared with the previous state. The discard pile and logs are
+ * appended to in place so that a move costs the same at any point in a game.
+ *
+ * The previous state must be treated as superseded once a transition returns.
+ * Code that needs to keep an older state around (audit snapshots) takes an
+ * independent copy with snapshotGameState.
+ */
+
+import { GameState, PlayerId, PlayerState, Meld, Move, Tile } from './types';
+import { CharlestonState, CharlestonPlayerState } from './charleston';
+import { TileWall } from './tile-wall';
+import { INVALID_TILE_ID } from './tile-codec';
+import { DerivedState } from './derived-state';
+import { removeTiles } from './hand-counts';
+
+export class StateDraft {
+  readonly state: GameState;
+  private readonly copiedPlayers = new Set<PlayerId>();
+  private charlestonCopied = false;
+  private wallCopied = false;
+  private derivedCopied = false;
+
+  constructor(base: GameState) {
+    this.state = { ...base, players: { ...base.players } };
+  }
+
+  /**
+   * Writable copy of one player (hand and melds arrays are fresh; melds
+   * themselves are shared until replaced)
+   */
+  player(id: PlayerId): PlayerState {
+    if (!this.copiedPlayers.has(id)) {
+      const player = this.state.players[id];
+      this.state.players[id] = { ...player, hand: player.hand.slice(), melds: player.melds.slice() };
+      this.copiedPlayers.add(id);
+    }
+    return this.state.players[id];
+  }
+
+  /**
+   * Writable copy of the Charleston state and its per-player entries
+   */
+  charleston(): CharlestonState {
+    if (!this.state.charleston) {
+      throw new Error('Charleston is not active');
+    }
+    if (!this.charlestonCopied) {
+      this.state.charleston = copyCharleston(this.state.charleston);
+      this.charlestonCopied = true;
+    }
+    return this.state.charleston;
+  }
+
+  /**
+   * Writable wall (the cursors are copied; tile slots are always shared)
+   */
+  wall(): TileWall {
+    if (!this.wallCopied) {
+      this.state.wall = this.state.wall.clone();
+      this.wallCopied = true;
+    }
+    return this.state.wall;
+  }
+
+  /**
+   * Writable derived counts, computed from the state if it has none yet
+   */
+  derived(): DerivedState {
+    if (!this.derivedCopied) {
+      this.state.derived = this.state.derived ? this.state.derived.clone() : DerivedState.fromState(this.state);
+      this.derivedCopied = true;
+    }
+    return this.state.derived!;
+  }
+
+  /**
+   * Takes tiles out of a player's concealed hand, keeping the derived counts
+   * in step. Returns false (and changes nothing) unless every tile is held.
+   */
+  takeFromHand(id: PlayerId, tiles: readonly Tile[]): boolean {
+    if (!this.derived().takeFromHand(id, tiles)) return false;
+    removeTiles(this.player(id).hand, tiles);
+    return true;
+  }
+
+  /**
+   * Adds tiles to a player's concealed hand, keeping the derived counts in step
+   */
+  addToHand(id: PlayerId, tiles: readonly Tile[]): void {
+    this.derived().addToHand(id, tiles);
+    this.player(id).hand.push(...tiles);
+  }
+}
+
+function copyCharleston(charleston: CharlestonState): CharlestonState {
+  const playerStates = {} as Record<PlayerId, CharlestonPlayerState>;
+  for (let pid = 0; pid < 4; pid++) {
+    const playerId = pid as PlayerId;
+    playerStates[playerId] = { ...charleston.playerStates[playerId] };
+  }
+  return { ...charleston, playerStates };
+}
+
+function copyMeld(meld: Meld): Meld {
+  return { ...meld, tiles: meld.tiles.slice() };
+}
+
+/**
+ * Independent copy of a state for keeping history. Tiles are strings and the
+ * rule card is immutable, so both are shared; every container a later
+ * transition or handler could write to is copied.
+ */
+export function snapshotGameState(state: GameState): GameState {
+  const players = {} as Record<PlayerId, PlayerState>;
+  for (let pid = 0; pid < 4; pid++) {
+    const playerId = pid as PlayerId;
+    const player = state.players[playerId];
+    if (!player) continue;
+    players[playerId] = { ...player, hand: player.hand.slice(), melds: player.melds.map(copyMeld) };
+  }
+
+  return {
+    ...state,
+    players,
+    wall: state.wall.clone(),
+    reservedTiles: state.reservedTiles.slice(),
+    discardPile: state.discardPile.slice(),
+    lastAction: state.lastAction && { ...state.lastAction },
+    charleston: state.charleston && copyCharleston(state.charleston),
+    logs: state.logs.slice(),
+    derived: state.derived?.clone()
+  };
+}
+
+/**
+ * A move as `seat` saw it: Charleston passes between two other seats lose
+ * their tiles. Every other move is public.
+ */
+export function redactMove(move: Move, seat?: PlayerId): Move {
+  if (move.type !== 'charlestonPass' || move.player === seat || move.to === seat) return move;
+  return { ...move, tiles: [] };
+}
+
+function redactCharleston(charleston: CharlestonState, seat?: PlayerId): CharlestonState {
+  const playerStates = {} as Record<PlayerId, CharlestonPlayerState>;
+  for (let pid = 0; pid < 4; pid++) {
+    const playerId = pid as PlayerId;
+    const entry = charleston.playerStates[playerId];
+    playerStates[playerId] = playerId === seat
+      ? { ...entry }
+      : { ...entry, selectedTiles: [], courtesyOffer: entry.courtesyOffer && { ...entry.courtesyOffer, tiles: [] } };
+  }
+  let incomingTiles: CharlestonState['incomingTiles'];
+  if (charleston.incomingTiles) {
+    incomingTiles = {} as Record<PlayerId, Tile[]>;
+    for (let pid = 0; pid < 4; pid++) {
+      const playerId = pid as PlayerId;
+      incomingTiles[playerId] = playerId === seat ? (charleston.incomingTiles[playerId] ?? []).slice() : [];
+    }
+  }
+  return { ...charleston, playerStates, incomingTiles };
+}
+
+/**
+ * Copy of a state showing only what `seat` can see at the table (no seat
+ * sees no concealed tiles). Other seats' concealed hands and Charleston
+ * selections are emptied, the wall keeps its counts but not its tiles, and
+ * the derived counts, which would give the hidden tiles away, are dropped.
+ */
+export function redactGameState(state: GameState, seat?: PlayerId): GameState {
+  const players = {} as Record<PlayerId, PlayerState>;
+  for (let pid = 0; pid < 4; pid++) {
+    const playerId = pid as PlayerId;
+    const player = state.players[playerId];
+    if (!player) continue;
+    players[playerId] = {
+      ...player,
+      hand: playerId === seat ? player.hand.slice() : [],
+      melds: player.melds.map(copyMeld)
+    };
+  }
+
+  const { wall } = state;
+  const hidden = new Uint8Array(wall.drawn + wall.length + wall.deadLength).fill(INVALID_TILE_ID);
+  return {
+    ...state,
+    players,
+    wall: TileWall.fromDrawOrder(hidden, wall.deadLength, wall.drawn),
+    reservedTiles: [],
+    discardPile: state.discardPile.slice(),
+    lastAction: state.lastAction && { ...state.lastAction },
+    charleston: state.charleston && redactCharleston(state.charleston, seat),
+    logs: state.logs.map(move => redactMove(move, seat)),
+    derived: undefined
+  };
+}
@@ -0,0 +1,275 @@
+/**
+ * Multiset of tiles backed by a fixed-size count vector
+ *
+ * A hand, meld or wall segment is stored as one Uint8Array slot per tile kind
+ * (see tile-codec), giving O(1) add/remove/has/count, cheap cloning and
+ * order-insensitive equality. Joker, flower and total counts are cached and
+ * kept up to date on every mutation.
+ */
+
+import { Tile } from './types';
+import {
+  TileId,
+  TILE_KIND_COUNT,
+  TILE_FLAGS,
+  FLAG_FLOWER,
+  JOKER_ID,
+  INVALID_TILE_ID,
+  encodeTile,
+  decodeTile
+} from './tile-codec';
+
+export class HandCounts {
+  /** Count of each tile kind, indexed by tile ID. Treat as read-only. */
+  readonly counts: Uint8Array;
+  private total = 0;
+  private flowers = 0;
+
+  constructor(counts?: Uint8Array) {
+    this.counts = new Uint8Array(TILE_KIND_COUNT);
+    if (counts) {
+      for (let id = 0; id < TILE_KIND_COUNT; id++) {
+        if (counts[id]) this.addId(id, counts[id]);
+      }
+    }
+  }
+
+  /**
+   * Builds counts from tile strings. Throws on unknown tiles.
+   */
+  static fromTiles(tiles: readonly Tile[]): HandCounts {
+    const result = HandCounts.tryFromTiles(tiles);
+    if (!result) {
+      throw new Error(`Unknown tile: ${tiles.find(t => encodeTile(t) === INVALID_TILE_ID)}`);
+    }
+    return result;
+  }
+
+  /**
+   * Builds counts from tile strings, or returns null if any tile is unknown
+   */
+  static tryFromTiles(tiles: readonly Tile[]): HandCounts | null {
+    const result = new HandCounts();
+    for (const tile of tiles) {
+      const id = encodeTile(tile);
+      if (id === INVALID_TILE_ID) return null;
+      result.addId(id);
+    }
+    return result;
+  }
+
+  /**
+   * Builds counts from tile IDs
+   */
+  static fromIds(ids: ArrayLike<TileId>): HandCounts {
+    const result = new HandCounts();
+    for (let i = 0; i < ids.length; i++) {
+      result.addId(ids[i]);
+    }
+    return result;
+  }
+
+  /** Total number of tiles */
+  get size(): number {
+    return this.total;
+  }
+
+  get jokerCount(): number {
+    return this.counts[JOKER_ID];
+  }
+
+  get flowerCount(): number {
+    return this.flowers;
+  }
+
+  /** Number of non-joker tiles */
+  get naturalCount(): number {
+    return this.total - this.counts[JOKER_ID];
+  }
+
+  countId(id: TileId): number {
+    return this.counts[id] ?? 0;
+  }
+
+  count(tile: Tile): number {
+    const id = encodeTile(tile);
+    return id === INVALID_TILE_ID ? 0 : this.counts[id];
+  }
+
+  hasId(id: TileId, n: number = 1): boolean {
+    return this.countId(id) >= n;
+  }
+
+  has(tile: Tile, n: number = 1): boolean {
+    return this.count(tile) >= n;
+  }
+
+  addId(id: TileId, n: number = 1): void {
+    this.counts[id] += n;
+    this.total += n;
+    if (TILE_FLAGS[id] & FLAG_FLOWER) this.flowers += n;
+  }
+
+  add(tile: Tile, n: number = 1): void {
+    const id = encodeTile(tile);
+    if (id === INVALID_TILE_ID) {
+      throw new Error(`Unknown tile: ${tile}`);
+    }
+    this.addId(id, n);
+  }
+
+  /**
+   * Removes n copies of a tile. Returns false (and changes nothing) if there
+   * are fewer than n.
+   */
+  removeId(id: TileId, n: number = 1): boolean {
+    if (this.countId(id) < n) return false;
+    this.counts[id] -= n;
+    this.total -= n;
+    if (TILE_FLAGS[id] & FLAG_FLOWER) this.flowers -= n;
+    return true;
+  }
+
+  remove(tile: Tile, n: number = 1): boolean {
+    const id = encodeTile(tile);
+    return id !== INVALID_TILE_ID && this.removeId(id, n);
+  }
+
+  addAll(tiles: readonly Tile[]): void {
+    for (const tile of tiles) {
+      this.add(tile);
+    }
+  }
+
+  /**
+   * Removes every tile in the list. Returns false (and changes nothing) if
+   * the tiles are not all present, counting duplicates.
+   */
+  removeAll(tiles: readonly Tile[]): boolean {
+    const other = HandCounts.tryFromTiles(tiles);
+    if (!other || !this.containsAll(other)) return false;
+    for (let id = 0; id < TILE_KIND_COUNT; id++) {
+      if (other.counts[id]) this.removeId(id, other.counts[id]);
+    }
+    return true;
+  }
+
+  /**
+   * Checks if this multiset contains every tile of another (with multiplicity)
+   */
+  containsAll(other: HandCounts): boolean {
+    for (let id = 0; id < TILE_KIND_COUNT; id++) {
+      if (other.counts[id] > this.counts[id]) return false;
+    }
+    return true;
+  }
+
+  /**
+   * Number of distinct non-joker tile kinds present
+   */
+  distinctNaturals(): number {
+    let kinds = 0;
+    for (let id = 0; id < JOKER_ID; id++) {
+      if (this.counts[id]) kinds++;
+    }
+    return kinds;
+  }
+
+  clone(): HandCounts {
+    const copy = new HandCounts();
+    copy.counts.set(this.counts);
+    copy.total = this.total;
+    copy.flowers = this.flowers;
+    return copy;
+  }
+
+  /**
+   * Order-insensitive equality
+   */
+  equals(other: HandCounts): boolean {
+    if (this.total !== other.total) return false;
+    for (let id = 0; id < TILE_KIND_COUNT; id++) {
+      if (this.counts[id] !== other.counts[id]) return false;
+    }
+    return true;
+  }
+
+  /**
+   * Tile IDs in ascending order
+   */
+  toIds(): Uint8Array {
+    const ids = new Uint8Array(this.total);
+    let i = 0;
+    for (let id = 0; id < TILE_KIND_COUNT; id++) {
+      for (let c = this.counts[id]; c > 0; c--) {
+        ids[i++] = id;
+      }
+    }
+    return ids;
+  }
+
+  /**
+   * Tile strings in tile ID order
+   */
+  toTiles(): Tile[] {
+    const tiles: Tile[] = [];
+    for (let id = 0; id < TILE_KIND_COUNT; id++) {
+      const count = this.counts[id];
+      if (count === 0) continue;
+      const tile = decodeTile(id);
+      for (let c = 0; c < count; c++) {
+        tiles.push(tile);
+      }
+    }
+    return tiles;
+  }
+}
+
+/**
+ * Counts jokers in a tile list without building a full count vector
+ */
+export function countJokers(tiles: readonly Tile[]): number {
+  let jokers = 0;
+  for (const tile of tiles) {
+    if (tile === 'J') jokers++;
+  }
+  return jokers;
+}
+
+/**
+ * Builds the combined counts of a concealed hand and its exposed melds.
+ * Throws on unknown tiles.
+ */
+export function handWithMelds(hand: readonly Tile[] | HandCounts, melds: readonly { tiles: Tile[] }[]): HandCounts {
+  const counts = hand instanceof HandCounts ? hand.clone() : HandCounts.fromTiles(hand);
+  for (const meld of melds) {
+    counts.addAll(meld.tiles);
+  }
+  return counts;
+}
+
+/**
+ * Removes one copy of each listed tile from a tile array in place, keeping the
+ * order of the remaining tiles. Tiles that are not present are ignored.
+ * Returns the number of tiles removed.
+ */
+export function removeTiles(hand: Tile[], tiles: readonly Tile[]): number {
+  if (tiles.length === 0) return 0;
+
+  const pending = new HandCounts();
+  for (const tile of tiles) {
+    const id = encodeTile(tile);
+    if (id !== INVALID_TILE_ID) pending.addId(id);
+  }
+
+  let write = 0;
+  for (let read = 0; read < hand.length; read++) {
+    const id = encodeTile(hand[read]);
+    if (id !== INVALID_TILE_ID && pending.removeId(id)) continue;
+    hand[write++] = hand[read];
+  }
+
+  const removed = hand.length - write;
+  hand.length = write;
+  return removed;
+}
@@ -0,0 +1,461 @@
+/**
+ * "Tiles away" distances from a hand to every line on the card
+ *
+ * For each compiled template (one suit assignment / number shift of a
+ * pattern) the distance is the number of tiles still missing once the hand's
+ * naturals and jokers are placed: naturals fill singles and pairs first, then
+ * groups; jokers fill what is left of the groups, up to the pattern's joker
+ * limit. Exposed melds must each take one group of the same tile and size,
+ * otherwise the template is unreachable.
+ *
+ * A HandDistance keeps each template's missing natural and group tiles, so a
+ * tile entering or leaving the hand only touches the templates that use its
+ * class (a few dozen of several hundred). DistanceCache holds one per player
+ * and brings them up to date from the derived hand counts after each move.
+ *
+ * The cache also keeps each player's claim sets, refreshed whenever their
+ * hand changes: the tiles that would complete their hand, and the tiles they
+ * could call for an exposure towards a reachable open pattern. Deciding who
+ * may claim a discard is then a table read per seat. A caller that syncs
+ * after every move but asks about only some of them (self-play) can have the
+ * sets refilled lazily instead, on the first question after a change.
+ */
+
+import { GameState, HandPattern, Meld, PlayerId, RuleCard, Tile } from './types';
+import { HandCounts } from './hand-counts';
+import {
+  CompiledRuleCard,
+  HandTemplate,
+  MATCH_CLASS_COUNT,
+  HAND_SIZE,
+  getCompiledRuleCard,
+  matchClass,
+  toHandVector
+} from './hand-matcher';
+import { TileId, JOKER_ID, INVALID_TILE_ID, encodeTile } from './tile-codec';
+import { getDerivedState } from './derived-state';
+
+/** Distance of a template the exposed melds cannot fit */
+export const UNREACHABLE = 255;
+
+// Lines further than this from the closest one are not worth keeping
+export const LINE_SLACK = 2;
+// Most lines scored, nearest first
+export const MAX_LINES = 64;
+
+/** A Charleston hand touching every suit, for compiling the card and warming workers up */
+export const WARM_UP_HAND: readonly Tile[] = ['1B', '2B', '3B', '4C', '5C', '6C', '7D', '8D', '9D', 'N', 'E', 'RD', 'F1'];
+
+export interface PatternDistance {
+  pattern: HandPattern;
+  template: HandTemplate;
+  distance: number;
+}
+
+/**
+ * Every template of a card in one flat list, with the templates using each
+ * tile class
+ */
+export interface DistanceTable {
+  templates: HandTemplate[];
+  patternOf: Uint16Array;
+  maxJokers: Uint8Array;
+  isOpen: Uint8Array;
+  postings: Uint16Array[];
+}
+
+const distanceTables = new WeakMap<CompiledRuleCard, DistanceTable>();
+
+export function getDistanceTable(compiled: CompiledRuleCard): DistanceTable {
+  let table = distanceTables.get(compiled);
+  if (!table) {
+    const templates: HandTemplate[] = [];
+    const patternOf: number[] = [];
+    const maxJokers: number[] = [];
+    const isOpen: number[] = [];
+    compiled.patterns.forEach((pattern, p) => {
+      for (const template of pattern.templates) {
+        templates.push(template);
+        patternOf.push(p);
+        maxJokers.push(pattern.maxJokers);
+        isOpen.push(pattern.pattern.isOpen ? 1 : 0);
+      }
+    });
+    const postings: Uint16Array[] = [];
+    for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+      const uses: number[] = [];
+      templates.forEach((t, i) => {
+        if (t.natural[cls] + t.grouped[cls] > 0) uses.push(i);
+      });
+      postings.push(Uint16Array.from(uses));
+    }
+    table = {
+      templates,
+      patternOf: Uint16Array.from(patternOf),
+      maxJokers: Uint8Array.from(maxJokers),
+      isOpen: Uint8Array.from(isOpen),
+      postings
+    };
+    distanceTables.set(compiled, table);
+  }
+  return table;
+}
+
+function missingNaturals(need: number, have: number): number {
+  return need > have ? need - have : 0;
+}
+
+function missingGrouped(natural: number, grouped: number, have: number): number {
+  const spare = have > natural ? have - natural : 0;
+  return spare >= grouped ? 0 : grouped - spare;
+}
+
+export class HandDistance {
+  private readonly compiled: CompiledRuleCard;
+  private readonly table: DistanceTable;
+  private readonly counts = new Uint8Array(MATCH_CLASS_COUNT);
+  private jokers = 0;
+  private tiles = 0;
+  /** Missing natural and group tiles per template */
+  private readonly naturalGap: Uint8Array;
+  private readonly groupGap: Uint8Array;
+  /** Jokers each template may still take, after those in exposed melds */
+  private readonly jokerRoom: Uint8Array;
+  /** Group needs per template once exposed melds are placed (null: no melds) */
+  private grouped: Uint8Array | null = null;
+  private melds: readonly Meld[] = [];
+
+  constructor(card: RuleCard, hand: readonly Tile[] | HandCounts = [], melds: readonly Meld[] = []) {
+    this.compiled = getCompiledRuleCard(card);
+    this.table = getDistanceTable(this.compiled);
+    const count = this.table.templates.length;
+    this.naturalGap = new Uint8Array(count);
+    this.groupGap = new Uint8Array(count);
+    this.jokerRoom = new Uint8Array(count);
+    this.reset(hand, melds);
+  }
+
+  /**
+   * Recomputes every template for a new hand and exposures
+   */
+  reset(hand: readonly Tile[] | HandCounts, melds: readonly Meld[]): void {
+    const vector = toHandVector(hand, melds);
+    if (!vector) {
+      throw new Error('Hand contains unknown tiles or mixed melds');
+    }
+    this.counts.set(vector.counts);
+    this.jokers = vector.jokers;
+    this.tiles = vector.size;
+    this.melds = melds;
+    this.grouped = vector.melds.length > 0 ? new Uint8Array(this.table.templates.length * MATCH_CLASS_COUNT) : null;
+
+    const { templates, maxJokers, postings } = this.table;
+    for (let t = 0; t < templates.length; t++) {
+      this.naturalGap[t] = 0;
+      this.groupGap[t] = 0;
+      this.jokerRoom[t] = Math.max(0, maxJokers[t] - vector.meldJokers);
+      if (this.grouped) {
+        const grouped = this.grouped.subarray(t * MATCH_CLASS_COUNT, (t + 1) * MATCH_CLASS_COUNT);
+        grouped.set(templates[t].grouped);
+        if (!placeMelds(templates[t], vector.melds, grouped) || vector.meldJokers > maxJokers[t]) {
+          this.naturalGap[t] = UNREACHABLE;
+        }
+      }
+    }
+
+    // Classes a template does not use add nothing, so walk the postings
+    // rather than every class of every template
+    for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+      const have = this.counts[cls];
+      for (const t of postings[cls]) {
+        if (this.naturalGap[t] === UNREACHABLE) continue;
+        const natural = templates[t].natural[cls];
+        const grouped = this.grouped ? this.grouped[t * MATCH_CLASS_COUNT + cls] : templates[t].grouped[cls];
+        this.naturalGap[t] += missingNaturals(natural, have);
+        this.groupGap[t] += missingGrouped(natural, grouped, have);
+      }
+    }
+  }
+
+  /** Exposed melds the distances were computed with */
+  get exposures(): readonly Meld[] {
+    return this.melds;
+  }
+
+  addTile(tile: Tile): void {
+    this.changeId(tileId(tile), 1);
+  }
+
+  removeTile(tile: Tile): void {
+    this.changeId(tileId(tile), -1);
+  }
+
+  /**
+   * Adds (delta > 0) or removes tiles of one ID, updating only the templates
+   * that use its class
+   */
+  changeId(id: TileId, delta: number): void {
+    if (id === JOKER_ID) {
+      if (this.jokers + delta < 0) throw new Error('No joker to remove');
+      this.jokers += delta;
+      this.tiles += delta;
+      return;
+    }
+    const cls = matchClass(id);
+    const before = this.counts[cls];
+    const after = before + delta;
+    if (after < 0) throw new Error(`No ${id} to remove`);
+    this.counts[cls] = after;
+    this.tiles += delta;
+
+    const { templates } = this.table;
+    for (const t of this.table.postings[cls]) {
+      if (this.naturalGap[t] === UNREACHABLE) continue;
+      const natural = templates[t].natural[cls];
+      const grouped = this.grouped ? this.grouped[t * MATCH_CLASS_COUNT + cls] : templates[t].grouped[cls];
+      this.naturalGap[t] += missingNaturals(natural, after) - missingNaturals(natural, before);
+      this.groupGap[t] += missingGrouped(natural, grouped, after) - missingGrouped(natural, grouped, before);
+    }
+  }
+
+  /**
+   * Tiles still needed to complete template t of the card (flattened order)
+   */
+  templateDistance(t: number): number {
+    const naturalGap = this.naturalGap[t];
+    if (naturalGap === UNREACHABLE) return UNREACHABLE;
+    const jokers = Math.min(this.jokers, this.jokerRoom[t]);
+    const groupGap = this.groupGap[t];
+    return naturalGap + (groupGap > jokers ? groupGap - jokers : 0);
+  }
+
+  /**
+   * The closest template of every pattern, nearest first. Unreachable
+   * patterns are left out.
+   */
+  patternDistances(): PatternDistance[] {
+    const { templates, patternOf } = this.table;
+    const best = new Array<PatternDistance | undefined>(this.compiled.patterns.length);
+    for (let t = 0; t < templates.length; t++) {
+      const distance = this.templateDistance(t);
+      if (distance === UNREACHABLE) continue;
+      const p = patternOf[t];
+      const current = best[p];
+      if (!current || distance < current.distance) {
+        best[p] = { pattern: this.compiled.patterns[p].pattern, template: templates[t], distance };
+      }
+    }
+    return best
+      .filter((d): d is PatternDistance => d !== undefined)
+      .sort((a, b) => a.distance - b.distance || b.pattern.points - a.pattern.points);
+  }
+
+  /**
+   * Tiles held in total, concealed and exposed
+   */
+  get tileCount(): number {
+    return this.tiles;
+  }
+
+  /**
+   * Fills the claim sets by tile class: winning[cls] is 1 when one more tile
+   * of the class completes the hand (only for a 13-tile hand), and bit s of
+   * exposable[cls] is set when a discard of the class could be called for an
+   * exposed group of size s in a reachable open pattern.
+   */
+  fillClaimSets(winning: Uint8Array, exposable: Uint8Array): void {
+    winning.fill(0);
+    exposable.fill(0);
+    const { templates, isOpen } = this.table;
+    const placed = this.grouped;
+
+    for (let t = 0; t < templates.length; t++) {
+      const distance = this.templateDistance(t);
+      if (distance === UNREACHABLE) continue;
+      const template = templates[t];
+      // Group needs by class, after exposed melds, read in place
+      const grouped = placed ?? template.grouped;
+      const base = placed ? t * MATCH_CLASS_COUNT : 0;
+
+      if (distance === 1 && this.tiles === HAND_SIZE - 1) {
+        if (this.naturalGap[t] === 1) {
+          // The missing tile is a single or pair tile
+          for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+            if (template.natural[cls] > this.counts[cls]) winning[cls] = 1;
+          }
+        } else {
+          // Any group short of tiles (jokers already cover the rest)
+          for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+            if (missingGrouped(template.natural[cls], grouped[base + cls], this.counts[cls]) > 0) winning[cls] = 1;
+          }
+        }
+      }
+
+      if (!isOpen[t]) continue;
+      const jokers = Math.min(this.jokers, this.jokerRoom[t]);
+      for (const group of template.groups) {
+        const cls = group >> 3;
+        const size = group & 7;
+        // The discard plus size - 1 tiles from the hand, naturals or jokers
+        if (grouped[base + cls] >= size && this.counts[cls] + jokers >= size - 1) {
+          exposable[cls] |= 1 << size;
+        }
+      }
+    }
+  }
+
+  /**
+   * Fewest tiles needed to complete any line on the card
+   */
+  minDistance(): number {
+    let min = UNREACHABLE;
+    for (let t = 0; t < this.table.templates.length; t++) {
+      const distance = this.templateDistance(t);
+      if (distance < min) min = distance;
+    }
+    return min;
+  }
+}
+
+function tileId(tile: Tile): TileId {
+  const id = encodeTile(tile);
+  if (id === INVALID_TILE_ID) {
+    throw new Error(`Unknown tile: ${tile}`);
+  }
+  return id;
+}
+
+/**
+ * Takes one group per exposed meld out of the template's group needs.
+ * Returns false if some meld has no group left to fill.
+ */
+export function placeMelds(template: HandTemplate, melds: readonly number[], grouped: Uint8Array): boolean {
+  let used = 0;
+  for (const meld of melds) {
+    let found = -1;
+    for (let g = 0; g < template.groups.length; g++) {
+      if (template.groups[g] === meld && (used & (1 << g)) === 0) {
+        found = g;
+        break;
+      }
+    }
+    if (found === -1) return false;
+    used |= 1 << found;
+    grouped[meld >> 3] -= meld & 7;
+  }
+  return true;
+}
+
+/**
+ * Whether two meld lists hold the same meld objects (moves share untouched
+ * melds and replace changed ones)
+ */
+function sameMelds(a: readonly Meld[], b: readonly Meld[]): boolean {
+  return a.length === b.length && a.every((meld, i) => meld === b[i]);
+}
+
+export interface DistanceCacheOptions {
+  lazyClaimSets?: boolean;  // Refill claim sets when next asked for, not on sync
+}
+
+/**
+ * Per-player distances and claim sets for one game, kept in step with its state
+ */
+export class DistanceCache {
+  private readonly players: HandDistance[] = [];
+  private readonly ids: HandCounts[] = [];
+  private readonly winning: Uint8Array[] = [];
+  private readonly exposable: Uint8Array[] = [];
+  /** Claim sets behind the player's hand (lazy refill only) */
+  private readonly stale: boolean[] = [];
+  private readonly lazy: boolean;
+  private readonly card: RuleCard;
+
+  constructor(state: GameState, options: DistanceCacheOptions = {}) {
+    this.card = state.options.ruleCard;
+    this.lazy = options.lazyClaimSets ?? false;
+    const derived = getDerivedState(state);
+    for (let pid = 0; pid < 4; pid++) {
+      const player = state.players[pid as PlayerId];
+      this.players.push(new HandDistance(this.card, derived.hands[pid], player?.melds ?? []));
+      this.ids.push(derived.hands[pid].clone());
+      this.winning.push(new Uint8Array(MATCH_CLASS_COUNT));
+      this.exposable.push(new Uint8Array(MATCH_CLASS_COUNT));
+      this.stale.push(false);
+      this.refill(pid as PlayerId);
+    }
+  }
+
+  /**
+   * Brings every player's distances up to date with the state: a changed
+   * exposure recomputes that player, otherwise only the tiles that moved are
+   * applied. Claim sets are refreshed for every player whose hand changed
+   * (or, with lazyClaimSets, the next time they are asked for, so a hand
+   * that changes twice in a turn is only looked at once).
+   */
+  sync(state: GameState): void {
+    const derived = getDerivedState(state);
+    for (let pid = 0; pid < 4; pid++) {
+      const melds = state.players[pid as PlayerId]?.melds ?? [];
+      const hand = derived.hands[pid];
+      const tracker = this.players[pid];
+      const seen = this.ids[pid];
+
+      if (!sameMelds(melds, tracker.exposures)) {
+        tracker.reset(hand, melds);
+        this.ids[pid] = hand.clone();
+      } else if (!seen.equals(hand)) {
+        for (let id = 0; id <= JOKER_ID; id++) {
+          const delta = hand.countId(id) - seen.countId(id);
+          if (delta !== 0) {
+            tracker.changeId(id, delta);
+            if (delta > 0) seen.addId(id, delta);
+            else seen.removeId(id, -delta);
+          }
+        }
+      } else {
+        continue;
+      }
+      this.refill(pid as PlayerId);
+    }
+  }
+
+  private refill(player: PlayerId): void {
+    if (this.lazy) {
+      this.stale[player] = true;
+    } else {
+      this.players[player].fillClaimSets(this.winning[player], this.exposable[player]);
+    }
+  }
+
+  private claimSets(player: PlayerId): void {
+    if (!this.stale[player]) return;
+    this.players[player].fillClaimSets(this.winning[player], this.exposable[player]);
+    this.stale[player] = false;
+  }
+
+  forPlayer(player: PlayerId): HandDistance {
+    return this.players[player];
+  }
+
+  /**
+   * Whether the tile completes the player's hand
+   */
+  canWinOn(player: PlayerId, tile: Tile): boolean {
+    const id = encodeTile(tile);
+    if (id === INVALID_TILE_ID || id === JOKER_ID) return false;
+    this.claimSets(player);
+    return this.winning[player][matchClass(id)] === 1;
+  }
+
+  /**
+   * Whether the player could call the tile for an exposure of the given
+   * size (3 pong, 4 kong, 5 quint)
+   */
+  canExposeWith(player: PlayerId, tile: Tile, size: number): boolean {
+    const id = encodeTile(tile);
+    if (id === INVALID_TILE_ID || id === JOKER_ID) return false;
+    this.claimSets(player);
+    return (this.exposable[player][matchClass(id)] & (1 << size)) !== 0;
+  }
+}
@@ -0,0 +1,467 @@
+/**
+ * Compiled hand matcher for the rule card
+ *
+ * Each HandPattern is compiled once into count-vector templates, one per way
+ * of placing it on the tiles: every assignment of suits to its sections that
+ * satisfies the pattern's suit constraints, and for consecutive-run patterns
+ * every shift of its numbers along 1-9. A template holds, per tile class, the
+ * tiles required in singles and pairs (naturals only) and in groups of three
+ * or more (where jokers may stand in). Matching a hand is then one pass over
+ * the counts per template, with no search over tile arrangements.
+ *
+ * Pattern notation: each section string is one suit group. Digits 1-9 are
+ * number tiles of the section's suit, "0" is the white dragon (as in years),
+ * "D" is the dragon of the section's suit, "F" any flower and N/E/W/S winds.
+ * A run of identical symbols of length 3+ is a group; shorter runs are
+ * singles and pairs. Only sections holding numbers or dragons take a suit,
+ * and suit constraints between other sections are ignored.
+ *
+ * Flowers are interchangeable, so F1-F8 share one class (FIRST_FLOWER_ID).
+ */
+
+import { HandPattern, Meld, RuleCard, Tile } from './types';
+import { HandCounts } from './hand-counts';
+import { PatternIndex } from './pattern-index';
+import {
+  TileId,
+  JOKER_ID,
+  FIRST_FLOWER_ID,
+  INVALID_TILE_ID,
+  SUIT_CRAKS,
+  SUIT_BAMS,
+  SUIT_DOTS,
+  encodeTile,
+  isFlowerId,
+  numberTileId,
+  dragonIdForSuit
+} from './tile-codec';
+
+/** Tile classes a template counts: every tile ID below the joker, flowers folded */
+export const MATCH_CLASS_COUNT = JOKER_ID;
+export const HAND_SIZE = 14;
+
+const SUITS = [SUIT_CRAKS, SUIT_BAMS, SUIT_DOTS];
+const SYMBOL_IDS: Record<string, TileId> = {
+  '0': encodeTile('WD'),
+  F: FIRST_FLOWER_ID,
+  N: encodeTile('N'),
+  E: encodeTile('E'),
+  W: encodeTile('W'),
+  S: encodeTile('S')
+};
+const MIN_GROUP = 3;
+
+export interface HandTemplate {
+  /** Tiles per class held as singles or pairs; jokers may not stand in */
+  readonly natural: Uint8Array;
+  /** Tiles per class held in groups of 3+; jokers may stand in */
+  readonly grouped: Uint8Array;
+  /** Groups as (class << 3) | size, matched against exposed melds */
+  readonly groups: readonly number[];
+}
+
+export interface CompiledPattern {
+  readonly pattern: HandPattern;
+  readonly templates: readonly HandTemplate[];
+  /** Most jokers a winning hand may hold */
+  readonly maxJokers: number;
+}
+
+export interface CompiledRuleCard {
+  readonly card: RuleCard;
+  readonly patterns: readonly CompiledPattern[];
+  /** Prunes patterns by hand features before matching (see pattern-index.ts) */
+  readonly index: PatternIndex;
+}
+
+export interface HandMatch {
+  pattern: HandPattern;
+  template: HandTemplate;
+  jokers: number;
+}
+
+/**
+ * Class a tile ID is counted under
+ */
+export function matchClass(id: TileId): number {
+  return isFlowerId(id) ? FIRST_FLOWER_ID : id;
+}
+
+interface Run {
+  symbol: string;
+  length: number;
+}
+
+/**
+ * Splits a section string into runs of identical symbols
+ */
+function parseRuns(section: string): Run[] {
+  const runs: Run[] = [];
+  for (const token of section.split(/\s+/)) {
+    for (let i = 0; i < token.length; i++) {
+      const symbol = token[i];
+      if (!/[0-9DFNEWS]/.test(symbol)) continue; // Operators: x + =
+      const last = runs[runs.length - 1];
+      if (last && last.symbol === symbol && i > 0 && token[i - 1] === symbol) {
+        last.length++;
+      } else {
+        runs.push({ symbol, length: 1 });
+      }
+    }
+  }
+  return runs;
+}
+
+function isSuitedRun(run: Run): boolean {
+  return run.symbol === 'D' || (run.symbol >= '1' && run.symbol <= '9');
+}
+
+function runClass(run: Run, suit: number, shift: number): TileId {
+  if (run.symbol === 'D') return dragonIdForSuit(suit);
+  if (run.symbol >= '1' && run.symbol <= '9') {
+    return numberTileId(suit, Number(run.symbol) + shift);
+  }
+  return SYMBOL_IDS[run.symbol];
+}
+
+/**
+ * Every assignment of suits to the suited sections allowed by the constraints
+ */
+function suitAssignments(pattern: HandPattern, suited: number[]): number[][] {
+  const constraints = pattern.suitConstraints.filter(c =>
+    c.sections.every(section => suited.includes(section))
+  );
+  const results: number[][] = [];
+  const assignment: number[] = new Array(pattern.sections.length).fill(SUIT_CRAKS);
+
+  const assign = (k: number): void => {
+    if (k === suited.length) {
+      results.push(assignment.slice());
+      return;
+    }
+    for (const suit of SUITS) {
+      assignment[suited[k]] = suit;
+      const consistent = constraints.every(c => {
+        const [a, b] = c.sections;
+        if (suited.indexOf(a) > k || suited.indexOf(b) > k) return true;
+        return c.type === 'same' ? assignment[a] === assignment[b] : assignment[a] !== assignment[b];
+      });
+      if (consistent) assign(k + 1);
+    }
+  };
+  assign(0);
+  return results;
+}
+
+/**
+ * Number shifts a pattern may be played at: 0, or every shift along 1-9 for
+ * consecutive runs
+ */
+function numberShifts(pattern: HandPattern, runs: Run[][]): number[] {
+  if (!pattern.specialRules?.consecutiveRun) return [0];
+  const ranks = runs.flat().filter(r => r.symbol >= '1' && r.symbol <= '9').map(r => Number(r.symbol));
+  if (ranks.length === 0) return [0];
+  const shifts: number[] = [];
+  for (let shift = 1 - Math.min(...ranks); shift <= 9 - Math.max(...ranks); shift++) {
+    shifts.push(shift);
+  }
+  return shifts;
+}
+
+/**
+ * Compiles one pattern. Templates that do not come to 14 tiles (or need more
+ * than four natural copies of a tile) can never match and are dropped.
+ */
+export function compileHandPattern(pattern: HandPattern): CompiledPattern {
+  const runs = pattern.sections.map(section => parseRuns(section.pattern));
+  const suited = runs.map((r, i) => (r.some(isSuitedRun) ? i : -1)).filter(i => i !== -1);
+  const templates: HandTemplate[] = [];
+  const seen = new Set<string>();
+
+  for (const suits of suitAssignments(pattern, suited)) {
+    for (const shift of numberShifts(pattern, runs)) {
+      const natural = new Uint8Array(MATCH_CLASS_COUNT);
+      const grouped = new Uint8Array(MATCH_CLASS_COUNT);
+      const groups: number[] = [];
+      let size = 0;
+
+      runs.forEach((sectionRuns, section) => {
+        for (const run of sectionRuns) {
+          const cls = runClass(run, suits[section], shift);
+          if (run.length >= MIN_GROUP) {
+            grouped[cls] += run.length;
+            groups.push((cls << 3) | run.length);
+          } else {
+            natural[cls] += run.length;
+          }
+          size += run.length;
+        }
+      });
+
+      if (size !== HAND_SIZE) continue;
+      if (natural.some((n, cls) => cls !== FIRST_FLOWER_ID && n > 4)) continue;
+      const key = `${natural.join(',')}|${grouped.join(',')}`;
+      if (seen.has(key)) continue;
+      seen.add(key);
+      groups.sort((a, b) => a - b);
+      templates.push(Object.freeze({ natural, grouped, groups: Object.freeze(groups) }));
+    }
+  }
+
+  return Object.freeze({ pattern, templates: Object.freeze(templates), maxJokers: jokerLimit(pattern) });
+}
+
+function jokerLimit(pattern: HandPattern): number {
+  return pattern.specialRules?.noJokers ? 0 : pattern.allowedJokers;
+}
+
+/**
+ * A template in plain JSON, as stored in the compiled rule-card artifact:
+ * natural and grouped counts as one base-36 digit per class
+ */
+export interface SerializedTemplate {
+  natural: string;
+  grouped: string;
+  groups: number[];
+}
+
+export function serializeTemplates(compiled: CompiledPattern): SerializedTemplate[] {
+  const digits = (counts: Uint8Array) => Array.from(counts, n => n.toString(36)).join('');
+  return compiled.templates.map(t => ({
+    natural: digits(t.natural),
+    grouped: digits(t.grouped),
+    groups: t.groups.slice()
+  }));
+}
+
+function parseCounts(digits: string): Uint8Array {
+  if (digits.length !== MATCH_CLASS_COUNT) {
+    throw new Error(`Serialized template has ${digits.length} classes, expected ${MATCH_CLASS_COUNT}`);
+  }
+  const counts = new Uint8Array(MATCH_CLASS_COUNT);
+  for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+    counts[cls] = parseInt(digits[cls], 36);
+  }
+  return counts;
+}
+
+const compiledPatterns = new WeakMap<HandPattern, CompiledPattern>();
+const compiledCards = new WeakMap<RuleCard, CompiledRuleCard>();
+
+/**
+ * The pattern's templates, compiled on first use and cached per pattern
+ */
+export function getCompiledPattern(pattern: HandPattern): CompiledPattern {
+  let compiled = compiledPatterns.get(pattern);
+  if (!compiled) {
+    compiled = compileHandPattern(pattern);
+    compiledPatterns.set(pattern, compiled);
+  }
+  return compiled;
+}
+
+/**
+ * Every pattern of the card compiled, cached per card
+ */
+export function getCompiledRuleCard(card: RuleCard): CompiledRuleCard {
+  let compiled = compiledCards.get(card);
+  if (!compiled) {
+    const patterns = Object.freeze(card.patterns.map(getCompiledPattern));
+    compiled = Object.freeze({ card, patterns, index: new PatternIndex(patterns) });
+    compiledCards.set(card, compiled);
+  }
+  return compiled;
+}
+
+/**
+ * Caches a card as compiled from serialized templates (one list per pattern,
+ * as serializeTemplates wrote them) instead of compiling its patterns
+ */
+export function restoreCompiledRuleCard(
+  card: RuleCard,
+  templates: ReadonlyArray<readonly SerializedTemplate[]>
+): CompiledRuleCard {
+  if (templates.length !== card.patterns.length) {
+    throw new Error(`Serialized templates cover ${templates.length} patterns, the card has ${card.patterns.length}`);
+  }
+  const patterns = Object.freeze(card.patterns.map((pattern, p) => {
+    let compiled = compiledPatterns.get(pattern);
+    if (!compiled) {
+      compiled = Object.freeze({
+        pattern,
+        templates: Object.freeze(templates[p].map(t => Object.freeze({
+          natural: parseCounts(t.natural),
+          grouped: parseCounts(t.grouped),
+          groups: Object.freeze(t.groups.slice())
+        }))),
+        maxJokers: jokerLimit(pattern)
+      });
+      compiledPatterns.set(pattern, compiled);
+    }
+    return compiled;
+  }));
+  const compiled = Object.freeze({ card, patterns, index: new PatternIndex(patterns) });
+  compiledCards.set(card, compiled);
+  return compiled;
+}
+
+/**
+ * A hand reduced to what templates are matched against
+ */
+export interface HandVector {
+  /** Concealed tiles per class (jokers excluded) */
+  counts: Uint8Array;
+  /** Concealed jokers */
+  jokers: number;
+  /** Exposed melds as (class << 3) | size */
+  melds: number[];
+  /** Natural tiles per class in exposed melds */
+  exposed: Uint8Array;
+  /** Jokers in exposed melds */
+  meldJokers: number;
+  /** Tiles in total, concealed and exposed */
+  size: number;
+}
+
+/**
+ * Builds the vector for a concealed hand and its exposures. Returns null for
+ * hands no template can match (unknown tiles, melds of mixed tiles).
+ */
+export function toHandVector(hand: readonly Tile[] | HandCounts, melds: readonly Meld[]): HandVector | null {
+  const vector: HandVector = {
+    counts: new Uint8Array(MATCH_CLASS_COUNT),
+    jokers: 0,
+    melds: [],
+    exposed: new Uint8Array(MATCH_CLASS_COUNT),
+    meldJokers: 0,
+    size: 0
+  };
+
+  if (hand instanceof HandCounts) {
+    for (let id = 0; id < JOKER_ID; id++) {
+      vector.counts[matchClass(id)] += hand.countId(id);
+    }
+    vector.jokers = hand.jokerCount;
+    vector.size = hand.size;
+  } else {
+    for (const tile of hand) {
+      const id = encodeTile(tile);
+      if (id === INVALID_TILE_ID) return null;
+      if (id === JOKER_ID) vector.jokers++;
+      else vector.counts[matchClass(id)]++;
+    }
+    vector.size = hand.length;
+  }
+
+  for (const meld of melds) {
+    let cls = -1;
+    let jokers = 0;
+    for (const tile of meld.tiles) {
+      const id = encodeTile(tile);
+      if (id === INVALID_TILE_ID) return null;
+      if (id === JOKER_ID) {
+        jokers++;
+      } else if (cls === -1) {
+        cls = matchClass(id);
+      } else if (cls !== matchClass(id)) {
+        return null;
+      }
+    }
+    if (cls === -1) return null;
+    vector.meldJokers += jokers;
+    vector.exposed[cls] += meld.tiles.length - jokers;
+    vector.melds.push((cls << 3) | meld.tiles.length);
+    vector.size += meld.tiles.length;
+  }
+  return vector;
+}
+
+// Scratch space reused across matches (matching is synchronous)
+const scratchGrouped = new Uint8Array(MATCH_CLASS_COUNT);
+
+/**
+ * Whether the hand fills the template exactly
+ */
+export function matchesTemplate(template: HandTemplate, vector: HandVector): boolean {
+  let grouped = template.grouped;
+
+  // Each exposed meld fills one group of the same tile and size
+  if (vector.melds.length > 0) {
+    scratchGrouped.set(template.grouped);
+    grouped = scratchGrouped;
+    let used = 0;
+    for (const meld of vector.melds) {
+      let found = -1;
+      for (let g = 0; g < template.groups.length; g++) {
+        if (template.groups[g] === meld && (used & (1 << g)) === 0) {
+          found = g;
+          break;
+        }
+      }
+      if (found === -1) return false;
+      used |= 1 << found;
+      grouped[meld >> 3] -= meld & 7;
+    }
+  }
+
+  // Concealed tiles cover every single and pair; jokers fill the group gaps
+  const { natural } = template;
+  const counts = vector.counts;
+  let gaps = 0;
+  for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+    const have = counts[cls];
+    const need = natural[cls] + grouped[cls];
+    if (have < natural[cls] || have > need) return false;
+    gaps += need - have;
+  }
+  return gaps === vector.jokers;
+}
+
+/**
+ * Matches a hand against one compiled pattern
+ */
+export function matchCompiledPattern(compiled: CompiledPattern, vector: HandVector): HandMatch | null {
+  if (vector.size !== HAND_SIZE) return null;
+  const jokers = vector.jokers + vector.meldJokers;
+  if (jokers > compiled.maxJokers) return null;
+
+  for (const template of compiled.templates) {
+    if (matchesTemplate(template, vector)) {
+      return { pattern: compiled.pattern, template, jokers };
+    }
+  }
+  return null;
+}
+
+/**
+ * Every pattern on the card the hand completes
+ */
+export function matchAllPatterns(
+  card: RuleCard,
+  hand: readonly Tile[] | HandCounts,
+  melds: readonly Meld[]
+): HandMatch[] {
+  const vector = toHandVector(hand, melds);
+  if (!vector || vector.size !== HAND_SIZE) return [];
+  const matches: HandMatch[] = [];
+  for (const compiled of getCompiledRuleCard(card).index.candidates(vector)) {
+    const match = matchCompiledPattern(compiled, vector);
+    if (match) matches.push(match);
+  }
+  return matches;
+}
+
+/**
+ * The highest-scoring pattern the hand completes, or null
+ */
+export function matchHand(
+  card: RuleCard,
+  hand: readonly Tile[] | HandCounts,
+  melds: readonly Meld[]
+): HandMatch | null {
+  let best: HandMatch | null = null;
+  for (const match of matchAllPatterns(card, hand, melds)) {
+    if (!best || match.pattern.points > best.pattern.points) best = match;
+  }
+  return best;
+}
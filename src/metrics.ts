@@ -0,0 +1,64 @@
+/**
+ * Lightweight latency metrics
+ *
+ * Keeps a fixed-size window of recent samples in a Float64Array so recording
+ * never allocates; percentiles are computed over the window on demand.
+ */
+
+export interface LatencyStats {
+  count: number;   // Samples recorded since creation
+  avgMs: number;   // Mean over the window
+  p50Ms: number;
+  p95Ms: number;
+  p99Ms: number;
+  maxMs: number;   // Max over the window
+}
+
+export class LatencyRecorder {
+  private samples: Float64Array;
+  private next = 0;
+  private filled = 0;
+  private total = 0;
+
+  constructor(windowSize: number = 1024) {
+    if (windowSize <= 0) throw new Error('windowSize must be positive');
+    this.samples = new Float64Array(windowSize);
+  }
+
+  record(ms: number): void {
+    this.samples[this.next] = ms;
+    this.next = (this.next + 1) % this.samples.length;
+    if (this.filled < this.samples.length) this.filled++;
+    this.total++;
+  }
+
+  get count(): number {
+    return this.total;
+  }
+
+  stats(): LatencyStats {
+    if (this.filled === 0) {
+      return { count: 0, avgMs: 0, p50Ms: 0, p95Ms: 0, p99Ms: 0, maxMs: 0 };
+    }
+
+    const sorted = this.samples.slice(0, this.filled).sort();
+    let sum = 0;
+    for (let i = 0; i < sorted.length; i++) sum += sorted[i];
+
+    const at = (p: number) => sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))];
+    return {
+      count: this.total,
+      avgMs: sum / sorted.length,
+      p50Ms: at(0.5),
+      p95Ms: at(0.95),
+      p99Ms: at(0.99),
+      maxMs: sorted[sorted.length - 1]
+    };
+  }
+
+  reset(): void {
+    this.next = 0;
+    this.filled = 0;
+    this.total = 0;
+  }
+}
@@ -0,0 +1,156 @@
+/**
+ * Move reducer: applies a validated Move to a GameState
+ *
+ * Each move goes through a StateDraft, so only the players, wall cursors and
+ * counts it touches are copied, and the derived counts (visible tiles,
+ * per-player concealed and exposed tiles) are updated by the tiles that moved.
+ * No step depends on how long the game has run.
+ *
+ * Moves are expected to have passed validateMove; the reducer still throws on
+ * anything that would corrupt the state (tiles not held, empty wall).
+ */
+
+import { GameState, Move, PlayerId, Meld, Tile } from './types';
+import { StateDraft } from './game-state';
+import { isWinningHand } from './win-check';
+
+export function nextPlayer(player: PlayerId): PlayerId {
+  return ((player + 1) % 4) as PlayerId;
+}
+
+export function reduceMove(state: GameState, move: Move): GameState {
+  const draft = new StateDraft(state);
+  const next = draft.state;
+  // Take the counts before anything moves so they start from the base state
+  const derived = draft.derived();
+
+  switch (move.type) {
+    case 'draw': {
+      const tile = draft.wall().draw();
+      if (tile === undefined) {
+        throw new Error('No tiles left in wall');
+      }
+      derived.takeFromWall(tile);
+      draft.addToHand(move.player, [tile]);
+      next.currentPlayer = move.player;
+      next.lastAction = { type: 'draw', player: move.player };
+      break;
+    }
+
+    case 'discard': {
+      takeOrThrow(draft, move.player, [move.tile]);
+      next.discardPile.push({ player: move.player, tile: move.tile });
+      derived.addDiscard(move.tile);
+      next.currentPlayer = nextPlayer(move.player);
+      next.lastAction = { type: 'discard', player: move.player, tile: move.tile };
+      break;
+    }
+
+    case 'charlestonPass': {
+      takeOrThrow(draft, move.player, move.tiles);
+      draft.addToHand(move.to, move.tiles);
+      next.lastAction = { type: 'charlestonPass', player: move.player };
+      break;
+    }
+
+    case 'claim': {
+      const discard = next.discardPile[next.discardPile.length - 1];
+      if (!discard || discard.tile !== move.meld.tiles[0]) {
+        throw new Error('Can only claim most recently discarded tile');
+      }
+      // The claimed tile is already face up; the rest come from the hand
+      takeOrThrow(draft, move.player, move.meld.tiles.slice(1));
+      next.discardPile.pop();
+      derived.removeDiscard(discard.tile);
+      exposeMeld(draft, move.player, { ...move.meld, from: discard.player, exposed: true });
+      next.currentPlayer = move.player;
+      next.lastAction = { type: 'claim', player: move.player, tile: discard.tile };
+      break;
+    }
+
+    case 'kong': {
+      takeOrThrow(draft, move.player, move.tiles);
+      exposeMeld(draft, move.player, {
+        tiles: [...move.tiles],
+        type: 'kong',
+        from: 'wall',
+        exposed: true,
+        canExchangeJokers: move.tiles.includes('J')
+      });
+      next.lastAction = { type: 'kong', player: move.player };
+      break;
+    }
+
+    case 'replaceJoker': {
+      const owner = move.owner ?? move.player;
+      const meld = next.players[owner].melds[move.meldIndex];
+      const jokerIndex = meld ? meld.tiles.indexOf('J') : -1;
+      if (jokerIndex === -1) {
+        throw new Error('No joker to replace in that meld');
+      }
+      takeOrThrow(draft, move.player, [move.tile]);
+      const tiles = meld.tiles.slice();
+      tiles[jokerIndex] = move.tile;
+      draft.player(owner).melds[move.meldIndex] = { ...meld, tiles, canExchangeJokers: tiles.includes('J') };
+      draft.addToHand(move.player, ['J']);
+
+      derived.removeExposed(owner, 'J');
+      derived.addExposed(owner, [move.tile]);
+      next.lastAction = { type: 'replaceJoker', player: move.player, tile: move.tile };
+      break;
+    }
+
+    case 'declareMahjong': {
+      // A 13-tile declaration wins on the discard just thrown
+      const player = next.players[move.player];
+      const discard = next.discardPile[next.discardPile.length - 1];
+      const onDiscard = derived.tileCount(move.player) === 13 && !!discard &&
+        discard.player !== move.player && next.lastAction?.type === 'discard' && next.lastAction.tile === discard.tile;
+      const hand = onDiscard ? [...player.hand, discard.tile] : player.hand;
+      if (!isWinningHand(hand, player.melds, next.options.ruleCard)) {
+        throw new Error('Hand does not match any pattern on the card');
+      }
+      if (onDiscard) {
+        next.discardPile.pop();
+        derived.removeDiscard(discard.tile);
+        draft.addToHand(move.player, [discard.tile]);
+      }
+      next.phase = 'complete';
+      next.currentPlayer = move.player;
+      next.lastAction = { type: 'declareMahjong', player: move.player, tile: onDiscard ? discard.tile : undefined };
+      break;
+    }
+
+    case 'stopCharleston': {
+      if (next.charleston) {
+        const charleston = draft.charleston();
+        charleston.phase = 'complete';
+        charleston.completed = true;
+      }
+      next.phase = 'play';
+      next.currentPlayer = next.dealer;
+      next.lastAction = { type: 'stopCharleston', player: move.player };
+      break;
+    }
+
+    case 'pass':
+    case 'claimRequest':
+      // Claim windows are resolved by the caller; these are only recorded
+      next.lastAction = { type: move.type, player: move.player };
+      break;
+  }
+
+  next.logs.push(move);
+  return next;
+}
+
+function takeOrThrow(draft: StateDraft, player: PlayerId, tiles: readonly Tile[]): void {
+  if (!draft.takeFromHand(player, tiles)) {
+    throw new Error(`Tiles ${tiles.join(', ')} not in hand`);
+  }
+}
+
+function exposeMeld(draft: StateDraft, player: PlayerId, meld: Meld): void {
+  draft.player(player).melds.push(meld);
+  draft.derived().addExposed(player, meld.tiles);
+}
@@ -11,7 +11,10 @@
 import { readFileSync } from 'fs';
 import { resolve } from 'path';
 import { RuleCard } from './types';
-import { load2024RuleCard } from './rulecard-parser';
+import { getRuleCard } from './rulecard-registry';
+
+/** Source of the generic NMJL cards */
+export const NMJL_CARD_PATH = resolve(__dirname, '../nmjl_mahjong_hands_filled.json');
 
 // Simple baseline points per category to give some variety across hands
 const CATEGORY_BASE_POINTS: Record<string, number> = {
@@ -28,10 +31,28 @@ const CATEGORY_BASE_POINTS: Record<string, number> = {
   'Singles & Pairs': 40
 };
 
+let rawCard: any;
+
 function loadRawCard(): any {
-  const jsonPath = resolve(__dirname, '../nmjl_mahjong_hands_filled.json');
-  const raw = readFileSync(jsonPath, 'utf-8');
-  return JSON.parse(raw);
+  if (!rawCard) {
+    rawCard = JSON.parse(readFileSync(NMJL_CARD_PATH, 'utf-8'));
+  }
+  return rawCard;
+}
+
+/**
+ * Years the NMJL card data covers
+ */
+export function nmjlCardYears(): Array<2024 | 2025> {
+  return Object.keys(loadRawCard()).map(Number).filter((y): y is 2024 | 2025 => y === 2024 || y === 2025);
+}
+
+/**
+ * The generic NMJL card for a year, shared and frozen (from the rule-card
+ * registry, so the card data is not read or parsed per call)
+ */
+export function getRuleCardForYear(year: 2024 | 2025): RuleCard {
+  return getRuleCard(year, 'nmjl');
 }
 
 /**
@@ -39,7 +60,7 @@ function loadRawCard(): any {
  * The resulting RuleCard uses generic meld patterns (PPPPD) to allow play,
  * while preserving hand names for UI and scoring variety per category.
  */
-export function getRuleCardForYear(year: 2024 | 2025): RuleCard {
+export function buildNmjlRuleCard(year: 2024 | 2025): RuleCard {
   const data = loadRawCard();
   const yearKey = String(year);
   const yearData = data[yearKey];
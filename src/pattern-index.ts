@@ -0,0 +1,198 @@
+/**
+ * Feature-signature index over a card's compiled patterns
+ *
+ * Before any template is matched, a hand is reduced to cheap features: its
+ * flower, joker and per-wind and per-dragon counts, the ranks it holds, how
+ * many number suits it spans and the shapes of its exposed melds. For every
+ * value of every feature the index keeps a bitset of the patterns that admit
+ * it (in any of their templates), so the candidates for a hand are the AND of
+ * a dozen short bitsets and full matching runs only on those.
+ *
+ * Bitsets are conservative: a pattern is only left out when no template of it
+ * could take the feature value, never the other way round.
+ */
+
+import type { CompiledPattern, HandVector } from './hand-matcher';
+import {
+  FIRST_DRAGON_ID,
+  FIRST_WIND_ID,
+  FIRST_FLOWER_ID,
+  TILE_RANK,
+  TILE_SUIT,
+  TILE_FLAGS,
+  FLAG_NUMBER,
+  FLAG_DRAGON,
+  FLAG_WIND
+} from './tile-codec';
+
+const HAND_SIZE = 14;
+const FLOWER_VALUES = 9;  // 0-8 flowers
+const COPY_VALUES = 5;    // 0-4 of one wind or dragon
+const JOKER_VALUES = 9;   // 0-8 jokers
+const SUIT_VALUES = 4;    // 0-3 number suits
+const RANK_VALUES = 10;   // Ranks 1-9
+const MELD_SHAPES = 32;   // Kind (number, dragon, wind, flower) * 8 + size
+
+function meldKind(cls: number): number {
+  const flags = TILE_FLAGS[cls];
+  if (flags & FLAG_NUMBER) return 0;
+  if (flags & FLAG_DRAGON) return 1;
+  if (flags & FLAG_WIND) return 2;
+  return 3;
+}
+
+/**
+ * Shape of a packed (class << 3) | size group or meld
+ */
+function meldShape(packed: number): number {
+  return meldKind(packed >> 3) * 8 + (packed & 7);
+}
+
+export class PatternIndex {
+  readonly patterns: readonly CompiledPattern[];
+  private readonly words: number;
+  private readonly flowers: Uint32Array;
+  private readonly winds: Uint32Array[];
+  private readonly dragons: Uint32Array[];
+  private readonly jokers: Uint32Array;
+  private readonly suits: Uint32Array;
+  private readonly ranks: Uint32Array;
+  private readonly meldShapes: Uint32Array;
+  private readonly all: Uint32Array;
+  private readonly mask: Uint32Array;
+
+  constructor(patterns: readonly CompiledPattern[]) {
+    this.patterns = patterns;
+    this.words = Math.max(1, Math.ceil(patterns.length / 32));
+    const table = (values: number) => new Uint32Array(values * this.words);
+    this.flowers = table(FLOWER_VALUES);
+    this.winds = [0, 1, 2, 3].map(() => table(COPY_VALUES));
+    this.dragons = [0, 1, 2].map(() => table(COPY_VALUES));
+    this.jokers = table(JOKER_VALUES);
+    this.suits = table(SUIT_VALUES);
+    this.ranks = table(RANK_VALUES);
+    this.meldShapes = table(MELD_SHAPES);
+    this.all = table(1);
+    this.mask = table(1);
+
+    patterns.forEach((compiled, p) => {
+      this.set(this.all, 0, p);
+      for (let v = 0; v <= Math.min(compiled.maxJokers, JOKER_VALUES - 1); v++) {
+        this.set(this.jokers, v, p);
+      }
+
+      for (const template of compiled.templates) {
+        const { natural, grouped } = template;
+        const range = (bits: Uint32Array, cls: number, values: number) => {
+          for (let v = natural[cls]; v <= Math.min(natural[cls] + grouped[cls], values - 1); v++) {
+            this.set(bits, v, p);
+          }
+        };
+        range(this.flowers, FIRST_FLOWER_ID, FLOWER_VALUES);
+        for (let k = 0; k < 4; k++) range(this.winds[k], FIRST_WIND_ID + k, COPY_VALUES);
+        for (let k = 0; k < 3; k++) range(this.dragons[k], FIRST_DRAGON_ID + k, COPY_VALUES);
+
+        let suitMask = 0;
+        for (let cls = 0; cls < FIRST_DRAGON_ID; cls++) {
+          if (natural[cls] + grouped[cls] > 0) {
+            this.set(this.ranks, TILE_RANK[cls], p);
+            suitMask |= 1 << TILE_SUIT[cls];
+          }
+        }
+        const suitCount = (suitMask & 1) + ((suitMask >> 1) & 1) + ((suitMask >> 2) & 1);
+        for (let v = 0; v <= suitCount; v++) this.set(this.suits, v, p);
+
+        for (const group of template.groups) {
+          this.set(this.meldShapes, meldShape(group), p);
+        }
+      }
+    });
+  }
+
+  /**
+   * Patterns a complete 14-tile hand could match
+   */
+  candidates(vector: HandVector): CompiledPattern[] {
+    if (vector.size !== HAND_SIZE) return [];
+    const mask = this.startMask(vector);
+    if (!mask) return [];
+
+    const total = (cls: number) => vector.counts[cls] + vector.exposed[cls];
+    if (!this.and(mask, this.flowers, total(FIRST_FLOWER_ID), FLOWER_VALUES)) return [];
+    if (!this.and(mask, this.jokers, vector.jokers + vector.meldJokers, JOKER_VALUES)) return [];
+    for (let k = 0; k < 4; k++) {
+      if (!this.and(mask, this.winds[k], total(FIRST_WIND_ID + k), COPY_VALUES)) return [];
+    }
+    for (let k = 0; k < 3; k++) {
+      if (!this.and(mask, this.dragons[k], total(FIRST_DRAGON_ID + k), COPY_VALUES)) return [];
+    }
+
+    let rankMask = 0;
+    let suitMask = 0;
+    for (let cls = 0; cls < FIRST_DRAGON_ID; cls++) {
+      if (total(cls) > 0) {
+        rankMask |= 1 << TILE_RANK[cls];
+        suitMask |= 1 << TILE_SUIT[cls];
+      }
+    }
+    const suitCount = (suitMask & 1) + ((suitMask >> 1) & 1) + ((suitMask >> 2) & 1);
+    if (!this.and(mask, this.suits, suitCount, SUIT_VALUES)) return [];
+    for (let rank = 1; rank < RANK_VALUES; rank++) {
+      if ((rankMask & (1 << rank)) !== 0 && !this.and(mask, this.ranks, rank, RANK_VALUES)) return [];
+    }
+
+    return this.collect(mask);
+  }
+
+  /**
+   * Patterns a hand still being built could go for: only what cannot change
+   * any more (exposed melds and the jokers in them) is checked
+   */
+  inProgressCandidates(vector: HandVector): CompiledPattern[] {
+    const mask = this.startMask(vector);
+    if (!mask) return [];
+    if (!this.and(mask, this.jokers, vector.meldJokers, JOKER_VALUES)) return [];
+    return this.collect(mask);
+  }
+
+  private startMask(vector: HandVector): Uint32Array | null {
+    const mask = this.mask;
+    mask.set(this.all);
+    for (const meld of vector.melds) {
+      if (!this.and(mask, this.meldShapes, meldShape(meld), MELD_SHAPES)) return null;
+    }
+    return mask;
+  }
+
+  private set(bits: Uint32Array, value: number, pattern: number): void {
+    bits[value * this.words + (pattern >>> 5)] |= 1 << (pattern & 31);
+  }
+
+  /**
+   * ANDs the feature value's bitset into the mask. Returns false once the
+   * mask is empty (or the value is out of range).
+   */
+  private and(mask: Uint32Array, bits: Uint32Array, value: number, values: number): boolean {
+    if (value >= values) return false;
+    let any = 0;
+    const base = value * this.words;
+    for (let w = 0; w < this.words; w++) {
+      mask[w] &= bits[base + w];
+      any |= mask[w];
+    }
+    return any !== 0;
+  }
+
+  private collect(mask: Uint32Array): CompiledPattern[] {
+    const result: CompiledPattern[] = [];
+    for (let w = 0; w < this.words; w++) {
+      let word = mask[w];
+      while (word !== 0) {
+        const bit = 31 - Math.clz32(word & -word);
+        result.push(this.patterns[w * 32 + bit]);
+        word &= word - 1;
+      }
+    }
+    return result;
+  }
+}
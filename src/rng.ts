@@ -2,18 +2,46 @@
 /**
  * Deterministic cryptographic RNG using HMAC-SHA256 in counter mode.
  * Derives pseudorandom bytes from a (clientSeed, serverSecret) pair.
+ *
+ * Stream versions:
+ *   1 - one HMAC block per nextInt (first 4 bytes used, modulo reduction).
+ *       Kept so games created with it replay identically.
+ *   2 - HMAC blocks are generated into a refillable buffer and consumed four
+ *       bytes at a time; integers use rejection sampling (no modulo bias).
  */
 
 import * as crypto from 'crypto';
 
+export type RngVersion = 1 | 2;
+
+// Version used for new games
+export const LATEST_RNG_VERSION: RngVersion = 2;
+
+const BLOCK_BYTES = 32; // SHA-256 output
+const BLOCKS_PER_REFILL = 8;
+const UINT32_RANGE = 0x100000000;
+
 export class DeterministicRNG {
+  readonly version: RngVersion;
   private key: Buffer;
   private counter: number;
 
-  constructor(clientSeed: string, serverSecret: string) {
+  // v2 keystream buffer
+  private buffer: Buffer;
+  private bufferOffset: number;
+  private counterBytes: Buffer;
+
+  constructor(clientSeed: string, serverSecret: string, version: RngVersion = 1) {
+    if (version !== 1 && version !== 2) {
+      throw new Error(`Unsupported RNG version: ${version}`);
+    }
+    this.version = version;
     // key = HMAC(serverSecret, clientSeed)
     this.key = crypto.createHmac('sha256', serverSecret).update(clientSeed).digest();
     this.counter = 0;
+    this.buffer = Buffer.alloc(version === 2 ? BLOCK_BYTES * BLOCKS_PER_REFILL : 0);
+    this.bufferOffset = this.buffer.length;
+    this.counterBytes = Buffer.alloc(8);
   }
 
   private nextBytes(n: number): Buffer {
@@ -29,14 +57,76 @@ export class DeterministicRNG {
     return out;
   }
 
+  /**
+   * Refills the v2 buffer with HMAC(key, counter) blocks (counter as 64-bit BE)
+   */
+  private refill(): void {
+    for (let block = 0; block < BLOCKS_PER_REFILL; block++) {
+      this.counterBytes.writeUInt32BE(Math.floor(this.counter / UINT32_RANGE), 0);
+      this.counterBytes.writeUInt32BE(this.counter >>> 0, 4);
+      this.counter += 1;
+      crypto.createHmac('sha256', this.key)
+        .update(this.counterBytes)
+        .digest()
+        .copy(this.buffer, block * BLOCK_BYTES);
+    }
+    this.bufferOffset = 0;
+  }
+
+  /**
+   * Returns the next raw 32-bit unsigned value from the stream
+   */
+  public nextUint32(): number {
+    if (this.version === 1) {
+      return this.nextBytes(4).readUInt32BE(0);
+    }
+    if (this.bufferOffset + 4 > this.buffer.length) {
+      this.refill();
+    }
+    const v = this.buffer.readUInt32BE(this.bufferOffset);
+    this.bufferOffset += 4;
+    return v;
+  }
+
   // Returns integer in [0, max)
   public nextInt(max: number): number {
     if (max <= 0) throw new Error('max must be positive');
-    // use 4 bytes
-    const bytes = this.nextBytes(4);
-    const v = bytes.readUInt32BE(0);
+    if (this.version === 1) {
+      // use 4 bytes
+      return this.nextUint32() % max;
+    }
+    // Reject values from the incomplete final bucket so every result is equally likely
+    const limit = UINT32_RANGE - (UINT32_RANGE % max);
+    let v = this.nextUint32();
+    while (v >= limit) {
+      v = this.nextUint32();
+    }
     return v % max;
   }
+
+  /**
+   * Draws one integer in [0, maxes[i]) for each entry, in order.
+   * Equivalent to calling nextInt for each max.
+   */
+  public nextInts(maxes: ArrayLike<number>, out: Uint32Array = new Uint32Array(maxes.length)): Uint32Array {
+    if (out.length < maxes.length) {
+      throw new Error('Output array is too small');
+    }
+    for (let i = 0; i < maxes.length; i++) {
+      out[i] = this.nextInt(maxes[i]);
+    }
+    return out;
+  }
+
+  /**
+   * Fills an array with raw 32-bit values from the stream
+   */
+  public fillUint32(array: Uint32Array): Uint32Array {
+    for (let i = 0; i < array.length; i++) {
+      array[i] = this.nextUint32();
+    }
+    return array;
+  }
 }
 
 export function shuffle<T>(arr: T[], rng: DeterministicRNG): T[] {
@@ -8,6 +8,9 @@ import { parsePatternToTiles } from './tiles';
 import * as fs from 'fs';
 import * as path from 'path';
 
+/** Source of the 2024 card (see rulecard-registry.ts for the compiled form) */
+export const HANDS_2024_PATH = path.join(__dirname, 'data', '2024 Hands.json');
+
 /**
  * Determines if a pattern string contains flowers
  */
@@ -184,8 +187,7 @@ export function load2024RuleCard(): RuleCard {
   const patterns: HandPattern[] = [];
   
   // Load JSON data
-  const jsonPath = path.join(__dirname, 'data', '2024 Hands.json');
-  const ruleCardData = JSON.parse(fs.readFileSync(jsonPath, 'utf8'));
+  const ruleCardData = JSON.parse(fs.readFileSync(HANDS_2024_PATH, 'utf8'));
   const yearData = ruleCardData['2024'] as Record<string, Record<string, string[]>>;
   
   // Parse each category
@@ -0,0 +1,193 @@
+/**
+ * Process-wide registry of frozen, compiled rule cards
+ *
+ * Cards are keyed by year (and source) and by a hash of their content. The
+ * built-in cards load lazily, once, from the artifact build-rule-cards.ts
+ * writes at build time (data/rule-cards.json): the parsed cards together with
+ * their compiled match templates, so neither the card sources nor the hand
+ * patterns are parsed or compiled at startup. Without the artifact the cards
+ * are built from their sources on first use instead.
+ *
+ * The first card registered for a year is its default. Registering a card
+ * with the same content as one already held returns the held instance, so
+ * game states for the same card all share one object.
+ */
+
+import * as fs from 'fs';
+import * as path from 'path';
+import { RuleCard } from './types';
+import { load2024RuleCard, HANDS_2024_PATH } from './rulecard-parser';
+import { buildNmjlRuleCard, nmjlCardYears, NMJL_CARD_PATH } from './nmjl_loader';
+import {
+  SerializedTemplate,
+  getCompiledRuleCard,
+  restoreCompiledRuleCard,
+  serializeTemplates
+} from './hand-matcher';
+
+export const RULE_CARD_ARTIFACT = 'rule-cards.json';
+const ARTIFACT_VERSION = 1;
+
+/** Where a card came from: the detailed 2024 card, the generic NMJL cards, or an upload */
+export type RuleCardSource = 'hands' | 'nmjl' | 'custom';
+
+export interface RuleCardInfo {
+  name: string;
+  year: number;
+  source: RuleCardSource;
+  hash: string;
+}
+
+export interface RuleCardArtifactEntry {
+  year: number;
+  source: RuleCardSource;
+  hash: string;
+  card: RuleCard;
+  templates: SerializedTemplate[][]; // Compiled templates, one list per pattern
+}
+
+export interface RuleCardArtifact {
+  version: number;
+  sourceHashes: Record<string, string>; // Content hash of each source file, by file name
+  cards: RuleCardArtifactEntry[];
+}
+
+type RegisteredCard = RuleCardInfo & { card: RuleCard };
+
+const cardsByHash = new Map<string, RegisteredCard>();
+const cards: RegisteredCard[] = [];
+let builtinsLoaded = false;
+
+/**
+ * FNV-1a of a string as 8 hex digits
+ */
+function fnv1a(text: string): string {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < text.length; i++) {
+    hash = Math.imul(hash ^ text.charCodeAt(i), 0x01000193);
+  }
+  return (hash >>> 0).toString(16).padStart(8, '0');
+}
+
+/**
+ * Hash of a card's content (patterns, rules and scoring)
+ */
+export function ruleCardHash(card: RuleCard): string {
+  return fnv1a(JSON.stringify(card));
+}
+
+function deepFreeze<T>(value: T): T {
+  if (value && typeof value === 'object' && !Object.isFrozen(value)) {
+    Object.freeze(value);
+    for (const child of Object.values(value as Record<string, unknown>)) {
+      deepFreeze(child);
+    }
+  }
+  return value;
+}
+
+function register(
+  card: RuleCard,
+  year: number,
+  source: RuleCardSource,
+  hash: string,
+  templates?: SerializedTemplate[][]
+): RuleCard {
+  const held = cardsByHash.get(hash);
+  if (held) return held.card;
+
+  const frozen = deepFreeze(card);
+  if (templates) {
+    restoreCompiledRuleCard(frozen, templates);
+  } else {
+    getCompiledRuleCard(frozen);
+  }
+  const entry: RegisteredCard = { name: frozen.name, year, source, hash, card: frozen };
+  cards.push(entry);
+  cardsByHash.set(hash, entry);
+  return frozen;
+}
+
+/**
+ * Adds a card to the registry, frozen and compiled, and returns the shared
+ * instance. A card with the same content as a registered one is not added
+ * again; the registered instance is returned.
+ */
+export function registerRuleCard(card: RuleCard, source: RuleCardSource = 'custom'): RuleCard {
+  loadBuiltinCards();
+  return register(card, card.year, source, ruleCardHash(card));
+}
+
+/**
+ * The default card for a year, or the year's card from a given source
+ */
+export function getRuleCard(year: number, source?: RuleCardSource): RuleCard {
+  loadBuiltinCards();
+  const entry = cards.find(c => c.year === year && (source === undefined || c.source === source));
+  if (!entry) {
+    throw new Error(`No rule card for year ${year}${source ? ` from ${source}` : ''}`);
+  }
+  return entry.card;
+}
+
+export function getRuleCardByHash(hash: string): RuleCard | undefined {
+  loadBuiltinCards();
+  return cardsByHash.get(hash)?.card;
+}
+
+export function listRuleCards(): RuleCardInfo[] {
+  loadBuiltinCards();
+  return cards.map(({ name, year, source, hash }) => ({ name, year, source, hash }));
+}
+
+/**
+ * Parses and compiles the built-in cards from their sources, in registration
+ * order (each year's default first)
+ */
+export function buildRuleCardArtifact(): RuleCardArtifact {
+  const builtins: Array<{ year: number; source: RuleCardSource; card: RuleCard }> = [
+    { year: 2024, source: 'hands', card: load2024RuleCard() },
+    ...nmjlCardYears().map(year => ({ year, source: 'nmjl' as const, card: buildNmjlRuleCard(year) }))
+  ];
+  return {
+    version: ARTIFACT_VERSION,
+    sourceHashes: sourceHashes(),
+    cards: builtins.map(({ year, source, card }) => ({
+      year,
+      source,
+      hash: ruleCardHash(card),
+      card,
+      // Compiled from a copy so the artifact's card stays unfrozen and uncached
+      templates: getCompiledRuleCard(JSON.parse(JSON.stringify(card))).patterns.map(serializeTemplates)
+    }))
+  };
+}
+
+/**
+ * Content hashes of the card source files, to tell a stale artifact
+ */
+export function sourceHashes(): Record<string, string> {
+  const hashes: Record<string, string> = {};
+  for (const file of [HANDS_2024_PATH, NMJL_CARD_PATH]) {
+    hashes[path.basename(file)] = fnv1a(fs.readFileSync(file, 'utf8'));
+  }
+  return hashes;
+}
+
+function loadBuiltinCards(): void {
+  if (builtinsLoaded) return;
+  builtinsLoaded = true;
+
+  const file = path.join(__dirname, 'data', RULE_CARD_ARTIFACT);
+  let artifact: RuleCardArtifact | undefined;
+  if (fs.existsSync(file)) {
+    const parsed = JSON.parse(fs.readFileSync(file, 'utf8')) as RuleCardArtifact;
+    if (parsed.version === ARTIFACT_VERSION) artifact = parsed;
+  }
+  if (!artifact) {
+    artifact = buildRuleCardArtifact();
+  }
+  for (const entry of artifact.cards) {
+    register(entry.card, entry.year, entry.source, entry.hash, entry.templates);
+  }
+}
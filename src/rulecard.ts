@@ -5,7 +5,10 @@
 import { HandPattern, HandCategory, RuleCard, Tile, Meld } from './types';
 import { getTileSuit, getTileValue, getMatchingDragon, getOppositeDragons } from './tiles';
 import { load2024RuleCard, getHandsByCategory, findHandByName } from './rulecard-parser';
-import { validateSuitConstraints, couldMatchPattern } from './suit-validator';
+import { couldMatchPattern } from './suit-validator';
+import { handWithMelds } from './hand-counts';
+import { getCompiledPattern, getCompiledRuleCard, toHandVector, matchCompiledPattern } from './hand-matcher';
+import { getRuleCard } from './rulecard-registry';
 
 /**
  * Creates the 2024 American Mahjong rulecard from JSON data
@@ -14,6 +17,15 @@ export function create2024AmericanRuleCard(): RuleCard {
   return load2024RuleCard();
 }
 
+/**
+ * The 2024 rulecard as a single frozen instance shared by every game.
+ * Game states hold a reference to it and never copy it. It comes from the
+ * rule-card registry with its hand patterns already compiled.
+ */
+export function getShared2024RuleCard(): RuleCard {
+  return getRuleCard(2024);
+}
+
 /**
  * Gets all hands for a specific category
  */
@@ -27,8 +39,8 @@ export function validateHandPattern(hand: Tile[], melds: Meld[], pattern: HandPa
   error?: string;
   jokerCount?: number;
 } {
-  const allTiles = [...hand, ...melds.flatMap(m => m.tiles)];
-  const jokerCount = allTiles.filter(t => t === 'J').length;
+  const allTiles = handWithMelds(hand, melds);
+  const jokerCount = allTiles.jokerCount;
   
   if (pattern.specialRules?.noJokers && jokerCount > 0) {
     return { valid: false, error: 'This hand pattern does not allow jokers' };
@@ -41,17 +53,14 @@ export function validateHandPattern(hand: Tile[], melds: Meld[], pattern: HandPa
     };
   }
 
-  if (allTiles.length !== 14) {
+  if (allTiles.size !== 14) {
     return { valid: false, error: 'Hand must contain exactly 14 tiles' };
   }
 
-  // Use new suit constraint validation
-  const suitResult = validateSuitConstraints(hand, melds, pattern);
-  if (!suitResult.valid) {
-    return { 
-      valid: false, 
-      error: `Suit constraint violation: ${suitResult.errors.join(', ')}` 
-    };
+  // Match against the pattern's compiled templates (every suit assignment)
+  const vector = toHandVector(hand, melds);
+  if (!vector || !matchCompiledPattern(getCompiledPattern(pattern), vector)) {
+    return { valid: false, error: `Hand does not match ${pattern.name}` };
   }
   
   return { 
@@ -64,9 +73,12 @@ export function validateHandPattern(hand: Tile[], melds: Meld[], pattern: HandPa
  * Gets all possible hands that a player could be working towards
  */
 export function getPossibleHands(hand: Tile[], melds: Meld[], ruleCard: RuleCard): HandPattern[] {
-  return ruleCard.patterns.filter(pattern => {
-    return couldMatchPattern(hand, melds, pattern);
-  });
+  // Exposures rule out most lines before any pattern is checked
+  const vector = toHandVector(hand, melds);
+  if (!vector) return [];
+  return getCompiledRuleCard(ruleCard).index.inProgressCandidates(vector)
+    .map(compiled => compiled.pattern)
+    .filter(pattern => couldMatchPattern(hand, melds, pattern));
 }
 
 /**
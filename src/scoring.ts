@@ -4,7 +4,17 @@
  */
 
 import { RuleCard, HandPattern, Tile, Meld, GameState, PlayerId } from './types';
-import { validateHandPattern } from './rulecard';
+import { HandCounts } from './hand-counts';
+import { getCompiledRuleCard, toHandVector } from './hand-matcher';
+import { getWinTable } from './win-table';
+import { getEvalCache } from './eval-cache';
+
+/**
+ * How scoreHand finds the patterns a hand completes: the compiled matcher,
+ * or one probe of the card's precomputed win table (see win-table.ts), which
+ * falls back to the matcher for cards without a shipped table
+ */
+export type HandEvaluation = 'matcher' | 'table';
 
 export type ScoringResult = {
   valid: boolean;
@@ -23,33 +33,34 @@ export type ScoringResult = {
 
 /**
  * Analyze a set of tiles and melds to identify matching patterns.
+ * Matcher results are memoized in the shared evaluation cache.
  */
 function findMatchingPatterns(
   tiles: Tile[],
   melds: Meld[],
-  patterns: HandPattern[]
+  ruleCard: RuleCard,
+  evaluation: HandEvaluation
 ): { pattern: HandPattern; errors?: string[] }[] {
-  return patterns
-    .map(pattern => {
-      const validation = validateHandPattern(tiles, melds, pattern);
-      return {
-        pattern,
-        errors: validation.valid ? [] : [validation.error || 'Pattern validation failed']
-      };
-    })
-    .filter(result => !result.errors || result.errors.length === 0);
+  const vector = toHandVector(tiles, melds);
+  if (!vector) return [];
+  const compiled = getCompiledRuleCard(ruleCard);
+  const table = evaluation === 'table' ? getWinTable(ruleCard) : null;
+  if (table) {
+    return table.matchPatterns(compiled, vector).map(({ pattern }) => ({ pattern, errors: [] }));
+  }
+  return getEvalCache().matchPatterns(compiled, vector).map(({ pattern }) => ({ pattern, errors: [] }));
 }
 
 /**
  * Calculate bonuses for a winning hand.
  */
 function calculateBonuses(
-  tiles: Tile[],
+  counts: HandCounts,
   melds: Meld[],
   scoring: RuleCard['scoring'],
   selfDraw: boolean
 ): { flowerBonus: number; selfDrawBonus: number; kongBonus: number } {
-  const flowerCount = tiles.filter(t => t.startsWith('F')).length;
+  const flowerCount = counts.flowerCount;
   const kongCount = melds.filter(m => m.type === 'kong').length;
 
   return {
@@ -80,7 +91,8 @@ function calculatePenalties(
 export function scoreHand(
   state: GameState,
   player: PlayerId,
-  ruleCard: RuleCard
+  ruleCard: RuleCard,
+  evaluation: HandEvaluation = 'matcher'
 ): ScoringResult {
   const playerState = state.players[player];
   if (!playerState) {
@@ -90,7 +102,7 @@ export function scoreHand(
   const { hand, melds } = playerState;
 
   // Find matching patterns
-  const matches = findMatchingPatterns(hand, melds, ruleCard.patterns);
+  const matches = findMatchingPatterns(hand, melds, ruleCard, evaluation);
   if (matches.length === 0) {
     return {
       valid: false,
@@ -114,7 +126,7 @@ export function scoreHand(
   // Calculate bonuses
   const lastMove = state.logs[state.logs.length - 1];
   const selfDraw = lastMove?.type === 'draw' && lastMove.player === player;
-  const bonuses = calculateBonuses(hand, melds, ruleCard.scoring, selfDraw);
+  const bonuses = calculateBonuses(HandCounts.fromTiles(hand), melds, ruleCard.scoring, selfDraw);
   const penalties = calculatePenalties(state, player, ruleCard.scoring);
 
   // Calculate total score
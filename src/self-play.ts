@@ -0,0 +1,370 @@
+/**
+ * Headless self-play
+ *
+ * Plays complete games (deal, Charleston, play to mahjong or an empty wall)
+ * between bot policies and gathers what happened into SelfPlayStats: wins by
+ * pattern, game length, wall games and Charleston votes. Everything a game
+ * does follows from its seeds: game i of a run deals from
+ * DeterministicRNG(`game-${i}`, seed) with dealer i % 4, blind passes use the
+ * table's Charleston stream and random policies one of their own, and no
+ * decision has a time budget, so a run replays exactly whatever the sharding.
+ *
+ * Only the seats whose claim sets (see DistanceCache) could use a discard are
+ * asked about it, mahjong first, then exposures, each in turn order from the
+ * discarder; then the seat on turn plays. Each seat's distances are kept in
+ * step with the game and handed to its policy.
+ *
+ * runSelfPlay shards the games over a worker pool and reports each shard as
+ * it lands. Run from the command line:
+ *
+ *   node dist/self-play.js [games] [--seed S] [--workers N] [--shard N]
+ *                          [--policies greedy,greedy,random,greedy]
+ *                          [--policy-module path] [--json]
+ */
+
+import * as os from 'os';
+import * as path from 'path';
+import { performance } from 'perf_hooks';
+import { GameState, Move, PlayerId, RuleCard } from './types';
+import { startNewGame, processMove } from './engine';
+import {
+  initializeCharleston,
+  allPlayersReady,
+  executeCharlestonPass,
+  processVoteResults,
+  executeCourtesyPass,
+  tallyVotes,
+  createCharlestonRng
+} from './charleston-manager';
+import { BotAction, BotPolicy, getBotPolicy, getBotView, submitCharlestonAction } from './bot';
+import { DistanceCache } from './hand-distance';
+import { matchHand } from './hand-matcher';
+import { DeterministicRNG } from './rng';
+import { WorkerPool } from './worker-pool';
+
+const SEATS = [0, 1, 2, 3] as PlayerId[];
+// Exposure sizes a discard can be called for
+const EXPOSURE_SIZES = [3, 4, 5];
+
+export interface PatternStats {
+  category: string;
+  points: number;         // As the card scores it
+  allowedJokers: number;  // As the card allows
+  wins: number;
+  selfDrawn: number;      // Wins on a tile from the wall
+  jokers: number;         // Jokers held in winning hands, summed
+}
+
+export interface SelfPlayStats {
+  games: number;
+  wins: number;
+  wallGames: number;        // Games that ended with the wall empty
+  moves: number;            // Moves played after the Charleston, summed
+  discards: number;         // Summed, so turns per game is discards / games
+  claims: number;           // Exposures called
+  secondCharlestons: number;
+  votes: number[];          // Games by number of "yes" votes (0-4)
+  patterns: Record<string, PatternStats>;  // Winning patterns only
+  policies: Record<string, { seats: number; wins: number }>;  // Seats played and won per policy
+}
+
+export interface SelfPlayShard {
+  seed: string;
+  from: number;             // Games [from, to) of the run
+  to: number;
+  policies: string[];       // Policy per seat, by name
+  policyModules?: string[]; // Modules registering further policies
+}
+
+export function emptySelfPlayStats(): SelfPlayStats {
+  return {
+    games: 0,
+    wins: 0,
+    wallGames: 0,
+    moves: 0,
+    discards: 0,
+    claims: 0,
+    secondCharlestons: 0,
+    votes: [0, 0, 0, 0, 0],
+    patterns: {},
+    policies: {}
+  };
+}
+
+/**
+ * Adds one set of statistics into another
+ */
+export function mergeSelfPlayStats(into: SelfPlayStats, from: SelfPlayStats): SelfPlayStats {
+  into.games += from.games;
+  into.wins += from.wins;
+  into.wallGames += from.wallGames;
+  into.moves += from.moves;
+  into.discards += from.discards;
+  into.claims += from.claims;
+  into.secondCharlestons += from.secondCharlestons;
+  from.votes.forEach((count, yes) => (into.votes[yes] += count));
+  for (const [name, stats] of Object.entries(from.patterns)) {
+    const total = (into.patterns[name] ??= { ...stats, wins: 0, selfDrawn: 0, jokers: 0 });
+    total.wins += stats.wins;
+    total.selfDrawn += stats.selfDrawn;
+    total.jokers += stats.jokers;
+  }
+  for (const [name, stats] of Object.entries(from.policies)) {
+    const total = (into.policies[name] ??= { seats: 0, wins: 0 });
+    total.seats += stats.seats;
+    total.wins += stats.wins;
+  }
+  return into;
+}
+
+function runCharleston(state: GameState, policies: BotPolicy[], card: RuleCard, rng: DeterministicRNG,
+  stats: SelfPlayStats, seeds: { clientSeed: string; serverSecret: string }): GameState {
+  const charlestonRng = createCharlestonRng(seeds.clientSeed, seeds.serverSecret, state.rngVersion);
+  while (state.phase === 'charleston' && state.charleston && !state.charleston.completed) {
+    for (const seat of SEATS) {
+      const action = policies[seat].decide(card, getBotView(state, seat), { rng });
+      if (!submitCharlestonAction(state, seat, action)) {
+        throw new Error(`Policy ${policies[seat].name} made an invalid Charleston choice for seat ${seat}`);
+      }
+    }
+    if (!allPlayersReady(state.charleston)) {
+      throw new Error('Charleston stalled with seats not ready');
+    }
+    const phase = state.charleston.phase;
+    if (phase === 'vote') {
+      const { yes } = tallyVotes(state.charleston);
+      stats.votes[yes]++;
+      state = processVoteResults(state);
+      if (state.charleston!.phase !== 'courtesy') stats.secondCharlestons++;
+    } else if (phase === 'courtesy') {
+      state = executeCourtesyPass(state);
+    } else {
+      state = executeCharlestonPass(state, charlestonRng);
+    }
+  }
+  return state;
+}
+
+/**
+ * The move a seat's policy makes, if any
+ */
+function moveOf(action: BotAction): Move | undefined {
+  return action.type === 'move' ? action.move : undefined;
+}
+
+/**
+ * Plays game `index` of a run and adds it to the statistics
+ */
+export function playSelfPlayGame(seed: string, index: number, policies: BotPolicy[], stats: SelfPlayStats): GameState {
+  const seeds = { clientSeed: `game-${index}`, serverSecret: seed };
+  let state = initializeCharleston(startNewGame(seeds.clientSeed, seeds.serverSecret, (index % 4) as PlayerId));
+  const card = state.options.ruleCard;
+  const rng = new DeterministicRNG(`${seeds.clientSeed}:policies`, seeds.serverSecret, state.rngVersion);
+
+  state = runCharleston(state, policies, card, rng, stats, seeds);
+
+  // Only seats offered a discard look at their claim sets
+  const cache = new DistanceCache(state, { lazyClaimSets: true });
+  let moves = 0;
+  for (;;) {
+    let move: Move | undefined;
+
+    const top = state.discardPile[state.discardPile.length - 1];
+    if (state.lastAction?.type === 'discard' && top) {
+      // Callers in turn order from the discarder; mahjong beats an exposure
+      let exposure: Move | undefined;
+      for (let offset = 1; offset < 4 && !move; offset++) {
+        const seat = ((top.player + offset) % 4) as PlayerId;
+        const wins = cache.canWinOn(seat, top.tile);
+        if (!wins && (exposure || !EXPOSURE_SIZES.some(size => cache.canExposeWith(seat, top.tile, size)))) continue;
+        const call = moveOf(policies[seat].decide(card, getBotView(state, seat), { distance: cache.forPlayer(seat), rng }));
+        if (call?.type === 'declareMahjong') move = call;
+        else if (call?.type === 'claim' && !exposure) exposure = call;
+      }
+      move ??= exposure;
+    }
+    if (!move) {
+      const seat = state.currentPlayer;
+      move = moveOf(policies[seat].decide(card, getBotView(state, seat), { distance: cache.forPlayer(seat), rng }));
+    }
+    if (!move) break;
+
+    state = processMove(state, move);
+    cache.sync(state);
+    moves++;
+    if (move.type === 'discard') stats.discards++;
+    if (move.type === 'claim') stats.claims++;
+  }
+
+  stats.games++;
+  stats.moves += moves;
+  for (const seat of SEATS) {
+    (stats.policies[policies[seat].name] ??= { seats: 0, wins: 0 }).seats++;
+  }
+  if (state.phase === 'complete') {
+    const winner = state.currentPlayer;
+    const player = state.players[winner];
+    const match = matchHand(card, player.hand, player.melds);
+    if (!match) throw new Error(`Seat ${winner} went mahjong without a winning hand`);
+    const pattern = match.pattern;
+    const entry = (stats.patterns[pattern.name] ??= {
+      category: pattern.category,
+      points: pattern.points,
+      allowedJokers: pattern.allowedJokers,
+      wins: 0,
+      selfDrawn: 0,
+      jokers: 0
+    });
+    entry.wins++;
+    if (state.lastAction?.tile === undefined) entry.selfDrawn++;
+    entry.jokers += player.hand.filter(tile => tile === 'J').length
+      + player.melds.reduce((sum, meld) => sum + meld.tiles.filter(tile => tile === 'J').length, 0);
+    stats.wins++;
+    stats.policies[policies[winner].name].wins++;
+  } else if (state.wall.length === 0) {
+    stats.wallGames++;
+  } else {
+    throw new Error(`Game ${index} stalled with ${state.wall.length} tiles in the wall`);
+  }
+  return state;
+}
+
+/**
+ * Plays one shard of a run (the selfPlay worker task)
+ */
+export function playSelfPlayShard(shard: SelfPlayShard): SelfPlayStats {
+  for (const module of shard.policyModules ?? []) require(module);
+  const policies = shard.policies.map(getBotPolicy);
+  if (policies.length !== 4) throw new Error('Self-play needs a policy for each of the four seats');
+  const stats = emptySelfPlayStats();
+  for (let index = shard.from; index < shard.to; index++) {
+    playSelfPlayGame(shard.seed, index, policies, stats);
+  }
+  return stats;
+}
+
+export interface SelfPlayOptions {
+  games: number;
+  seed?: string;            // Default 'self-play'
+  workers?: number;         // Worker threads (default: one per CPU; 0 plays inline)
+  shardSize?: number;       // Games per task (default 250)
+  policies?: string[];      // Policy per seat (default greedy all round)
+  policyModules?: string[]; // Modules registering further policies, loaded by every worker
+}
+
+/**
+ * Plays a run of games across a worker pool. onShard sees the running total
+ * and each shard's own statistics as shards finish (in any order).
+ */
+export async function runSelfPlay(
+  options: SelfPlayOptions,
+  onShard?: (total: SelfPlayStats, shard: SelfPlayStats) => void
+): Promise<SelfPlayStats> {
+  const seed = options.seed ?? 'self-play';
+  const shardSize = Math.max(1, options.shardSize ?? 250);
+  const policies = options.policies ?? ['greedy', 'greedy', 'greedy', 'greedy'];
+  const policyModules = (options.policyModules ?? []).map(module => path.resolve(module));
+  // Fail on a bad policy here rather than in every worker
+  for (const module of policyModules) require(module);
+  if (policies.length !== 4) throw new Error('Self-play needs a policy for each of the four seats');
+  policies.forEach(getBotPolicy);
+
+  const pool = new WorkerPool({ size: options.workers ?? os.cpus().length });
+  const total = emptySelfPlayStats();
+  try {
+    const shards: Promise<void>[] = [];
+    for (let from = 0; from < options.games; from += shardSize) {
+      const to = Math.min(options.games, from + shardSize);
+      shards.push(pool.run('selfPlay', { seed, from, to, policies, policyModules }).then(stats => {
+        mergeSelfPlayStats(total, stats);
+        onShard?.(total, stats);
+      }));
+    }
+    await Promise.all(shards);
+  } finally {
+    await pool.close();
+  }
+  return total;
+}
+
+function percent(count: number, of: number): string {
+  return `${of > 0 ? ((100 * count) / of).toFixed(1) : '0.0'}%`;
+}
+
+/**
+ * Plain-text report of a run: rates, then patterns by wins
+ */
+export function formatSelfPlayReport(stats: SelfPlayStats): string {
+  const lines: string[] = [];
+  const games = stats.games;
+  lines.push(`${games.toLocaleString()} games`);
+  lines.push(`  mahjong           ${percent(stats.wins, games)}`);
+  lines.push(`  wall games        ${percent(stats.wallGames, games)}`);
+  lines.push(`  moves per game    ${(stats.moves / Math.max(1, games)).toFixed(1)}`);
+  lines.push(`  turns per game    ${(stats.discards / Math.max(1, games)).toFixed(1)}`);
+  lines.push(`  exposures / game  ${(stats.claims / Math.max(1, games)).toFixed(2)}`);
+  lines.push(`  second Charleston ${percent(stats.secondCharlestons, games)}`);
+  lines.push(`  yes votes         ${stats.votes.map((count, yes) => `${yes}: ${percent(count, games)}`).join('  ')}`);
+  for (const [name, policy] of Object.entries(stats.policies)) {
+    lines.push(`  policy ${name.padEnd(10)} wins ${percent(policy.wins, policy.seats)} of seats`);
+  }
+
+  lines.push('');
+  lines.push(`${'pattern'.padEnd(36)} ${'category'.padEnd(14)} ${'pts'.padStart(4)} ${'jkr'.padStart(4)} ` +
+    `${'wins'.padStart(8)} ${'win rate'.padStart(9)} ${'self-drawn'.padStart(10)} ${'avg jokers'.padStart(10)}`);
+  const patterns = Object.entries(stats.patterns).sort((a, b) => b[1].wins - a[1].wins || a[0].localeCompare(b[0]));
+  for (const [name, pattern] of patterns) {
+    lines.push(`${name.padEnd(36)} ${pattern.category.padEnd(14)} ${String(pattern.points).padStart(4)} ` +
+      `${String(pattern.allowedJokers).padStart(4)} ${pattern.wins.toLocaleString().padStart(8)} ` +
+      `${percent(pattern.wins, games).padStart(9)} ${percent(pattern.selfDrawn, pattern.wins).padStart(10)} ` +
+      `${(pattern.jokers / pattern.wins).toFixed(2).padStart(10)}`);
+  }
+  return lines.join('\n');
+}
+
+async function main(): Promise<void> {
+  const args = process.argv.slice(2);
+  const options: SelfPlayOptions = { games: 10000, policyModules: [] };
+  let json = false;
+  for (let i = 0; i < args.length; i++) {
+    const arg = args[i];
+    const value = () => {
+      const next = args[++i];
+      if (next === undefined) throw new Error(`${arg} needs a value`);
+      return next;
+    };
+    if (arg === '--seed') options.seed = value();
+    else if (arg === '--workers') options.workers = parseInt(value(), 10);
+    else if (arg === '--shard') options.shardSize = parseInt(value(), 10);
+    else if (arg === '--policies') options.policies = value().split(',');
+    else if (arg === '--policy-module') options.policyModules!.push(value());
+    else if (arg === '--json') json = true;
+    else if (/^\d+$/.test(arg)) options.games = parseInt(arg, 10);
+    else throw new Error(`Unknown argument: ${arg}`);
+  }
+
+  const start = performance.now();
+  let lastReport = 0;
+  const stats = await runSelfPlay(options, total => {
+    const now = performance.now();
+    if (now - lastReport < 1000 && total.games < options.games) return;
+    lastReport = now;
+    const perMinute = Math.round((total.games * 60000) / (now - start));
+    process.stderr.write(`${total.games.toLocaleString()}/${options.games.toLocaleString()} games, ` +
+      `${perMinute.toLocaleString()} games/min, mahjong ${percent(total.wins, total.games)}, ` +
+      `wall ${percent(total.wallGames, total.games)}\n`);
+  });
+
+  if (json) {
+    console.log(JSON.stringify(stats, null, 2));
+  } else {
+    console.log(formatSelfPlayReport(stats));
+  }
+}
+
+if (require.main === module) {
+  main().catch(err => {
+    console.error(err);
+    process.exit(1);
+  });
+}
@@ -1,7 +1,11 @@
 // path: mahjong-ts/src/server/rest/api.ts
 import http from 'http';
 import { URL } from 'url';
-import { load2024RuleCard } from '../../rulecard-parser';
+import { listRuleCards, registerRuleCard, ruleCardHash } from '../../rulecard-registry';
+import { getEventStore } from '../../event-store';
+
+// Same password the WebSocket server's admin_auth checks
+const ADMIN_PASSWORD = process.env.ADMIN_PASSWORD || 'admin123';
 
 type Handler = (req: http.IncomingMessage, res: http.ServerResponse, body?: any) => Promise<void> | void;
 
@@ -11,6 +15,11 @@ function json(res: http.ServerResponse, code: number, data: any) {
   res.end(JSON.stringify(data));
 }
 
+// Admin requests carry the admin password as a bearer token
+function isAdmin(req: http.IncomingMessage): boolean {
+  return req.headers.authorization === `Bearer ${ADMIN_PASSWORD}`;
+}
+
 function readBody(req: http.IncomingMessage): Promise<any> {
   return new Promise((resolve) => {
     const chunks: Buffer[] = [];
@@ -26,19 +35,23 @@ const routes: { method: string; path: RegExp; handler: Handler }[] = [];
 
 function route(method: string, path: RegExp, handler: Handler) { routes.push({ method, path, handler }); }
 
-// List rule cards (built-in 2024/2025)
+// List rule cards (built-in and uploaded)
 route('GET', /^\/rule_cards$/, (req, res) => {
-  json(res, 200, [{ name: 'NMJL 2024', year: 2024 }, { name: 'NMJL 2025', year: 2025 }]);
+  json(res, 200, listRuleCards());
 });
 
-// Upload custom rule card
+// Upload custom rule card (admin only: registered cards are kept for the
+// life of the process)
 route('POST', /^\/rule_cards$/, async (req, res, body) => {
-  if (!body?.name || !body?.year || !Array.isArray(body?.patterns)) {
+  if (!isAdmin(req)) {
+    return json(res, 401, { error: 'unauthorized' });
+  }
+  if (!body?.name || !Number.isInteger(body?.year) || !Array.isArray(body?.patterns)) {
     return json(res, 400, { error: 'invalid_rule_card' });
   }
   try {
-    load2024RuleCard();
-    return json(res, 200, { ok: true });
+    const card = registerRuleCard(body);
+    return json(res, 200, { ok: true, hash: ruleCardHash(card) });
   } catch (e: any) {
     return json(res, 400, { error: 'invalid_rule_card', message: e?.message });
   }
@@ -56,9 +69,25 @@ route('POST', /^\/games\/([^/]+)\/join$/, async (req, res) => {
   return json(res, 200, { ok: true });
 });
 
-// Get replay
+// Get replay: the state after `from` moves plus the moves in [from, to).
+// Nobody is seated here, so a live game shows no concealed tiles.
 route('GET', /^\/games\/([^/]+)\/replay$/, async (req, res) => {
-  return json(res, 200, { logs: [] });
+  const url = new URL(req.url || '/', 'http://localhost');
+  const gameId = decodeURIComponent(url.pathname.split('/')[2]);
+  const events = getEventStore(gameId);
+  if (!events) return json(res, 404, { error: 'not_found' });
+
+  const from = Math.min(Math.max(0, Number(url.searchParams.get('from')) || 0), events.length);
+  const toParam = url.searchParams.get('to');
+  const to = toParam === null ? events.length : Math.min(Math.max(from, Number(toParam) || 0), events.length);
+  const replay = events.replay(from, to);
+  return json(res, 200, {
+    startIndex: from,
+    state: replay.state,
+    checkpoints: replay.checkpoints,
+    logs: replay.logs,
+    nextIndex: to < events.length ? to : undefined
+  });
 });
 
 export function startRestServer(port = 3000) {
@@ -115,6 +115,17 @@ export type CharlestonCourtesyMsg = BaseMsg & {
   targetPlayer: number; // PlayerId to trade with
 };
 
+export type CharlestonHintMsg = BaseMsg & {
+  type: 'charleston_hint';
+  tableId: string;
+  count?: number; // Tiles to pass from the hand (default 3; fewer when passing blind)
+};
+
+export type FillWithBotsMsg = BaseMsg & {
+  type: 'fill_with_bots';
+  tableId: string; // Creator only, before the game starts
+};
+
 export type ClientToServer =
   | AuthMsg
   | SubscribeMsg
@@ -132,10 +143,15 @@ export type ClientToServer =
   | CharlestonSelectMsg
   | CharlestonReadyMsg
   | CharlestonVoteMsg
-  | CharlestonCourtesyMsg;
+  | CharlestonCourtesyMsg
+  | CharlestonHintMsg
+  | FillWithBotsMsg;
 
 // Server -> Client
-export type GameStateDelta = Partial<GameState> & { logsAppend?: GameState['logs'] };
+export type GameStateDelta = Partial<GameState> & {
+  logsAppend?: GameState['logs'];
+  deadPlayers?: PlayerId[]; // Seats whose hands became dead with this update
+};
 
 export type GameStateUpdateMsg = BaseMsg & {
   type: 'game_state_update';
@@ -156,6 +172,8 @@ export type ReplayChunkMsg = BaseMsg & {
   type: 'replay_chunk';
   tableId: string;
   startIndex: number;
+  state?: GameState; // State before logs[0]; sent with the first chunk of a replay
+  checkpoints?: { index: number; state: GameState }[]; // States reached without a move, with the first chunk
   logs: GameState['logs'];
   nextIndex?: number;
 };
@@ -207,6 +225,7 @@ export type PlayerInfo = {
   seatPosition?: number; // 0-3, assigned based on join order
   connected?: boolean; // Connection status
   disconnectedAt?: number; // Timestamp when disconnected (for duration calc)
+  isBot?: boolean; // Seat played by a bot
 };
 
 export type PlayersUpdateMsg = BaseMsg & {
@@ -334,6 +353,30 @@ export type CharlestonCompleteMsg = BaseMsg & {
   tableId: string;
 };
 
+// Suggested passes for the requesting player, best first
+export type CharlestonHintResultMsg = BaseMsg & {
+  type: 'charleston_hint_result';
+  tableId: string;
+  tiles: string[]; // The suggested pass
+  candidates: {
+    tiles: string[];
+    distance: number; // Tiles away from the closest line after the pass
+    pattern: string;  // That line's pattern
+  }[];
+};
+
+// A discard opening to calls, or the window closing (with the call that
+// took the tile, if any)
+export type ClaimWindowMsg = BaseMsg & {
+  type: 'claim_window';
+  tableId: string;
+  open: boolean;
+  discard: { player: number; tile: string };
+  eligible: number[];  // Seats that may call or pass
+  closesAt?: ISO8601;  // While open
+  claimed?: Move;      // Once closed
+};
+
 export type ServerToClient =
   | GameStateUpdateMsg
   | ActionResultMsg
@@ -352,6 +395,8 @@ export type ServerToClient =
   | CharlestonPassExecutedMsg
   | CharlestonVoteResultMsg
   | CharlestonCompleteMsg
+  | CharlestonHintResultMsg
+  | ClaimWindowMsg
   | PresenceUpdateMsg
   | ChatMessageMsg
   | AdminAuthResultMsg
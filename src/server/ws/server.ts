@@ -1,28 +1,87 @@
 // path: mahjong-ts/src/server/ws/server.ts
 import { WebSocketServer } from 'ws';
-import { randomUUID, randomBytes } from 'crypto';
+import { randomUUID } from 'crypto';
 import { ClientToServer, ServerToClient, nowIso, PlayerInfo } from './protocol';
 import { createGame, applyMove, getGameState } from '../../engine';
+import { Move, PlayerId } from '../../types';
 import { load2024RuleCard } from '../../rulecard-parser';
-import { commitServerSeed } from '../../fairness';
+import { GameSetupPool, loadSetupPoolConfig, generateCommittedSeed } from '../../game-setup-pool';
 import { 
   initializeCharleston,
   handleCharlestonSelection,
   handleCharlestonReady,
   handleCharlestonVote,
-  handleCharlestonVoteSubmit,
   handleCourtesyProposal,
   allPlayersReady,
   executeCharlestonPass,
   processVoteResults,
   executeCourtesyPass,
   tallyVotes,
-  getPhaseInstructions
+  getPhaseInstructions,
+  createCharlestonRng
 } from '../../charleston-manager';
+import { DeterministicRNG } from '../../rng';
+import { CharlestonAdvisor, loadCharlestonAdvisorConfig } from '../../charleston-advisor';
+import { BotDriver, BotAction, loadBotConfig, submitCharlestonAction } from '../../bot';
+import { GameEventStore, registerEventStore, removeEventStore } from '../../event-store';
+import { DeadHandTracker } from '../../dead-hand';
+import { validateDeadHand } from '../../validation';
+import {
+  ClaimArbiter,
+  ClaimResolution,
+  ClaimScheduler,
+  ClaimWindowMetrics,
+  ClaimWindowRecorder,
+  isClaimMove,
+  loadClaimWindowConfig
+} from '../../claim-arbiter';
+
+// Moves per replay_chunk message
+const REPLAY_CHUNK_SIZE = 256;
 
 // Admin password - in production, use environment variable
 const ADMIN_PASSWORD = process.env.ADMIN_PASSWORD || 'admin123';
 
+// Optional worker-thread game setup pool (enabled with SETUP_POOL_WORKERS > 0)
+const setupPoolConfig = loadSetupPoolConfig();
+let setupPool: GameSetupPool | null = null;
+
+export function getSetupPool(): GameSetupPool | null {
+  return setupPool;
+}
+
+// Charleston pass advice, for hints
+let charlestonAdvisor: CharlestonAdvisor | null = null;
+
+export function getCharlestonAdvisor(): CharlestonAdvisor {
+  if (!charlestonAdvisor) {
+    charlestonAdvisor = new CharlestonAdvisor(loadCharlestonAdvisorConfig());
+  }
+  return charlestonAdvisor;
+}
+
+// Bot seats: filled on request before the deal, and standing in for
+// disconnected players
+const botConfig = loadBotConfig();
+let botDriver: BotDriver | null = null;
+
+export function getBotDriver(): BotDriver {
+  if (!botDriver) {
+    botDriver = new BotDriver(botConfig);
+  }
+  return botDriver;
+}
+
+// Claim windows after each discard: one scheduler and one set of metrics
+// for every table
+const claimWindowConfig = loadClaimWindowConfig();
+const claimScheduler = new ClaimScheduler();
+const claimRecorder = new ClaimWindowRecorder();
+
+export function getClaimWindowMetrics(): ClaimWindowMetrics {
+  return claimRecorder.stats();
+}
+
 type Client = { 
   ws: any; 
   tableId?: string; 
@@ -42,6 +101,7 @@ type PlayerSession = {
   connected: boolean;
   disconnectedAt?: number; // Timestamp when disconnected
   client?: Client; // Current active client (undefined if disconnected)
+  bot?: boolean; // Seat played by a bot for the whole game
 };
 
 type TableEntry = {
@@ -51,8 +111,13 @@ type TableEntry = {
   createdAt: number;
   creatorLeft?: boolean; // Track if creator left but table should persist
   gameStarted?: boolean; // Track if game has started (hands dealt)
+  gameStarting?: boolean; // Deal is running on the setup pool
   paused?: boolean; // Track if game is paused due to disconnections
   playerSessions: Map<number, PlayerSession>; // Track all player sessions for reconnection
+  events?: GameEventStore; // Move log with periodic snapshots, from the deal onwards
+  charlestonRng?: DeterministicRNG; // Blind-pass choices, seeded from the table seeds
+  claims?: ClaimArbiter; // Claim window on the last discard
+  deadHands?: DeadHandTracker; // Patterns each seat can still complete, from the start of play
   seeds: {
     serverSecret: string; // per-table random secret
     clientSeed: string;   // client-provided or server-generated
@@ -85,6 +150,24 @@ function broadcast(tableId: string, msg: ServerToClient) {
   }
 }
 
+/**
+ * Seats taken: players at the table plus bots
+ */
+function seatedCount(table: TableEntry): number {
+  let bots = 0;
+  for (const session of table.playerSessions.values()) {
+    if (session.bot) bots++;
+  }
+  return table.clients.size + bots;
+}
+
+function firstFreeSeat(table: TableEntry): 0 | 1 | 2 | 3 {
+  for (let seat = 0; seat < 4; seat++) {
+    if (!table.playerSessions.has(seat)) return seat as 0 | 1 | 2 | 3;
+  }
+  return table.clients.size as 0 | 1 | 2 | 3;
+}
+
 function broadcastPlayerCount(tableId: string) {
   const table = tables.get(tableId);
   if (!table) {
@@ -92,7 +175,7 @@ function broadcastPlayerCount(tableId: string) {
     return;
   }
   
-  const playerCount = table.clients.size;
+  const playerCount = seatedCount(table);
   const msg: ServerToClient = {
     type: 'player_count_update',
     traceId: mkTrace(),
@@ -119,7 +202,8 @@ function broadcastPlayersUpdate(tableId: string) {
       username: session.username,
       isDealer: false, // Will be set when game starts
       connected: session.connected,
-      disconnectedAt: session.disconnectedAt
+      disconnectedAt: session.disconnectedAt,
+      isBot: session.bot
     });
   }
   
@@ -170,6 +254,11 @@ function pauseGame(tableId: string) {
     disconnectedPlayers
   };
   broadcast(tableId, msg);
+  
+  // The Charleston goes on, with bots passing for absent players
+  if (table.state?.charleston && !table.state.charleston.completed) {
+    scheduleBotPlay(tableId);
+  }
 }
 
 function checkAndResumeGame(tableId: string) {
@@ -242,7 +331,7 @@ function broadcastCharlestonState(tableId: string) {
 
 function startGameForTable(tableId: string) {
   const table = tables.get(tableId);
-  if (!table || table.gameStarted) return;
+  if (!table || table.gameStarted || table.gameStarting) return;
   
   console.log(`[Server] Starting game for table ${tableId.slice(0, 8)}`);
   
@@ -250,23 +339,50 @@ function startGameForTable(tableId: string) {
   const dealer = Math.floor(Math.random() * 4) as 0 | 1 | 2 | 3;
   console.log(`[Server] Selected dealer: Player ${dealer}`);
   
+  if (setupPool) {
+    // Deal on a worker thread; the table is finished off when the state is ready
+    table.gameStarting = true;
+    setupPool.createGame(table.seeds, dealer)
+      .then(state => {
+        table.gameStarting = false;
+        if (tables.get(tableId) !== table || table.gameStarted) return;
+        finishGameStart(tableId, table, dealer, state);
+      })
+      .catch(err => {
+        table.gameStarting = false;
+        console.error(`[Server] Setup pool failed for table ${tableId.slice(0, 8)}, dealing inline:`, err);
+        if (tables.get(tableId) !== table || table.gameStarted) return;
+        finishGameStart(tableId, table, dealer, createGame(table.seeds.clientSeed, table.seeds.serverSecret, dealer));
+      });
+    return;
+  }
+  
   // Create the game state with dealt hands
-  table.state = createGame(table.seeds.clientSeed, table.seeds.serverSecret, dealer);
+  finishGameStart(tableId, table, dealer, createGame(table.seeds.clientSeed, table.seeds.serverSecret, dealer));
+}
+
+function finishGameStart(tableId: string, table: TableEntry, dealer: 0 | 1 | 2 | 3, state: any) {
+  table.state = state;
   table.gameStarted = true;
   
   // Initialize Charleston
   table.state = initializeCharleston(table.state);
+  table.charlestonRng = createCharlestonRng(table.seeds.clientSeed, table.seeds.serverSecret, table.state.rngVersion);
+  table.events = new GameEventStore(table.state);
+  registerEventStore(tableId, table.events);
+  table.deadHands = undefined;
   
   // Assign seat positions based on join order (playerId already reflects this)
-  // and create PlayerInfo array
+  // and create PlayerInfo array, bots included
   const allPlayers: PlayerInfo[] = [];
-  for (const client of table.clients) {
-    const playerId = client.playerId!;
+  for (const session of table.playerSessions.values()) {
+    const playerId = session.playerId;
     allPlayers.push({
       playerId,
-      username: client.username || `Player ${playerId + 1}`,
+      username: session.client?.username || session.username,
       isDealer: playerId === dealer,
-      seatPosition: playerId // playerId 0-3 already reflects join order
+      seatPosition: playerId, // playerId 0-3 already reflects join order
+      isBot: session.bot
     });
   }
   
@@ -292,11 +408,351 @@ function startGameForTable(tableId: string) {
   broadcastCharlestonState(tableId);
   
   console.log(`[Server] Game started for table ${tableId.slice(0, 8)}, dealer is Player ${dealer}`);
+  scheduleBotPlay(tableId);
 }
 
 function mkTrace() { return randomUUID(); }
 
+/**
+ * Runs the Charleston step once every seat is ready: tallies the vote, or
+ * executes a pass or the courtesy pass
+ */
+function advanceCharleston(tableId: string) {
+  const table = tables.get(tableId);
+  if (!table || !table.state || !table.state.charleston) return;
+  
+  if (allPlayersReady(table.state.charleston)) {
+    console.log(`[Charleston] All players ready for phase ${table.state.charleston.phase}`);
+    const phase = table.state.charleston.phase;
+    
+    if (phase === 'vote') {
+      // Process vote results
+      table.state = processVoteResults(table.state);
+      table.events?.checkpoint(table.state);
+      
+      // Broadcast vote results
+      const voteResults = tallyVotes(table.state.charleston);
+      const voteResultMsg: ServerToClient = {
+        type: 'charleston_vote_result',
+        traceId: mkTrace(),
+        ts: nowIso(),
+        tableId,
+        yesVotes: voteResults.yes,
+        noVotes: voteResults.no,
+        secondCharlestonHappens: voteResults.yes >= 3
+      };
+      broadcast(tableId, voteResultMsg);
+      
+      // Broadcast new state
+      setTimeout(() => broadcastCharlestonState(tableId), 1000);
+    } else if (phase === 'courtesy') {
+      // Execute courtesy pass
+      table.state = executeCourtesyPass(table.state);
+      table.events?.checkpoint(table.state);
+      
+      // Broadcast completion
+      const completeMsg: ServerToClient = {
+        type: 'charleston_complete',
+        traceId: mkTrace(),
+        ts: nowIso(),
+        tableId
+      };
+      broadcast(tableId, completeMsg);
+      
+      // Update all players' hands
+      for (const c of table.clients) {
+        const playerId = c.playerId!;
+        const playerHand = table.state.players[playerId].hand;
+        
+        const updateMsg: ServerToClient = {
+          type: 'game_state_update',
+          traceId: mkTrace(),
+          ts: nowIso(),
+          tableId,
+          delta: {
+            phase: 'play',
+            players: {
+              [playerId]: {
+                hand: playerHand
+              }
+            } as any
+          }
+        };
+        c.ws.send(JSON.stringify(updateMsg));
+      }
+    } else {
+      // Execute pass
+      console.log(`[Charleston] Executing pass for phase ${phase}`);
+      const blindPassInfo: { playerId: number; count: number }[] = [];
+      
+      // Collect blind pass info
+      for (let pid = 0; pid < 4; pid++) {
+        const playerId = pid as 0 | 1 | 2 | 3;
+        const playerState = table.state.charleston.playerStates[playerId];
+        if (playerState.blindPass?.enabled) {
+          blindPassInfo.push({
+            playerId,
+            count: playerState.blindPass.count
+          });
+        }
+      }
+      
+      table.state = executeCharlestonPass(table.state, table.charlestonRng);
+      table.events?.checkpoint(table.state);
+      console.log(`[Charleston] Pass executed, new phase: ${table.state.charleston.phase}`);
+      
+      // Send pass executed message to each player with their new tiles
+      for (const c of table.clients) {
+        const playerId = c.playerId!;
+        const playerHand = table.state.players[playerId].hand;
+        
+        const passMsg: ServerToClient = {
+          type: 'charleston_pass_executed',
+          traceId: mkTrace(),
+          ts: nowIso(),
+          tableId,
+          passNumber: table.state.charleston.passNumber - 1,
+          yourNewTiles: playerHand,
+          blindPassInfo: blindPassInfo.length > 0 ? blindPassInfo : undefined
+        };
+        c.ws.send(JSON.stringify(passMsg));
+      }
+      
+      // Broadcast new state after a brief delay
+      setTimeout(() => broadcastCharlestonState(tableId), 500);
+    }
+  }
+  
+  // Bots and seats away from the table are played for
+  scheduleBotPlay(tableId);
+}
+
+const botPlayScheduled = new Set<string>();
+
+function scheduleBotPlay(tableId: string) {
+  if (botPlayScheduled.has(tableId)) return;
+  botPlayScheduled.add(tableId);
+  setImmediate(() => {
+    botPlayScheduled.delete(tableId);
+    playBotSeats(tableId).catch(err => {
+      console.error(`[Bots] Play failed for table ${tableId.slice(0, 8)}:`, err);
+    });
+  });
+}
+
+/**
+ * Seats a bot plays for: bot seats, and disconnected players' seats (during
+ * the Charleston only when bots do not replace them, as the table is paused).
+ * Bots wait while nobody is at the table.
+ */
+function botSeats(table: TableEntry): (0 | 1 | 2 | 3)[] {
+  const seats: (0 | 1 | 2 | 3)[] = [];
+  if (table.clients.size === 0) return seats;
+  const inCharleston = !!table.state?.charleston && !table.state.charleston.completed;
+  for (const session of table.playerSessions.values()) {
+    const away = !session.connected && (botConfig.replaceDisconnected || (table.paused && inCharleston));
+    if (session.bot || away) seats.push(session.playerId);
+  }
+  return seats;
+}
+
+/**
+ * Plays for every bot seat: during the Charleston each seat not yet ready
+ * makes its choice; in play bot seats answer an open claim window, and
+ * otherwise the seat on turn moves (see turnBotMove). The
+ * decisions are made off the event loop by the bot driver; a decision made
+ * for a state that has since moved on is dropped, as the move that changed
+ * it schedules the bots again.
+ */
+async function playBotSeats(tableId: string) {
+  const table = tables.get(tableId);
+  if (!table || !table.gameStarted || !table.state) return;
+  const seats = botSeats(table);
+  if (seats.length === 0) return;
+
+  const state = table.state;
+  const driver = getBotDriver();
+
+  if (state.charleston && !state.charleston.completed) {
+    const phase = state.charleston.phase;
+    const waiting = seats.filter(playerId => !state.charleston.playerStates[playerId].ready);
+    if (waiting.length === 0) return;
+    const actions = await Promise.all(waiting.map(playerId => driver.decide(state, playerId)));
+    // A seat may have come back, or the step run, while the bots decided
+    if (table.state !== state || state.charleston.phase !== phase) return;
+    const current = botSeats(table);
+    waiting.forEach((playerId, i) => {
+      if (!current.includes(playerId) || state.charleston.playerStates[playerId].ready) return;
+      if (submitCharlestonAction(state, playerId, actions[i])) {
+        console.log(`[Charleston] Bot played ${actions[i].type} for player ${playerId}`);
+      }
+    });
+    broadcastCharlestonState(tableId);
+    advanceCharleston(tableId);
+    return;
+  }
+
+  if (state.phase !== 'play') return;
+  const claims = claimArbiter(tableId, table);
+  const window = claims.window;
+  if (window && window.state === state) {
+    // Bot seats answer the open discard at once; the window waits for the rest
+    const waiting = seats.filter(playerId => window.eligible.includes(playerId) && !window.responses.has(playerId));
+    if (waiting.length === 0) return;
+    const actions = await Promise.all(waiting.map(playerId => driver.decide(state, playerId)));
+    waiting.forEach((playerId, i) => {
+      if (claims.window !== window) return;
+      const action = actions[i];
+      const move: Move = action.type === 'move' && isClaimMove(state, action.move)
+        ? action.move
+        : { type: 'pass', player: playerId };
+      const res = claims.submit(move);
+      if (!res.ok) {
+        console.error(`[Bots] Call ${move.type} for player ${playerId} rejected:`, res.error);
+        claims.submit({ type: 'pass', player: playerId });
+      }
+    });
+    return;
+  }
+
+  if (table.paused) return;
+  const actions = await Promise.all(seats.map(playerId => driver.decide(state, playerId)));
+  if (table.state !== state) return;
+  const move = turnBotMove(state, seats, actions);
+  if (!move) return;
+
+  const apply = () => {
+    if (tables.get(tableId) !== table || table.state !== state) return;
+    applyTableMove(tableId, table, move);
+  };
+  // People at the table get time to follow the bots
+  let people = false;
+  for (const session of table.playerSessions.values()) {
+    if (!session.bot && session.connected) people = true;
+  }
+  if (people && botConfig.moveDelayMs > 0) {
+    setTimeout(apply, botConfig.moveDelayMs);
+  } else {
+    apply();
+  }
+}
+
+/**
+ * The move of the seat on turn. Calls go through the claim window, so once
+ * it has closed a seat on turn that would still call the discard draws
+ * instead.
+ */
+function turnBotMove(state: any, seats: (0 | 1 | 2 | 3)[], actions: BotAction[]): Move | undefined {
+  const seat = state.currentPlayer;
+  const action = actions[seats.indexOf(seat)];
+  if (!action || action.type !== 'move') return undefined;
+  if (!isClaimMove(state, action.move)) return action.move;
+  return state.wall.length > 0 ? { type: 'draw', player: seat } : undefined;
+}
+
+function applyTableMove(tableId: string, table: TableEntry, move: Move) {
+  const res = applyMove(table.state, move);
+  if (!res.state) {
+    console.error(`[Server] Move ${move.type} for player ${move.player} rejected:`, res.error);
+    return;
+  }
+  table.state = res.state;
+  table.events?.append(move, res.state);
+  const deadPlayers = trackDeadHands(tableId, table);
+  broadcast(tableId, {
+    type: 'game_state_update', traceId: mkTrace(), ts: nowIso(), tableId, delta: { logsAppend: [move], deadPlayers }
+  } as ServerToClient);
+  openClaimWindow(tableId, table);
+  scheduleBotPlay(tableId);
+}
+
+/**
+ * Syncs the table's dead-hand tracker with its state (after the move is in
+ * the log) and marks the seats that can no longer complete any pattern as
+ * dead. A change is checkpointed, so replays see the seats die where play
+ * did. Returns the seats that became dead, if any.
+ */
+function trackDeadHands(tableId: string, table: TableEntry): PlayerId[] | undefined {
+  const state = table.state;
+  if (state.phase !== 'play') return undefined;
+  if (table.deadHands) {
+    table.deadHands.sync(state);
+  } else {
+    table.deadHands = new DeadHandTracker(state);
+  }
+
+  const dead: PlayerId[] = [];
+  for (const player of [0, 1, 2, 3] as PlayerId[]) {
+    if (state.players[player].isDead) continue;
+    if (validateDeadHand(state, player, table.deadHands).error?.code !== 'dead_hand') continue;
+    // The players record is the current state's own, so this leaves earlier states alone
+    state.players[player] = { ...state.players[player], isDead: true };
+    dead.push(player);
+    console.log(`[Server] Player ${player} at table ${tableId} has a dead hand`);
+  }
+  if (dead.length === 0) return undefined;
+  table.events?.checkpoint(state);
+  return dead;
+}
+
+function claimArbiter(tableId: string, table: TableEntry): ClaimArbiter {
+  if (!table.claims) {
+    table.claims = new ClaimArbiter(
+      { windowMs: claimWindowConfig.windowMs, scheduler: claimScheduler, recorder: claimRecorder },
+      resolution => resolveClaimWindow(tableId, table, resolution)
+    );
+  }
+  return table.claims;
+}
+
+/**
+ * Opens the table's claim window if the last move was a discard (and drops
+ * any window the move has overtaken)
+ */
+function openClaimWindow(tableId: string, table: TableEntry) {
+  const window = claimArbiter(tableId, table).open(table.state);
+  if (!window) return;
+  broadcast(tableId, {
+    type: 'claim_window',
+    traceId: mkTrace(),
+    ts: nowIso(),
+    tableId,
+    open: true,
+    discard: window.discard,
+    eligible: window.eligible,
+    closesAt: new Date(Date.now() + (window.closesAt - window.openedAt)).toISOString()
+  } as ServerToClient);
+}
+
+/**
+ * Plays the call that won the window, if any, and lets the game go on
+ */
+function resolveClaimWindow(tableId: string, table: TableEntry, resolution: ClaimResolution) {
+  if (tables.get(tableId) !== table || table.state !== resolution.window.state) return;
+  const { window, move } = resolution;
+  broadcast(tableId, {
+    type: 'claim_window',
+    traceId: mkTrace(),
+    ts: nowIso(),
+    tableId,
+    open: false,
+    discard: window.discard,
+    eligible: window.eligible,
+    claimed: move
+  } as ServerToClient);
+  if (move) {
+    console.log(`[Claims] Player ${move.player} takes ${window.discard.tile} (${move.type}, ${resolution.reason} after ${resolution.latencyMs.toFixed(0)}ms)`);
+    applyTableMove(tableId, table, move);
+  } else {
+    scheduleBotPlay(tableId);
+  }
+}
+
 export function startServer(port = 8080) {
+  if (setupPoolConfig.enabled && !setupPool) {
+    setupPool = new GameSetupPool(setupPoolConfig);
+    console.log(`[Server] Game setup pool enabled with ${setupPoolConfig.workers} worker(s)`);
+  }
   const wss = new WebSocketServer({ port });
   console.log(`WebSocket server listening on ws://localhost:${port}`);
 
@@ -320,8 +776,12 @@ export function startServer(port = 8080) {
               session.client = undefined;
               table.clients.delete(client);
               
-              // Pause the game
-              pauseGame(client.tableId);
+              // A bot plays the seat until they are back, or the game pauses
+              if (botConfig.replaceDisconnected) {
+                scheduleBotPlay(client.tableId);
+              } else {
+                pauseGame(client.tableId);
+              }
               
               // Broadcast updated player list showing disconnection
               broadcastPlayersUpdate(client.tableId);
@@ -342,6 +802,7 @@ export function startServer(port = 8080) {
               if (table.clients.size === 0) {
                 console.log(`[Table ${client.tableId.slice(0, 8)}] All players left, cleaning up`);
                 tables.delete(client.tableId);
+                removeEventStore(client.tableId);
                 inviteCodeToTableId.delete(table.inviteCode);
               }
             }
@@ -365,9 +826,9 @@ export function startServer(port = 8080) {
         const sessionToken = randomUUID();
         
         // Generate per-table seeds for deterministic fairness
-        const serverSecret = randomBytes(32).toString('hex');
+        // (taken from the setup pool's pre-generated reserve when enabled)
         const clientSeed = (msg as any).clientSeed || randomUUID();
-        const serverCommit = commitServerSeed(serverSecret);
+        const seeds = setupPool ? setupPool.takeSeeds(clientSeed) : { ...generateCommittedSeed(), clientSeed };
 
         const entry: TableEntry = {
           state: null, // Don't create game state until 4 players join
@@ -377,7 +838,7 @@ export function startServer(port = 8080) {
           gameStarted: false,
           paused: false,
           playerSessions: new Map(),
-          seeds: { serverSecret, clientSeed, serverCommit }
+          seeds
         };
         
         tables.set(tableId, entry);
@@ -507,8 +968,8 @@ export function startServer(port = 8080) {
 
         // New player joining (not a reconnection)
         if (!isReconnection) {
-          // Reject if table already has 4 players
-          if (entry.clients.size >= 4) {
+          // Reject if table already has 4 players (bots included)
+          if (seatedCount(entry) >= 4) {
             const errorResponse: ServerToClient = {
               type: 'action_result',
               traceId: mkTrace(),
@@ -539,7 +1000,8 @@ export function startServer(port = 8080) {
           const newSessionToken = randomUUID();
           client.tableId = tableId;
           client.sessionToken = newSessionToken;
-          client.username = (msg as any).username || `Player ${entry.clients.size + 1}`;
+          const seat = firstFreeSeat(entry);
+          client.username = (msg as any).username || `Player ${seat + 1}`;
           if (!client.tableHistory) client.tableHistory = new Set();
           client.tableHistory.add(tableId);
           
@@ -549,7 +1011,7 @@ export function startServer(port = 8080) {
             client.playerId = 0;
             entry.creatorLeft = false;
           } else {
-            client.playerId = entry.clients.size as (0 | 1 | 2 | 3);
+            client.playerId = seat;
           }
           
           entry.clients.add(client);
@@ -572,7 +1034,7 @@ export function startServer(port = 8080) {
           ts: nowIso(),
           tableId,
           inviteCode: entry.inviteCode,
-          players: entry.clients.size,
+          players: seatedCount(entry),
           sessionToken: client.sessionToken || '',
           reconnected: isReconnection
         };
@@ -622,12 +1084,44 @@ export function startServer(port = 8080) {
         broadcastPlayersUpdate(tableId);
         
         // If we now have 4 players and game hasn't started, start it
-        if (entry.clients.size === 4 && !entry.gameStarted) {
+        if (seatedCount(entry) === 4 && !entry.gameStarted) {
           startGameForTable(tableId);
         }
         return;
       }
 
+      if (msg.type === 'fill_with_bots') {
+        const table = tables.get(msg.tableId);
+        if (!table || client.tableId !== msg.tableId || !client.isCreator || table.gameStarted || table.gameStarting) {
+          ws.send(JSON.stringify({
+            type: 'action_result',
+            traceId: mkTrace(),
+            ts: nowIso(),
+            tableId: msg.tableId,
+            ok: false,
+            error: { code: 'cannot_add_bots', message: 'Only the table creator can add bots before the game starts' }
+          } as ServerToClient));
+          return;
+        }
+
+        for (let seat = 0; seat < 4; seat++) {
+          if (table.playerSessions.has(seat)) continue;
+          table.playerSessions.set(seat, {
+            playerId: seat as 0 | 1 | 2 | 3,
+            username: `Bot ${seat + 1}`,
+            sessionToken: randomUUID(), // Never handed out, so no one can take the seat
+            connected: true,
+            bot: true
+          });
+        }
+        console.log(`[Server] Bots fill the empty seats at table ${msg.tableId.slice(0, 8)}`);
+
+        broadcastPlayerCount(msg.tableId);
+        broadcastPlayersUpdate(msg.tableId);
+        startGameForTable(msg.tableId);
+        return;
+      }
+
       if (msg.type === 'get_my_tables') {
         const myTables: { tableId: string; inviteCode: string; isCreator: boolean }[] = [];
         
@@ -691,6 +1185,8 @@ export function startServer(port = 8080) {
               const currentTable = tables.get(tableIdForBroadcast);
               if (currentTable && currentTable.clients.size === 0) {
                 tables.delete(tableIdForBroadcast);
+                removeEventStore(tableIdForBroadcast);
+                currentTable.claims?.cancel();
                 inviteCodeToTableId.delete(currentTable.inviteCode);
                 console.log(`[Table ${tableIdForBroadcast.slice(0, 8)}] Cleaned up after timeout`);
               }
@@ -700,7 +1196,9 @@ export function startServer(port = 8080) {
           else if (!client.isCreator && table.clients.size === 0) {
             console.log(`[Table ${tableIdForBroadcast.slice(0, 8)}] All players left, cleaning up`);
             tables.delete(client.tableId);
+            removeEventStore(client.tableId);
             inviteCodeToTableId.delete(table.inviteCode);
+            table.claims?.cancel();
           }
         }
         
@@ -743,9 +1241,90 @@ export function startServer(port = 8080) {
         return;
       }
 
+      if (msg.type === 'replay_request') {
+        // Only the table's own players may replay it
+        const table = tables.get(msg.tableId);
+        const events = table?.events;
+        if (!table || !events || client.tableId !== msg.tableId) {
+          ws.send(JSON.stringify({
+            type: 'action_result',
+            traceId: mkTrace(),
+            ts: nowIso(),
+            tableId: msg.tableId,
+            ok: false,
+            error: { code: 'replay_unavailable', message: 'No replay for this table' }
+          } as ServerToClient));
+          return;
+        }
+
+        // The state at fromIndex, then every later move in chunks. Until the
+        // game is complete the replay shows only what this seat saw.
+        const startIndex = Math.min(Math.max(0, msg.fromIndex ?? 0), events.length);
+        const replay = events.replay(startIndex, events.length, client.playerId);
+        let index = startIndex;
+        do {
+          const end = Math.min(index + REPLAY_CHUNK_SIZE, events.length);
+          const chunk: ServerToClient = {
+            type: 'replay_chunk',
+            traceId: mkTrace(),
+            ts: nowIso(),
+            tableId: msg.tableId,
+            startIndex: index,
+            state: index === startIndex ? replay.state : undefined,
+            checkpoints: index === startIndex ? replay.checkpoints : undefined,
+            logs: replay.logs.slice(index - startIndex, end - startIndex),
+            nextIndex: end < events.length ? end : undefined
+          };
+          ws.send(JSON.stringify(chunk));
+          index = end;
+        } while (index < events.length);
+        return;
+      }
+
       if (msg.type === 'player_action' && client.tableId) {
         const table = tables.get(client.tableId);
         if (!table) return;
+        const reject = (code: string, message: string) => ws.send(JSON.stringify({
+          type: 'action_result',
+          traceId: mkTrace(),
+          ts: nowIso(),
+          tableId: client.tableId,
+          ok: false,
+          error: { code, message }
+        } as ServerToClient));
+        if (!table.state) {
+          reject('not_started', 'The game has not started');
+          return;
+        }
+        // A client plays (and answers claim windows) for its own seat only
+        if (msg.action.player !== client.playerId) {
+          reject('not_your_seat', 'You can only act for your own seat');
+          return;
+        }
+        // The Charleston goes through the charleston_* messages, which keep
+        // its pass directions, pass sizes and vote
+        if (msg.action.type === 'charlestonPass' || msg.action.type === 'stopCharleston') {
+          reject('use_charleston_messages', 'Charleston passes and votes use the charleston_* messages');
+          return;
+        }
+        const claims = claimArbiter(client.tableId, table);
+        const answer = msg.action.type === 'pass' || isClaimMove(table.state, msg.action);
+        // Calls and passes on a discard are answers to its claim window, and
+        // nothing else is played while the window is open
+        if (answer || claims.window) {
+          const result = answer
+            ? claims.submit(msg.action)
+            : { ok: false as const, error: { code: 'claim_window_open', message: 'Wait for the discard to be called or passed' } };
+          ws.send(JSON.stringify({
+            type: 'action_result',
+            traceId: mkTrace(),
+            ts: nowIso(),
+            tableId: client.tableId,
+            ok: result.ok,
+            error: result.ok ? undefined : result.error
+          } as ServerToClient));
+          return;
+        }
         const res = applyMove(table.state, msg.action);
         const resultMsg: ServerToClient = {
           type: 'action_result',
@@ -756,13 +1335,24 @@ export function startServer(port = 8080) {
           error: res.error,
           applied: res.state ? msg.action : undefined
         };
-        if (res.state) table.state = res.state;
+        let deadPlayers: PlayerId[] | undefined;
+        if (res.state) {
+          table.state = res.state;
+          table.events?.append(msg.action, res.state);
+          deadPlayers = trackDeadHands(client.tableId, table);
+        }
         ws.send(JSON.stringify(resultMsg));
 
         if (res.state) {
           broadcast(client.tableId, {
-            type: 'game_state_update', traceId: mkTrace(), ts: nowIso(), tableId: client.tableId, delta: { logsAppend: [msg.action] }
+            type: 'game_state_update',
+            traceId: mkTrace(),
+            ts: nowIso(),
+            tableId: client.tableId,
+            delta: { logsAppend: [msg.action], deadPlayers }
           } as ServerToClient);
+          openClaimWindow(client.tableId, table);
+          scheduleBotPlay(client.tableId);
         }
         return;
       }
@@ -966,105 +1556,8 @@ export function startServer(port = 8080) {
         // Broadcast updated state
         broadcastCharlestonState(tableId);
         
-        // Check if all players are ready
-        if (allPlayersReady(table.state.charleston)) {
-          console.log(`[Charleston] All players ready for phase ${table.state.charleston.phase}`);
-          const phase = table.state.charleston.phase;
-          
-          if (phase === 'vote') {
-            // Process vote results
-            table.state = processVoteResults(table.state);
-            
-            // Broadcast vote results
-            const voteResults = tallyVotes(table.state.charleston);
-            const voteResultMsg: ServerToClient = {
-              type: 'charleston_vote_result',
-              traceId: mkTrace(),
-              ts: nowIso(),
-              tableId,
-              yesVotes: voteResults.yes,
-              noVotes: voteResults.no,
-              secondCharlestonHappens: voteResults.yes >= 3
-            };
-            broadcast(tableId, voteResultMsg);
-            
-            // Broadcast new state
-            setTimeout(() => broadcastCharlestonState(tableId), 1000);
-          } else if (phase === 'courtesy') {
-            // Execute courtesy pass
-            table.state = executeCourtesyPass(table.state);
-            
-            // Broadcast completion
-            const completeMsg: ServerToClient = {
-              type: 'charleston_complete',
-              traceId: mkTrace(),
-              ts: nowIso(),
-              tableId
-            };
-            broadcast(tableId, completeMsg);
-            
-            // Update all players' hands
-            for (const c of table.clients) {
-              const playerId = c.playerId!;
-              const playerHand = table.state.players[playerId].hand;
-              
-              const updateMsg: ServerToClient = {
-                type: 'game_state_update',
-                traceId: mkTrace(),
-                ts: nowIso(),
-                tableId,
-                delta: {
-                  phase: 'play',
-                  players: {
-                    [playerId]: {
-                      hand: playerHand
-                    }
-                  } as any
-                }
-              };
-              c.ws.send(JSON.stringify(updateMsg));
-            }
-          } else {
-            // Execute pass
-            console.log(`[Charleston] Executing pass for phase ${phase}`);
-            const blindPassInfo: { playerId: number; count: number }[] = [];
-            
-            // Collect blind pass info
-            for (let pid = 0; pid < 4; pid++) {
-              const playerId = pid as 0 | 1 | 2 | 3;
-              const playerState = table.state.charleston.playerStates[playerId];
-              if (playerState.blindPass?.enabled) {
-                blindPassInfo.push({
-                  playerId,
-                  count: playerState.blindPass.count
-                });
-              }
-            }
-            
-            table.state = executeCharlestonPass(table.state);
-            console.log(`[Charleston] Pass executed, new phase: ${table.state.charleston.phase}`);
-            
-            // Send pass executed message to each player with their new tiles
-            for (const c of table.clients) {
-              const playerId = c.playerId!;
-              const playerHand = table.state.players[playerId].hand;
-              
-              const passMsg: ServerToClient = {
-                type: 'charleston_pass_executed',
-                traceId: mkTrace(),
-                ts: nowIso(),
-                tableId,
-                passNumber: table.state.charleston.passNumber - 1,
-                yourNewTiles: playerHand,
-                blindPassInfo: blindPassInfo.length > 0 ? blindPassInfo : undefined
-              };
-              c.ws.send(JSON.stringify(passMsg));
-            }
-            
-            // Broadcast new state after a brief delay
-            setTimeout(() => broadcastCharlestonState(tableId), 500);
-          }
-        }
+        // Run the step if every seat is ready
+        advanceCharleston(tableId);
         
         return;
       }
@@ -1096,6 +1589,49 @@ export function startServer(port = 8080) {
         return;
       }
 
+      if (msg.type === 'charleston_hint') {
+        const { tableId, count } = msg;
+        const table = tables.get(tableId);
+
+        // Only a player at the table gets advice, and only on their own hand
+        if (
+          !table || client.tableId !== tableId || client.playerId === undefined ||
+          table.state?.phase !== 'charleston' || !table.state.charleston
+        ) {
+          ws.send(JSON.stringify({
+            type: 'action_result',
+            traceId: mkTrace(),
+            ts: nowIso(),
+            tableId,
+            ok: false,
+            error: { code: 'hint_unavailable', message: 'No Charleston hint for this table' }
+          } as ServerToClient));
+          return;
+        }
+
+        const playerId = client.playerId;
+        getCharlestonAdvisor().advise(table.state.players[playerId].hand, { count: count ?? 3 }).then(advice => {
+          ws.send(JSON.stringify({
+            type: 'charleston_hint_result',
+            traceId: mkTrace(),
+            ts: nowIso(),
+            tableId,
+            tiles: advice.tiles,
+            candidates: advice.candidates.map(({ tiles, distance, pattern }) => ({ tiles, distance, pattern }))
+          } as ServerToClient));
+        }, err => {
+          ws.send(JSON.stringify({
+            type: 'action_result',
+            traceId: mkTrace(),
+            ts: nowIso(),
+            tableId,
+            ok: false,
+            error: { code: 'hint_failed', message: err.message }
+          } as ServerToClient));
+        });
+        return;
+      }
+
       if (msg.type === 'charleston_courtesy') {
         const { tableId, tiles, targetPlayer } = msg;
         const table = tables.get(tableId);
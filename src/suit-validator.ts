@@ -4,7 +4,8 @@
  */
 
 import { HandPattern, HandSection, SuitConstraint, Tile, Meld } from './types';
-import { getTileSuit, getDragonSuit, tileHasSuit, groupTilesBySuit } from './tiles';
+import { handWithMelds } from './hand-counts';
+import { TILE_EFFECTIVE_SUIT, SUIT_NAMES, NO_SUIT, INVALID_TILE_ID, encodeTile } from './tile-codec';
 
 export interface SuitValidationResult {
   valid: boolean;
@@ -13,50 +14,37 @@ export interface SuitValidationResult {
 }
 
 /**
- * Gets the effective suit of a tile (handles dragons)
+ * Gets the effective suit code of a tile (dragons map to their associated suit).
+ * Flowers, winds, jokers and unknown tiles return NO_SUIT.
  */
-function getEffectiveSuit(tile: Tile): string | null {
-  const baseSuit = getTileSuit(tile);
-  
-  if (baseSuit === 'dragons') {
-    // Dragons have specific suit associations
-    return getDragonSuit(tile as 'RD' | 'GD' | 'WD');
-  }
-  
-  if (baseSuit === 'flowers' || baseSuit === 'winds' || baseSuit === 'jokers') {
-    return null; // These don't participate in suit constraints
-  }
-  
-  return baseSuit;
+function getEffectiveSuit(tile: Tile): number {
+  const id = encodeTile(tile);
+  return id === INVALID_TILE_ID ? NO_SUIT : TILE_EFFECTIVE_SUIT[id];
 }
 
 /**
  * Validates that all tiles in a section are the same suit
  */
 function validateSectionSuit(tiles: Tile[], section: HandSection): { valid: boolean; suit: string | null; error?: string } {
-  const suitedTiles = tiles.filter(tile => {
-    const suit = getEffectiveSuit(tile);
-    return suit !== null;
-  });
+  let firstSuit = NO_SUIT;
   
-  if (suitedTiles.length === 0) {
-    return { valid: true, suit: null }; // No suited tiles, no constraint
-  }
-  
-  const firstSuit = getEffectiveSuit(suitedTiles[0]);
-  
-  for (let i = 1; i < suitedTiles.length; i++) {
-    const tileSuit = getEffectiveSuit(suitedTiles[i]);
-    if (tileSuit !== firstSuit) {
+  for (const tile of tiles) {
+    const tileSuit = getEffectiveSuit(tile);
+    if (tileSuit === NO_SUIT) continue; // Doesn't participate in suit constraints
+    
+    if (firstSuit === NO_SUIT) {
+      firstSuit = tileSuit;
+    } else if (tileSuit !== firstSuit) {
       return {
         valid: false,
         suit: null,
-        error: `Section "${section.pattern}" contains mixed suits: ${firstSuit} and ${tileSuit}`
+        error: `Section "${section.pattern}" contains mixed suits: ${SUIT_NAMES[firstSuit]} and ${SUIT_NAMES[tileSuit]}`
       };
     }
   }
   
-  return { valid: true, suit: firstSuit };
+  // No suited tiles, no constraint
+  return { valid: true, suit: firstSuit === NO_SUIT ? null : SUIT_NAMES[firstSuit] };
 }
 
 /**
@@ -155,15 +143,15 @@ export function validateSuitConstraints(
  */
 export function couldMatchPattern(hand: Tile[], melds: Meld[], pattern: HandPattern): boolean {
   // Count total tiles
-  const totalTiles = hand.length + melds.reduce((sum, meld) => sum + meld.tiles.length, 0);
+  const counts = handWithMelds(hand, melds);
   const expectedTiles = pattern.sections.reduce((sum, section) => sum + section.tiles.length, 0);
   
-  if (totalTiles !== expectedTiles) {
+  if (counts.size !== expectedTiles) {
     return false;
   }
   
   // Check joker count
-  const jokerCount = [...hand, ...melds.flatMap(m => m.tiles)].filter(t => t === 'J').length;
+  const jokerCount = counts.jokerCount;
   if (jokerCount > pattern.allowedJokers) {
     return false;
   }
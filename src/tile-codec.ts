@@ -0,0 +1,240 @@
+/**
+ * Integer tile codec for American Mahjong
+ *
+ * Maps the 42 distinct tile kinds plus the joker to small integer IDs and
+ * exposes frozen lookup tables for suit, rank, dragon/suit association and
+ * classification flags. Tile strings are only needed at the protocol boundary;
+ * hot paths classify a tile with a single array read instead of string parsing.
+ *
+ * ID layout:
+ *   0-8   1C..9C (Craks)      27 RD   30 N   34-41 F1..F8
+ *   9-17  1B..9B (Bams)       28 GD   31 E   42    J
+ *   18-26 1D..9D (Dots)       29 WD   32 S
+ *                                     33 W
+ */
+
+import { Tile, TileSuit } from './types';
+
+export type TileId = number;
+
+export const TILE_KIND_COUNT = 43;
+export const FIRST_DRAGON_ID = 27;
+export const FIRST_WIND_ID = 30;
+export const FIRST_FLOWER_ID = 34;
+export const JOKER_ID = 42;
+export const INVALID_TILE_ID = -1;
+
+// Suit codes (index into SUIT_NAMES)
+export const SUIT_CRAKS = 0;
+export const SUIT_BAMS = 1;
+export const SUIT_DOTS = 2;
+export const SUIT_DRAGONS = 3;
+export const SUIT_WINDS = 4;
+export const SUIT_FLOWERS = 5;
+export const SUIT_JOKERS = 6;
+export const NO_SUIT = -1;
+
+export const SUIT_NAMES: readonly TileSuit[] = Object.freeze([
+  'craks', 'bams', 'dots', 'dragons', 'winds', 'flowers', 'jokers'
+] as TileSuit[]);
+
+// Classification flags (bitmask)
+export const FLAG_NUMBER = 1;
+export const FLAG_DRAGON = 2;
+export const FLAG_WIND = 4;
+export const FLAG_FLOWER = 8;
+export const FLAG_JOKER = 16;
+export const FLAG_SUITED = 32; // Numbers and dragons take part in suit constraints
+
+const NUMBER_SUFFIXES = ['C', 'B', 'D'];
+const DRAGONS: Tile[] = ['RD', 'GD', 'WD'];
+const WINDS: Tile[] = ['N', 'E', 'S', 'W'];
+const FLOWERS: Tile[] = ['F1', 'F2', 'F3', 'F4', 'F5', 'F6', 'F7', 'F8'];
+
+function buildTileNames(): Tile[] {
+  const names: Tile[] = [];
+  for (const suffix of NUMBER_SUFFIXES) {
+    for (let rank = 1; rank <= 9; rank++) {
+      names.push(`${rank}${suffix}`);
+    }
+  }
+  names.push(...DRAGONS, ...WINDS, ...FLOWERS, 'J');
+  return names;
+}
+
+/**
+ * Tile string for each ID
+ */
+export const TILE_NAMES: readonly Tile[] = Object.freeze(buildTileNames());
+
+const TILE_IDS = new Map<Tile, TileId>(TILE_NAMES.map((name, id) => [name, id]));
+
+function buildTable(valueFor: (id: TileId) => number): readonly number[] {
+  const table: number[] = [];
+  for (let id = 0; id < TILE_KIND_COUNT; id++) {
+    table.push(valueFor(id));
+  }
+  return Object.freeze(table);
+}
+
+/**
+ * Suit code of each tile ID
+ */
+export const TILE_SUIT: readonly number[] = buildTable(id => {
+  if (id < FIRST_DRAGON_ID) return Math.floor(id / 9);
+  if (id < FIRST_WIND_ID) return SUIT_DRAGONS;
+  if (id < FIRST_FLOWER_ID) return SUIT_WINDS;
+  if (id < JOKER_ID) return SUIT_FLOWERS;
+  return SUIT_JOKERS;
+});
+
+/**
+ * Rank (1-9) of each number tile, 0 for all other tiles
+ */
+export const TILE_RANK: readonly number[] = buildTable(id => id < FIRST_DRAGON_ID ? (id % 9) + 1 : 0);
+
+/**
+ * Effective suit used by suit constraints: number tiles keep their suit and
+ * dragons map to their associated suit (RD = craks, GD = bams, WD = dots).
+ * Winds, flowers and jokers have NO_SUIT.
+ */
+export const TILE_EFFECTIVE_SUIT: readonly number[] = buildTable(id => {
+  if (id < FIRST_DRAGON_ID) return Math.floor(id / 9);
+  if (id < FIRST_WIND_ID) return id - FIRST_DRAGON_ID;
+  return NO_SUIT;
+});
+
+/**
+ * Classification flags of each tile ID
+ */
+export const TILE_FLAGS: readonly number[] = buildTable(id => {
+  switch (TILE_SUIT[id]) {
+    case SUIT_DRAGONS: return FLAG_DRAGON | FLAG_SUITED;
+    case SUIT_WINDS: return FLAG_WIND;
+    case SUIT_FLOWERS: return FLAG_FLOWER;
+    case SUIT_JOKERS: return FLAG_JOKER;
+    default: return FLAG_NUMBER | FLAG_SUITED;
+  }
+});
+
+/**
+ * The 152-tile set as IDs, in the same order as createAmericanMahjongTileSet()
+ */
+export const TILE_SET_TEMPLATE: readonly TileId[] = Object.freeze((() => {
+  const ids: TileId[] = [];
+  for (let id = 0; id < FIRST_FLOWER_ID; id++) {
+    ids.push(id, id, id, id);
+  }
+  for (let id = FIRST_FLOWER_ID; id < JOKER_ID; id++) {
+    ids.push(id);
+  }
+  for (let i = 0; i < 8; i++) {
+    ids.push(JOKER_ID);
+  }
+  return ids;
+})());
+
+/**
+ * Number of physical copies of each tile kind in the set
+ */
+export const TILE_COPIES: readonly number[] = buildTable(id => {
+  if (id < FIRST_FLOWER_ID) return 4;
+  if (id < JOKER_ID) return 1;
+  return 8;
+});
+
+/**
+ * Converts a tile string to its ID, or INVALID_TILE_ID for unknown tiles
+ */
+export function encodeTile(tile: Tile): TileId {
+  const id = TILE_IDS.get(tile);
+  return id === undefined ? INVALID_TILE_ID : id;
+}
+
+/**
+ * Converts a tile ID back to its string form
+ */
+export function decodeTile(id: TileId): Tile {
+  const tile = TILE_NAMES[id];
+  if (tile === undefined) {
+    throw new Error(`Invalid tile id: ${id}`);
+  }
+  return tile;
+}
+
+/**
+ * Converts a list of tile strings to IDs. Throws on unknown tiles.
+ */
+export function encodeTiles(tiles: readonly Tile[]): Uint8Array {
+  const ids = new Uint8Array(tiles.length);
+  for (let i = 0; i < tiles.length; i++) {
+    const id = encodeTile(tiles[i]);
+    if (id === INVALID_TILE_ID) {
+      throw new Error(`Unknown tile: ${tiles[i]}`);
+    }
+    ids[i] = id;
+  }
+  return ids;
+}
+
+/**
+ * Converts a list of tile IDs back to tile strings
+ */
+export function decodeTiles(ids: ArrayLike<TileId>): Tile[] {
+  const tiles: Tile[] = new Array(ids.length);
+  for (let i = 0; i < ids.length; i++) {
+    tiles[i] = decodeTile(ids[i]);
+  }
+  return tiles;
+}
+
+/**
+ * Gets the ID of a number tile from its suit code (0-2) and rank (1-9)
+ */
+export function numberTileId(suit: number, rank: number): TileId {
+  return suit * 9 + rank - 1;
+}
+
+/**
+ * Gets the ID of the dragon associated with a number suit code (0-2)
+ */
+export function dragonIdForSuit(suit: number): TileId {
+  return FIRST_DRAGON_ID + suit;
+}
+
+export function isJokerId(id: TileId): boolean {
+  return id === JOKER_ID;
+}
+
+export function isFlowerId(id: TileId): boolean {
+  return (TILE_FLAGS[id] & FLAG_FLOWER) !== 0;
+}
+
+export function isNumberId(id: TileId): boolean {
+  return (TILE_FLAGS[id] & FLAG_NUMBER) !== 0;
+}
+
+/**
+ * Checks if tile IDs are consecutive numbers of the same suit
+ */
+export function areConsecutiveIds(ids: ArrayLike<TileId>): boolean {
+  if (ids.length < 2) return false;
+
+  const suit = TILE_SUIT[ids[0]];
+  if (!(TILE_FLAGS[ids[0]] & FLAG_NUMBER)) return false;
+
+  // Ranks are 1-9, so a bitmask tells us both uniqueness and span
+  let mask = 0;
+  let min = 10;
+  for (let i = 0; i < ids.length; i++) {
+    const id = ids[i];
+    if (!(TILE_FLAGS[id] & FLAG_NUMBER) || TILE_SUIT[id] !== suit) return false;
+    const rank = TILE_RANK[id];
+    const bit = 1 << rank;
+    if (mask & bit) return false;
+    mask |= bit;
+    if (rank < min) min = rank;
+  }
+
+  return mask === ((1 << ids.length) - 1) << min;
+}
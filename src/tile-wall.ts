@@ -0,0 +1,251 @@
+/**
+ * Ring-buffer wall for American Mahjong
+ *
+ * The shuffled tiles stay in a single Uint8Array of tile IDs in their physical
+ * (shuffled) order; breaking, dealing and drawing only move cursors.
+ *
+ * Draws run in "draw order": index 0 is the first tile dealt, and draw index k
+ * lives in slot (start - k) mod N. This matches the physical table: tiles are
+ * taken leftwards from the break in the dealer's wall, then continue into the
+ * wall to its left (walls[(dealer + 3) % 4]), and so on around the ring.
+ *
+ *   [0, head)        tiles already drawn from the live end
+ *   [head, liveEnd)  live wall
+ *   [liveEnd, tail)  dead wall (tiles reserved by the dice break)
+ *   [tail, N)        tiles taken as replacement draws
+ */
+
+import { Tile, PlayerId } from './types';
+import { TileId, decodeTile, decodeTiles, encodeTiles } from './tile-codec';
+
+export const TILES_PER_WALL = 38; // 19 stacks, 2 high
+export const DEALT_TILE_COUNT = 53; // 14 to the dealer, 13 to each other player
+
+/**
+ * Seat (as an offset from the dealer) that receives each of the first
+ * DEALT_TILE_COUNT draws: three rounds of four tiles to each player starting
+ * with the dealer, then two more to the dealer and one to each other player.
+ */
+export const DEAL_SEAT_OFFSETS: readonly number[] = Object.freeze((() => {
+  const seats: number[] = [];
+  for (let round = 0; round < 3; round++) {
+    for (let offset = 0; offset < 4; offset++) {
+      seats.push(offset, offset, offset, offset);
+    }
+  }
+  seats.push(0, 0, 1, 2, 3);
+  return seats;
+})());
+
+/**
+ * Slot of the first draw after breaking the dealer's wall for a dice roll
+ */
+function breakStart(dealer: PlayerId, dice: number): number {
+  return dealer * TILES_PER_WALL + TILES_PER_WALL - dice * 2 - 1;
+}
+
+/**
+ * Writes a broken 152-tile shuffle in draw order (dealt tiles, then live
+ * wall, then the dice * 2 dead-wall tiles) without building a TileWall
+ */
+export function writeDrawOrder(shuffled: Uint8Array, dealer: PlayerId, dice: number, out: Uint8Array): Uint8Array {
+  const n = shuffled.length;
+  let slot = breakStart(dealer, dice);
+  for (let k = 0; k < n; k++) {
+    out[k] = shuffled[slot];
+    slot = slot === 0 ? n - 1 : slot - 1;
+  }
+  return out;
+}
+
+/**
+ * Compact snapshot form of a TileWall (see toJSON)
+ */
+export interface TileWallSnapshot {
+  slots: string;   // Base64 of the tile IDs in physical order
+  start: number;   // Slot of draw index 0
+  head: number;
+  liveEnd: number;
+  tail: number;
+}
+
+export class TileWall {
+  private readonly slots: Uint8Array;
+  private readonly start: number;
+  private head: number;
+  private liveEnd: number;
+  private tail: number;
+
+  private constructor(slots: Uint8Array, start: number, head: number, liveEnd: number, tail: number) {
+    this.slots = slots;
+    this.start = start;
+    this.head = head;
+    this.liveEnd = liveEnd;
+    this.tail = tail;
+  }
+
+  /**
+   * Builds the wall from the shuffled tile set and breaks it: the last
+   * dice * 2 tiles of the dealer's wall become the dead wall and the deal
+   * starts from the tile just before them.
+   */
+  static fromShuffle(ids: Uint8Array, dealer: PlayerId, dice: number): TileWall {
+    if (ids.length !== TILES_PER_WALL * 4) {
+      throw new Error(`Expected ${TILES_PER_WALL * 4} tiles, got ${ids.length}`);
+    }
+    return new TileWall(ids, breakStart(dealer, dice), 0, ids.length - dice * 2, ids.length);
+  }
+
+  /**
+   * Builds a wall from tiles already in draw order, with an optional dead wall
+   * (in draw order, i.e. the last dead tile is the first replacement draw)
+   */
+  static fromTiles(live: readonly Tile[], dead: readonly Tile[] = []): TileWall {
+    return TileWall.fromDrawOrder(encodeTiles([...live, ...dead]), dead.length);
+  }
+
+  /**
+   * Builds a wall from tile IDs in draw order whose last deadCount tiles are
+   * the dead wall, with the first `drawn` tiles already taken
+   */
+  static fromDrawOrder(ids: ArrayLike<TileId>, deadCount: number, drawn: number = 0): TileWall {
+    const n = ids.length;
+    const slots = new Uint8Array(n);
+    for (let k = 0; k < n; k++) {
+      slots[n - 1 - k] = ids[k];
+    }
+    return new TileWall(slots, n - 1, drawn, n - deadCount, n);
+  }
+
+  static fromJSON(snapshot: TileWallSnapshot): TileWall {
+    const slots = new Uint8Array(Buffer.from(snapshot.slots, 'base64'));
+    return new TileWall(slots, snapshot.start, snapshot.head, snapshot.liveEnd, snapshot.tail);
+  }
+
+  /** Tiles left in the live wall */
+  get length(): number {
+    return this.liveEnd - this.head;
+  }
+
+  /** Tiles left in the dead wall */
+  get deadLength(): number {
+    return this.tail - this.liveEnd;
+  }
+
+  /** Total tiles the wall was built with */
+  get size(): number {
+    return this.slots.length;
+  }
+
+  /** Number of tiles drawn from the live end so far */
+  get drawn(): number {
+    return this.head;
+  }
+
+  private slotOf(index: number): number {
+    const n = this.slots.length;
+    return ((this.start - index) % n + n) % n;
+  }
+
+  /**
+   * Draws the next live tile ID, or -1 when the live wall is exhausted
+   */
+  drawId(): TileId {
+    if (this.head >= this.liveEnd) return -1;
+    return this.slots[this.slotOf(this.head++)];
+  }
+
+  /**
+   * Draws the next live tile, or undefined when the live wall is exhausted
+   */
+  draw(): Tile | undefined {
+    const id = this.drawId();
+    return id === -1 ? undefined : decodeTile(id);
+  }
+
+  /**
+   * Draws a replacement tile from the far end: the dead wall first, then the
+   * end of the live wall once the dead wall is used up. Returns -1 when empty.
+   */
+  drawReplacementId(): TileId {
+    if (this.tail <= this.head) return -1;
+    this.tail--;
+    if (this.liveEnd > this.tail) this.liveEnd = this.tail;
+    return this.slots[this.slotOf(this.tail)];
+  }
+
+  drawReplacement(): Tile | undefined {
+    const id = this.drawReplacementId();
+    return id === -1 ? undefined : decodeTile(id);
+  }
+
+  /**
+   * Tile ID at a live-wall offset without drawing it (0 = next draw)
+   */
+  peekId(offset: number = 0): TileId {
+    const index = this.head + offset;
+    if (offset < 0 || index >= this.liveEnd) return -1;
+    return this.slots[this.slotOf(index)];
+  }
+
+  /**
+   * Deals the opening hands (see DEAL_SEAT_OFFSETS)
+   */
+  deal(dealer: PlayerId): Tile[][] {
+    const hands: Tile[][] = [[], [], [], []];
+    for (let i = 0; i < DEALT_TILE_COUNT; i++) {
+      hands[(dealer + DEAL_SEAT_OFFSETS[i]) % 4].push(decodeTile(this.drawId()));
+    }
+    return hands;
+  }
+
+  /**
+   * Live wall tiles in draw order
+   */
+  liveTiles(): Tile[] {
+    return decodeTiles(this.liveIds());
+  }
+
+  /**
+   * Dead wall tiles in draw order
+   */
+  deadTiles(): Tile[] {
+    return decodeTiles(this.deadIds());
+  }
+
+  /** Live wall tile IDs in draw order */
+  liveIds(): Uint8Array {
+    return this.idsBetween(this.head, this.liveEnd);
+  }
+
+  /** Dead wall tile IDs in draw order */
+  deadIds(): Uint8Array {
+    return this.idsBetween(this.liveEnd, this.tail);
+  }
+
+  private idsBetween(from: number, to: number): Uint8Array {
+    const ids = new Uint8Array(Math.max(0, to - from));
+    for (let i = 0; i < ids.length; i++) {
+      ids[i] = this.slots[this.slotOf(from + i)];
+    }
+    return ids;
+  }
+
+  /**
+   * Copies the cursors; the slots are never written after construction so
+   * they are shared
+   */
+  clone(): TileWall {
+    return new TileWall(this.slots, this.start, this.head, this.liveEnd, this.tail);
+  }
+
+  toJSON(): TileWallSnapshot {
+    return {
+      slots: Buffer.from(this.slots.buffer, this.slots.byteOffset, this.slots.length).toString('base64'),
+      start: this.start,
+      head: this.head,
+      liveEnd: this.liveEnd,
+      tail: this.tail
+    };
+  }
+}
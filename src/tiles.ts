@@ -2,77 +2,45 @@
  * American Mahjong tile utilities
  */
 
-import { Tile, TileNumber, Dragon, Wind, Flower } from './types';
+import { Tile, Dragon } from './types';
+import {
+  TileId,
+  TILE_SET_TEMPLATE,
+  TILE_SUIT,
+  TILE_RANK,
+  TILE_FLAGS,
+  SUIT_NAMES,
+  FLAG_FLOWER,
+  FLAG_SUITED,
+  INVALID_TILE_ID,
+  encodeTile,
+  decodeTiles,
+  areConsecutiveIds
+} from './tile-codec';
+import { HandCounts } from './hand-counts';
 
 /**
  * Creates the complete set of 152 American Mahjong tiles
+ * Order: Craks 1-9, Bams 1-9, Dots 1-9 (four each), dragons RD/GD/WD and
+ * winds N/E/S/W (four each), flowers F1-F8, then eight jokers.
  */
 export function createAmericanMahjongTileSet(): Tile[] {
-  const tiles: Tile[] = [];
-
-  // Craks (Characters) 1-9, four each = 36 tiles
-  for (let num: TileNumber = 1; num <= 9; num++) {
-    for (let i = 0; i < 4; i++) {
-      tiles.push(`${num}C`);
-    }
-  }
-
-  // Bams (Bamboos) 1-9, four each = 36 tiles
-  for (let num: TileNumber = 1; num <= 9; num++) {
-    for (let i = 0; i < 4; i++) {
-      tiles.push(`${num}B`);
-    }
-  }
-
-  // Dots 1-9, four each = 36 tiles
-  for (let num: TileNumber = 1; num <= 9; num++) {
-    for (let i = 0; i < 4; i++) {
-      tiles.push(`${num}D`);
-    }
-  }
-
-  // Dragons - four each = 12 tiles
-  const dragons: Dragon[] = ['RD', 'GD', 'WD'];
-  for (const dragon of dragons) {
-    for (let i = 0; i < 4; i++) {
-      tiles.push(dragon);
-    }
-  }
-
-  // Winds - four each = 16 tiles
-  const winds: Wind[] = ['N', 'E', 'S', 'W'];
-  for (const wind of winds) {
-    for (let i = 0; i < 4; i++) {
-      tiles.push(wind);
-    }
-  }
-
-  // Flowers - eight total = 8 tiles
-  const flowers: Flower[] = ['F1', 'F2', 'F3', 'F4', 'F5', 'F6', 'F7', 'F8'];
-  for (const flower of flowers) {
-    tiles.push(flower);
-  }
-
-  // Jokers - eight total = 8 tiles
-  for (let i = 0; i < 8; i++) {
-    tiles.push('J');
-  }
-
-  return tiles; // Total: 36 + 36 + 36 + 12 + 16 + 8 + 8 = 152 tiles
+  return decodeTiles(TILE_SET_TEMPLATE);
 }
 
 /**
  * Gets the suit of a tile
  */
 export function getTileSuit(tile: Tile): 'craks' | 'bams' | 'dots' | 'dragons' | 'winds' | 'flowers' | 'jokers' | null {
-  if (tile === 'J') return 'jokers';
-  if (tile.startsWith('F')) return 'flowers';
-  if (['N', 'E', 'S', 'W'].includes(tile)) return 'winds';
-  if (['RD', 'GD', 'WD'].includes(tile)) return 'dragons';
-  if (tile.endsWith('C')) return 'craks';
-  if (tile.endsWith('B')) return 'bams';
-  if (tile.endsWith('D')) return 'dots';
-  return null; // Unknown tile
+  const id = encodeTile(tile);
+  return id === INVALID_TILE_ID ? null : SUIT_NAMES[TILE_SUIT[id]];
+}
+
+/**
+ * Gets the suit of a tile ID
+ */
+export function getTileIdSuit(id: TileId): 'craks' | 'bams' | 'dots' | 'dragons' | 'winds' | 'flowers' | 'jokers' {
+  return SUIT_NAMES[TILE_SUIT[id]];
 }
 
 /**
@@ -93,9 +61,10 @@ export function groupTilesBySuit(tiles: Tile[]): Record<string, Tile[]> {
   const groups: Record<string, Tile[]> = {};
   
   for (const tile of tiles) {
-    const suit = getTileSuit(tile);
-    if (!suit) continue;
+    const id = encodeTile(tile);
+    if (id === INVALID_TILE_ID) continue;
     
+    const suit = SUIT_NAMES[TILE_SUIT[id]];
     if (!groups[suit]) groups[suit] = [];
     groups[suit].push(tile);
   }
@@ -107,8 +76,8 @@ export function groupTilesBySuit(tiles: Tile[]): Record<string, Tile[]> {
  * Checks if a tile can have a suit (i.e., not flowers or winds)
  */
 export function tileHasSuit(tile: Tile): boolean {
-  const suit = getTileSuit(tile);
-  return suit !== null && !['flowers', 'winds', 'jokers'].includes(suit);
+  const id = encodeTile(tile);
+  return id !== INVALID_TILE_ID && (TILE_FLAGS[id] & FLAG_SUITED) !== 0;
 }
 
 /**
@@ -151,8 +120,8 @@ export function parsePatternToTiles(pattern: string): string[] {
  * Gets the numeric value of a tile (for number tiles)
  */
 export function getTileValue(tile: Tile): number | null {
-  const match = tile.match(/^(\d+)[CBD]$/);
-  return match ? parseInt(match[1]) : null;
+  const id = encodeTile(tile);
+  return id === INVALID_TILE_ID || TILE_RANK[id] === 0 ? null : TILE_RANK[id];
 }
 
 /**
@@ -166,7 +135,8 @@ export function isJoker(tile: Tile): boolean {
  * Checks if a tile is a flower
  */
 export function isFlower(tile: Tile): boolean {
-  return tile.startsWith('F');
+  const id = encodeTile(tile);
+  return id !== INVALID_TILE_ID && (TILE_FLAGS[id] & FLAG_FLOWER) !== 0;
 }
 
 /**
@@ -175,18 +145,14 @@ export function isFlower(tile: Tile): boolean {
 export function areConsecutive(tiles: Tile[]): boolean {
   if (tiles.length < 2) return false;
   
-  const suit = getTileSuit(tiles[0]);
-  if (!suit || !['craks', 'bams', 'dots'].includes(suit)) return false;
-  
-  const values = tiles.map(getTileValue).filter(v => v !== null) as number[];
-  if (values.length !== tiles.length) return false; // All must be number tiles
-  
-  values.sort((a, b) => a - b);
-  for (let i = 1; i < values.length; i++) {
-    if (values[i] !== values[i-1] + 1) return false;
+  const ids: TileId[] = [];
+  for (const tile of tiles) {
+    const id = encodeTile(tile);
+    if (id === INVALID_TILE_ID) return false;
+    ids.push(id);
   }
   
-  return true;
+  return areConsecutiveIds(ids);
 }
 
 /**
@@ -219,34 +185,36 @@ export function getOppositeDragons(suit: string): Dragon[] {
 export function isValidMeld(tiles: Tile[], meldType: 'pong' | 'kong' | 'chow' | 'pair' | 'quint'): boolean {
   if (tiles.length === 0) return false;
   
-  const jokerCount = tiles.filter(isJoker).length;
-  const realTiles = tiles.filter(t => !isJoker(t));
+  const counts = HandCounts.tryFromTiles(tiles);
+  if (!counts) return false;
+  const jokerCount = counts.jokerCount;
+  const identical = counts.distinctNaturals() <= 1;
   
   switch (meldType) {
     case 'pair':
       // Pairs cannot use jokers in American Mahjong
       if (jokerCount > 0) return false;
       if (tiles.length !== 2) return false;
-      return realTiles.every(t => t === realTiles[0]);
+      return identical;
       
     case 'pong':
       if (tiles.length !== 3) return false;
       if (jokerCount === 3) return false; // Cannot be all jokers
-      return realTiles.every(t => t === realTiles[0]);
+      return identical;
       
     case 'kong':
       if (tiles.length !== 4) return false;
       if (jokerCount === 4) return false; // Cannot be all jokers
-      return realTiles.every(t => t === realTiles[0]);
+      return identical;
       
     case 'quint':
       if (tiles.length !== 5) return false;
-      if (jokerCount === 0 && !realTiles.every(isFlower)) {
+      if (jokerCount === 0 && counts.flowerCount !== counts.size) {
         // Quints require jokers unless all flowers
         return false;
       }
       if (jokerCount === 5) return false; // Cannot be all jokers
-      return realTiles.every(t => t === realTiles[0]);
+      return identical;
       
     case 'chow':
       if (tiles.length !== 3) return false;
@@ -4,6 +4,9 @@
  */
 
 import { CharlestonState } from './charleston';
+import { RngVersion } from './rng';
+import { TileWall } from './tile-wall';
+import type { DerivedState } from './derived-state';
 
 // American Mahjong uses 152 tiles total
 export type Tile = string; 
@@ -50,8 +53,7 @@ export interface GameState {
   players: Record<PlayerId, PlayerState>;
   dealer: PlayerId;
   currentPlayer: PlayerId;
-  wall: Tile[];
-  deadWall: Tile[];
+  wall: TileWall; // Live and dead wall; wall.length is the live tiles remaining
   reservedTiles: Tile[]; // Reserved tiles from dice roll
   discardPile: Array<{ player: PlayerId; tile: Tile }>;
   lastAction?: {
@@ -65,6 +67,8 @@ export interface GameState {
   };
   logs: Move[];
   dice?: number; // The dice roll for wall breaking
+  rngVersion?: RngVersion; // RNG stream the deal was generated with (absent = 1)
+  derived?: DerivedState; // Incrementally maintained tile counts (see derived-state.ts)
 }
 export type Meld = {
   tiles: Tile[];
@@ -141,7 +145,7 @@ export type Move =
   | { type: 'claimRequest'; player: PlayerId; claimType: 'pong' | 'chow' | 'kong' }
   | { type: 'declareMahjong'; player: PlayerId }
   | { type: 'stopCharleston'; player: PlayerId }
-  | { type: 'replaceJoker'; player: PlayerId; meldIndex: number; tile: Tile }
+  | { type: 'replaceJoker'; player: PlayerId; meldIndex: number; tile: Tile; owner?: PlayerId } // owner defaults to player
   | { type: 'kong'; player: PlayerId; tiles: Tile[] };
 
 
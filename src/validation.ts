@@ -1,5 +1,7 @@
 // path: mahjong-ts/src/validation.ts
 import { GameState, Move, PlayerId, Tile, Meld, RuleCard } from './types';
+import { HandCounts, countJokers } from './hand-counts';
+import type { DeadHandTracker } from './dead-hand';
 
 export interface ValidationError {
   code: string;
@@ -11,9 +13,11 @@ export interface ValidationResult {
   error?: ValidationError;
 }
 
-export function validateTileOwnership(hand: Tile[], tiles: Tile[]): ValidationResult {
+export function validateTileOwnership(hand: Tile[] | HandCounts, tiles: Tile[]): ValidationResult {
+  // Work on a copy so duplicates must each be matched by a separate tile in hand
+  const remaining = hand instanceof HandCounts ? hand.clone() : HandCounts.fromTiles(hand);
   for (const tile of tiles) {
-    if (!hand.includes(tile)) {
+    if (!remaining.remove(tile)) {
       return {
         valid: false,
         error: {
@@ -27,7 +31,7 @@ export function validateTileOwnership(hand: Tile[], tiles: Tile[]): ValidationRe
 }
 
 export function validateJokerUsage(meld: Meld): ValidationResult {
-  const jokerCount = meld.tiles.filter(t => t === 'J').length;
+  const jokerCount = countJokers(meld.tiles);
   
   // No jokers in the meld
   if (jokerCount === 0) return { valid: true };
@@ -69,11 +73,23 @@ export function validateExposure(meld: Meld, state: GameState, isOpen: boolean):
     };
   }
 
+  const counts = HandCounts.tryFromTiles(meld.tiles);
+  if (!counts) {
+    return {
+      valid: false,
+      error: {
+        code: 'invalid_tile',
+        message: 'Meld contains an unknown tile'
+      }
+    };
+  }
+  // All natural (non-joker) tiles in a pong, kong or quint must be identical
+  const identicalNaturals = counts.distinctNaturals() <= 1;
+
   switch (meld.type) {
     case 'pong':
       // Must have at least 2 natural tiles plus claimed tile or joker
-      const naturalTiles = meld.tiles.filter(t => t !== 'J');
-      if (naturalTiles.length < 2) {
+      if (counts.naturalCount < 2) {
         return {
           valid: false,
           error: {
@@ -82,8 +98,7 @@ export function validateExposure(meld: Meld, state: GameState, isOpen: boolean):
           }
         };
       }
-      // All natural tiles must be the same
-      if (naturalTiles.length > 0 && !naturalTiles.every(t => t === naturalTiles[0])) {
+      if (!identicalNaturals) {
         return {
           valid: false,
           error: {
@@ -96,8 +111,7 @@ export function validateExposure(meld: Meld, state: GameState, isOpen: boolean):
       
     case 'kong':
       // Must have at least 3 natural tiles plus claimed tile or joker
-      const kongNaturals = meld.tiles.filter(t => t !== 'J');
-      if (kongNaturals.length < 3) {
+      if (counts.naturalCount < 3) {
         return {
           valid: false,
           error: {
@@ -106,8 +120,7 @@ export function validateExposure(meld: Meld, state: GameState, isOpen: boolean):
           }
         };
       }
-      // All natural tiles must be the same
-      if (kongNaturals.length > 0 && !kongNaturals.every(t => t === kongNaturals[0])) {
+      if (!identicalNaturals) {
         return {
           valid: false,
           error: {
@@ -120,10 +133,7 @@ export function validateExposure(meld: Meld, state: GameState, isOpen: boolean):
 
     case 'quint':
       // Five of a kind - requires at least one joker unless all flowers
-      const quintNaturals = meld.tiles.filter(t => t !== 'J');
-      const jokerCount = meld.tiles.filter(t => t === 'J').length;
-      
-      if (meld.tiles.length !== 5) {
+      if (counts.size !== 5) {
         return {
           valid: false,
           error: {
@@ -133,7 +143,7 @@ export function validateExposure(meld: Meld, state: GameState, isOpen: boolean):
         };
       }
       
-      if (jokerCount === 0 && !quintNaturals.every(t => t.startsWith('F'))) {
+      if (counts.jokerCount === 0 && counts.flowerCount !== counts.size) {
         return {
           valid: false,
           error: {
@@ -143,7 +153,7 @@ export function validateExposure(meld: Meld, state: GameState, isOpen: boolean):
         };
       }
       
-      if (quintNaturals.length > 0 && !quintNaturals.every(t => t === quintNaturals[0])) {
+      if (!identicalNaturals) {
         return {
           valid: false,
           error: {
@@ -168,7 +178,11 @@ export function validateExposure(meld: Meld, state: GameState, isOpen: boolean):
   return { valid: true };
 }
 
-export function validateDeadHand(state: GameState, player: PlayerId): ValidationResult {
+/**
+ * Checks the player's tile count and exposures, and, given the game's
+ * DeadHandTracker (synced to the state), that some pattern is still reachable
+ */
+export function validateDeadHand(state: GameState, player: PlayerId, candidates?: DeadHandTracker): ValidationResult {
   const playerState = state.players[player];
   
   // Check tile count
@@ -192,15 +206,55 @@ export function validateDeadHand(state: GameState, player: PlayerId): Validation
       return exposureResult;
     }
   }
+
+  if (candidates?.isDead(player)) {
+    return {
+      valid: false,
+      error: {
+        code: 'dead_hand',
+        message: 'No pattern on the card can still be completed'
+      }
+    };
+  }
   
   return { valid: true };
 }
 
+function invalid(code: string, message: string): ValidationResult {
+  return { valid: false, error: { code, message } };
+}
+
+/**
+ * Tiles a player holds, concealed plus exposed
+ */
+function totalTiles(state: GameState, player: PlayerId): number {
+  if (state.derived) return state.derived.tileCount(player);
+  const playerState = state.players[player];
+  return playerState.hand.length + playerState.melds.reduce((sum, m) => sum + m.tiles.length, 0);
+}
+
+/**
+ * Checks that it is the player's turn during play
+ */
+function validateTurn(state: GameState, player: PlayerId): ValidationResult {
+  if (state.phase !== 'play') {
+    return invalid('invalid_phase', 'Game is not in play');
+  }
+  if (state.currentPlayer !== player) {
+    return invalid('not_your_turn', 'It is not your turn');
+  }
+  return { valid: true };
+}
+
 export function validateMove(state: GameState, move: Move): ValidationResult {
   const player = state.players[move.player];
+  // Counts are maintained by the move reducer when present
+  const hand = state.derived ? state.derived.hands[move.player] : player.hand;
   
   switch (move.type) {
-    case 'draw':
+    case 'draw': {
+      const turn = validateTurn(state, move.player);
+      if (!turn.valid) return turn;
       if (state.wall.length === 0) {
         return {
           valid: false,
@@ -210,7 +264,7 @@ export function validateMove(state: GameState, move: Move): ValidationResult {
           }
         };
       }
-      if (player.hand.length !== 13) {
+      if (totalTiles(state, move.player) !== 13) {
         return {
           valid: false,
           error: {
@@ -220,9 +274,10 @@ export function validateMove(state: GameState, move: Move): ValidationResult {
         };
       }
       break;
+    }
       
-    case 'discard':
-      if (player.hand.length !== 14) {
+    case 'discard': {
+      if (totalTiles(state, move.player) !== 14) {
         return {
           valid: false,
           error: {
@@ -231,11 +286,17 @@ export function validateMove(state: GameState, move: Move): ValidationResult {
           }
         };
       }
-      const ownership = validateTileOwnership(player.hand, [move.tile]);
+      const ownership = validateTileOwnership(hand, [move.tile]);
       if (!ownership.valid) return ownership;
+      const turn = validateTurn(state, move.player);
+      if (!turn.valid) return turn;
       break;
+    }
       
-    case 'claim':
+    case 'claim': {
+      if (player.isDead) {
+        return invalid('dead_hand', 'A dead hand cannot call discards');
+      }
       // Validate claim timing and tile ownership
       const lastDiscard = state.discardPile[state.discardPile.length - 1];
       if (!lastDiscard || lastDiscard.tile !== move.meld.tiles[0]) {
@@ -247,6 +308,12 @@ export function validateMove(state: GameState, move: Move): ValidationResult {
           }
         };
       }
+      if (lastDiscard.player === move.player) {
+        return invalid('invalid_claim', 'Cannot claim your own discard');
+      }
+      if (state.phase !== 'play') {
+        return invalid('invalid_phase', 'Game is not in play');
+      }
       
       // Validate the meld structure
       const jokerResult = validateJokerUsage(move.meld);
@@ -263,7 +330,86 @@ export function validateMove(state: GameState, move: Move): ValidationResult {
         const exposureResult = validateExposure(move.meld, state, isOpen);
         if (!exposureResult.valid) return exposureResult;
       break;
+    }
+
+    case 'charlestonPass': {
+      if (state.phase !== 'charleston') {
+        return invalid('invalid_phase', 'Charleston is not active');
+      }
+      if (move.to === move.player) {
+        return invalid('invalid_pass', 'Cannot pass tiles to yourself');
+      }
+      if (move.tiles.includes('J')) {
+        return invalid('invalid_pass', 'Jokers cannot be passed');
+      }
+      const ownership = validateTileOwnership(hand, move.tiles);
+      if (!ownership.valid) return ownership;
+      break;
+    }
+
+    case 'kong': {
+      const turn = validateTurn(state, move.player);
+      if (!turn.valid) return turn;
+      const meld: Meld = { tiles: move.tiles, type: 'kong', from: 'wall', exposed: true, canExchangeJokers: true };
+      if (move.tiles.length !== 4) {
+        return invalid('invalid_kong', 'Kong must have exactly 4 tiles');
+      }
+      const jokerResult = validateJokerUsage(meld);
+      if (!jokerResult.valid) return jokerResult;
+      const exposureResult = validateExposure(meld, state, true);
+      if (!exposureResult.valid) return exposureResult;
+      const ownership = validateTileOwnership(hand, move.tiles);
+      if (!ownership.valid) return ownership;
+      break;
+    }
+
+    case 'replaceJoker': {
+      const turn = validateTurn(state, move.player);
+      if (!turn.valid) return turn;
+      const owner = state.players[move.owner ?? move.player];
+      const meld = owner?.melds[move.meldIndex];
+      if (!meld || !meld.exposed || !meld.tiles.includes('J')) {
+        return invalid('invalid_joker_exchange', 'No exposed joker in that meld');
+      }
+      // The replacement must be the tile the joker stands in for
+      if (move.tile === 'J' || meld.tiles.some(t => t !== 'J' && t !== move.tile)) {
+        return invalid('invalid_joker_exchange', `${move.tile} does not match the meld`);
+      }
+      const ownership = validateTileOwnership(hand, [move.tile]);
+      if (!ownership.valid) return ownership;
+      break;
+    }
+
+    case 'declareMahjong': {
+      if (state.phase !== 'play') {
+        return invalid('invalid_phase', 'Game is not in play');
+      }
+      if (player.isDead) {
+        return invalid('dead_hand', 'A dead hand cannot declare mahjong');
+      }
+      // 14 tiles win on the player's own turn; 13 only on the discard just thrown
+      if (totalTiles(state, move.player) === 14) {
+        if (state.currentPlayer !== move.player) {
+          return invalid('not_your_turn', 'It is not your turn');
+        }
+        break;
+      }
+      const discard = state.discardPile[state.discardPile.length - 1];
+      if (
+        state.lastAction?.type !== 'discard' || !discard ||
+        discard.tile !== state.lastAction.tile || discard.player === move.player
+      ) {
+        return invalid('invalid_claim', 'Mahjong on a discard must call the discard just thrown');
+      }
+      break;
+    }
+
+    case 'stopCharleston':
+      if (state.phase !== 'charleston') {
+        return invalid('invalid_phase', 'Charleston is not active');
+      }
+      break;
   }
   
   return { valid: true };
-}
\ No newline at end of file
+}
@@ -3,8 +3,9 @@
  */
 
 import { Tile, PlayerId } from './types';
-import { DeterministicRNG } from './rng';
-import { createAmericanMahjongTileSet } from './tiles';
+import { DeterministicRNG, RngVersion, LATEST_RNG_VERSION } from './rng';
+import { TILE_SET_TEMPLATE, decodeTiles } from './tile-codec';
+import { TileWall, TileWallSnapshot } from './tile-wall';
 
 export interface Wall {
   tiles: Tile[];
@@ -21,17 +22,39 @@ export interface GameWalls {
  * Creates and shuffles the complete American Mahjong tile set
  */
 export function createShuffledTileSet(rng: DeterministicRNG): Tile[] {
-  const tiles = createAmericanMahjongTileSet();
+  return decodeTiles(shuffleTileIds(rng));
+}
+
+/**
+ * Shuffles the tile set as IDs (same permutation as createShuffledTileSet)
+ */
+export function shuffleTileIds(rng: DeterministicRNG): Uint8Array {
+  return shuffleTileIdsInto(rng, new Uint8Array(TILE_SET_TEMPLATE.length));
+}
+
+/**
+ * Writes a shuffled tile set into an existing buffer of 152 slots
+ */
+export function shuffleTileIdsInto(rng: DeterministicRNG, ids: Uint8Array): Uint8Array {
+  ids.set(TILE_SET_TEMPLATE);
   
   // Fisher-Yates shuffle using DeterministicRNG
-  for (let i = tiles.length - 1; i > 0; i--) {
+  for (let i = ids.length - 1; i > 0; i--) {
     const j = rng.nextInt(i + 1);
-    [tiles[i], tiles[j]] = [tiles[j], tiles[i]];
+    const tmp = ids[i];
+    ids[i] = ids[j];
+    ids[j] = tmp;
   }
   
-  return tiles;
+  return ids;
 }
 
+/*
+ * Array-based wall building (buildWalls/breakWall/dealTiles) is the original
+ * reference implementation. Games are set up with TileWall, which produces the
+ * same deal without copying arrays.
+ */
+
 /**
  * Builds four walls from shuffled tiles
  * Each wall is 19 tiles long and 2 tiles deep (38 tiles total)
@@ -151,27 +174,58 @@ export function rollDice(rng: DeterministicRNG): number {
  */
 export function setupGame(rng: DeterministicRNG, dealer: PlayerId): {
   hands: Tile[][];
-  gameWalls: GameWalls;
+  wall: TileWall;
   dice: number;
 } {
-  // Create and shuffle tiles
-  const shuffledTiles = createShuffledTileSet(rng);
-  
-  // Build walls
-  const walls = buildWalls(shuffledTiles);
-  
-  // Roll dice for wall breaking
+  // Shuffle, roll dice for wall breaking, then break and deal in place
+  const shuffled = shuffleTileIds(rng);
   const dice = rollDice(rng);
+  const wall = TileWall.fromShuffle(shuffled, dealer, dice);
+  const hands = wall.deal(dealer);
   
-  // Break wall and set up dealing
-  const gameWalls = breakWall(walls, dice, dealer);
-  
-  // Deal tiles to all players
-  const { hands, gameWalls: finalGameWalls } = dealTiles(gameWalls);
-  
+  return { hands, wall, dice };
+}
+
+export interface GameDeal {
+  hands: Tile[][];
+  wall: TileWall;
+  reservedTiles: Tile[]; // Reserved tiles from dice roll, in wall order
+  dice: number;
+}
+
+/**
+ * Runs the full setup for a pair of committed seeds
+ */
+export function dealFromSeeds(
+  clientSeed: string,
+  serverSecret: string,
+  dealer: PlayerId,
+  rngVersion: RngVersion = LATEST_RNG_VERSION
+): GameDeal {
+  const rng = new DeterministicRNG(clientSeed, serverSecret, rngVersion);
+  const { hands, wall, dice } = setupGame(rng, dealer);
   return {
     hands,
-    gameWalls: finalGameWalls,
+    wall,
+    reservedTiles: wall.deadTiles().reverse(),
     dice
   };
-}
\ No newline at end of file
+}
+
+/**
+ * Plain-data form of a GameDeal for passing between threads
+ */
+export interface SerializedGameDeal {
+  hands: Tile[][];
+  wall: TileWallSnapshot;
+  reservedTiles: Tile[];
+  dice: number;
+}
+
+export function serializeDeal(deal: GameDeal): SerializedGameDeal {
+  return { ...deal, wall: deal.wall.toJSON() };
+}
+
+export function deserializeDeal(deal: SerializedGameDeal): GameDeal {
+  return { ...deal, wall: TileWall.fromJSON(deal.wall) };
+}
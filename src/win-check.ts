@@ -0,0 +1,27 @@
+/**
+ * Win detection against the game's rule card
+ */
+
+import { GameState, PlayerId, Tile, Meld, RuleCard } from './types';
+import { getCompiledRuleCard, toHandVector } from './hand-matcher';
+import { getEvalCache } from './eval-cache';
+
+/**
+ * Checks whether a complete hand matches a pattern on the card. Exposed
+ * melds must each fill one group of the pattern. Answers are memoized in the
+ * shared evaluation cache.
+ */
+export function isWinningHand(hand: Tile[], melds: Meld[], ruleCard: RuleCard): boolean {
+  const vector = toHandVector(hand, melds);
+  if (!vector) return false;
+  return getEvalCache().matchPatterns(getCompiledRuleCard(ruleCard), vector).length > 0;
+}
+
+export function checkWin(state: GameState, player: PlayerId): boolean {
+  // Validate hand against rulecard patterns
+  const playerState = state.players[player];
+  if (!playerState) return false;
+  const ruleCard = state.options?.ruleCard;
+  if (!ruleCard) return false;
+  return isWinningHand(playerState.hand, playerState.melds, ruleCard);
+}
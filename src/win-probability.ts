@@ -0,0 +1,362 @@
+/**
+ * Exact probability of completing each line on the card in the draws left
+ *
+ * As seen from one player, the tiles they have not seen (the wall plus the
+ * other players' concealed hands) form a multiset: every copy less the
+ * discards, all exposures and the player's own hand. The player's remaining
+ * draws are modelled as a sample without replacement from that multiset, and
+ * a template is completed when the sample holds every missing single and pair
+ * tile and the group tiles still short fit in the jokers held and drawn (up to
+ * the pattern's joker limit). Discards are free, so no needed tile is ever
+ * thrown back.
+ *
+ * The probability is a multivariate hypergeometric sum, computed exactly by a
+ * DP over the template's missing classes: (tiles drawn from them, group tiles
+ * short) -> number of ways, with the jokers and unneeded tiles folded in at
+ * the end. Both stages are cached. The DP table is keyed by the needs vector
+ * (missing tiles and unseen copies per class, sorted so suit twins share it),
+ * so it survives from turn to turn until the hand or those classes change;
+ * the final probability adds the unseen jokers, pool size and draws left.
+ */
+
+import { GameState, HandPattern, Meld, PlayerId, RuleCard, Tile } from './types';
+import { HandCounts } from './hand-counts';
+import {
+  CompiledRuleCard,
+  HandTemplate,
+  MATCH_CLASS_COUNT,
+  HAND_SIZE,
+  getCompiledRuleCard,
+  matchClass,
+  toHandVector
+} from './hand-matcher';
+import { getDistanceTable, placeMelds } from './hand-distance';
+import { JOKER_ID, TILE_COPIES } from './tile-codec';
+import { getDerivedState } from './derived-state';
+
+export interface PatternProbability {
+  pattern: HandPattern;
+  template: HandTemplate;  // The pattern's most likely line
+  probability: number;     // Chance of completing that line in the draws left
+}
+
+export interface WinProbabilityOptions {
+  draws?: number; // Draws left for the player (default: their share of the live wall)
+}
+
+/** Unseen tiles as seen from one player */
+export interface UnseenTiles {
+  counts: Uint8Array; // Per match class
+  jokers: number;
+}
+
+const POOL_SIZE = TILE_COPIES.reduce((sum, n) => sum + n, 0);
+// DP tables run to a few KiB each
+const MAX_NEED_TABLES = 4096;
+
+// Binomial coefficients up to the size of the set, as doubles
+const binomials: Float64Array[] = (() => {
+  const rows: Float64Array[] = [];
+  for (let n = 0; n <= POOL_SIZE; n++) {
+    const row = new Float64Array(n + 1);
+    row[0] = row[n] = 1;
+    for (let k = 1; k < n; k++) row[k] = rows[n - 1][k - 1] + rows[n - 1][k];
+    rows.push(row);
+  }
+  return rows;
+})();
+
+function choose(n: number, k: number): number {
+  return k < 0 || k > n ? 0 : binomials[n][k];
+}
+
+/**
+ * Ways of drawing k tiles of a template's missing classes, by (k, group tiles
+ * left short): row k holds jokerRoom + 1 counts. Depends only on the needs, so
+ * it is shared across turns until the hand or the unseen counts of those
+ * classes change. Probabilities worked out from it are kept with it, by draw
+ * model.
+ */
+interface NeedWays {
+  ways: Float64Array;
+  width: number;
+  tiles: number; // Unseen tiles of the missing classes (the last row)
+  probabilities: Map<number, number>;
+}
+
+const needCache = new Map<string, NeedWays>();
+// DP rows, reused between runs (the DP is synchronous)
+let scratch = [new Float64Array(0), new Float64Array(0)];
+let hits = 0;
+let misses = 0;
+
+/**
+ * Runs the DP over the missing classes. needs holds one code per class,
+ * (unseen copies << 8) | (missing single/pair tiles << 4) | missing group tiles.
+ */
+function needWays(needs: readonly number[], jokerRoom: number): NeedWays {
+  const width = jokerRoom + 1;
+  let tiles = 0;
+  for (const need of needs) tiles += need >> 8;
+  const size = (tiles + 1) * width;
+  if (scratch[0].length < size) scratch = [new Float64Array(size), new Float64Array(size)];
+  let [ways, next] = scratch;
+  ways.fill(0, 0, size);
+  ways[0] = 1;
+
+  let drawnMax = 0;
+  for (const need of needs) {
+    const unseen = need >> 8;
+    const natural = (need >> 4) & 15;
+    const grouped = need & 15;
+    next.fill(0, 0, size);
+    for (let drawn = 0; drawn <= drawnMax; drawn++) {
+      for (let short = 0; short < width; short++) {
+        const w = ways[drawn * width + short];
+        if (w === 0) continue;
+        for (let k = natural; k <= unseen; k++) {
+          const s = short + (grouped > k - natural ? grouped - (k - natural) : 0);
+          if (s < width) next[(drawn + k) * width + s] += w * choose(unseen, k);
+        }
+      }
+    }
+    drawnMax += unseen;
+    [ways, next] = [next, ways];
+  }
+  return { ways: ways.slice(0, size), width, tiles, probabilities: new Map() };
+}
+
+/**
+ * The draws being modelled: `draws` tiles from a pool of `pool` unseen tiles,
+ * `jokers` of them jokers. For each number of unseen tiles a template's
+ * missing classes hold, tails() gives, per tiles drawn from those classes d
+ * and joker count m, the ways of making up the rest of the draws with at
+ * least m jokers.
+ */
+class DrawModel {
+  private readonly tables = new Map<number, Float64Array>();
+  /** Numeric key of the model (pool and draws fit in 8 bits, jokers in 4) */
+  readonly key: number;
+
+  constructor(readonly pool: number, readonly draws: number, readonly jokers: number) {
+    this.key = (pool << 16) | (draws << 8) | (jokers << 4);
+  }
+
+  tails(tiles: number): Float64Array {
+    let table = this.tables.get(tiles);
+    if (!table) {
+      const width = this.jokers + 2;
+      const other = this.pool - tiles - this.jokers;
+      table = new Float64Array((this.draws + 1) * width);
+      for (let drawn = 0; drawn <= this.draws; drawn++) {
+        const rest = this.draws - drawn;
+        const row = drawn * width;
+        for (let k = this.jokers; k >= 0; k--) {
+          table[row + k] = table[row + k + 1] + (k <= rest ? choose(this.jokers, k) * choose(other, rest - k) : 0);
+        }
+      }
+      this.tables.set(tiles, table);
+    }
+    return table;
+  }
+}
+
+/**
+ * Probability of drawing what a template still needs (needs ends with its
+ * joker room), holding `jokers` usable jokers
+ */
+function completionProbability(needs: number[], jokers: number, model: DrawModel): number {
+  const needKey = String.fromCharCode.apply(null, needs);
+  let entry = needCache.get(needKey);
+  if (!entry) {
+    if (needCache.size >= MAX_NEED_TABLES) needCache.clear();
+    entry = needWays(needs.slice(0, -1), needs[needs.length - 1]);
+    needCache.set(needKey, entry);
+  }
+  const key = model.key | jokers;
+  const cached = entry.probabilities.get(key);
+  if (cached !== undefined) {
+    hits++;
+    return cached;
+  }
+  misses++;
+
+  // With d tiles drawn from the missing classes and s group tiles short, at
+  // least s - jokers of the remaining draws must be jokers
+  const { ways, width, tiles } = entry;
+  const tails = model.tails(tiles);
+  const tailWidth = model.jokers + 2;
+  let total = 0;
+  for (let drawn = 0; drawn <= tiles && drawn <= model.draws; drawn++) {
+    for (let short = 0; short < width; short++) {
+      const w = ways[drawn * width + short];
+      if (w === 0) continue;
+      const k = short > jokers ? short - jokers : 0;
+      if (k <= model.jokers) total += w * tails[drawn * tailWidth + k];
+    }
+  }
+  const probability = Math.min(1, total / choose(model.pool, model.draws));
+  entry.probabilities.set(key, probability);
+  return probability;
+}
+
+const templateClasses = new WeakMap<CompiledRuleCard, Uint8Array[]>();
+
+/**
+ * The classes each template (in distance-table order) uses
+ */
+function getTemplateClasses(compiled: CompiledRuleCard, templates: readonly HandTemplate[]): Uint8Array[] {
+  let classes = templateClasses.get(compiled);
+  if (!classes) {
+    classes = templates.map(template => {
+      const used: number[] = [];
+      for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+        if (template.natural[cls] + template.grouped[cls] > 0) used.push(cls);
+      }
+      return Uint8Array.from(used);
+    });
+    templateClasses.set(compiled, classes);
+  }
+  return classes;
+}
+
+/**
+ * Tiles the player has not seen: every copy less the discards, all exposures
+ * and the player's concealed hand
+ */
+export function unseenTiles(state: GameState, player: PlayerId): UnseenTiles {
+  const derived = getDerivedState(state);
+  const counts = new Uint8Array(MATCH_CLASS_COUNT);
+  for (let id = 0; id < JOKER_ID; id++) {
+    counts[matchClass(id)] += Math.max(0, TILE_COPIES[id] - derived.visible.countId(id) - derived.hands[player].countId(id));
+  }
+  const jokers = Math.max(0, TILE_COPIES[JOKER_ID] - derived.visible.jokerCount - derived.hands[player].jokerCount);
+  return { counts, jokers };
+}
+
+/**
+ * The player's share of the live wall, drawing in turn order from whoever
+ * draws next
+ */
+export function drawsLeft(state: GameState, player: PlayerId): number {
+  const holding = getDerivedState(state).tileCount(state.currentPlayer) === HAND_SIZE;
+  const next = holding ? (state.currentPlayer + 1) % 4 : state.currentPlayer;
+  const offset = (player - next + 4) % 4;
+  const live = state.wall.length;
+  return offset >= live ? 0 : Math.floor((live - 1 - offset) / 4) + 1;
+}
+
+/**
+ * Chance of completing every reachable pattern of the card from a hand, most
+ * likely first. Each pattern is given with its most likely line.
+ */
+export function handWinProbabilities(
+  card: RuleCard,
+  hand: readonly Tile[] | HandCounts,
+  melds: readonly Meld[],
+  unseen: UnseenTiles,
+  draws: number
+): PatternProbability[] {
+  const vector = toHandVector(hand, melds);
+  if (!vector) {
+    throw new Error('Hand contains unknown tiles or mixed melds');
+  }
+  const compiled = getCompiledRuleCard(card);
+  const { templates, patternOf, maxJokers, isOpen } = getDistanceTable(compiled);
+  let pool = unseen.jokers;
+  for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) pool += unseen.counts[cls];
+  draws = Math.max(0, Math.min(draws, pool));
+
+  const classes = getTemplateClasses(compiled, templates);
+  const model = new DrawModel(pool, draws, unseen.jokers);
+  const grouped = new Uint8Array(MATCH_CLASS_COUNT);
+  const best = new Array<PatternProbability | undefined>(compiled.patterns.length);
+  const needs: number[] = [];
+
+  for (let t = 0; t < templates.length; t++) {
+    const template = templates[t];
+    if (vector.meldJokers > maxJokers[t]) continue;
+    grouped.set(template.grouped);
+    if (vector.melds.length > 0 && (!isOpen[t] || !placeMelds(template, vector.melds, grouped))) continue;
+    const jokerRoom = maxJokers[t] - vector.meldJokers;
+
+    // Missing tiles per class; give up early when the draws cannot cover them
+    needs.length = 0;
+    let missing = 0;
+    let missingNatural = 0;
+    let possible = true;
+    for (const cls of classes[t]) {
+      const have = vector.counts[cls];
+      const need = template.natural[cls];
+      const natural = need > have ? need - have : 0;
+      const spare = have > need ? have - need : 0;
+      const group = grouped[cls] > spare ? grouped[cls] - spare : 0;
+      if (natural + group === 0) continue;
+      if (natural > unseen.counts[cls]) {
+        possible = false;
+        break;
+      }
+      missing += natural + group;
+      missingNatural += natural;
+      needs.push((unseen.counts[cls] << 8) | (natural << 4) | group);
+    }
+    const jokers = Math.min(vector.jokers, jokerRoom);
+    if (!possible || missingNatural > draws || missing - Math.min(jokerRoom, vector.jokers + unseen.jokers) > draws) {
+      continue;
+    }
+
+    if (needs.length === 0) {
+      best[patternOf[t]] = { pattern: compiled.patterns[patternOf[t]].pattern, template, probability: 1 };
+      continue;
+    }
+    // Sorted so templates with the same needs (e.g. suit twins) share entries
+    for (let i = 1; i < needs.length; i++) {
+      const need = needs[i];
+      let j = i - 1;
+      for (; j >= 0 && needs[j] > need; j--) needs[j + 1] = needs[j];
+      needs[j + 1] = need;
+    }
+    needs.push(jokerRoom);
+    const probability = completionProbability(needs, jokers, model);
+    if (probability === 0) continue;
+
+    const p = patternOf[t];
+    const current = best[p];
+    if (!current || probability > current.probability) {
+      best[p] = { pattern: compiled.patterns[p].pattern, template, probability };
+    }
+  }
+
+  return best
+    .filter((p): p is PatternProbability => p !== undefined)
+    .sort((a, b) => b.probability - a.probability || b.pattern.points - a.pattern.points);
+}
+
+/**
+ * Chance of the player completing each still-live pattern in their remaining
+ * draws, given what is visible to them in the state
+ */
+export function winProbabilities(
+  state: GameState,
+  player: PlayerId,
+  options: WinProbabilityOptions = {}
+): PatternProbability[] {
+  const derived = getDerivedState(state);
+  return handWinProbabilities(
+    state.options.ruleCard,
+    derived.hands[player],
+    state.players[player].melds,
+    unseenTiles(state, player),
+    options.draws ?? drawsLeft(state, player)
+  );
+}
+
+export interface WinProbabilityCacheStats {
+  needs: number; // Cached DP tables
+  hits: number;  // Probabilities answered from the cache
+  misses: number;
+}
+
+export function winProbabilityCacheStats(): WinProbabilityCacheStats {
+  return { needs: needCache.size, hits, misses };
+}
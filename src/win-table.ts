@@ -0,0 +1,364 @@
+/**
+ * Precomputed winning-hand table for a rule card
+ *
+ * Every 14-tile multiset that completes a pattern (each template, with every
+ * way of standing jokers in for group tiles up to the pattern's limit) is
+ * stored under an exact key: its 14 match classes sorted ascending, jokers
+ * last, packed six bits each into three 32-bit words. Keys are placed with a
+ * hash-and-displace perfect hash: a first hash picks a bucket, and each
+ * bucket stores the seed that sends its keys to free slots. A lookup is two
+ * hashes, one slot read and a key compare, and yields every pattern the
+ * multiset completes, highest points first.
+ *
+ * Exposed melds are folded into the multiset (their jokers as jokers). That
+ * is necessary but not sufficient for a match, so hands with exposures have
+ * the listed patterns checked with the compiled matcher.
+ *
+ * The table for the 2024 card is generated by src/build-win-table.ts and
+ * shipped as data/2024-win-table.bin. A table carries a fingerprint of the
+ * card it was built for and is ignored for any other card.
+ */
+
+import * as fs from 'fs';
+import * as path from 'path';
+import { RuleCard } from './types';
+import {
+  CompiledPattern,
+  CompiledRuleCard,
+  HandVector,
+  HAND_SIZE,
+  MATCH_CLASS_COUNT,
+  getCompiledRuleCard,
+  matchCompiledPattern
+} from './hand-matcher';
+import { JOKER_ID } from './tile-codec';
+
+export const WIN_TABLE_FILE = '2024-win-table.bin';
+
+const MAGIC = 0x544a574d; // "MWJT"
+const VERSION = 1;
+const HEADER_WORDS = 8;
+const KEY_WORDS = 3;
+const EMPTY = 0xffff;
+const BUCKET_SIZE = 4;    // Average keys per bucket
+const LOAD_FACTOR = 0.95; // Keys per slot
+const MAX_SEED = 0xffff;
+
+/**
+ * FNV-1a over what the table depends on: pattern order, notation, suit
+ * constraints, points and joker rules
+ */
+export function cardFingerprint(card: RuleCard): number {
+  let hash = 0x811c9dc5;
+  for (const pattern of card.patterns) {
+    const text = JSON.stringify([
+      pattern.name,
+      pattern.pattern,
+      pattern.points,
+      pattern.allowedJokers,
+      pattern.specialRules ?? {},
+      pattern.suitConstraints
+    ]);
+    for (let i = 0; i < text.length; i++) {
+      hash = Math.imul(hash ^ text.charCodeAt(i), 0x01000193);
+    }
+  }
+  return hash >>> 0;
+}
+
+function mix(h: number): number {
+  h = Math.imul(h ^ (h >>> 16), 0x85ebca6b);
+  h = Math.imul(h ^ (h >>> 13), 0xc2b2ae35);
+  return (h ^ (h >>> 16)) >>> 0;
+}
+
+function hashKey(w0: number, w1: number, w2: number, seed: number): number {
+  return mix(mix(mix(seed ^ w0) ^ w1) ^ w2);
+}
+
+/**
+ * Packs the sorted classes of a 14-tile multiset. Returns false unless the
+ * counts come to exactly 14 tiles.
+ */
+function packKey(counts: Uint8Array, jokers: number, out: Uint32Array): boolean {
+  let w0 = 0;
+  let w1 = 0;
+  let w2 = 0;
+  let n = 0;
+  for (let cls = 0; cls <= JOKER_ID; cls++) {
+    const count = cls === JOKER_ID ? jokers : counts[cls];
+    if (n + count > HAND_SIZE) return false;
+    for (let k = 0; k < count; k++, n++) {
+      if (n < 5) w0 |= cls << (6 * n);
+      else if (n < 10) w1 |= cls << (6 * (n - 5));
+      else w2 |= cls << (6 * (n - 10));
+    }
+  }
+  out[0] = w0;
+  out[1] = w1;
+  out[2] = w2;
+  return n === HAND_SIZE;
+}
+
+interface TableLayout {
+  seeds: number;
+  keys: number;
+  values: number;
+  listOffsets: number;
+  lists: number;
+  byteLength: number;
+}
+
+/**
+ * Byte offsets of the sections after the header, each 4-byte aligned
+ */
+function tableLayout(buckets: number, slots: number, listCount: number, listLength: number): TableLayout {
+  const align = (bytes: number) => (bytes + 3) & ~3;
+  const seeds = HEADER_WORDS * 4;
+  const keys = seeds + align(buckets * 2);
+  const values = keys + slots * KEY_WORDS * 4;
+  const listOffsets = values + align(slots * 2);
+  const lists = listOffsets + (listCount + 1) * 4;
+  return { seeds, keys, values, listOffsets, lists, byteLength: lists + align(listLength * 2) };
+}
+
+const NO_PATTERNS: readonly number[] = Object.freeze([]);
+
+// Scratch space for lookups (lookups are synchronous)
+const scratchKey = new Uint32Array(KEY_WORDS);
+const scratchCounts = new Uint8Array(MATCH_CLASS_COUNT);
+
+export class WinTable {
+  readonly fingerprint: number;
+  readonly keyCount: number;
+  readonly byteLength: number;
+  private readonly seeds: Uint16Array;
+  private readonly keys: Uint32Array;
+  private readonly values: Uint16Array;
+  /** Pattern lists, unpacked once so lookups do not allocate */
+  private readonly lists: ReadonlyArray<readonly number[]>;
+
+  private constructor(buffer: ArrayBuffer) {
+    const header = new Uint32Array(buffer, 0, HEADER_WORDS);
+    if (header[0] !== MAGIC || header[1] !== VERSION) {
+      throw new Error('Not a win table (or an unsupported version)');
+    }
+    this.fingerprint = header[2];
+    this.keyCount = header[3];
+    const slots = header[4];
+    const buckets = header[5];
+    const listCount = header[6];
+    const listLength = header[7];
+    this.byteLength = buffer.byteLength;
+
+    const layout = tableLayout(buckets, slots, listCount, listLength);
+    if (layout.byteLength !== buffer.byteLength) {
+      throw new Error('Win table is truncated or has trailing data');
+    }
+    this.seeds = new Uint16Array(buffer, layout.seeds, buckets);
+    this.keys = new Uint32Array(buffer, layout.keys, slots * KEY_WORDS);
+    this.values = new Uint16Array(buffer, layout.values, slots);
+    const offsets = new Uint32Array(buffer, layout.listOffsets, listCount + 1);
+    const lists = new Uint16Array(buffer, layout.lists, listLength);
+    this.lists = Array.from({ length: listCount }, (_, l) =>
+      Object.freeze(Array.from(lists.subarray(offsets[l], offsets[l + 1])))
+    );
+  }
+
+  /**
+   * Reads a serialized table. The bytes are copied, so the source may be
+   * any (unaligned) buffer.
+   */
+  static fromBytes(bytes: Uint8Array): WinTable {
+    return new WinTable(bytes.slice().buffer);
+  }
+
+  /**
+   * Indices into the card's patterns that the multiset completes, highest
+   * points first (empty when it completes none)
+   */
+  lookup(counts: Uint8Array, jokers: number): readonly number[] {
+    const key = scratchKey;
+    if (!packKey(counts, jokers, key)) return NO_PATTERNS;
+
+    const buckets = this.seeds.length;
+    const slots = this.values.length;
+    const bucket = hashKey(key[0], key[1], key[2], 0) % buckets;
+    const slot = hashKey(key[0], key[1], key[2], this.seeds[bucket]) % slots;
+
+    const value = this.values[slot];
+    const k = slot * KEY_WORDS;
+    if (value === EMPTY || this.keys[k] !== key[0] || this.keys[k + 1] !== key[1] || this.keys[k + 2] !== key[2]) {
+      return NO_PATTERNS;
+    }
+    return this.lists[value];
+  }
+
+  /**
+   * Every pattern of the compiled card the hand completes, highest points
+   * first. The card must be the one the table was built for.
+   */
+  matchPatterns(compiled: CompiledRuleCard, vector: HandVector): CompiledPattern[] {
+    if (vector.size !== HAND_SIZE) return [];
+    let counts = vector.counts;
+    if (vector.melds.length > 0) {
+      counts = scratchCounts;
+      for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+        counts[cls] = vector.counts[cls] + vector.exposed[cls];
+      }
+    }
+
+    const found = this.lookup(counts, vector.jokers + vector.meldJokers);
+    const result: CompiledPattern[] = [];
+    for (let i = 0; i < found.length; i++) {
+      const pattern = compiled.patterns[found[i]];
+      if (vector.melds.length === 0 || matchCompiledPattern(pattern, vector)) result.push(pattern);
+    }
+    return result;
+  }
+}
+
+/**
+ * Enumerates every winning multiset of the card and serializes the table
+ */
+export function buildWinTable(card: RuleCard): Uint8Array {
+  const compiled = getCompiledRuleCard(card);
+
+  // Winning multisets by packed key, each with the patterns it completes
+  const entries = new Map<string, { key: Uint32Array; patterns: Set<number> }>();
+  const counts = new Uint8Array(MATCH_CLASS_COUNT);
+  compiled.patterns.forEach((pattern, p) => {
+    for (const template of pattern.templates) {
+      const groupClasses: number[] = [];
+      for (let cls = 0; cls < MATCH_CLASS_COUNT; cls++) {
+        counts[cls] = template.natural[cls] + template.grouped[cls];
+        if (template.grouped[cls] > 0) groupClasses.push(cls);
+      }
+
+      // Every split of the jokers over the group classes
+      const place = (g: number, jokers: number): void => {
+        if (g === groupClasses.length) {
+          const key = new Uint32Array(KEY_WORDS);
+          if (!packKey(counts, jokers, key)) return;
+          const id = `${key[0]},${key[1]},${key[2]}`;
+          let entry = entries.get(id);
+          if (!entry) {
+            entry = { key, patterns: new Set() };
+            entries.set(id, entry);
+          }
+          entry.patterns.add(p);
+          return;
+        }
+        const cls = groupClasses[g];
+        const full = counts[cls];
+        for (let j = 0; j <= template.grouped[cls] && jokers + j <= pattern.maxJokers; j++) {
+          counts[cls] = full - j;
+          place(g + 1, jokers + j);
+        }
+        counts[cls] = full;
+      };
+      place(0, 0);
+    }
+  });
+
+  // Distinct pattern lists, highest points first
+  const listIds = new Map<string, number>();
+  const lists: number[][] = [];
+  const keys: Uint32Array[] = [];
+  const values: number[] = [];
+  for (const { key, patterns } of entries.values()) {
+    const list = [...patterns].sort((a, b) => card.patterns[b].points - card.patterns[a].points || a - b);
+    const id = list.join(',');
+    let listId = listIds.get(id);
+    if (listId === undefined) {
+      listId = lists.length;
+      listIds.set(id, listId);
+      lists.push(list);
+    }
+    keys.push(key);
+    values.push(listId);
+  }
+  if (lists.length >= EMPTY) {
+    throw new Error(`Too many distinct pattern lists for a win table: ${lists.length}`);
+  }
+
+  // Hash and displace, largest buckets first
+  const keyCount = keys.length;
+  const slotCount = Math.max(1, Math.ceil(keyCount / LOAD_FACTOR));
+  const bucketCount = Math.max(1, Math.ceil(keyCount / BUCKET_SIZE));
+  const bucketKeys: number[][] = Array.from({ length: bucketCount }, () => []);
+  keys.forEach((key, i) => bucketKeys[hashKey(key[0], key[1], key[2], 0) % bucketCount].push(i));
+  const order = bucketKeys.map((_, b) => b).sort((a, b) => bucketKeys[b].length - bucketKeys[a].length);
+
+  const seeds = new Uint16Array(bucketCount);
+  const slotOf = new Int32Array(slotCount).fill(-1);
+  const placed: number[] = [];
+  for (const b of order) {
+    const members = bucketKeys[b];
+    if (members.length === 0) break;
+    let seed = 1;
+    for (; seed <= MAX_SEED; seed++) {
+      placed.length = 0;
+      for (const i of members) {
+        const key = keys[i];
+        const slot = hashKey(key[0], key[1], key[2], seed) % slotCount;
+        if (slotOf[slot] !== -1 || placed.includes(slot)) break;
+        placed.push(slot);
+      }
+      if (placed.length === members.length) break;
+    }
+    if (seed > MAX_SEED) {
+      throw new Error(`No displacement seed places bucket ${b} of the win table`);
+    }
+    seeds[b] = seed;
+    members.forEach((i, k) => { slotOf[placed[k]] = i; });
+  }
+
+  // Serialize: header, seeds, keys, values, list offsets, list data
+  const listLength = lists.reduce((sum, list) => sum + list.length, 0);
+  const layout = tableLayout(bucketCount, slotCount, lists.length, listLength);
+  const buffer = new ArrayBuffer(layout.byteLength);
+  new Uint32Array(buffer, 0, HEADER_WORDS).set([
+    MAGIC, VERSION, cardFingerprint(card), keyCount, slotCount, bucketCount, lists.length, listLength
+  ]);
+  new Uint16Array(buffer, layout.seeds, bucketCount).set(seeds);
+  const keyView = new Uint32Array(buffer, layout.keys, slotCount * KEY_WORDS);
+  const valueView = new Uint16Array(buffer, layout.values, slotCount).fill(EMPTY);
+  for (let slot = 0; slot < slotCount; slot++) {
+    const i = slotOf[slot];
+    if (i === -1) continue;
+    keyView.set(keys[i], slot * KEY_WORDS);
+    valueView[slot] = values[i];
+  }
+  const offsets = new Uint32Array(buffer, layout.listOffsets, lists.length + 1);
+  const listView = new Uint16Array(buffer, layout.lists, listLength);
+  let at = 0;
+  lists.forEach((list, l) => {
+    offsets[l] = at;
+    listView.set(list, at);
+    at += list.length;
+  });
+  offsets[lists.length] = at;
+
+  return new Uint8Array(buffer);
+}
+
+const loadedTables = new WeakMap<RuleCard, WinTable | null>();
+
+/**
+ * The shipped table for the card, loaded on first use. Null when no table
+ * ships for it (a different card, or the file is missing).
+ */
+export function getWinTable(card: RuleCard): WinTable | null {
+  let table = loadedTables.get(card);
+  if (table === undefined) {
+    table = null;
+    const file = path.join(__dirname, 'data', WIN_TABLE_FILE);
+    if (fs.existsSync(file)) {
+      const loaded = WinTable.fromBytes(fs.readFileSync(file));
+      if (loaded.fingerprint === cardFingerprint(card)) table = loaded;
+    }
+    loadedTables.set(card, table);
+  }
+  return table;
+}
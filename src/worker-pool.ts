@@ -0,0 +1,302 @@
+/**
+ * Fixed-size worker_threads pool for CPU-bound engine tasks
+ *
+ * Tasks are looked up by name in workers/tasks.ts. When the pool has no
+ * workers (size 0) or the compiled worker script is unavailable (e.g. when
+ * running the TypeScript sources directly under ts-jest), tasks run inline on
+ * the calling thread instead, with the same results.
+ */
+
+import * as fs from 'fs';
+import * as path from 'path';
+import { Worker } from 'worker_threads';
+import { performance } from 'perf_hooks';
+import { LatencyRecorder, LatencyStats } from './metrics';
+import {
+  WorkerTaskKind,
+  WorkerTaskInput,
+  WorkerTaskOutput,
+  WorkerRequest,
+  WorkerResponse,
+  runWorkerTask
+} from './workers/tasks';
+
+export interface WorkerPoolOptions {
+  size: number;           // Number of worker threads (0 = run inline)
+  workerScript?: string;  // Defaults to the compiled workers/pool-worker.js
+}
+
+export interface WorkerPoolMetrics {
+  workers: number;        // Live worker threads (0 when running inline)
+  busy: number;           // Workers currently running a task
+  queueDepth: number;     // Tasks waiting for a free worker
+  completed: number;
+  failed: number;
+  latency: LatencyStats;  // Submit-to-result time, including queueing
+}
+
+type PendingTask = {
+  request: WorkerRequest;
+  submittedAt: number;
+  resolve: (output: any) => void;
+  reject: (error: Error) => void;
+};
+
+type PoolWorker = {
+  worker: Worker;
+  current?: PendingTask;
+};
+
+const DEFAULT_WORKER_SCRIPT = path.join(__dirname, 'workers', 'pool-worker.js');
+
+export class WorkerPool {
+  private workers: PoolWorker[] = [];
+  private queue: PendingTask[] = [];
+  private nextId = 1;
+  private completed = 0;
+  private failed = 0;
+  private closed = false;
+  private latency = new LatencyRecorder();
+  private readonly workerScript: string;
+  private readonly size: number;
+
+  constructor(options: WorkerPoolOptions) {
+    this.workerScript = options.workerScript || DEFAULT_WORKER_SCRIPT;
+    this.size = fs.existsSync(this.workerScript) ? Math.max(0, Math.floor(options.size)) : 0;
+    for (let i = 0; i < this.size; i++) {
+      this.workers.push(this.spawn());
+    }
+  }
+
+  /**
+   * True when tasks run on worker threads rather than inline
+   */
+  get threaded(): boolean {
+    return this.size > 0;
+  }
+
+  /**
+   * Runs a named task, on a worker thread when available
+   */
+  run<K extends WorkerTaskKind>(kind: K, input: WorkerTaskInput<K>): Promise<WorkerTaskOutput<K>> {
+    if (this.closed) {
+      return Promise.reject(new Error('Worker pool is closed'));
+    }
+
+    return new Promise<WorkerTaskOutput<K>>((resolve, reject) => {
+      const task: PendingTask = {
+        request: { id: this.nextId++, kind, input },
+        submittedAt: performance.now(),
+        resolve,
+        reject
+      };
+
+      if (!this.threaded) {
+        this.runInline(task);
+        return;
+      }
+
+      this.queue.push(task);
+      this.dispatch();
+    });
+  }
+
+  getMetrics(): WorkerPoolMetrics {
+    return {
+      workers: this.workers.length,
+      busy: this.workers.filter(w => w.current).length,
+      queueDepth: this.queue.length,
+      completed: this.completed,
+      failed: this.failed,
+      latency: this.latency.stats()
+    };
+  }
+
+  /**
+   * Stops all workers. Queued and running tasks are rejected.
+   */
+  async close(): Promise<void> {
+    this.closed = true;
+    const error = new Error('Worker pool is closed');
+    for (const task of this.queue.splice(0)) {
+      task.reject(error);
+    }
+    const workers = this.workers.splice(0);
+    for (const pw of workers) {
+      if (pw.current) {
+        pw.current.reject(error);
+        pw.current = undefined;
+      }
+    }
+    await Promise.all(workers.map(pw => pw.worker.terminate()));
+  }
+
+  private runInline(task: PendingTask): void {
+    // Defer so callers see the same async behaviour as the threaded path
+    setImmediate(() => {
+      try {
+        const output = runWorkerTask(task.request.kind, task.request.input);
+        this.finish(task);
+        task.resolve(output);
+      } catch (error: any) {
+        this.finish(task, true);
+        task.reject(error instanceof Error ? error : new Error(String(error)));
+      }
+    });
+  }
+
+  private spawn(): PoolWorker {
+    const pw: PoolWorker = { worker: new Worker(this.workerScript) };
+
+    pw.worker.on('message', (response: WorkerResponse) => {
+      const task = pw.current;
+      pw.current = undefined;
+      pw.worker.unref();
+      if (task && task.request.id === response.id) {
+        if (response.error !== undefined) {
+          this.finish(task, true);
+          task.reject(new Error(response.error));
+        } else {
+          this.finish(task);
+          task.resolve(response.output);
+        }
+      }
+      this.dispatch();
+    });
+
+    pw.worker.on('error', (error: Error) => {
+      const task = pw.current;
+      pw.current = undefined;
+      if (task) {
+        this.finish(task, true);
+        task.reject(error);
+      }
+    });
+
+    pw.worker.on('exit', () => {
+      // Replace workers that die unexpectedly so the pool keeps its size
+      const index = this.workers.indexOf(pw);
+      if (index === -1 || this.closed) return;
+      const task = pw.current;
+      if (task) {
+        this.finish(task, true);
+        task.reject(new Error('Worker exited while running a task'));
+      }
+      this.workers[index] = this.spawn();
+      this.dispatch();
+    });
+
+    // Idle workers should not keep the process alive
+    pw.worker.unref();
+    return pw;
+  }
+
+  private dispatch(): void {
+    for (const pw of this.workers) {
+      if (this.queue.length === 0) return;
+      if (pw.current) continue;
+      const task = this.queue.shift()!;
+      pw.current = task;
+      pw.worker.ref();
+      pw.worker.postMessage(task.request);
+    }
+  }
+
+  private finish(task: PendingTask, failed: boolean = false): void {
+    this.latency.record(performance.now() - task.submittedAt);
+    if (failed) {
+      this.failed++;
+    } else {
+      this.completed++;
+    }
+  }
+}
+
+// Share of the budget (from the request, so queueing counts) a worker may
+// spend on the task; the rest covers the trip back from the worker
+export const SEARCH_SHARE = 0.6;
+
+export interface BudgetedPoolMetrics {
+  requests: number;
+  late: number;              // Requests answered by the fallback
+  latency: LatencyStats;     // Request-to-answer time
+  pool: WorkerPoolMetrics;
+}
+
+/**
+ * A worker pool answering within a per-request budget. Each task gets
+ * SEARCH_SHARE of the budget as its deadline; if the worker has not replied
+ * by the end of the budget (or fails), the caller's fallback computes the
+ * answer on the calling thread instead.
+ */
+export class BudgetedPool {
+  private pool: WorkerPool;
+  private readonly budgetMs: number;
+  private requests = 0;
+  private late = 0;
+  private latency = new LatencyRecorder();
+
+  constructor(size: number, budgetMs: number) {
+    this.budgetMs = budgetMs;
+    this.pool = new WorkerPool({ size });
+  }
+
+  /**
+   * Runs one task on each worker so the first real request finds it ready
+   */
+  warmUp<K extends WorkerTaskKind>(kind: K, input: (until: number) => WorkerTaskInput<K>): void {
+    for (let i = 0; i < this.pool.getMetrics().workers; i++) {
+      this.pool.run(kind, input(Date.now() + 1000)).catch(() => undefined);
+    }
+  }
+
+  /**
+   * The task's answer within the budget. `input` is given the wall-clock
+   * time the worker must answer by.
+   */
+  run<K extends WorkerTaskKind>(
+    kind: K,
+    input: (until: number) => WorkerTaskInput<K>,
+    fallback: () => WorkerTaskOutput<K>
+  ): Promise<WorkerTaskOutput<K>> {
+    const start = performance.now();
+    this.requests++;
+    return new Promise<WorkerTaskOutput<K>>((resolve, reject) => {
+      let settled = false;
+      const finish = (output: WorkerTaskOutput<K>) => {
+        if (settled) return;
+        settled = true;
+        clearTimeout(timer);
+        this.latency.record(performance.now() - start);
+        resolve(output);
+      };
+      const late = () => {
+        if (settled) return;
+        this.late++;
+        try {
+          finish(fallback());
+        } catch (error) {
+          settled = true;
+          reject(error);
+        }
+      };
+      const timer = setTimeout(late, this.budgetMs);
+      timer.unref();
+
+      this.pool.run(kind, input(Date.now() + this.budgetMs * SEARCH_SHARE)).then(finish, late);
+    });
+  }
+
+  getMetrics(): BudgetedPoolMetrics {
+    return {
+      requests: this.requests,
+      late: this.late,
+      latency: this.latency.stats(),
+      pool: this.pool.getMetrics()
+    };
+  }
+
+  async close(): Promise<void> {
+    await this.pool.close();
+  }
+}
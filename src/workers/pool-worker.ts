@@ -0,0 +1,19 @@
+/**
+ * Worker thread entry point for WorkerPool
+ */
+
+import { parentPort } from 'worker_threads';
+import { runWorkerTask, WorkerRequest, WorkerResponse } from './tasks';
+
+if (parentPort) {
+  const port = parentPort;
+  port.on('message', (request: WorkerRequest) => {
+    let response: WorkerResponse;
+    try {
+      response = { id: request.id, output: runWorkerTask(request.kind, request.input) };
+    } catch (error: any) {
+      response = { id: request.id, error: error?.message || String(error) };
+    }
+    port.postMessage(response);
+  });
+}
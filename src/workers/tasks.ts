@@ -0,0 +1,108 @@
+/**
+ * Tasks that can run on a WorkerPool
+ *
+ * Each task takes and returns structured-clone-friendly data. The same table
+ * is used by the worker threads and by the pool's inline fallback, so results
+ * never depend on where a task ran.
+ */
+
+import { PlayerId, Tile } from '../types';
+import { RngVersion } from '../rng';
+import { dealFromSeeds, serializeDeal, SerializedGameDeal } from '../wall';
+import { DealBatch, SeedPair, fillDealBatch } from '../batch-setup';
+import { HandMatrix, HandEvaluationBatch, fillHandEvaluation } from '../batch-eval';
+import { getShared2024RuleCard } from '../rulecard';
+import { PassAdviceOptions, CharlestonAdvice, adviseCharlestonPass } from '../charleston-advisor';
+import { BotView, BotAction, decideBotAction } from '../bot';
+import { SelfPlayShard, SelfPlayStats, playSelfPlayShard } from '../self-play';
+
+export interface DealTask {
+  clientSeed: string;
+  serverSecret: string;
+  dealer: PlayerId;
+  rngVersion: RngVersion;
+}
+
+export interface SetupBatchTask {
+  batch: DealBatch;   // Backed by SharedArrayBuffers, so rows are written in place
+  seeds: SeedPair[];
+  from: number;       // First row to fill
+}
+
+export interface EvaluateHandsTask {
+  matrix: HandMatrix;            // Backed by SharedArrayBuffers, as are the results
+  results: HandEvaluationBatch;
+  from: number;                  // Rows [from, to) to evaluate
+  to: number;
+}
+
+export interface CharlestonAdviceTask {
+  hand: Tile[];
+  options: PassAdviceOptions;
+  searchUntil: number;  // Date.now() by which the search stops; a task queued past it
+                        // returns the greedy pass
+}
+
+export interface BotActionTask {
+  view: BotView;
+  decideUntil: number;  // Date.now() by which searches stop; a task queued past it
+                        // returns the greedy choice
+}
+
+export const workerTasks = {
+  deal(task: DealTask): SerializedGameDeal {
+    return serializeDeal(dealFromSeeds(task.clientSeed, task.serverSecret, task.dealer, task.rngVersion));
+  },
+
+  setupBatch(task: SetupBatchTask): number {
+    fillDealBatch(task.batch, task.seeds, task.from);
+    return task.seeds.length;
+  },
+
+  evaluateHands(task: EvaluateHandsTask): number {
+    fillHandEvaluation(task.matrix, task.results, getShared2024RuleCard(), task.from, task.to);
+    return task.to - task.from;
+  },
+
+  charlestonAdvice(task: CharlestonAdviceTask): CharlestonAdvice {
+    const budgetMs = Math.max(0, task.searchUntil - Date.now());
+    return adviseCharlestonPass(getShared2024RuleCard(), task.hand, { ...task.options, budgetMs });
+  },
+
+  botAction(task: BotActionTask): BotAction {
+    const budgetMs = Math.max(0, task.decideUntil - Date.now());
+    return decideBotAction(getShared2024RuleCard(), task.view, { budgetMs });
+  },
+
+  selfPlay(task: SelfPlayShard): SelfPlayStats {
+    return playSelfPlayShard(task);
+  }
+};
+
+export type WorkerTasks = typeof workerTasks;
+export type WorkerTaskKind = keyof WorkerTasks;
+export type WorkerTaskInput<K extends WorkerTaskKind> = Parameters<WorkerTasks[K]>[0];
+export type WorkerTaskOutput<K extends WorkerTaskKind> = ReturnType<WorkerTasks[K]>;
+
+export interface WorkerRequest {
+  id: number;
+  kind: WorkerTaskKind;
+  input: unknown;
+}
+
+export interface WorkerResponse {
+  id: number;
+  output?: unknown;
+  error?: string;
+}
+
+/**
+ * Runs a task by name on the current thread
+ */
+export function runWorkerTask(kind: WorkerTaskKind, input: unknown): unknown {
+  const task: ((input: any) => unknown) | undefined = workerTasks[kind];
+  if (!task) {
+    throw new Error(`Unknown worker task: ${kind}`);
+  }
+  return task(input);
+}
@@ -0,0 +1,120 @@
+/**
+ * Zobrist position hashing
+ *
+ * Every (location, tile, copy) triple has a fixed 64-bit key. A position hash
+ * is the XOR of the keys of all tiles in it, where the k-th copy of a tile in
+ * a location uses copy index k, so moving one tile is two XORs regardless of
+ * the size of the state. Keys come from SHA-256 over a fixed label, so every
+ * process (and any auditor) derives the same hash for the same position.
+ *
+ * Keys are stored as pairs of 32-bit halves to stay off BigInt.
+ */
+
+import * as crypto from 'crypto';
+import { PlayerId } from './types';
+import { TileId, TILE_KIND_COUNT, TILE_COPIES } from './tile-codec';
+
+// Locations: concealed hands 0-3, exposures 4-7, then the shared piles
+export const LOCATION_DISCARDS = 8;
+export const LOCATION_LIVE_WALL = 9;
+export const LOCATION_DEAD_WALL = 10;
+export const ZOBRIST_LOCATION_COUNT = 11;
+
+export function handLocation(player: PlayerId): number {
+  return player;
+}
+
+export function exposedLocation(player: PlayerId): number {
+  return 4 + player;
+}
+
+const MAX_COPIES = Math.max(...TILE_COPIES);
+const TILE_KEY_COUNT = ZOBRIST_LOCATION_COUNT * TILE_KIND_COUNT * MAX_COPIES;
+
+/** Extra keys for whole-state fields: 4 players to move, then game phases */
+export const TURN_KEY_OFFSET = TILE_KEY_COUNT;
+export const PHASE_KEY_OFFSET = TILE_KEY_COUNT + 4;
+const KEY_COUNT = PHASE_KEY_OFFSET + 4;
+
+export const ZOBRIST_KEYS: Uint32Array = (() => {
+  const keys = new Uint32Array(KEY_COUNT * 2);
+  let filled = 0;
+  for (let block = 0; filled < keys.length; block++) {
+    const digest = crypto.createHash('sha256').update(`mahjong-zobrist:${block}`).digest();
+    for (let i = 0; i < digest.length && filled < keys.length; i += 4) {
+      keys[filled++] = digest.readUInt32LE(i);
+    }
+  }
+  return keys;
+})();
+
+function tileKey(location: number, id: TileId, copy: number): number {
+  return ((location * TILE_KIND_COUNT + id) * MAX_COPIES + copy) * 2;
+}
+
+/**
+ * Formats a key pair (or any hi/lo hash) as 16 hex digits
+ */
+export function formatHash(hi: number, lo: number): string {
+  return (hi >>> 0).toString(16).padStart(8, '0') + (lo >>> 0).toString(16).padStart(8, '0');
+}
+
+export class ZobristHash {
+  private readonly counts: Uint8Array;
+  private hi: number;
+  private lo: number;
+
+  constructor(counts?: Uint8Array, hi: number = 0, lo: number = 0) {
+    this.counts = counts ?? new Uint8Array(ZOBRIST_LOCATION_COUNT * TILE_KIND_COUNT);
+    this.hi = hi;
+    this.lo = lo;
+  }
+
+  /** High 32 bits of the hash */
+  get high(): number {
+    return this.hi;
+  }
+
+  /** Low 32 bits of the hash */
+  get low(): number {
+    return this.lo;
+  }
+
+  add(location: number, id: TileId): void {
+    const slot = location * TILE_KIND_COUNT + id;
+    const key = tileKey(location, id, this.counts[slot]++);
+    this.hi ^= ZOBRIST_KEYS[key];
+    this.lo ^= ZOBRIST_KEYS[key + 1];
+  }
+
+  /**
+   * Removes one copy of a tile from a location. Returns false (and changes
+   * nothing) if the location holds none.
+   */
+  remove(location: number, id: TileId): boolean {
+    const slot = location * TILE_KIND_COUNT + id;
+    if (this.counts[slot] === 0) return false;
+    const key = tileKey(location, id, --this.counts[slot]);
+    this.hi ^= ZOBRIST_KEYS[key];
+    this.lo ^= ZOBRIST_KEYS[key + 1];
+    return true;
+  }
+
+  move(from: number, to: number, id: TileId): boolean {
+    if (!this.remove(from, id)) return false;
+    this.add(to, id);
+    return true;
+  }
+
+  equals(other: ZobristHash): boolean {
+    return this.hi === other.hi && this.lo === other.lo;
+  }
+
+  toString(): string {
+    return formatHash(this.hi, this.lo);
+  }
+
+  clone(): ZobristHash {
+    return new ZobristHash(this.counts.slice(), this.hi, this.lo);
+  }
+}
@@ -0,0 +1,102 @@
+import {
+  evaluateHands,
+  evaluateHandsOnPool,
+  fillHandEvaluation,
+  createHandEvaluationBatch,
+  toHandMatrix,
+  NO_PATTERN
+} from '../src/batch-eval';
+import { getShared2024RuleCard } from '../src/rulecard';
+import { getCompiledRuleCard, matchAllPatterns } from '../src/hand-matcher';
+import { HandCounts } from '../src/hand-counts';
+import { DeterministicRNG } from '../src/rng';
+import { createAmericanMahjongTileSet } from '../src/tiles';
+import { decodeTile, FIRST_FLOWER_ID } from '../src/tile-codec';
+import { WorkerPool } from '../src/worker-pool';
+import { RuleCard, Tile } from '../src/types';
+
+const card = getShared2024RuleCard();
+const compiled = getCompiledRuleCard(card);
+
+// Winning hands for some templates, some with jokers, between random hands
+function sampleHands(count: number): Tile[][] {
+  const rng = new DeterministicRNG('eval-client', 'eval-secret', 2);
+  const tiles = createAmericanMahjongTileSet();
+  const templates = compiled.patterns.flatMap(p => p.templates);
+  const hands: Tile[][] = [];
+  for (let i = 0; i < count; i++) {
+    const hand: Tile[] = [];
+    if (i % 2 === 0) {
+      const template = templates[rng.nextUint32() % templates.length];
+      let jokers = i % 3;
+      let flower = 0;
+      for (let cls = 0; cls < template.natural.length; cls++) {
+        for (let n = 0; n < template.natural[cls] + template.grouped[cls]; n++) {
+          if (n >= template.natural[cls] && jokers-- > 0) hand.push('J');
+          else hand.push(cls === FIRST_FLOWER_ID ? decodeTile(FIRST_FLOWER_ID + (flower++ % 8)) : decodeTile(cls));
+        }
+      }
+    } else {
+      const pool = tiles.slice();
+      for (let n = 0; n < 14; n++) hand.push(pool.splice(rng.nextUint32() % pool.length, 1)[0]);
+    }
+    hands.push(hand);
+  }
+  return hands;
+}
+
+function expectMatcherResults(hands: Tile[][], results: ReturnType<typeof evaluateHands>, ruleCard: RuleCard): void {
+  hands.forEach((hand, row) => {
+    const matches = matchAllPatterns(ruleCard, hand, []);
+    const feasible = ruleCard.patterns.map((_, p) => results.feasible[row * results.patternCount + p]);
+    expect(feasible).toEqual(ruleCard.patterns.map(p => matches.some(m => m.pattern === p) ? 1 : 0));
+    const best = Math.max(0, ...matches.map(m => m.pattern.points));
+    expect(results.points[row]).toBe(best);
+    if (matches.length === 0) expect(results.best[row]).toBe(NO_PATTERN);
+    else expect(ruleCard.patterns[results.best[row]].points).toBe(best);
+  });
+}
+
+describe('evaluateHands', () => {
+  const hands = sampleHands(60);
+
+  test('matches the compiled matcher hand by hand', () => {
+    const results = evaluateHands(toHandMatrix(hands));
+    expect(results.count).toBe(hands.length);
+    expect(results.patternCount).toBe(card.patterns.length);
+    expectMatcherResults(hands, results, card);
+  });
+
+  test('evaluates cards without a win table through the matcher', () => {
+    const copy: RuleCard = { ...card, patterns: card.patterns.slice(0, 40) };
+    expectMatcherResults(hands, evaluateHands(toHandMatrix(hands), copy), copy);
+  });
+
+  test('takes hand counts and leaves short hands unmatched', () => {
+    const matrix = toHandMatrix([HandCounts.fromTiles(hands[0]), hands[0].slice(1)]);
+    const results = createHandEvaluationBatch(2, card.patterns.length);
+    fillHandEvaluation(matrix, results, card);
+    expect(results.best[0]).toBe(evaluateHands(toHandMatrix([hands[0]])).best[0]);
+    expect(results.best[1]).toBe(NO_PATTERN);
+    expect(results.points[1]).toBe(0);
+  });
+});
+
+describe('evaluateHandsOnPool', () => {
+  let pool: WorkerPool;
+
+  afterEach(async () => {
+    await pool?.close();
+  });
+
+  test.each([0, 2])('produces the same results as evaluateHands (%s workers)', async size => {
+    const hands = sampleHands(25);
+    pool = new WorkerPool({ size });
+    const results = await evaluateHandsOnPool(toHandMatrix(hands), pool, { chunkSize: 10 });
+    const expected = evaluateHands(toHandMatrix(hands));
+    expect(Array.from(results.best)).toEqual(Array.from(expected.best));
+    expect(Array.from(results.points)).toEqual(Array.from(expected.points));
+    expect(Array.from(results.feasible)).toEqual(Array.from(expected.feasible));
+    expect(pool.getMetrics().completed).toBe(3);
+  });
+});
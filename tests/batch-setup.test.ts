@@ -0,0 +1,64 @@
+import {
+  SeedPair,
+  setupGames,
+  setupGamesOnPool,
+  getDeal,
+  dealHandIds,
+  DEAL_ROW_SIZE
+} from '../src/batch-setup';
+import { dealFromSeeds } from '../src/wall';
+import { encodeTiles } from '../src/tile-codec';
+import { WorkerPool } from '../src/worker-pool';
+
+const seeds: SeedPair[] = [0, 1, 2, 3, 4].map(i => ({
+  clientSeed: `client-${i}`,
+  serverSecret: `secret-${i}`
+}));
+
+describe('setupGames', () => {
+  test.each([0, 3])('matches dealFromSeeds for every seed (dealer %s)', dealer => {
+    const batch = setupGames(seeds, dealer);
+    expect(batch.count).toBe(seeds.length);
+    expect(batch.tiles.length).toBe(seeds.length * DEAL_ROW_SIZE);
+
+    seeds.forEach((seed, i) => {
+      const expected = dealFromSeeds(seed.clientSeed, seed.serverSecret, dealer);
+      const deal = getDeal(batch, i);
+      expect(deal.hands).toEqual(expected.hands);
+      expect(deal.dice).toBe(expected.dice);
+      expect(deal.reservedTiles).toEqual(expected.reservedTiles);
+      expect(deal.wall.liveTiles()).toEqual(expected.wall.liveTiles());
+      expect(deal.wall.drawReplacement()).toEqual(expected.wall.drawReplacement());
+    });
+  });
+
+  test('keeps the RNG stream version', () => {
+    const batch = setupGames(seeds.slice(0, 1), 1, 1);
+    const expected = dealFromSeeds(seeds[0].clientSeed, seeds[0].serverSecret, 1, 1);
+    expect(getDeal(batch, 0).hands).toEqual(expected.hands);
+  });
+
+  test('reads a single hand as tile IDs', () => {
+    const batch = setupGames(seeds, 2);
+    const expected = dealFromSeeds(seeds[1].clientSeed, seeds[1].serverSecret, 2);
+    expect(Array.from(dealHandIds(batch, 1, 2))).toEqual(Array.from(encodeTiles(expected.hands[2])));
+    expect(dealHandIds(batch, 1, 0).length).toBe(13);
+  });
+});
+
+describe('setupGamesOnPool', () => {
+  let pool: WorkerPool;
+
+  afterEach(async () => {
+    await pool?.close();
+  });
+
+  test.each([0, 2])('produces the same batch as setupGames (%s workers)', async size => {
+    pool = new WorkerPool({ size });
+    const batch = await setupGamesOnPool(seeds, 1, pool, { chunkSize: 2 });
+    const expected = setupGames(seeds, 1);
+    expect(Array.from(batch.tiles)).toEqual(Array.from(expected.tiles));
+    expect(Array.from(batch.dice)).toEqual(Array.from(expected.dice));
+    expect(pool.getMetrics().completed).toBe(3);
+  });
+});
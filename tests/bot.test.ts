@@ -0,0 +1,120 @@
+import { getShared2024RuleCard } from '../src/rulecard';
+import { BotAction, BotDriver, BotView, decideBotAction, getBotView, submitCharlestonAction } from '../src/bot';
+import { startNewGame, processMove } from '../src/engine';
+import {
+  initializeCharleston,
+  allPlayersReady,
+  executeCharlestonPass,
+  processVoteResults,
+  executeCourtesyPass,
+  createCharlestonRng
+} from '../src/charleston-manager';
+import { isWinningHand } from '../src/win-check';
+import { HandCounts } from '../src/hand-counts';
+import { GameState, Move, PlayerId, Tile } from '../src/types';
+
+const card = getShared2024RuleCard();
+const seats = [0, 1, 2, 3] as PlayerId[];
+
+function repeat(tile: Tile, n: number): Tile[] {
+  return new Array(n).fill(tile);
+}
+
+function allTiles(state: GameState): HandCounts {
+  const tiles = seats.flatMap(pid => [...state.players[pid].hand, ...state.players[pid].melds.flatMap(m => m.tiles)]);
+  return HandCounts.fromTiles([...tiles, ...state.discardPile.map(d => d.tile)]);
+}
+
+// Mahjong first, then claims, then the seat on turn
+function pickMove(actions: BotAction[]): Move | undefined {
+  const moves = actions.flatMap(a => (a.type === 'move' ? [a.move] : []));
+  return moves.find(m => m.type === 'declareMahjong') ?? moves.find(m => m.type === 'claim') ?? moves[0];
+}
+
+function playBotGame(seed: string): { state: GameState; moves: number } {
+  let state = initializeCharleston(startNewGame(seed, 'secret', 0));
+  const rng = createCharlestonRng(seed, 'secret');
+  while (state.phase === 'charleston') {
+    for (const pid of seats) {
+      expect(submitCharlestonAction(state, pid, decideBotAction(card, getBotView(state, pid)))).toBe(true);
+    }
+    expect(allPlayersReady(state.charleston!)).toBe(true);
+    const phase = state.charleston!.phase;
+    if (phase === 'vote') state = processVoteResults(state);
+    else if (phase === 'courtesy') state = executeCourtesyPass(state);
+    else state = executeCharlestonPass(state, rng);
+  }
+
+  let moves = 0;
+  for (;;) {
+    const move = pickMove(seats.map(pid => decideBotAction(card, getBotView(state, pid))));
+    if (!move) break;
+    state = processMove(state, move);
+    moves++;
+  }
+  return { state, moves };
+}
+
+describe('bot seats', () => {
+  test('four bots play a game to the end through the move validator', () => {
+    let wins = 0;
+    for (let game = 0; game < 6; game++) {
+      const start = startNewGame(`bots-${game}`, 'secret', 0);
+      const { state, moves } = playBotGame(`bots-${game}`);
+      expect(moves).toBeGreaterThan(0);
+      expect(allTiles(state).size + state.wall.length).toBe(allTiles(start).size + start.wall.length);
+
+      if (state.phase === 'complete') {
+        wins++;
+        const winner = state.players[state.currentPlayer];
+        expect(state.lastAction!.type).toBe('declareMahjong');
+        expect(isWinningHand(winner.hand, winner.melds, card)).toBe(true);
+      } else {
+        // Nobody could go on: the wall ran out with the seat on turn waiting to draw
+        expect(state.wall.length).toBe(0);
+      }
+    }
+    expect(wins).toBeGreaterThan(0);
+  });
+
+  test('calls mahjong and exposures on a discard, and lets others go', () => {
+    const view = (hand: Tile[], tile: Tile): BotView => ({
+      seat: 1,
+      phase: 'play',
+      hand,
+      melds: [],
+      currentPlayer: 2,
+      discard: { player: 0, tile },
+      wallCount: 50
+    });
+    const waiting = ['F1', 'F5', ...repeat('4B', 4), ...repeat('5B', 4), ...repeat('6B', 3)];
+    expect(decideBotAction(card, view(waiting, '6B'))).toEqual({ type: 'move', move: { type: 'declareMahjong', player: 1 } });
+
+    // Two tiles from 222 000 2222 4444: the pong is worth calling
+    const close = ['2C', '2C', ...repeat('WD', 3), ...repeat('2D', 4), ...repeat('4D', 3), 'N'];
+    const claim = decideBotAction(card, view(close, '2C'));
+    expect(claim.type).toBe('move');
+    const move = (claim as { move: Move }).move;
+    expect(move.type).toBe('claim');
+    if (move.type === 'claim') expect(move.meld.tiles).toEqual(['2C', '2C', '2C']);
+
+    // Not the seat's turn, and nothing to gain from the tile
+    expect(decideBotAction(card, view(close, 'N'))).toEqual({ type: 'wait' });
+    // A joker is never claimed
+    expect(decideBotAction(card, view(waiting, 'J'))).toEqual({ type: 'wait' });
+  });
+
+  test('the driver decides through its pool within the budget', async () => {
+    const driver = new BotDriver({ workers: 0, moveBudgetMs: 2000 });
+    const state = initializeCharleston(startNewGame('bot-driver', 'secret', 0));
+    const action = await driver.decide(state, 2);
+    expect(action).toEqual(decideBotAction(card, getBotView(state, 2)));
+    expect(action.type).toBe('charlestonPass');
+
+    const metrics = driver.getMetrics();
+    expect(metrics.decisions).toBe(1);
+    expect(metrics.late).toBe(0);
+    expect(metrics.latency.count).toBe(1);
+    await driver.close();
+  });
+});
@@ -0,0 +1,79 @@
+import { getShared2024RuleCard } from '../src/rulecard';
+import { adviseCharlestonPass, CharlestonAdvisor } from '../src/charleston-advisor';
+import { HandDistance, getDistanceTable } from '../src/hand-distance';
+import { getCompiledRuleCard, matchClass } from '../src/hand-matcher';
+import { encodeTile } from '../src/tile-codec';
+import { startNewGame } from '../src/engine';
+import { PlayerId, Tile } from '../src/types';
+
+const card = getShared2024RuleCard();
+const templateCount = getDistanceTable(getCompiledRuleCard(card)).templates.length;
+
+// Every pass by position, scored from scratch over the same lines
+function bruteForce(hand: Tile[], count: number): number[] {
+  const full = new HandDistance(card, hand);
+  const distances = Array.from({ length: templateCount }, (_, t) => full.templateDistance(t));
+  const order = distances.map((_, t) => t).sort((a, b) => distances[a] - distances[b]);
+  const lines = order.filter(t => distances[t] <= distances[order[0]] + 2).slice(0, 64);
+
+  const scores = new Map<string, number>();
+  const pick = (from: number, picked: number[]) => {
+    if (picked.length === count) {
+      const key = picked.map(i => matchClass(encodeTile(hand[i]))).sort((a, b) => a - b).join(',');
+      const rest = new HandDistance(card, hand.filter((_, i) => !picked.includes(i)));
+      scores.set(key, lines.reduce((sum, t) => sum + Math.pow(2, -rest.templateDistance(t)), 0));
+      return;
+    }
+    for (let i = from; i < hand.length; i++) {
+      if (hand[i] !== 'J') pick(i + 1, [...picked, i]);
+    }
+  };
+  pick(0, []);
+  return [...scores.values()].sort((a, b) => b - a);
+}
+
+describe('Charleston pass advice', () => {
+  test('the pruned search finds the best passes an exhaustive one does', () => {
+    for (let game = 0; game < 3; game++) {
+      const state = startNewGame(`advice-${game}`, 'secret', 0);
+      for (const pid of [0, 2] as PlayerId[]) {
+        const hand = state.players[pid].hand;
+        const advice = adviseCharlestonPass(card, hand, { top: 5 });
+        const expected = bruteForce(hand, 3).slice(0, 5);
+
+        expect(advice.complete).toBe(true);
+        expect(advice.candidates.map(c => c.score)).toEqual(expected);
+        expect(advice.evaluated).toBeLessThan(advice.passes);
+        expect(advice.tiles).toEqual(advice.candidates[0].tiles);
+      }
+    }
+  });
+
+  test('passes only held tiles, never jokers, even with no time to search', () => {
+    const hand = ['J', 'J', '1B', '1B', '1B', '2B', '2B', '2B', '3B', 'N', 'S', 'F1', 'F2', '7D'];
+    for (const count of [1, 2, 3]) {
+      const advice = adviseCharlestonPass(card, hand, { count, budgetMs: 0 });
+      expect(advice.tiles.length).toBe(count);
+      const rest = [...hand];
+      for (const tile of advice.tiles) {
+        expect(tile).not.toBe('J');
+        expect(rest).toContain(tile);
+        rest.splice(rest.indexOf(tile), 1);
+      }
+    }
+    expect(() => adviseCharlestonPass(card, ['J', 'J', '1B'], { count: 2 })).toThrow('jokers cannot be passed');
+  });
+
+  test('the advisor answers through its pool within the budget', async () => {
+    const advisor = new CharlestonAdvisor({ workers: 0, budgetMs: 2000 });
+    const hand = startNewGame('advisor-pool', 'secret', 0).players[1].hand;
+    const advice = await advisor.advise(hand);
+    expect(advice.tiles).toEqual(adviseCharlestonPass(card, hand).tiles);
+
+    const metrics = advisor.getMetrics();
+    expect(metrics.requests).toBe(1);
+    expect(metrics.late).toBe(0);
+    expect(metrics.latency.count).toBe(1);
+    await advisor.close();
+  });
+});
@@ -0,0 +1,133 @@
+import { GameState, PlayerId, Tile } from '../src/types';
+import { startNewGame } from '../src/engine';
+import { initializeCharleston, executeCharlestonPass, createCharlestonRng, getPassTarget } from '../src/charleston-manager';
+import { CharlestonPhase } from '../src/charleston';
+import { DerivedState, getDerivedState } from '../src/derived-state';
+import { HandCounts } from '../src/hand-counts';
+
+const seats = [0, 1, 2, 3] as PlayerId[];
+
+function atPhase(seed: string, phase: CharlestonPhase): GameState {
+  const state = initializeCharleston(startNewGame(seed, 'secret', 0));
+  state.charleston!.phase = phase;
+  return state;
+}
+
+// Seats blind passing `blind[seat]` tiles select the rest from their own hand
+function select(state: GameState, blind: number[] = [0, 0, 0, 0]): void {
+  for (const pid of seats) {
+    const count = blind[pid];
+    state.charleston!.playerStates[pid] = {
+      selectedTiles: state.players[pid].hand.filter(t => t !== 'J').slice(0, 3 - count),
+      ready: true,
+      blindPass: count > 0 ? { enabled: true, count: count as 1 | 2 | 3 } : undefined
+    };
+  }
+}
+
+function allTiles(state: GameState): HandCounts {
+  return HandCounts.fromTiles(seats.flatMap(pid => state.players[pid].hand));
+}
+
+function expectDerivedInStep(state: GameState): void {
+  const fresh = DerivedState.fromState(state);
+  const derived = getDerivedState(state);
+  for (const pid of seats) expect(derived.hands[pid].equals(fresh.hands[pid])).toBe(true);
+  expect(derived.zobrist.equals(fresh.zobrist)).toBe(true);
+}
+
+describe('Charleston pass', () => {
+  test('sends every seat\'s tiles to its target in one step', () => {
+    for (const phase of ['pass-right', 'pass-across', 'pass-left'] as CharlestonPhase[]) {
+      const state = atPhase(`pass-${phase}`, phase);
+      select(state);
+      const next = executeCharlestonPass(state);
+
+      for (const pid of seats) {
+        const sent = state.charleston!.playerStates[pid].selectedTiles;
+        const target = getPassTarget(pid, phase);
+        expect(next.charleston!.incomingTiles![target]).toEqual(sent);
+        // The rest of the hand keeps its order, with the incoming tiles last
+        const hand = next.players[target].hand;
+        expect(hand.length).toBe(state.players[target].hand.length);
+        expect(hand.slice(hand.length - 3)).toEqual(sent);
+      }
+      expect(allTiles(next).equals(allTiles(state))).toBe(true);
+      expectDerivedInStep(next);
+    }
+  });
+
+  test('blind passes replay from the table seeds', () => {
+    const run = () => {
+      const state = atPhase('blind-seed', 'pass-left');
+      select(state, [0, 2, 1, 3]);
+      return executeCharlestonPass(state, createCharlestonRng('blind-client', 'blind-secret'));
+    };
+    const first = run();
+    const second = run();
+    for (const pid of seats) expect(second.players[pid].hand).toEqual(first.players[pid].hand);
+
+    const state = atPhase('blind-seed', 'pass-left');
+    select(state, [0, 2, 1, 3]);
+    expect(allTiles(first).equals(allTiles(state))).toBe(true);
+    expectDerivedInStep(first);
+    for (const pid of seats) {
+      // A seat passing n blind keeps 3 - n of the tiles coming to it
+      const blind = state.charleston!.playerStates[pid].blindPass?.count ?? 0;
+      expect(first.charleston!.incomingTiles![pid].length).toBe(3 - blind);
+      expect(first.players[pid].hand.length).toBe(state.players[pid].hand.length);
+    }
+    // Seat 3 passes on everything seat 0 sends it, so seat 2 keeps two of
+    // seat 0's tiles
+    const fromSeat0 = state.charleston!.playerStates[0].selectedTiles;
+    const received = first.charleston!.incomingTiles![2];
+    expect(received.every((tile: Tile) => fromSeat0.includes(tile))).toBe(true);
+    expect(first.charleston!.incomingTiles![3]).toEqual([]);
+
+    expect(() => executeCharlestonPass(state)).toThrow('Blind passes need the table RNG');
+  });
+
+  test('long chains of blind passes still deliver every kept tile', () => {
+    // With every seat passing on one or two, a kept slot can trace back
+    // through more than four seats before reaching a seat's own tile
+    for (const count of [1, 2]) {
+      for (const phase of ['pass-left', 'pass-right-2'] as CharlestonPhase[]) {
+        for (let game = 0; game < 25; game++) {
+          const state = atPhase(`chain-${count}-${game}`, phase);
+          select(state, [count, count, count, count]);
+          const next = executeCharlestonPass(state, createCharlestonRng(`chain-${game}`, 'secret'));
+          for (const pid of seats) {
+            const kept = next.charleston!.incomingTiles![pid];
+            expect(kept.length).toBe(3 - count);
+            expect(kept.every((tile: Tile) => typeof tile === 'string')).toBe(true);
+            expect(next.players[pid].hand.length).toBe(state.players[pid].hand.length);
+          }
+          expect(allTiles(next).equals(allTiles(state))).toBe(true);
+          expectDerivedInStep(next);
+        }
+      }
+    }
+  });
+
+  test('nothing moves when every seat passes all three on blind', () => {
+    const state = atPhase('all-blind', 'pass-right-2');
+    select(state, [3, 3, 3, 3]);
+    const next = executeCharlestonPass(state, createCharlestonRng('client', 'secret'));
+    for (const pid of seats) {
+      expect(next.players[pid].hand).toEqual(state.players[pid].hand);
+      expect(next.charleston!.incomingTiles![pid]).toEqual([]);
+    }
+    expect(next.charleston!.phase).toBe('courtesy');
+  });
+
+  test('rejects a tile the seat does not hold without changing the state', () => {
+    const state = atPhase('bad-pass', 'pass-right');
+    select(state);
+    const missing = ['1B', '2B', '3B', '4B', '5B', 'N', 'E'].find(t => !state.players[2].hand.includes(t))!;
+    state.charleston!.playerStates[2].selectedTiles = [missing, ...state.charleston!.playerStates[2].selectedTiles.slice(1)];
+    const before = JSON.stringify(state);
+
+    expect(() => executeCharlestonPass(state)).toThrow(`Player 2 cannot pass ${missing}`);
+    expect(JSON.stringify(state)).toBe(before);
+  });
+});
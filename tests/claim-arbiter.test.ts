@@ -0,0 +1,145 @@
+import {
+  ClaimArbiter,
+  ClaimResolution,
+  ClaimScheduler,
+  claimPriority,
+  isClaimMove,
+  loadClaimWindowConfig
+} from '../src/claim-arbiter';
+import { startNewGame, processMove } from '../src/engine';
+import { GameState, Move, PlayerId, Tile } from '../src/types';
+
+function repeat(tile: Tile, n: number): Tile[] {
+  return new Array(n).fill(tile);
+}
+
+// Player 0 has just thrown a tile. Player 1 can win on 2C (222 000 2222
+// 4444) and player 2 can pong it with a joker; player 3 can use neither 2C
+// nor N.
+function discardState(tile: Tile = '2C'): GameState {
+  const state = startNewGame('claims', 'secret', 0);
+  state.phase = 'play';
+  state.players[0].hand = [tile, ...repeat('N', 13)];
+  state.players[1].hand = ['2C', '2C', ...repeat('WD', 3), ...repeat('2D', 4), ...repeat('4D', 4)];
+  state.players[2].hand = ['2C', 'J', ...repeat('S', 11)];
+  state.players[3].hand = repeat('W', 13);
+  state.derived = undefined;
+  state.currentPlayer = 0;
+  return processMove(state, { type: 'discard', player: 0, tile });
+}
+
+function setup(windowMs = 1000) {
+  let now = 0;
+  const scheduler = new ClaimScheduler({ now: () => now, manual: true });
+  const resolved: ClaimResolution[] = [];
+  const arbiter = new ClaimArbiter({ windowMs, scheduler }, resolution => resolved.push(resolution));
+  return { scheduler, arbiter, resolved, advance: (ms: number) => scheduler.runDue((now += ms)) };
+}
+
+const pong = (player: PlayerId): Move => ({
+  type: 'claim',
+  player,
+  meld: { type: 'pong', tiles: ['2C', '2C', 'J'], from: 0, exposed: true, canExchangeJokers: true }
+});
+
+describe('claim windows', () => {
+  test('the scheduler runs deadlines in order behind one clock', () => {
+    let now = 0;
+    const scheduler = new ClaimScheduler({ now: () => now, manual: true });
+    const ran: number[] = [];
+    const at = [30, 10, 50, 20, 40];
+    const tasks = at.map(t => scheduler.schedule(t, () => ran.push(t)));
+    scheduler.cancel(tasks[3]);
+    expect(scheduler.pending).toBe(4);
+
+    expect(scheduler.runDue((now = 35))).toBe(2);
+    expect(ran).toEqual([10, 30]);
+    expect(scheduler.runDue((now = 100))).toBe(2);
+    expect(ran).toEqual([10, 30, 40, 50]);
+    expect(scheduler.pending).toBe(0);
+  });
+
+  test('only seats that could call the discard may answer, once each', () => {
+    const { arbiter, scheduler } = setup();
+    const state = discardState();
+    const window = arbiter.open(state)!;
+    expect(window.eligible).toEqual([1, 2]);
+    expect(window.winners).toEqual([1]);
+    expect(window.discard).toEqual({ player: 0, tile: '2C' });
+
+    expect(arbiter.submit({ type: 'pass', player: 0 })).toMatchObject({ ok: false, error: { code: 'not_eligible' } });
+    expect(arbiter.submit({ type: 'pass', player: 3 })).toMatchObject({ ok: false, error: { code: 'not_eligible' } });
+    expect(arbiter.submit({ type: 'declareMahjong', player: 2 })).toMatchObject({ ok: false, error: { code: 'invalid_claim' } });
+    expect(arbiter.submit({ type: 'draw', player: 1 })).toMatchObject({ ok: false, error: { code: 'invalid_claim' } });
+    expect(arbiter.submit({ type: 'pass', player: 2 })).toEqual({ ok: true });
+    expect(arbiter.submit({ type: 'pass', player: 2 })).toMatchObject({ ok: false, error: { code: 'already_answered' } });
+    arbiter.cancel();
+
+    // A dead hand is never offered the discard
+    const dead = discardState();
+    dead.players[2] = { ...dead.players[2], isDead: true };
+    expect(arbiter.open(dead)!.eligible).toEqual([1]);
+    arbiter.cancel();
+
+    // Nobody can use N: no window and nothing scheduled
+    expect(arbiter.open(discardState('N'))).toBeNull();
+    expect(scheduler.pending).toBe(0);
+
+    expect(isClaimMove(state, pong(2))).toBe(true);
+    expect(isClaimMove(state, { type: 'declareMahjong', player: 1 })).toBe(true);
+    expect(isClaimMove(state, { type: 'draw', player: 1 })).toBe(false);
+
+    // Nothing to call on a joker, or once the discard is overtaken
+    const drawn = processMove(state, { type: 'draw', player: 1 });
+    expect(arbiter.open(drawn)).toBeNull();
+    expect(arbiter.window).toBeNull();
+    expect(arbiter.submit({ type: 'pass', player: 2 })).toMatchObject({ ok: false, error: { code: 'no_claim_window' } });
+  });
+
+  test('mahjong beats an earlier exposure; the window closes once nobody can outrank the best call', () => {
+    const { arbiter, resolved, advance } = setup();
+    arbiter.open(discardState());
+    expect(arbiter.submit(pong(2))).toEqual({ ok: true });
+    // Seat 1 could still call mahjong
+    expect(resolved).toHaveLength(0);
+    advance(250);
+    expect(arbiter.submit({ type: 'declareMahjong', player: 1 })).toEqual({ ok: true });
+    expect(resolved).toHaveLength(1);
+    expect(resolved[0].move).toEqual({ type: 'declareMahjong', player: 1 });
+    expect(resolved[0].reason).toBe('answered');
+    expect(resolved[0].latencyMs).toBe(250);
+    expect(arbiter.window).toBeNull();
+
+    // Seat 2 has not answered, but can only pong, behind seat 1's mahjong
+    arbiter.open(discardState());
+    expect(arbiter.submit({ type: 'declareMahjong', player: 1 })).toEqual({ ok: true });
+    expect(resolved).toHaveLength(2);
+    expect(resolved[1].reason).toBe('decided');
+    expect(resolved[1].move).toEqual({ type: 'declareMahjong', player: 1 });
+
+    expect(claimPriority({ type: 'declareMahjong', player: 3 }, 0)).toBeLessThan(claimPriority(pong(1), 0));
+    expect(claimPriority(pong(1), 2)).toBeGreaterThan(claimPriority(pong(3), 2));
+  });
+
+  test('closes when every seat has answered, or at the deadline', () => {
+    const { arbiter, resolved, advance, scheduler } = setup(1000);
+    arbiter.open(discardState());
+    for (const player of [1, 2] as PlayerId[]) arbiter.submit({ type: 'pass', player });
+    expect(resolved.map(r => [r.reason, r.move])).toEqual([['answered', undefined]]);
+    expect(scheduler.pending).toBe(0);
+
+    arbiter.open(discardState());
+    arbiter.submit(pong(2));
+    advance(999);
+    expect(resolved).toHaveLength(1);
+    advance(1);
+    expect(resolved[1].reason).toBe('timeout');
+    expect(resolved[1].move).toEqual(pong(2));
+    expect(resolved[1].latencyMs).toBe(1000);
+
+    expect(arbiter.getMetrics()).toMatchObject({ windows: 2, claimed: 1, early: 1, timedOut: 1 });
+    expect(arbiter.getMetrics().latency.count).toBe(2);
+    expect(loadClaimWindowConfig({ CLAIM_WINDOW_MS: '500' })).toEqual({ windowMs: 500 });
+    expect(loadClaimWindowConfig({ CLAIM_WINDOW_MS: 'x' })).toEqual({ windowMs: 3000 });
+  });
+});
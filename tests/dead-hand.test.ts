@@ -0,0 +1,115 @@
+import { getShared2024RuleCard, findHandByName } from '../src/rulecard';
+import { DeadHandTracker } from '../src/dead-hand';
+import { validateDeadHand } from '../src/validation';
+import { getCompiledRuleCard } from '../src/hand-matcher';
+import { startNewGame, processMove } from '../src/engine';
+import { createAmericanMahjongTileSet } from '../src/tiles';
+import { GameState, Meld, PlayerId, Tile } from '../src/types';
+
+const card = getShared2024RuleCard();
+
+function repeat(tile: Tile, n: number): Tile[] {
+  return new Array(n).fill(tile);
+}
+
+function playState(seed: string): GameState {
+  return processMove(startNewGame(seed, 'secret', 0), { type: 'stopCharleston', player: 0 });
+}
+
+function setDiscards(state: GameState, tiles: Tile[]): void {
+  state.discardPile = tiles.map(tile => ({ player: 1 as PlayerId, tile }));
+  state.derived = undefined;
+}
+
+const names = (tracker: DeadHandTracker, player: PlayerId) => tracker.candidates(player).map(p => p.name);
+
+describe('dead hand tracker', () => {
+  test('incremental pruning matches a fresh scan as the game goes on', () => {
+    let state = playState('dead-seed');
+    const tracker = new DeadHandTracker(state);
+    for (let i = 0; i < 120; i++) {
+      const player = state.currentPlayer;
+      state = state.players[player].hand.length === 14
+        ? processMove(state, { type: 'discard', player, tile: state.players[player].hand[i % 14] })
+        : processMove(state, { type: 'draw', player });
+      tracker.sync(state);
+      const fresh = new DeadHandTracker(state);
+      for (let pid = 0; pid < 4; pid++) {
+        expect(names(tracker, pid as PlayerId)).toEqual(names(fresh, pid as PlayerId));
+      }
+    }
+    expect(tracker.candidateCount(0)).toBeLessThan(card.patterns.length);
+  });
+
+  test('drops patterns whose singles and pairs are used up', () => {
+    const state = playState('flowers-seed');
+    const tracker = new DeadHandTracker(state);
+    const flowerPair = findHandByName(card, 'FF 1111 2222 3333')!;
+    expect(tracker.candidates(2)).toContain(flowerPair);
+
+    // Two of eight flowers left: the pair can still be made
+    setDiscards(state, ['F1', 'F2', 'F3', 'F4', 'F5', 'F6']);
+    tracker.sync(state);
+    expect(tracker.candidates(2)).toContain(flowerPair);
+
+    // One left, and jokers cannot fill a pair
+    setDiscards(state, ['F1', 'F2', 'F3', 'F4', 'F5', 'F6', 'F7']);
+    tracker.sync(state);
+    expect(tracker.candidates(2)).not.toContain(flowerPair);
+    expect(names(tracker, 2)).toEqual(names(new DeadHandTracker(state), 2));
+  });
+
+  test('exposures rule out concealed patterns and templates they do not fit', () => {
+    const state = playState('exposure-seed');
+    // Every other pattern made concealed (the 2024 card has none)
+    state.options.ruleCard = { ...card, patterns: card.patterns.map((p, i) => i % 2 ? { ...p, isOpen: false } : p) };
+    const concealed = getCompiledRuleCard(state.options.ruleCard).patterns
+      .filter(p => !p.pattern.isOpen && p.templates.length > 0)
+      .map(p => p.pattern);
+    const tracker = new DeadHandTracker(state);
+    const before = tracker.candidates(1);
+    expect(concealed.every(p => before.includes(p))).toBe(true);
+
+    const pong: Meld = { tiles: ['N', 'N', 'N'], type: 'pong', from: 2, exposed: true, canExchangeJokers: false };
+    state.players[1].melds = [pong];
+    state.derived = undefined;
+    tracker.sync(state);
+    const after = tracker.candidates(1);
+    expect(after.length).toBeGreaterThan(0);
+    expect(after.some(p => !p.isOpen)).toBe(false);
+    expect(after.length).toBeLessThan(tracker.candidates(0).length);
+    expect(names(tracker, 1)).toEqual(names(new DeadHandTracker(state), 1));
+
+    // A second exposure, holding a joker, on top of the first
+    const kong: Meld = { tiles: ['E', 'E', 'E', 'J'], type: 'kong', from: 3, exposed: true, canExchangeJokers: true };
+    state.players[1].melds = [pong, kong];
+    state.derived = undefined;
+    tracker.sync(state);
+    expect(tracker.candidateCount(1)).toBeLessThan(after.length);
+    expect(names(tracker, 1)).toEqual(names(new DeadHandTracker(state), 1));
+  });
+
+  test('flags a player dead once the last tile they could use is discarded', () => {
+    const state = playState('last-tile-seed');
+    const hand = ['F1', 'F2', ...repeat('4B', 4), ...repeat('5B', 4), ...repeat('6B', 3)];
+    const rest = createAmericanMahjongTileSet();
+    for (const tile of [...hand, '6B']) rest.splice(rest.indexOf(tile), 1);
+    for (let pid = 0; pid < 4; pid++) {
+      state.players[pid as PlayerId].hand = pid === 0 ? hand : [];
+      state.players[pid as PlayerId].melds = [];
+    }
+    setDiscards(state, rest);
+
+    // Only the missing 6B is unseen
+    const tracker = new DeadHandTracker(state);
+    expect(names(tracker, 0)).toEqual(['FF 1111 2222 3333']);
+    expect(tracker.isDead(0)).toBe(false);
+    expect(validateDeadHand(state, 0, tracker).valid).toBe(true);
+
+    setDiscards(state, [...rest, '6B']);
+    tracker.sync(state);
+    expect(tracker.isDead(0)).toBe(true);
+    expect(tracker.deadPlayers()).toContain(0);
+    expect(validateDeadHand(state, 0, tracker).error?.code).toBe('dead_hand');
+  });
+});
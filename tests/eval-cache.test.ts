@@ -0,0 +1,99 @@
+import { EvalCache, cardSymmetries, canonicalHandKey } from '../src/eval-cache';
+import { getShared2024RuleCard } from '../src/rulecard';
+import { getCompiledRuleCard, toHandVector, matchAllPatterns } from '../src/hand-matcher';
+import { DeterministicRNG } from '../src/rng';
+import { createAmericanMahjongTileSet } from '../src/tiles';
+import { decodeTile, FIRST_FLOWER_ID } from '../src/tile-codec';
+import { Tile } from '../src/types';
+
+const card = getShared2024RuleCard();
+const compiled = getCompiledRuleCard(card);
+
+// Two suits swapped, dragons with their suits
+function swapSuits(hand: Tile[], a: string, b: string): Tile[] {
+  const dragons: Record<string, string> = { C: 'RD', B: 'GD', D: 'WD' };
+  return hand.map(tile => {
+    if (tile === dragons[a]) return dragons[b];
+    if (tile === dragons[b]) return dragons[a];
+    if (/^[1-9][CBD]$/.test(tile)) {
+      const suit = tile[1] === a ? b : tile[1] === b ? a : tile[1];
+      return `${tile[0]}${suit}`;
+    }
+    return tile;
+  });
+}
+
+const swapCraksBams = (hand: Tile[]) => swapSuits(hand, 'C', 'B');
+
+function sampleHands(count: number): Tile[][] {
+  const rng = new DeterministicRNG('cache-client', 'cache-secret', 2);
+  const tiles = createAmericanMahjongTileSet();
+  const templates = compiled.patterns.flatMap(p => p.templates);
+  const hands: Tile[][] = [];
+  for (let i = 0; i < count; i++) {
+    const hand: Tile[] = [];
+    if (i % 2 === 0) {
+      const template = templates[rng.nextUint32() % templates.length];
+      let flower = 0;
+      for (let cls = 0; cls < template.natural.length; cls++) {
+        for (let n = 0; n < template.natural[cls] + template.grouped[cls]; n++) {
+          hand.push(cls === FIRST_FLOWER_ID ? decodeTile(FIRST_FLOWER_ID + (flower++ % 8)) : decodeTile(cls));
+        }
+      }
+    } else {
+      const pool = tiles.slice();
+      for (let n = 0; n < 14; n++) hand.push(pool.splice(rng.nextUint32() % pool.length, 1)[0]);
+    }
+    hands.push(hand);
+  }
+  return hands;
+}
+
+const names = (patterns: readonly { pattern: { name: string } }[]) => patterns.map(p => p.pattern.name).sort();
+
+describe('evaluation cache', () => {
+  test('the 2024 card is symmetric under the craks/bams swap only', () => {
+    expect(cardSymmetries(compiled).length).toBe(2);
+    const hand = ['1C', '1C', '1C', '2B', '2B', '2B', '3D', '3D', '3D', 'RD', 'RD', 'RD', 'N', 'N'];
+    const key = (tiles: Tile[]) => canonicalHandKey(compiled, toHandVector(tiles, [])!);
+    expect(key(swapCraksBams(hand))).toBe(key(hand));
+    // Dots stay put: the year hands fix white dragons
+    expect(key(swapSuits(hand, 'C', 'D'))).not.toBe(key(hand));
+  });
+
+  test('answers like the matcher and shares entries between suit twins', () => {
+    const cache = new EvalCache();
+    const hands = sampleHands(80);
+    for (const hand of hands) {
+      expect(names(cache.matchPatterns(compiled, toHandVector(hand, [])!))).toEqual(names(matchAllPatterns(card, hand, [])));
+    }
+    const misses = cache.metrics().misses;
+    for (const hand of hands) {
+      const twin = swapCraksBams(hand);
+      expect(names(cache.matchPatterns(compiled, toHandVector(twin, [])!))).toEqual(names(matchAllPatterns(card, twin, [])));
+    }
+    const metrics = cache.metrics();
+    expect(metrics.misses).toBe(misses);
+    expect(metrics.hits).toBe(hands.length + (hands.length - metrics.entries));
+    expect(metrics.hitRate).toBeGreaterThan(0.5);
+  });
+
+  test('evicts least recently used entries to stay under its memory cap', () => {
+    const cache = new EvalCache({ maxBytes: 1000 });
+    const hands = sampleHands(40).map(hand => toHandVector(hand, [])!);
+    for (const vector of hands) {
+      cache.matchPatterns(compiled, vector);
+      cache.matchPatterns(compiled, hands[0]); // Keep the first hand recent
+    }
+    const metrics = cache.metrics();
+    expect(metrics.bytes).toBeLessThanOrEqual(1000);
+    expect(metrics.evictions).toBeGreaterThan(0);
+    expect(metrics.entries).toBe(40 - metrics.evictions);
+
+    const hits = metrics.hits;
+    cache.matchPatterns(compiled, hands[0]);
+    expect(cache.metrics().hits).toBe(hits + 1);
+    cache.matchPatterns(compiled, hands[1]);
+    expect(cache.metrics().hits).toBe(hits + 1);
+  });
+});
@@ -0,0 +1,151 @@
+import { startNewGame, processMove } from '../src/engine';
+import { GameState, Move } from '../src/types';
+import { GameEventStore, encodeMove, decodeMove } from '../src/event-store';
+import { hashPosition } from '../src/fairness';
+import { redactMove } from '../src/game-state';
+
+function startPlay(): GameState {
+  return processMove(startNewGame('event-seed', 'secret', 0), { type: 'stopCharleston', player: 0 });
+}
+
+function nextMove(state: GameState): Move {
+  const player = state.currentPlayer;
+  return state.players[player].hand.length === 14
+    ? { type: 'discard', player, tile: state.players[player].hand[0] }
+    : { type: 'draw', player };
+}
+
+// Plays draw/discard turns, recording each move and the state it produced
+function playTurns(store: GameEventStore, state: GameState, turns: number): GameState[] {
+  const states = [state];
+  for (let i = 0; i < turns; i++) {
+    const move = nextMove(state);
+    state = processMove(state, move);
+    store.append(move, state);
+    states.push(state);
+  }
+  return states;
+}
+
+describe('event store', () => {
+  test('every move type round-trips through the compact encoding', () => {
+    const moves: Move[] = [
+      { type: 'draw', player: 1 },
+      { type: 'discard', player: 2, tile: '5B' },
+      { type: 'charlestonPass', player: 0, to: 3, tiles: ['1C', 'N', 'F1'] },
+      { type: 'pass', player: 3 },
+      { type: 'claim', player: 1, meld: { tiles: ['RD', 'RD', 'J'], type: 'pong', from: 0, exposed: true, canExchangeJokers: true } },
+      { type: 'claimRequest', player: 2, claimType: 'kong' },
+      { type: 'declareMahjong', player: 0 },
+      { type: 'stopCharleston', player: 0 },
+      { type: 'replaceJoker', player: 2, meldIndex: 1, tile: '9D' },
+      { type: 'replaceJoker', player: 2, meldIndex: 0, tile: 'WD', owner: 3 },
+      { type: 'kong', player: 3, tiles: ['E', 'E', 'E', 'J'] }
+    ];
+    const bytes = new Uint8Array(moves.reduce((out: number[], m) => encodeMove(m, out), []));
+
+    let offset = 0;
+    for (const move of moves) {
+      const decoded = decodeMove(bytes, offset);
+      expect(decoded.move).toEqual(move);
+      offset = decoded.next;
+    }
+    expect(offset).toBe(bytes.length);
+  });
+
+  test('materializes the state at any index', () => {
+    const initial = startPlay();
+    const store = new GameEventStore(initial, { snapshotInterval: 8 });
+    const states = playTurns(store, initial, 30);
+
+    expect(store.length).toBe(30);
+    expect(store.snapshotCount).toBe(4); // Indices 0, 8, 16, 24
+    for (const index of [0, 1, 7, 8, 9, 23, 24, 30]) {
+      const state = store.materialize(index);
+      expect(hashPosition(state)).toBe(hashPosition(states[index]));
+      // Logs are appended in place, so only the replayed copy stops at index
+      expect(state.logs.length).toBe(index + 1);
+      expect(state.players[0].hand).toEqual(states[index].players[0].hand);
+    }
+    expect(() => store.materialize(31)).toThrow(RangeError);
+  });
+
+  test('materialized states are independent of the store', () => {
+    const initial = startPlay();
+    const store = new GameEventStore(initial, { snapshotInterval: 4 });
+    const states = playTurns(store, initial, 8);
+    expect(hashPosition(store.materialize(4))).toBe(hashPosition(states[4]));
+
+    const resumed = store.materialize(4);
+    processMove(resumed, nextMove(resumed));
+    resumed.players[0].hand.pop();
+    expect(hashPosition(store.materialize(4))).toBe(hashPosition(states[4]));
+  });
+
+  test('checkpoints capture state changes that are not moves', () => {
+    const initial = startPlay();
+    const store = new GameEventStore(initial, { snapshotInterval: 32 });
+    playTurns(store, initial, 3);
+
+    const changed = store.materialize();
+    changed.players[0].hand.reverse();
+    changed.currentPlayer = 2;
+    store.checkpoint(changed);
+
+    expect(store.materialize(3).currentPlayer).toBe(2);
+    expect(store.materialize(3).players[0].hand).toEqual(changed.players[0].hand);
+    expect(store.moves(1, 3).length).toBe(2);
+
+    // Flags set outside any move (a dead hand) carry through later moves
+    const dead = store.materialize();
+    dead.players[1] = { ...dead.players[1], isDead: true };
+    store.checkpoint(dead);
+    playTurns(store, dead, 4);
+    expect(store.materialize().players[1].isDead).toBe(true);
+    expect(store.materialize(3, true).players[1].isDead).toBe(false);
+  });
+
+  test('checkpoints at one index keep the states recorded before them', () => {
+    const deal = startNewGame('event-seed', 'secret', 0);
+    const store = new GameEventStore(deal);
+    const passed = store.materialize();
+    passed.players[0].hand.reverse();
+    store.checkpoint(passed);
+    const stopped = processMove(passed, { type: 'stopCharleston', player: 0 });
+    store.checkpoint(stopped);
+
+    expect(store.materialize(0).phase).toBe('play');
+    expect(store.materialize(0, true).phase).toBe('charleston');
+    expect(store.materialize(0, true).players[0].hand).toEqual(deal.players[0].hand);
+    expect(store.checkpoints().map(c => c.state.players[0].hand)).toEqual([
+      passed.players[0].hand,
+      stopped.players[0].hand
+    ]);
+  });
+
+  test('replays of a live game show only what the seat saw', () => {
+    const initial = startPlay();
+    const store = new GameEventStore(initial);
+    playTurns(store, initial, 4);
+
+    const seen = store.replay(0, store.length, 1);
+    expect(seen.state.players[1].hand).toEqual(initial.players[1].hand);
+    for (const other of [0, 2, 3] as const) expect(seen.state.players[other].hand).toEqual([]);
+    expect(seen.state.wall.length).toBe(initial.wall.length);
+    expect(Array.from(seen.state.wall.liveIds()).every(id => id === 255)).toBe(true);
+    expect(seen.state.derived).toBeUndefined();
+    expect(seen.logs).toEqual(store.moves());
+    const pass: Move = { type: 'charlestonPass', player: 2, to: 3, tiles: ['1C', '2C', '3C'] };
+    expect(redactMove(pass, 1)).toEqual({ ...pass, tiles: [] });
+    expect(redactMove(pass, 3)).toEqual(pass);
+    expect(store.replay(0, 1).state.players[1].hand).toEqual([]);
+
+    // The whole game once it is over
+    const over = { ...store.materialize(), phase: 'complete' as const };
+    store.checkpoint(over);
+    const full = store.replay(0, store.length);
+    expect(full.state.players[0].hand).toEqual(initial.players[0].hand);
+    expect(full.state.wall.liveTiles()).toEqual(initial.wall.liveTiles());
+    expect(full.checkpoints.map(c => c.index)).toEqual([store.length]);
+  });
+});
@@ -22,6 +22,7 @@ import {
 } from '../src/audit-storage';
 
 import { createAmericanMahjongTileSet } from '../src/tiles';
+import { TileWall } from '../src/tile-wall';
 
 describe('Provable Fairness System', () => {
   let tiles: string[];
@@ -185,8 +186,7 @@ describe('Provable Fairness System', () => {
         } as Record<0 | 1 | 2 | 3, any>,
         dealer: 0 as const,
         currentPlayer: 0 as const,
-        wall: tiles.slice(0, 100),
-        deadWall: tiles.slice(100, 114),
+        wall: TileWall.fromTiles(tiles.slice(0, 100), tiles.slice(100, 114)),
         reservedTiles: [],
         discardPile: [],
         lastAction: undefined,
@@ -253,8 +253,7 @@ describe('Provable Fairness System', () => {
         } as Record<0 | 1 | 2 | 3, any>,
         dealer: 0 as const,
         currentPlayer: 0 as const,
-        wall: tiles.slice(0, 100),
-        deadWall: tiles.slice(100, 114),
+        wall: TileWall.fromTiles(tiles.slice(0, 100), tiles.slice(100, 114)),
         reservedTiles: [],
         discardPile: [],
         lastAction: undefined,
@@ -450,8 +449,7 @@ describe('Provable Fairness System', () => {
         players: {} as Record<0 | 1 | 2 | 3, any>,
         dealer: 0 as const,
         currentPlayer: 0 as const,
-        wall: [],
-        deadWall: [],
+        wall: TileWall.fromTiles([]),
         reservedTiles: [],
         discardPile: [],
         options: {
@@ -0,0 +1,57 @@
+import { GameSetupPool, loadSetupPoolConfig, generateCommittedSeed } from '../src/game-setup-pool';
+import { WorkerPool } from '../src/worker-pool';
+import { startNewGame } from '../src/engine';
+import { verifyCommit } from '../src/fairness';
+
+describe('GameSetupPool', () => {
+  let pool: GameSetupPool;
+
+  afterEach(async () => {
+    await pool?.close();
+  });
+
+  test.each([0, 2])('deals the same game as startNewGame (%s workers)', async workers => {
+    pool = new GameSetupPool({ workers, seedReserve: 4 });
+    const seeds = pool.takeSeeds('client-seed');
+    expect(verifyCommit(seeds.serverCommit, seeds.serverSecret)).toBe(true);
+    const fresh = generateCommittedSeed();
+    expect(verifyCommit(fresh.serverCommit, fresh.serverSecret)).toBe(true);
+
+    const state = await pool.createGame(seeds, 2);
+    const expected = startNewGame(seeds.clientSeed, seeds.serverSecret, 2);
+    expect(state.wall).toEqual(expected.wall);
+    expect(state.reservedTiles).toEqual(expected.reservedTiles);
+    expect(state.players[2].hand).toEqual(expected.players[2].hand);
+    expect(state.dice).toBe(expected.dice);
+    expect(state.options.ruleCard.patterns.length).toBeGreaterThan(0);
+  });
+
+  test('reports queue depth and setup latency', async () => {
+    pool = new GameSetupPool({ workers: 1, seedReserve: 0 });
+    const games = [0, 1, 2].map(i => pool.createGame(pool.takeSeeds(`seed-${i}`), 0));
+    expect(pool.getMetrics().inFlight).toBe(3);
+    await Promise.all(games);
+
+    const metrics = pool.getMetrics();
+    expect(metrics.inFlight).toBe(0);
+    expect(metrics.queueDepth).toBe(0);
+    expect(metrics.setupLatency.count).toBe(3);
+    expect(metrics.pool.completed).toBe(3);
+  });
+
+  test('reads its size from the environment', () => {
+    expect(loadSetupPoolConfig({}).enabled).toBe(false);
+    expect(loadSetupPoolConfig({ SETUP_POOL_WORKERS: '3', SETUP_POOL_SEEDS: '10' }))
+      .toEqual({ enabled: true, workers: 3, seedReserve: 10 });
+  });
+});
+
+describe('WorkerPool', () => {
+  test('surfaces task errors', async () => {
+    const workers = new WorkerPool({ size: 0 });
+    await expect(workers.run('deal', { clientSeed: 'a', serverSecret: 'b', dealer: 0, rngVersion: 3 as any }))
+      .rejects.toThrow('Unsupported RNG version');
+    expect(workers.getMetrics().failed).toBe(1);
+    await workers.close();
+  });
+});
@@ -0,0 +1,92 @@
+import { GameState, PlayerId } from '../src/types';
+import { startNewGame } from '../src/engine';
+import { initializeCharleston, executeCharlestonPass, executeCourtesyPass } from '../src/charleston-manager';
+import { StateDraft, snapshotGameState } from '../src/game-state';
+import { getShared2024RuleCard } from '../src/rulecard';
+
+function readyToPass(): GameState {
+  const state = initializeCharleston(startNewGame('client', 'secret', 0));
+  for (let pid = 0; pid < 4; pid++) {
+    const playerId = pid as PlayerId;
+    state.charleston!.playerStates[playerId] = {
+      selectedTiles: state.players[playerId].hand.filter(t => t !== 'J').slice(0, 3),
+      ready: true
+    };
+  }
+  return state;
+}
+
+describe('StateDraft', () => {
+  test('copies a player only when it is written', () => {
+    const state = startNewGame('client', 'secret', 0);
+    const draft = new StateDraft(state);
+    draft.player(1).hand.pop();
+
+    expect(draft.state.players[1]).not.toBe(state.players[1]);
+    expect(draft.state.players[1].hand.length).toBe(state.players[1].hand.length - 1);
+    expect(draft.state.players[0]).toBe(state.players[0]);
+    expect(draft.state.wall).toBe(state.wall);
+
+    draft.wall().drawId();
+    expect(draft.state.wall.length).toBe(state.wall.length - 1);
+  });
+});
+
+describe('structurally shared transitions', () => {
+  test('a Charleston pass leaves the previous state untouched', () => {
+    const state = readyToPass();
+    const before = JSON.stringify(state);
+    const next = executeCharlestonPass(state);
+
+    expect(JSON.stringify(state)).toBe(before);
+    expect(next.charleston!.phase).toBe('pass-across');
+    for (const tile of state.charleston!.playerStates[0].selectedTiles) {
+      expect(next.players[1].hand).toContain(tile);
+    }
+    expect(next.options.ruleCard).toBe(state.options.ruleCard);
+    expect(next.wall).toBe(state.wall);
+    expect(next.logs).toBe(state.logs);
+  });
+
+  test('a courtesy pass copies only the trading players', () => {
+    const state = initializeCharleston(startNewGame('client', 'secret', 0));
+    state.charleston!.phase = 'courtesy';
+    const tile0 = state.players[0].hand.find(t => t !== 'J')!;
+    const tile2 = state.players[2].hand.find(t => t !== 'J')!;
+    state.charleston!.playerStates[0].courtesyOffer = { tiles: [tile0], targetPlayer: 2 };
+    state.charleston!.playerStates[2].courtesyOffer = { tiles: [tile2], targetPlayer: 0 };
+
+    const next = executeCourtesyPass(state);
+    expect(next.phase).toBe('play');
+    expect(next.players[0].hand).toContain(tile2);
+    expect(next.players[1]).toBe(state.players[1]);
+    expect(next.players[3]).toBe(state.players[3]);
+    expect(state.charleston!.completed).toBe(false);
+  });
+});
+
+describe('snapshotGameState', () => {
+  test('is independent of later in-place changes', () => {
+    const state = readyToPass();
+    const snapshot = snapshotGameState(state);
+
+    state.players[0].hand.pop();
+    state.charleston!.playerStates[0].ready = false;
+    state.logs.push({ type: 'pass', player: 0 });
+    state.wall.drawId();
+
+    expect(snapshot.players[0].hand.length).toBe(14);
+    expect(snapshot.charleston!.playerStates[0].ready).toBe(true);
+    expect(snapshot.logs.length).toBe(0);
+    expect(snapshot.wall.length).toBe(state.wall.length + 1);
+    expect(snapshot.options.ruleCard).toBe(state.options.ruleCard);
+  });
+
+  test('games share one frozen rule card', () => {
+    const a = startNewGame('a', 'secret', 0);
+    const b = startNewGame('b', 'secret', 1);
+    expect(a.options.ruleCard).toBe(getShared2024RuleCard());
+    expect(b.options.ruleCard).toBe(a.options.ruleCard);
+    expect(Object.isFrozen(a.options.ruleCard.patterns[0].sections)).toBe(true);
+  });
+});
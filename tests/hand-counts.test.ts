@@ -0,0 +1,73 @@
+import { HandCounts, removeTiles, handWithMelds } from '../src/hand-counts';
+import { validateTileOwnership } from '../src/validation';
+import { isValidMeld } from '../src/tiles';
+
+describe('HandCounts', () => {
+  test('add, remove, has and count', () => {
+    const counts = HandCounts.fromTiles(['1B', '1B', 'J', 'F1', 'RD']);
+    expect(counts.size).toBe(5);
+    expect(counts.count('1B')).toBe(2);
+    expect(counts.has('1B', 2)).toBe(true);
+    expect(counts.has('1B', 3)).toBe(false);
+    expect(counts.jokerCount).toBe(1);
+    expect(counts.flowerCount).toBe(1);
+
+    expect(counts.remove('1B', 3)).toBe(false);
+    expect(counts.count('1B')).toBe(2);
+    expect(counts.remove('F1')).toBe(true);
+    expect(counts.flowerCount).toBe(0);
+    expect(counts.remove('XX')).toBe(false);
+    expect(counts.size).toBe(4);
+    expect(() => counts.add('XX')).toThrow('Unknown tile');
+  });
+
+  test('removeAll is all-or-nothing and respects duplicates', () => {
+    const counts = HandCounts.fromTiles(['2C', '3C', '4C']);
+    expect(counts.removeAll(['2C', '2C'])).toBe(false);
+    expect(counts.size).toBe(3);
+    expect(counts.removeAll(['2C', '4C'])).toBe(true);
+    expect(counts.toTiles()).toEqual(['3C']);
+  });
+
+  test('clone is independent and equality ignores order', () => {
+    const a = HandCounts.fromTiles(['N', 'E', 'J', 'N']);
+    const b = HandCounts.fromTiles(['J', 'N', 'N', 'E']);
+    expect(a.equals(b)).toBe(true);
+    const c = a.clone();
+    c.remove('J');
+    expect(c.equals(a)).toBe(false);
+    expect(a.jokerCount).toBe(1);
+    expect(c.jokerCount).toBe(0);
+    expect(HandCounts.fromIds(a.toIds()).equals(a)).toBe(true);
+  });
+
+  test('handWithMelds combines hand and exposures', () => {
+    const counts = handWithMelds(['1D', 'J'], [{ tiles: ['5B', '5B', 'J'] }]);
+    expect(counts.size).toBe(5);
+    expect(counts.jokerCount).toBe(2);
+  });
+
+  test('removeTiles keeps order of remaining tiles', () => {
+    const hand = ['3B', '1B', '3B', 'N', '9D'];
+    expect(removeTiles(hand, ['3B', '9D', 'WD'])).toBe(2);
+    expect(hand).toEqual(['1B', '3B', 'N']);
+  });
+});
+
+describe('ported hand checks', () => {
+  test('ownership counts duplicates', () => {
+    const hand = ['1B', '2B', '3B'];
+    expect(validateTileOwnership(hand, ['1B', '2B']).valid).toBe(true);
+    expect(validateTileOwnership(hand, ['1B', '1B']).valid).toBe(false);
+    expect(validateTileOwnership(HandCounts.fromTiles(['1B', '1B']), ['1B', '1B']).valid).toBe(true);
+  });
+
+  test('meld shapes', () => {
+    expect(isValidMeld(['5C', 'J', '5C'], 'pong')).toBe(true);
+    expect(isValidMeld(['5C', 'J', '6C'], 'pong')).toBe(false);
+    expect(isValidMeld(['J', 'J', 'J'], 'pong')).toBe(false);
+    expect(isValidMeld(['5C', 'J'], 'pair')).toBe(false);
+    expect(isValidMeld(['N', 'N', 'N', 'N', 'J'], 'quint')).toBe(true);
+    expect(isValidMeld(['N', 'N', 'N', 'N', 'N'], 'quint')).toBe(false);
+  });
+});
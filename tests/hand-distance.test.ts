@@ -0,0 +1,137 @@
+import { getShared2024RuleCard, findHandByName } from '../src/rulecard';
+import { HandDistance, DistanceCache, UNREACHABLE } from '../src/hand-distance';
+import { startNewGame, processMove } from '../src/engine';
+import { DeterministicRNG } from '../src/rng';
+import { createAmericanMahjongTileSet } from '../src/tiles';
+import { isWinningHand } from '../src/win-check';
+import { getCompiledRuleCard } from '../src/hand-matcher';
+import { decodeTile, FIRST_FLOWER_ID, JOKER_ID } from '../src/tile-codec';
+import { GameState, Meld, PlayerId, Tile } from '../src/types';
+
+const card = getShared2024RuleCard();
+
+function repeat(tile: Tile, n: number): Tile[] {
+  return new Array(n).fill(tile);
+}
+
+function distancesOf(tracker: HandDistance): number[] {
+  return tracker.patternDistances().map(d => d.distance * 1000 + card.patterns.indexOf(d.pattern));
+}
+
+describe('hand distance', () => {
+  test('counts missing tiles, with jokers filling groups only', () => {
+    const name = 'FF 1111 2222 3333';
+    const target = findHandByName(card, name)!;
+    const distanceTo = (hand: Tile[]) =>
+      new HandDistance(card, hand).patternDistances().find(d => d.pattern === target)!.distance;
+
+    const complete = ['F1', 'F2', ...repeat('4B', 4), ...repeat('5B', 4), ...repeat('6B', 4)];
+    expect(distanceTo(complete)).toBe(0);
+    expect(new HandDistance(card, complete).minDistance()).toBe(0);
+
+    // Two tiles short of the 6B kong
+    expect(distanceTo(complete.slice(0, 12))).toBe(2);
+    // A joker fills the kong, but not the flower pair
+    expect(distanceTo([...complete.slice(0, 12), 'J', 'J'])).toBe(0);
+    expect(distanceTo(['J', 'J', ...complete.slice(2)])).toBe(2);
+  });
+
+  test('incremental updates match a fresh computation', () => {
+    const rng = new DeterministicRNG('distance-client', 'distance-secret', 2);
+    const pool = createAmericanMahjongTileSet();
+    const hand: Tile[] = [];
+    for (let i = 0; i < 13; i++) hand.push(pool.splice(rng.nextUint32() % pool.length, 1)[0]);
+
+    const tracker = new HandDistance(card, hand);
+    for (let step = 0; step < 60; step++) {
+      const drawn = pool.splice(rng.nextUint32() % pool.length, 1)[0];
+      hand.push(drawn);
+      tracker.addTile(drawn);
+      const discarded = hand.splice(rng.nextUint32() % hand.length, 1)[0];
+      tracker.removeTile(discarded);
+      pool.push(discarded);
+      expect(distancesOf(tracker)).toEqual(distancesOf(new HandDistance(card, hand)));
+    }
+  });
+
+  test('exposed melds rule out templates they cannot fill', () => {
+    const windPong: Meld = { tiles: ['N', 'N', 'N'], type: 'pong', from: 1, exposed: true, canExchangeJokers: false };
+    const tracker = new HandDistance(card, ['1C', '2C'], [windPong]);
+    const reachable = tracker.patternDistances();
+    expect(reachable.length).toBeGreaterThan(0);
+    expect(reachable.length).toBeLessThan(card.patterns.length);
+    expect(reachable.every(d => d.template.groups.some(g => (g & 7) === 3))).toBe(true);
+    expect(reachable.every(d => d.distance < UNREACHABLE)).toBe(true);
+  });
+
+  test('the per-player cache follows moves', () => {
+    let state: GameState = processMove(startNewGame('distance-seed', 'secret', 0), { type: 'stopCharleston', player: 0 });
+    const cache = new DistanceCache(state);
+    for (let i = 0; i < 12; i++) {
+      const player = state.currentPlayer;
+      state = state.players[player].hand.length === 14
+        ? processMove(state, { type: 'discard', player, tile: state.players[player].hand[0] })
+        : processMove(state, { type: 'draw', player });
+      cache.sync(state);
+      for (let pid = 0; pid < 4; pid++) {
+        const player = state.players[pid as PlayerId];
+        const fresh = new HandDistance(card, player.hand, player.melds);
+        expect(distancesOf(cache.forPlayer(pid as PlayerId))).toEqual(distancesOf(fresh));
+      }
+    }
+  });
+
+  test('waits match a brute-force win check over every tile', () => {
+    const rng = new DeterministicRNG('waits-client', 'waits-secret', 2);
+    const templates = getCompiledRuleCard(card).patterns.flatMap(p => p.templates);
+    const kinds: Tile[] = [];
+    for (let id = 0; id < JOKER_ID; id++) kinds.push(decodeTile(id));
+
+    for (let i = 0; i < 40; i++) {
+      // A winning hand with one tile taken out, sometimes with jokers
+      const template = templates[rng.nextUint32() % templates.length];
+      const hand: Tile[] = [];
+      let jokers = i % 3;
+      let flower = 0;
+      for (let cls = 0; cls < template.natural.length; cls++) {
+        for (let n = 0; n < template.natural[cls] + template.grouped[cls]; n++) {
+          if (n >= template.natural[cls] && jokers-- > 0) hand.push('J');
+          else hand.push(cls === FIRST_FLOWER_ID ? decodeTile(FIRST_FLOWER_ID + (flower++ % 8)) : decodeTile(cls));
+        }
+      }
+      hand.splice(rng.nextUint32() % hand.length, 1);
+
+      const state = processMove(startNewGame(`waits-${i}`, 'secret', 0), { type: 'stopCharleston', player: 0 });
+      state.players[1].hand = hand;
+      state.derived = undefined;
+      const cache = new DistanceCache(state);
+      for (const tile of kinds) {
+        expect([tile, cache.canWinOn(1, tile)]).toEqual([tile, isWinningHand([...hand, tile], [], card)]);
+      }
+    }
+  });
+
+  test('exposure claims need an open pattern with a group of that tile', () => {
+    const state = processMove(startNewGame('claims-seed', 'secret', 0), { type: 'stopCharleston', player: 0 });
+    state.players[2].hand = ['N', 'N', 'E', 'E', '1C', '2C', '3C', 'WD', 'F1', 'F2', '5B', '7D', '9D'];
+    state.derived = undefined;
+    const cache = new DistanceCache(state);
+    expect(cache.canExposeWith(2, 'N', 3)).toBe(true);
+    // Without jokers, the discard plus the tiles held must fill the group
+    expect(cache.canExposeWith(2, 'N', 4)).toBe(false);
+    expect(cache.canExposeWith(2, 'S', 3)).toBe(false);
+    expect(cache.canExposeWith(2, 'J', 3)).toBe(false);
+
+    state.players[2].hand = [...state.players[2].hand.slice(0, 12), 'J'];
+    state.derived = undefined;
+    cache.sync(state);
+    expect(cache.canExposeWith(2, 'N', 4)).toBe(true);
+    expect(cache.canExposeWith(2, 'E', 4)).toBe(true);
+
+    // Filled on the first question instead of on sync, with the same answers
+    const lazy = new DistanceCache(state, { lazyClaimSets: true });
+    for (const tile of ['N', 'E', 'S', '1C', 'J']) {
+      for (const size of [3, 4, 5]) expect(lazy.canExposeWith(2, tile, size)).toBe(cache.canExposeWith(2, tile, size));
+    }
+  });
+});
@@ -0,0 +1,76 @@
+import { getShared2024RuleCard, validateHandPattern, findHandByName } from '../src/rulecard';
+import { getCompiledPattern, matchHand } from '../src/hand-matcher';
+import { isWinningHand } from '../src/win-check';
+import { Meld, Tile } from '../src/types';
+
+const card = getShared2024RuleCard();
+
+function pattern(name: string) {
+  const found = findHandByName(card, name);
+  if (!found) throw new Error(`No pattern ${name}`);
+  return found;
+}
+
+function repeat(tile: Tile, n: number): Tile[] {
+  return new Array(n).fill(tile);
+}
+
+function kong(tile: Tile, jokers: number = 0): Meld {
+  return {
+    tiles: [...repeat(tile, 4 - jokers), ...repeat('J', jokers)],
+    type: 'kong',
+    from: 1,
+    exposed: true,
+    canExchangeJokers: jokers > 0
+  };
+}
+
+describe('hand matcher', () => {
+  test('compiles one template per suit assignment and number shift', () => {
+    // Three sections in three different suits, numbers shifted from 1-3 up to 7-9
+    expect(getCompiledPattern(pattern('x FF 1111 2222 3333')).templates.length).toBe(6 * 7);
+    // Two suited sections in different suits; "000" takes no suit
+    expect(getCompiledPattern(pattern('222 000 2222 4444')).templates.length).toBe(6);
+  });
+
+  test('matches any suit and uses jokers only in groups', () => {
+    const hand = ['F1', 'F5', ...repeat('4B', 4), ...repeat('5B', 4), ...repeat('6B', 4)];
+    expect(validateHandPattern(hand, [], pattern('FF 1111 2222 3333')).valid).toBe(true);
+    expect(isWinningHand(hand, [], card)).toBe(true);
+
+    const jokerInGroup = ['F1', 'F5', '4B', '4B', 'J', 'J', ...repeat('5B', 4), ...repeat('6B', 4)];
+    expect(isWinningHand(jokerInGroup, [], card)).toBe(true);
+
+    const jokerInPair = ['F1', 'J', ...repeat('4B', 4), ...repeat('5B', 4), ...repeat('6B', 4)];
+    expect(isWinningHand(jokerInPair, [], card)).toBe(false);
+
+    const mixedSuits = ['F1', 'F5', ...repeat('4B', 4), ...repeat('5C', 4), ...repeat('6B', 4)];
+    expect(validateHandPattern(mixedSuits, [], pattern('FF 1111 2222 3333')).valid).toBe(false);
+  });
+
+  test('reads 0 as the white dragon and D as the section suit dragon', () => {
+    const year = [...repeat('2C', 3), ...repeat('WD', 3), ...repeat('2D', 4), ...repeat('4D', 4)];
+    expect(validateHandPattern(year, [], pattern('222 000 2222 4444')).valid).toBe(true);
+    const redDragons = [...repeat('2C', 3), ...repeat('RD', 3), ...repeat('2D', 4), ...repeat('4D', 4)];
+    expect(validateHandPattern(redDragons, [], pattern('222 000 2222 4444')).valid).toBe(false);
+
+    // FFFFF DDDD 11111: dragon of a different suit to the numbers
+    const quints = ['F1', 'F2', 'F3', 'F4', 'F5', ...repeat('GD', 4), '1C', '1C', '1C', 'J', 'J'];
+    expect(validateHandPattern(quints, [], pattern('FFFFF DDDD 11111')).valid).toBe(true);
+    const sameSuitDragon = ['F1', 'F2', 'F3', 'F4', 'F5', ...repeat('RD', 4), '1C', '1C', '1C', 'J', 'J'];
+    expect(validateHandPattern(sameSuitDragon, [], pattern('FFFFF DDDD 11111')).valid).toBe(false);
+  });
+
+  test('exposed melds fill whole groups', () => {
+    const concealed = ['F1', 'F2', ...repeat('5B', 4), ...repeat('6B', 4)];
+    const match = matchHand(card, concealed, [kong('4B', 1)]);
+    expect(match).not.toBeNull();
+    expect(match!.jokers).toBe(1);
+
+    expect(isWinningHand(['F1', 'F2', ...repeat('4B', 4), ...repeat('6B', 4)], [kong('5B')], card)).toBe(true);
+
+    // An exposed pong cannot be topped up from the hand into a kong
+    const pong: Meld = { tiles: ['4B', '4B', '4B'], type: 'pong', from: 2, exposed: true, canExchangeJokers: false };
+    expect(isWinningHand(['F1', 'F2', '4B', ...repeat('5B', 4), ...repeat('6B', 4)], [pong], card)).toBe(false);
+  });
+});
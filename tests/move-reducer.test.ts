@@ -0,0 +1,91 @@
+import { startNewGame, processMove } from '../src/engine';
+import { GameState, Move, PlayerId } from '../src/types';
+import { DerivedState } from '../src/derived-state';
+
+function startPlay(): GameState {
+  return processMove(startNewGame('reducer-seed', 'secret', 0), { type: 'stopCharleston', player: 0 });
+}
+
+function expectDerivedInSync(state: GameState): void {
+  const fresh = DerivedState.fromState(state);
+  expect(state.derived!.visible.equals(fresh.visible)).toBe(true);
+  for (let pid = 0; pid < 4; pid++) {
+    expect(state.derived!.hands[pid].equals(fresh.hands[pid])).toBe(true);
+    expect(state.derived!.exposed[pid].equals(fresh.exposed[pid])).toBe(true);
+  }
+}
+
+describe('move reducer', () => {
+  test('draw and discard move tiles between the wall, hands and discards', () => {
+    let state = startPlay();
+    expect(state.phase).toBe('play');
+    const wallBefore = state.wall.length;
+
+    state = processMove(state, { type: 'discard', player: 0, tile: state.players[0].hand[0] });
+    expect(state.currentPlayer).toBe(1);
+    expect(state.players[0].hand.length).toBe(13);
+    expect(state.discardPile.length).toBe(1);
+
+    state = processMove(state, { type: 'draw', player: 1 });
+    expect(state.players[1].hand.length).toBe(14);
+    expect(state.wall.length).toBe(wallBefore - 1);
+    expectDerivedInSync(state);
+  });
+
+  test('rejects moves out of turn', () => {
+    const state = startPlay();
+    expect(() => processMove(state, { type: 'draw', player: 2 })).toThrow('not your turn');
+    expect(() => processMove(state, { type: 'discard', player: 1, tile: state.players[1].hand[0] })).toThrow();
+  });
+
+  test('keeps derived counts in step over a long game', () => {
+    let state = startPlay();
+    let turns = 0;
+    while (state.wall.length > 0 && turns < 80) {
+      const player = state.currentPlayer;
+      if (state.derived!.tileCount(player) === 13) {
+        state = processMove(state, { type: 'draw', player });
+      }
+      state = processMove(state, { type: 'discard', player, tile: state.players[player].hand[0] });
+      turns++;
+    }
+    expect(state.logs.length).toBeGreaterThan(turns);
+    expect(state.derived!.visible.size).toBe(state.discardPile.length);
+    expectDerivedInSync(state);
+  });
+
+  test('claims expose a meld and pass the turn to the claimer', () => {
+    const state = startPlay();
+    state.players[0].hand.splice(0, 2, '5D', '5D');
+    state.players[2].hand.splice(0, 2, '5D', 'J');
+    state.derived = undefined; // Hands were edited directly
+
+    let next = processMove(state, { type: 'discard', player: 0, tile: '5D' });
+    const meld = { type: 'pong' as const, tiles: ['5D', '5D', 'J'], from: 0 as PlayerId, exposed: true, canExchangeJokers: true };
+    next = processMove(next, { type: 'claim', player: 2, meld });
+
+    expect(next.currentPlayer).toBe(2);
+    expect(next.discardPile.length).toBe(0);
+    expect(next.players[2].melds[0].tiles).toEqual(['5D', '5D', 'J']);
+    expect(next.derived!.tileCount(2)).toBe(14);
+    expectDerivedInSync(next);
+
+    // Player 0 now holds the last 5D and swaps it for the joker on their turn
+    next = processMove(next, { type: 'discard', player: 2, tile: next.players[2].hand[0] });
+    next = processMove(next, { type: 'draw', player: 3 });
+    next = processMove(next, { type: 'discard', player: 3, tile: next.players[3].hand[0] });
+    next = processMove(next, { type: 'draw', player: 0 });
+    next = processMove(next, { type: 'replaceJoker', player: 0, owner: 2, meldIndex: 0, tile: '5D' });
+    expect(next.players[2].melds[0].tiles).toEqual(['5D', '5D', '5D']);
+    expect(next.players[0].hand).toContain('J');
+    expectDerivedInSync(next);
+  });
+
+  test('a failed mahjong declaration leaves the state unchanged', () => {
+    const state = startPlay();
+    const before = JSON.stringify(state);
+    const move: Move = { type: 'declareMahjong', player: 0 };
+    expect(() => processMove(state, move)).toThrow();
+    expect(JSON.stringify(state)).toBe(before);
+  });
+});
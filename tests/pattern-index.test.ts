@@ -0,0 +1,76 @@
+import { getShared2024RuleCard } from '../src/rulecard';
+import { getCompiledRuleCard, toHandVector, matchCompiledPattern, HandTemplate } from '../src/hand-matcher';
+import { DeterministicRNG } from '../src/rng';
+import { createAmericanMahjongTileSet } from '../src/tiles';
+import { decodeTile, FIRST_FLOWER_ID, FIRST_WIND_ID } from '../src/tile-codec';
+import { Tile } from '../src/types';
+
+const compiled = getCompiledRuleCard(getShared2024RuleCard());
+
+// A hand filling the template, with the given number of group tiles as jokers
+function handFor(template: HandTemplate, jokers: number): Tile[] {
+  const hand: Tile[] = [];
+  let flower = 0;
+  for (let cls = 0; cls < template.natural.length; cls++) {
+    for (let n = 0; n < template.natural[cls] + template.grouped[cls]; n++) {
+      const isGroupTile = n >= template.natural[cls];
+      if (isGroupTile && jokers > 0) {
+        hand.push('J');
+        jokers--;
+      } else {
+        hand.push(cls === FIRST_FLOWER_ID ? decodeTile(FIRST_FLOWER_ID + (flower++ % 8)) : decodeTile(cls));
+      }
+    }
+  }
+  return hand;
+}
+
+function fullScan(hand: Tile[]): string[] {
+  const vector = toHandVector(hand, [])!;
+  return compiled.patterns.filter(p => matchCompiledPattern(p, vector)).map(p => p.pattern.name);
+}
+
+describe('pattern index', () => {
+  test('keeps every pattern a winning hand matches', () => {
+    for (const pattern of compiled.patterns) {
+      for (const template of pattern.templates) {
+        const hand = handFor(template, Math.min(2, pattern.maxJokers));
+        const candidates = compiled.index.candidates(toHandVector(hand, [])!).map(p => p.pattern.name);
+        expect(candidates).toContain(pattern.pattern.name);
+        for (const name of fullScan(hand)) {
+          expect(candidates).toContain(name);
+        }
+      }
+    }
+  });
+
+  test('prunes random hands to a few candidates without losing matches', () => {
+    const rng = new DeterministicRNG('index-client', 'index-secret', 2);
+    const tiles = createAmericanMahjongTileSet();
+    let totalCandidates = 0;
+    for (let i = 0; i < 200; i++) {
+      const hand: Tile[] = [];
+      const pool = tiles.slice();
+      for (let n = 0; n < 14; n++) {
+        hand.push(pool.splice(rng.nextUint32() % pool.length, 1)[0]);
+      }
+      const candidates = compiled.index.candidates(toHandVector(hand, [])!).map(p => p.pattern.name);
+      totalCandidates += candidates.length;
+      for (const name of fullScan(hand)) {
+        expect(candidates).toContain(name);
+      }
+    }
+    expect(totalCandidates / 200).toBeLessThan(compiled.patterns.length / 4);
+  });
+
+  test('exposed meld shapes rule out patterns without a matching group', () => {
+    const pong = { tiles: ['N', 'N', 'N'], type: 'pong' as const, from: 1 as const, exposed: true, canExchangeJokers: false };
+    const vector = toHandVector([], [pong])!;
+    const candidates = compiled.index.inProgressCandidates(vector);
+    expect(candidates.length).toBeGreaterThan(0);
+    expect(candidates.length).toBeLessThan(compiled.patterns.length);
+    for (const candidate of candidates) {
+      expect(candidate.templates.some(t => t.groups.some(g => (g & 7) === 3 && (g >> 3) >= FIRST_WIND_ID && (g >> 3) < FIRST_WIND_ID + 4))).toBe(true);
+    }
+  });
+});
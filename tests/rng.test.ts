@@ -0,0 +1,57 @@
+import { DeterministicRNG, LATEST_RNG_VERSION } from '../src/rng';
+import { startNewGame, createGame } from '../src/engine';
+
+describe('DeterministicRNG', () => {
+  test('v1 stream is unchanged', () => {
+    const rng = new DeterministicRNG('testseed', 'secret');
+    const values = Array.from({ length: 10 }, () => rng.nextInt(1000));
+    expect(values).toEqual([571, 5, 290, 582, 543, 112, 81, 848, 357, 326]);
+  });
+
+  test('v2 is deterministic and differs from v1', () => {
+    const a = new DeterministicRNG('testseed', 'secret', 2);
+    const b = new DeterministicRNG('testseed', 'secret', 2);
+    const v1 = new DeterministicRNG('testseed', 'secret', 1);
+    const seqA = Array.from({ length: 100 }, () => a.nextInt(152));
+    const seqB = Array.from({ length: 100 }, () => b.nextInt(152));
+    const seqV1 = Array.from({ length: 100 }, () => v1.nextInt(152));
+    expect(seqA).toEqual(seqB);
+    expect(seqA).not.toEqual(seqV1);
+    expect(seqA.every(v => v >= 0 && v < 152)).toBe(true);
+  });
+
+  test.each([1, 2] as const)('nextInts matches repeated nextInt (v%s)', version => {
+    const maxes = [152, 151, 6, 6, 1, 0x80000001];
+    const bulk = new DeterministicRNG('seed', 'secret', version).nextInts(maxes);
+    const single = new DeterministicRNG('seed', 'secret', version);
+    expect(Array.from(bulk)).toEqual(maxes.map(m => single.nextInt(m)));
+  });
+
+  test('fillUint32 continues the stream across buffer refills', () => {
+    const bulk = new DeterministicRNG('seed', 'secret', 2).fillUint32(new Uint32Array(200));
+    const single = new DeterministicRNG('seed', 'secret', 2);
+    expect(Array.from(bulk)).toEqual(Array.from({ length: 200 }, () => single.nextUint32()));
+  });
+
+  test('rejects invalid arguments', () => {
+    expect(() => new DeterministicRNG('a', 'b', 3 as any)).toThrow('Unsupported RNG version');
+    expect(() => new DeterministicRNG('a', 'b', 2).nextInt(0)).toThrow('max must be positive');
+  });
+});
+
+describe('RNG version per game', () => {
+  test('new games record the latest version', () => {
+    expect(startNewGame('seed', 'secret').rngVersion).toBe(LATEST_RNG_VERSION);
+  });
+
+  test('games replay identically with their recorded version', () => {
+    for (const version of [1, 2] as const) {
+      const original = createGame('seed', 'secret', 1, { rngVersion: version });
+      const replayed = startNewGame('seed', 'secret', 1, original.rngVersion);
+      expect(replayed.rngVersion).toBe(version);
+      expect(replayed.wall).toEqual(original.wall);
+      expect(replayed.players[1].hand).toEqual(original.players[1].hand);
+    }
+    expect(startNewGame('seed', 'secret', 0, 1).wall).not.toEqual(startNewGame('seed', 'secret', 0, 2).wall);
+  });
+});
@@ -0,0 +1,49 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import {
+  RULE_CARD_ARTIFACT,
+  buildRuleCardArtifact,
+  getRuleCard,
+  getRuleCardByHash,
+  listRuleCards,
+  registerRuleCard,
+  ruleCardHash
+} from '../src/rulecard-registry';
+import { getShared2024RuleCard } from '../src/rulecard';
+import { load2024RuleCard } from '../src/rulecard-parser';
+import { compileHandPattern, getCompiledRuleCard, serializeTemplates } from '../src/hand-matcher';
+import { RuleCard } from '../src/types';
+
+describe('rule card registry', () => {
+  test('the shipped artifact is up to date with the card sources', () => {
+    const shipped = JSON.parse(fs.readFileSync(path.join(__dirname, '../src/data', RULE_CARD_ARTIFACT), 'utf8'));
+    expect(shipped).toEqual(JSON.parse(JSON.stringify(buildRuleCardArtifact())));
+  });
+
+  test('serves one frozen, precompiled instance per card', () => {
+    const card = getRuleCard(2024);
+    expect(getShared2024RuleCard()).toBe(card);
+    expect(getRuleCard(2024, 'hands')).toBe(card);
+    expect(Object.isFrozen(card.patterns[0].sections)).toBe(true);
+    expect(ruleCardHash(card)).toBe(ruleCardHash(load2024RuleCard()));
+    expect(getRuleCardByHash(ruleCardHash(card))).toBe(card);
+
+    // Restored templates are the ones compiling the patterns gives
+    getCompiledRuleCard(card).patterns.forEach(compiled => {
+      expect(serializeTemplates(compiled)).toEqual(serializeTemplates(compileHandPattern(compiled.pattern)));
+    });
+    expect(() => getRuleCard(1999)).toThrow('No rule card for year 1999');
+  });
+
+  test('registers custom cards by content', () => {
+    const card = getRuleCard(2024);
+    expect(registerRuleCard(load2024RuleCard())).toBe(card);
+
+    const custom: RuleCard = { ...load2024RuleCard(), name: 'House rules 2024' };
+    const registered = registerRuleCard(custom);
+    expect(registered).not.toBe(card);
+    expect(getRuleCardByHash(ruleCardHash(custom))).toBe(registered);
+    expect(getRuleCard(2024)).toBe(card);
+    expect(listRuleCards().filter(c => c.source === 'custom').map(c => c.name)).toContain('House rules 2024');
+  });
+});
@@ -0,0 +1,67 @@
+import {
+  emptySelfPlayStats,
+  mergeSelfPlayStats,
+  playSelfPlayGame,
+  playSelfPlayShard,
+  runSelfPlay,
+  SelfPlayStats
+} from '../src/self-play';
+import { getBotPolicy } from '../src/bot';
+import { getShared2024RuleCard } from '../src/rulecard';
+import { isWinningHand } from '../src/win-check';
+
+const greedy = ['greedy', 'greedy', 'greedy', 'greedy'];
+
+function wins(stats: SelfPlayStats): number {
+  return Object.values(stats.patterns).reduce((sum, p) => sum + p.wins, 0);
+}
+
+describe('self-play', () => {
+  test('a run replays the same whatever the sharding', () => {
+    const whole = playSelfPlayShard({ seed: 'replay', from: 0, to: 8, policies: greedy });
+    const split = mergeSelfPlayStats(
+      playSelfPlayShard({ seed: 'replay', from: 5, to: 8, policies: greedy }),
+      playSelfPlayShard({ seed: 'replay', from: 0, to: 5, policies: greedy })
+    );
+    expect(split).toEqual(whole);
+
+    expect(whole.games).toBe(8);
+    expect(whole.wins + whole.wallGames).toBe(8);
+    expect(wins(whole)).toBe(whole.wins);
+    expect(whole.votes.reduce((a, b) => a + b, 0)).toBe(8);
+    expect(whole.policies.greedy).toEqual({ seats: 32, wins: whole.wins });
+    expect(playSelfPlayShard({ seed: 'other', from: 0, to: 8, policies: greedy })).not.toEqual(whole);
+  });
+
+  test('random and greedy seats finish games that end in a real win or an empty wall', () => {
+    const card = getShared2024RuleCard();
+    const policies = ['random', 'greedy', 'random', 'greedy'].map(getBotPolicy);
+    const stats = emptySelfPlayStats();
+    for (let index = 0; index < 6; index++) {
+      const state = playSelfPlayGame('mixed', index, policies, stats);
+      if (state.phase === 'complete') {
+        const winner = state.players[state.currentPlayer];
+        expect(isWinningHand(winner.hand, winner.melds, card)).toBe(true);
+      } else {
+        expect(state.wall.length).toBe(0);
+      }
+    }
+    expect(stats.games).toBe(6);
+    expect(stats.policies.random.seats).toBe(12);
+    expect(stats.policies.random.wins + stats.policies.greedy.wins).toBe(stats.wins);
+
+    expect(() => getBotPolicy('nobody')).toThrow('Unknown bot policy: nobody');
+  });
+
+  test('runSelfPlay reports each shard and totals them', async () => {
+    const seen: number[] = [];
+    const total = await runSelfPlay({ games: 7, seed: 'run', workers: 0, shardSize: 3 }, (sum, shard) => {
+      seen.push(shard.games);
+      expect(sum.games).toBe(seen.reduce((a, b) => a + b, 0));
+    });
+    expect(seen.sort()).toEqual([1, 3, 3]);
+    expect(total).toEqual(playSelfPlayShard({ seed: 'run', from: 0, to: 7, policies: greedy }));
+
+    await expect(runSelfPlay({ games: 1, workers: 0, policies: ['greedy'] })).rejects.toThrow('four seats');
+  });
+});
@@ -0,0 +1,67 @@
+import {
+  TILE_KIND_COUNT,
+  TILE_NAMES,
+  TILE_SUIT,
+  TILE_RANK,
+  TILE_EFFECTIVE_SUIT,
+  TILE_COPIES,
+  TILE_SET_TEMPLATE,
+  SUIT_NAMES,
+  INVALID_TILE_ID,
+  JOKER_ID,
+  encodeTile,
+  decodeTile,
+  encodeTiles,
+  decodeTiles,
+  numberTileId,
+  dragonIdForSuit,
+  areConsecutiveIds
+} from '../src/tile-codec';
+import { createAmericanMahjongTileSet, getTileSuit, getTileValue, areConsecutive } from '../src/tiles';
+
+describe('tile codec', () => {
+  test('round-trips every tile kind', () => {
+    expect(TILE_NAMES).toHaveLength(TILE_KIND_COUNT);
+    for (let id = 0; id < TILE_KIND_COUNT; id++) {
+      expect(encodeTile(decodeTile(id))).toBe(id);
+    }
+    expect(decodeTiles(encodeTiles(['1C', 'RD', 'N', 'F3', 'J']))).toEqual(['1C', 'RD', 'N', 'F3', 'J']);
+  });
+
+  test('unknown tiles are rejected', () => {
+    expect(encodeTile('XX')).toBe(INVALID_TILE_ID);
+    expect(() => encodeTiles(['1C', '0D'])).toThrow('Unknown tile');
+    expect(() => decodeTile(TILE_KIND_COUNT)).toThrow('Invalid tile id');
+  });
+
+  test('lookup tables agree with tile strings', () => {
+    for (let id = 0; id < TILE_KIND_COUNT; id++) {
+      const tile = TILE_NAMES[id];
+      expect(SUIT_NAMES[TILE_SUIT[id]]).toBe(getTileSuit(tile));
+      expect(TILE_RANK[id] || null).toBe(getTileValue(tile));
+    }
+    expect(TILE_EFFECTIVE_SUIT[encodeTile('RD')]).toBe(TILE_SUIT[encodeTile('5C')]);
+    expect(TILE_EFFECTIVE_SUIT[encodeTile('GD')]).toBe(TILE_SUIT[encodeTile('5B')]);
+    expect(TILE_EFFECTIVE_SUIT[encodeTile('WD')]).toBe(TILE_SUIT[encodeTile('5D')]);
+    expect(dragonIdForSuit(TILE_SUIT[encodeTile('3B')])).toBe(encodeTile('GD'));
+    expect(numberTileId(2, 7)).toBe(encodeTile('7D'));
+  });
+
+  test('tile set template matches the full set', () => {
+    expect(TILE_SET_TEMPLATE).toHaveLength(152);
+    expect(decodeTiles(TILE_SET_TEMPLATE)).toEqual(createAmericanMahjongTileSet());
+    const copies = new Array(TILE_KIND_COUNT).fill(0);
+    TILE_SET_TEMPLATE.forEach(id => copies[id]++);
+    expect(copies).toEqual([...TILE_COPIES]);
+    expect(copies[JOKER_ID]).toBe(8);
+  });
+
+  test('consecutive runs', () => {
+    expect(areConsecutiveIds(encodeTiles(['3B', '1B', '2B']))).toBe(true);
+    expect(areConsecutiveIds(encodeTiles(['1B', '2B', '4B']))).toBe(false);
+    expect(areConsecutiveIds(encodeTiles(['1B', '2C', '3B']))).toBe(false);
+    expect(areConsecutiveIds(encodeTiles(['1B', '1B']))).toBe(false);
+    expect(areConsecutive(['7D', '8D', '9D'])).toBe(true);
+    expect(areConsecutive(['RD', 'GD'])).toBe(false);
+  });
+});
@@ -0,0 +1,84 @@
+import { TileWall } from '../src/tile-wall';
+import { buildWalls, breakWall, dealTiles, rollDice, setupGame, shuffleTileIds } from '../src/wall';
+import { DeterministicRNG } from '../src/rng';
+import { decodeTiles } from '../src/tile-codec';
+import { PlayerId, Tile } from '../src/types';
+
+// Deal with the original array-based wall and keep drawing until it is empty
+function legacyDeal(seed: string, dealer: PlayerId) {
+  const rng = new DeterministicRNG(seed, 'secret', 2);
+  const shuffled = decodeTiles(shuffleTileIds(rng));
+  const dice = rollDice(rng);
+  const walls = buildWalls(shuffled);
+  const { hands, gameWalls } = dealTiles(breakWall(walls, dice, dealer));
+  const reserved = gameWalls.walls[dealer].reserved.slice();
+
+  const draws: Tile[] = [];
+  let current = gameWalls.dealingWall;
+  for (;;) {
+    let tries = 0;
+    while (gameWalls.walls[current].tiles.length === 0 && tries++ < 4) {
+      current = (current + 3) % 4;
+    }
+    const tile = gameWalls.walls[current].tiles.pop();
+    if (tile === undefined) break;
+    draws.push(tile);
+  }
+  return { hands, reserved, draws, dice };
+}
+
+describe('TileWall', () => {
+  test.each([
+    ['alpha', 0], ['beta', 1], ['gamma', 2], ['delta', 3], ['epsilon', 1]
+  ] as Array<[string, PlayerId]>)('matches the array-based deal for %s (dealer %s)', (seed, dealer) => {
+    const legacy = legacyDeal(seed, dealer);
+    const { hands, wall, dice } = setupGame(new DeterministicRNG(seed, 'secret', 2), dealer);
+
+    expect(dice).toBe(legacy.dice);
+    expect(hands).toEqual(legacy.hands);
+    expect(wall.deadTiles().reverse()).toEqual(legacy.reserved);
+    expect(wall.length).toBe(legacy.draws.length);
+    expect(wall.liveTiles()).toEqual(legacy.draws);
+
+    const drawn: Tile[] = [];
+    for (let tile = wall.draw(); tile !== undefined; tile = wall.draw()) {
+      drawn.push(tile);
+    }
+    expect(drawn).toEqual(legacy.draws);
+    expect(wall.length).toBe(0);
+    expect(wall.deadLength).toBe(dice * 2);
+  });
+
+  test('replacement draws use the dead wall first, then the live tail', () => {
+    const wall = TileWall.fromTiles(['1C', '2C', '3C'], ['N', 'E']);
+    expect(wall.drawReplacement()).toBe('E');
+    expect(wall.drawReplacement()).toBe('N');
+    expect(wall.deadLength).toBe(0);
+    expect(wall.drawReplacement()).toBe('3C');
+    expect(wall.length).toBe(2);
+    expect(wall.draw()).toBe('1C');
+    expect(wall.draw()).toBe('2C');
+    expect(wall.draw()).toBeUndefined();
+    expect(wall.drawReplacement()).toBeUndefined();
+  });
+
+  test('snapshots are compact and restore the cursors', () => {
+    const { wall } = setupGame(new DeterministicRNG('snap', 'secret', 2), 2);
+    wall.draw();
+    wall.drawReplacement();
+
+    const json = JSON.stringify(wall);
+    expect(json.length).toBeLessThan(300);
+    const restored = TileWall.fromJSON(JSON.parse(json));
+    expect(restored.liveTiles()).toEqual(wall.liveTiles());
+    expect(restored.deadTiles()).toEqual(wall.deadTiles());
+  });
+
+  test('clones draw independently', () => {
+    const wall = TileWall.fromTiles(['1D', '2D']);
+    const copy = wall.clone();
+    expect(copy.draw()).toBe('1D');
+    expect(wall.length).toBe(2);
+    expect(decodeTiles([wall.peekId()])).toEqual(['1D']);
+  });
+});
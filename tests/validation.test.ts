@@ -1,6 +1,7 @@
 // path: mahjong-ts/tests/validation.test.ts
 import { validateTileOwnership, validateJokerUsage, validateExposure, validateDeadHand, validateMove } from '../src/validation';
 import { Meld, GameState, Move, PlayerId } from '../src/types';
+import { TileWall } from '../src/tile-wall';
 
 const MOCK_RULES = {
   name: 'Test Rules',
@@ -44,8 +45,7 @@ const createMockState = (overrides = {}): GameState => ({
   },
   dealer: 0,
   currentPlayer: 0,
-  wall: [],
-  deadWall: [],
+  wall: TileWall.fromTiles([]),
   reservedTiles: [], // Added required field
   discardPile: [],
   phase: 'play',
@@ -204,7 +204,7 @@ describe('validateMove', () => {
       2: { hand: [], melds: [], isReady: true, isDead: false, score: 0 },
       3: { hand: [], melds: [], isReady: true, isDead: false, score: 0 }
     },
-    wall: ['5C'],
+    wall: TileWall.fromTiles(['5C']),
     discardPile: [{
       tile: '1B',
       player: 1
@@ -253,4 +253,45 @@ describe('validateMove', () => {
     };
     expect(validateMove(mockState, move).valid).toBe(true);
   });
-});
\ No newline at end of file
+
+  it('should only accept mahjong on the discard just thrown', () => {
+    const thrown = createMockState({
+      ...mockState,
+      currentPlayer: 2,
+      lastAction: { type: 'discard', player: 1, tile: '1B' }
+    });
+    const move: Move = { type: 'declareMahjong', player: 0 };
+    expect(validateMove(thrown, move).valid).toBe(true);
+    expect(validateMove(thrown, { type: 'declareMahjong', player: 1 }).error?.code).toBe('invalid_claim');
+
+    // Once the discard has been passed over or drawn past it is stale
+    const passed = createMockState({ ...thrown, lastAction: { type: 'draw', player: 2 } });
+    expect(validateMove(passed, move).error?.code).toBe('invalid_claim');
+    expect(validateMove(mockState, move).error?.code).toBe('invalid_claim');
+
+    // A full hand wins only on its own turn
+    const full = createMockState({
+      ...thrown,
+      players: { ...thrown.players, 0: { ...thrown.players[0], hand: [...thrown.players[0].hand, '5C'] } }
+    });
+    expect(validateMove(full, move).error?.code).toBe('not_your_turn');
+    expect(validateMove({ ...full, currentPlayer: 0 }, move).valid).toBe(true);
+  });
+
+  it('should not let a dead hand call or win', () => {
+    const dead = createMockState({
+      ...mockState,
+      currentPlayer: 2,
+      lastAction: { type: 'discard', player: 1, tile: '1B' },
+      players: { ...mockState.players, 0: { ...mockState.players[0], isDead: true } }
+    });
+    const pong: Move = {
+      type: 'claim',
+      player: 0,
+      meld: { type: 'pong', tiles: ['1B', '1B', '1B'], from: 1, exposed: true, canExchangeJokers: false }
+    };
+    expect(validateMove(dead, pong).error?.code).toBe('dead_hand');
+    expect(validateMove(dead, { type: 'declareMahjong', player: 0 }).error?.code).toBe('dead_hand');
+    expect(validateMove({ ...dead, lastAction: undefined, currentPlayer: 0 }, { type: 'draw', player: 0 }).valid).toBe(true);
+  });
+});
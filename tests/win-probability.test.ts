@@ -0,0 +1,121 @@
+import { getShared2024RuleCard, findHandByName } from '../src/rulecard';
+import {
+  handWinProbabilities,
+  winProbabilities,
+  drawsLeft,
+  unseenTiles,
+  winProbabilityCacheStats,
+  UnseenTiles
+} from '../src/win-probability';
+import { startNewGame, processMove } from '../src/engine';
+import { MATCH_CLASS_COUNT, getCompiledPattern, matchClass } from '../src/hand-matcher';
+import { encodeTile } from '../src/tile-codec';
+import { PlayerId, Tile } from '../src/types';
+
+const card = getShared2024RuleCard();
+const target = findHandByName(card, 'FF 1111 2222 3333')!;
+const complete = ['F1', 'F2', ...repeat('4B', 4), ...repeat('5B', 4), ...repeat('6B', 4)];
+
+function repeat(tile: Tile, n: number): Tile[] {
+  return new Array(n).fill(tile);
+}
+
+function pool(tiles: Tile[]): UnseenTiles {
+  const unseen = { counts: new Uint8Array(MATCH_CLASS_COUNT), jokers: 0 };
+  for (const tile of tiles) {
+    if (tile === 'J') unseen.jokers++;
+    else unseen.counts[matchClass(encodeTile(tile))]++;
+  }
+  return unseen;
+}
+
+function probabilityOf(hand: Tile[], unseen: Tile[], draws: number): number {
+  const found = handWinProbabilities(card, hand, [], pool(unseen), draws).find(p => p.pattern === target);
+  return found ? found.probability : 0;
+}
+
+function choose(n: number, k: number): number {
+  let result = 1;
+  for (let i = 0; i < k; i++) result = result * (n - i) / (i + 1);
+  return result;
+}
+
+// Every k-subset of a list of (labelled) tiles
+function* subsets(tiles: Tile[], k: number, from = 0, picked: Tile[] = []): Generator<Tile[]> {
+  if (picked.length === k) {
+    yield picked;
+    return;
+  }
+  for (let i = from; i < tiles.length; i++) yield* subsets(tiles, k, i + 1, [...picked, tiles[i]]);
+}
+
+describe('win probability', () => {
+  test('one tile away matches the closed form', () => {
+    const junk = [...repeat('1C', 4), ...repeat('2C', 4), ...repeat('3D', 4), ...repeat('N', 4)];
+    // A 6B kong short: the last 6B or any joker completes it
+    const unseen = ['6B', 'J', 'J', 'J', ...junk];
+    for (const draws of [0, 1, 3, 8]) {
+      const expected = 1 - choose(unseen.length - 4, draws) / choose(unseen.length, draws);
+      expect(probabilityOf(complete.slice(0, 13), unseen, draws)).toBeCloseTo(expected, 12);
+    }
+    // A flower short: jokers cannot fill a pair
+    const flowers = ['F3', 'F4', 'F5', 'J', 'J', ...junk];
+    const hand = complete.slice(1);
+    expect(probabilityOf(hand, flowers, 4)).toBeCloseTo(1 - choose(flowers.length - 3, 4) / choose(flowers.length, 4), 12);
+    expect(probabilityOf(complete, [], 0)).toBe(1);
+  });
+
+  test('agrees with enumerating every draw from a small pool', () => {
+    // Short a flower, a 4B and two 5Bs, holding one joker
+    const hand = ['F1', 'J', ...repeat('4B', 3), ...repeat('5B', 2), ...repeat('6B', 4)];
+    const unseen = ['F5', 'F6', '4B', '5B', '5B', 'J', 'J', '1C', '1C', '2D', 'N'];
+    const jokerLimit = getCompiledPattern(target).maxJokers;
+    for (const draws of [2, 3, 5, 7]) {
+      let wins = 0;
+      let total = 0;
+      for (const drawn of subsets(unseen, draws)) {
+        total++;
+        const count = (tile: Tile) => drawn.filter(t => t === tile).length;
+        const flowers = drawn.filter(t => t[0] === 'F').length;
+        // The pair needs a real flower; jokers (one held) fill 4B/5B gaps, up
+        // to the pattern's limit
+        const short = Math.max(0, 1 - count('4B')) + Math.max(0, 2 - count('5B'));
+        if (flowers >= 1 && short <= Math.min(jokerLimit, 1 + count('J'))) wins++;
+      }
+      expect(probabilityOf(hand, unseen, draws)).toBeCloseTo(wins / total, 12);
+    }
+  });
+
+  test('follows a game from each player\'s view', () => {
+    let state = processMove(startNewGame('odds-seed', 'secret', 0), { type: 'stopCharleston', player: 0 });
+    for (let i = 0; i < 20; i++) {
+      const player = state.currentPlayer;
+      state = state.players[player].hand.length === 14
+        ? processMove(state, { type: 'discard', player, tile: state.players[player].hand[0] })
+        : processMove(state, { type: 'draw', player });
+    }
+    const draws = ([0, 1, 2, 3] as PlayerId[]).map(pid => drawsLeft(state, pid));
+    expect(draws.reduce((a, b) => a + b)).toBe(state.wall.length);
+
+    const unseen = unseenTiles(state, 1);
+    let size = unseen.jokers;
+    unseen.counts.forEach(n => { size += n; });
+    // The wall plus the other three concealed hands
+    const others = [0, 2, 3].reduce((sum, pid) => sum + state.players[pid as PlayerId].hand.length, 0);
+    expect(size).toBe(state.wall.length + state.wall.deadLength + others);
+
+    const odds = winProbabilities(state, 1);
+    expect(odds.length).toBeGreaterThan(0);
+    for (let i = 0; i < odds.length; i++) {
+      expect(odds[i].probability).toBeGreaterThan(0);
+      expect(odds[i].probability).toBeLessThanOrEqual(1);
+      if (i > 0) expect(odds[i].probability).toBeLessThanOrEqual(odds[i - 1].probability);
+    }
+
+    const before = winProbabilityCacheStats();
+    expect(winProbabilities(state, 1)).toEqual(odds);
+    const after = winProbabilityCacheStats();
+    expect(after.misses).toBe(before.misses);
+    expect(after.hits).toBeGreaterThan(before.hits);
+  });
+});
@@ -0,0 +1,92 @@
+import { getShared2024RuleCard } from '../src/rulecard';
+import { getCompiledRuleCard, toHandVector, matchAllPatterns, HandTemplate } from '../src/hand-matcher';
+import { WinTable, buildWinTable, getWinTable, cardFingerprint } from '../src/win-table';
+import { scoreHand } from '../src/scoring';
+import { startNewGame } from '../src/engine';
+import { DeterministicRNG } from '../src/rng';
+import { createAmericanMahjongTileSet } from '../src/tiles';
+import { decodeTile, FIRST_FLOWER_ID } from '../src/tile-codec';
+import { Meld, Tile } from '../src/types';
+
+const card = getShared2024RuleCard();
+const compiled = getCompiledRuleCard(card);
+const table = WinTable.fromBytes(buildWinTable(card));
+
+function handFor(template: HandTemplate, jokers: number): Tile[] {
+  const hand: Tile[] = [];
+  let flower = 0;
+  for (let cls = 0; cls < template.natural.length; cls++) {
+    for (let n = 0; n < template.natural[cls] + template.grouped[cls]; n++) {
+      if (n >= template.natural[cls] && jokers-- > 0) hand.push('J');
+      else hand.push(cls === FIRST_FLOWER_ID ? decodeTile(FIRST_FLOWER_ID + (flower++ % 8)) : decodeTile(cls));
+    }
+  }
+  return hand;
+}
+
+function tableNames(hand: Tile[], melds: Meld[] = []): string[] {
+  return table.matchPatterns(compiled, toHandVector(hand, melds)!).map(p => p.pattern.name).sort();
+}
+
+function matcherNames(hand: Tile[], melds: Meld[] = []): string[] {
+  return matchAllPatterns(card, hand, melds).map(m => m.pattern.name).sort();
+}
+
+describe('win table', () => {
+  test('finds every pattern the matcher does for winning hands', () => {
+    for (const pattern of compiled.patterns) {
+      for (const template of pattern.templates) {
+        for (const jokers of [0, Math.min(3, pattern.maxJokers)]) {
+          const hand = handFor(template, jokers);
+          expect(tableNames(hand)).toEqual(matcherNames(hand));
+          expect(tableNames(hand)).toContain(pattern.pattern.name);
+        }
+      }
+    }
+  });
+
+  test('agrees with the matcher on random hands', () => {
+    const rng = new DeterministicRNG('table-client', 'table-secret', 2);
+    const tiles = createAmericanMahjongTileSet();
+    for (let i = 0; i < 300; i++) {
+      const pool = tiles.slice();
+      const hand: Tile[] = [];
+      for (let n = 0; n < 14; n++) hand.push(pool.splice(rng.nextUint32() % pool.length, 1)[0]);
+      expect(tableNames(hand)).toEqual(matcherNames(hand));
+    }
+    expect(tableNames(['1C', '2C'])).toEqual([]);
+  });
+
+  test('checks exposed melds against the listed patterns', () => {
+    const pattern = compiled.patterns.find(p => p.pattern.isOpen && p.templates[0].groups.length > 1)!;
+    const template = pattern.templates[0];
+    const group = template.groups[0];
+    const tile = decodeTile(group >> 3);
+    const meld: Meld = {
+      tiles: new Array(group & 7).fill(tile),
+      type: (group & 7) === 3 ? 'pong' : 'kong',
+      from: 1,
+      exposed: true,
+      canExchangeJokers: false
+    };
+    const hand = handFor(template, 0);
+    for (let n = 0; n < meld.tiles.length; n++) hand.splice(hand.indexOf(tile), 1);
+    expect(tableNames(hand, [meld])).toEqual(matcherNames(hand, [meld]));
+    expect(tableNames(hand, [meld])).toContain(pattern.pattern.name);
+  });
+
+  test('ships a table for the 2024 card that scoreHand can use', () => {
+    const shipped = getWinTable(card);
+    expect(shipped).not.toBeNull();
+    expect(shipped!.fingerprint).toBe(cardFingerprint(card));
+    expect(shipped!.keyCount).toBe(table.keyCount);
+
+    const state = startNewGame('table-seed', 'secret', 0);
+    const template = compiled.patterns[0].templates[0];
+    state.players[0].hand = handFor(template, 0);
+    state.players[0].melds = [];
+    expect(scoreHand(state, 0, card, 'table')).toEqual(scoreHand(state, 0, card));
+    state.players[0].hand = state.players[0].hand.slice(1).concat('N');
+    expect(scoreHand(state, 0, card, 'table')).toEqual(scoreHand(state, 0, card));
+  });
+});
@@ -96,6 +96,52 @@ describe('WS integration', () => {
       }
     });
   }, 15000); // Increase timeout to 15s
+
+  test('Charleston moves sent as player actions are rejected', (done: any) => {
+    const allClients: WebSocket[] = [];
+    const errors: string[] = [];
+    const client0 = new WebSocket('ws://localhost:9090');
+    allClients.push(client0);
+
+    client0.on('open', () => {
+      auth(client0);
+      createTable(client0, 'Host');
+    });
+
+    client0.on('message', (data: Buffer) => {
+      const msg = JSON.parse(data.toString());
+      if (msg.type === 'table_created') {
+        for (let i = 1; i < 4; i++) {
+          const client = new WebSocket('ws://localhost:9090');
+          allClients.push(client);
+          client.on('open', () => {
+            auth(client);
+            joinTable(client, msg.inviteCode, `Guest${i}`);
+          });
+        }
+      }
+
+      if (msg.type === 'game_start') {
+        const ts = new Date().toISOString();
+        const actions = [
+          { type: 'stopCharleston', player: msg.yourPlayerId },
+          { type: 'charlestonPass', player: msg.yourPlayerId, to: (msg.yourPlayerId + 1) % 4, tiles: msg.yourHand.slice(0, 5) }
+        ];
+        for (const action of actions) {
+          client0.send(JSON.stringify({ type: 'player_action', traceId: 't-charleston', ts, tableId: msg.tableId, action }));
+        }
+      }
+
+      if (msg.type === 'action_result' && !msg.ok) {
+        errors.push(msg.error.code);
+        if (errors.length === 2) {
+          expect(errors).toEqual(['use_charleston_messages', 'use_charleston_messages']);
+          allClients.forEach(c => c.close());
+          done();
+        }
+      }
+    });
+  }, 15000);
 });
 
 
@@ -0,0 +1,73 @@
+import { startNewGame, processMove } from '../src/engine';
+import { GameState, PlayerId } from '../src/types';
+import { DerivedState } from '../src/derived-state';
+import { ZobristHash, LOCATION_DISCARDS, handLocation } from '../src/zobrist';
+import { FairnessManager, hashPosition, hashGameState } from '../src/fairness';
+
+function playTurns(turns: number): GameState {
+  let state = processMove(startNewGame('zobrist', 'secret', 0), { type: 'stopCharleston', player: 0 });
+  for (let i = 0; i < turns; i++) {
+    const player = state.currentPlayer;
+    if (state.derived!.tileCount(player) === 13) {
+      state = processMove(state, { type: 'draw', player });
+    }
+    state = processMove(state, { type: 'discard', player, tile: state.players[player].hand[0] });
+  }
+  return state;
+}
+
+describe('ZobristHash', () => {
+  test('adding and removing a tile restores the hash', () => {
+    const hash = new ZobristHash();
+    hash.add(handLocation(0), 5);
+    const before = hash.toString();
+    hash.add(handLocation(0), 5);
+    hash.move(handLocation(0), LOCATION_DISCARDS, 5);
+    expect(hash.toString()).not.toBe(before);
+    hash.remove(LOCATION_DISCARDS, 5);
+    expect(hash.toString()).toBe(before);
+    expect(hash.remove(LOCATION_DISCARDS, 5)).toBe(false);
+  });
+
+  test('incremental updates match a hash computed from scratch', () => {
+    const state = playTurns(30);
+    expect(state.derived!.zobrist.equals(DerivedState.fromState(state).zobrist)).toBe(true);
+  });
+});
+
+describe('hashPosition', () => {
+  test('ignores hand order but not tile locations or turn', () => {
+    const state = playTurns(5);
+    const reordered: GameState = {
+      ...state,
+      players: { ...state.players, 1: { ...state.players[1], hand: state.players[1].hand.slice().reverse() } },
+      derived: undefined
+    };
+    expect(hashPosition(reordered)).toBe(hashPosition(state));
+
+    const next = processMove(state, { type: 'draw', player: state.currentPlayer });
+    expect(hashPosition(next)).not.toBe(hashPosition(state));
+    expect(hashPosition({ ...state, currentPlayer: ((state.currentPlayer + 1) % 4) as PlayerId })).not.toBe(hashPosition(state));
+  });
+
+  test('the audit log records position hashes with periodic full digests', () => {
+    const manager = new FairnessManager('zobrist-game', {}, { checkpointInterval: 4 });
+    let state = playTurns(0);
+    for (let i = 0; i < 8; i++) {
+      const player = state.currentPlayer;
+      const move = state.derived!.tileCount(player) === 13
+        ? { type: 'draw' as const, player }
+        : { type: 'discard' as const, player, tile: state.players[player].hand[0] };
+      const next = processMove(state, move);
+      manager.logGameAction(move.type, move, String(player), state, next);
+      state = next;
+    }
+
+    const entries = manager.getAuditLogger().getEntries();
+    const checkpoints = entries.filter(e => e.action === 'state_checkpoint');
+    expect(checkpoints.length).toBe(2);
+    expect(checkpoints[1].data.stateHash).toBe(hashGameState(state));
+    expect(checkpoints[1].data.positionHash).toBe(hashPosition(state));
+    expect(entries[0].stateHashAfter).toBe(entries[1].stateHashBefore);
+  });
+});